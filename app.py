@@ -16,7 +16,9 @@ import time
 # Import modules
 from modules.classifier import WasteClassifier
 from modules.data_manager import DataManager
+from modules.bulk_ingest import BulkIngestor, is_archive, iter_archive_images
 from modules.trainer import ModelTrainer
+from modules.training_estimator import TrainingEstimator, format_estimate, split_counts
 from modules.recommender import WasteRecommender
 from utils.visualizer import (
     plot_training_history_interactive, 
@@ -25,7 +27,7 @@ from utils.visualizer import (
     plot_ai_level_progress
 )
 from config import (
-    MODEL_PATH, LABELS_PATH, RAW_DATA_DIR, PROCESSED_DATA_DIR,
+    MODEL_PATH, LABELS_PATH, DATASET_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR,
     WASTE_CATEGORIES, CATEGORY_ICONS, EDUCATIONAL_CONTENT,
     AI_LEVELS, MESSAGES, DEFAULT_TRAINING_PARAMS
 )
@@ -189,6 +191,10 @@ def init_session_state():
         st.session_state.classifier = None
     if 'data_manager' not in st.session_state:
         st.session_state.data_manager = DataManager(RAW_DATA_DIR, PROCESSED_DATA_DIR)
+    if 'bulk_ingestor' not in st.session_state:
+        st.session_state.bulk_ingestor = BulkIngestor(
+            st.session_state.data_manager, DATASET_DIR / "bulk_jobs"
+        )
     if 'recommender' not in st.session_state:
         st.session_state.recommender = WasteRecommender()
     if 'training_in_progress' not in st.session_state:
@@ -335,11 +341,46 @@ def page_add_data():
         """, unsafe_allow_html=True)
         
         # Upload form
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "Pilih foto sampah",
-            type=['jpg', 'jpeg', 'png'],
-            help="Format: JPG, JPEG, atau PNG"
+            type=['jpg', 'jpeg', 'png', 'zip'],
+            accept_multiple_files=True,
+            help="Format: JPG, JPEG, atau PNG. Bisa pilih banyak gambar atau file .zip"
         )
+        uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 and not is_archive(uploaded_files[0].name) else None
+        
+        if uploaded_files and uploaded_file is None:
+            # Banyak gambar / arsip: diproses paralel lewat BulkIngestor
+            st.info(f"📦 {len(uploaded_files)} file dipilih")
+            
+            category = st.selectbox(
+                "Pilih Kategori Sampah",
+                options=list(WASTE_CATEGORIES.keys()),
+                format_func=lambda x: f"{CATEGORY_ICONS.get(x, '♻️')} {WASTE_CATEGORIES[x]}"
+            )
+            
+            if st.button("➕ Tambah Semua ke Dataset", type="primary"):
+                files = []
+                for f in uploaded_files:
+                    if is_archive(f.name):
+                        files.extend(iter_archive_images(f.getvalue(), f.name))
+                    else:
+                        files.append((f.name, f.getvalue()))
+                
+                progress = st.progress(0.0, text="Memproses gambar...")
+                job = st.session_state.bulk_ingestor.ingest(
+                    category, files,
+                    progress_callback=lambda j: progress.progress(
+                        j['processed'] / max(j['total'], 1),
+                        text=f"Memproses {j['processed']}/{j['total']} gambar..."
+                    )
+                )
+                
+                st.success(f"✅ {job['added']} gambar ditambahkan, "
+                           f"{job['duplicates']} duplikat dilewati")
+                if job['errors']:
+                    st.warning(f"⚠️ {job['errors']} file gagal diproses")
+                    st.dataframe([r for r in job['results'] if r['status'] == 'error'])
         
         if uploaded_file is not None:
             # Preview image
@@ -480,10 +521,19 @@ def page_training():
     
     # Estimate training time
     stats = st.session_state.data_manager.get_dataset_statistics()
-    estimated_time = estimate_training_time(stats['total_raw'], epochs, batch_size)
+    estimator = TrainingEstimator(str(DATASET_DIR / "training_benchmark.json"), ["training_logs"])
+    estimated_time = estimate_training_time(estimator, stats['total_raw'], epochs, batch_size)
     
     st.info(f"⏱️ Estimasi waktu training: **{estimated_time}**")
     
+    if estimator.cached_benchmark(batch_size) is None and not st.session_state.training_in_progress:
+        if st.button("📏 Ukur kecepatan komputer ini (beberapa detik)"):
+            with st.spinner("Mengukur kecepatan training..."):
+                split_result = st.session_state.data_manager.split_dataset()
+                if split_result['success']:
+                    estimator.benchmark(ModelTrainer(PROCESSED_DATA_DIR, MODEL_PATH), batch_size)
+            st.rerun()
+    
     # Training button
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -885,18 +935,11 @@ def get_ai_level_name(accuracy: float) -> str:
     else:
         return "🚀 AI Roket"
 
-def estimate_training_time(total_images: int, epochs: int, batch_size: int) -> str:
-    """Estimasi waktu training"""
-    # Rough estimate: ~0.1s per batch per epoch
-    batches_per_epoch = max(total_images // batch_size, 1)
-    total_seconds = batches_per_epoch * epochs * 0.1
-    
-    if total_seconds < 60:
-        return f"{total_seconds:.0f} detik"
-    elif total_seconds < 3600:
-        return f"{total_seconds/60:.1f} menit"
-    else:
-        return f"{total_seconds/3600:.1f} jam"
+def estimate_training_time(estimator: TrainingEstimator, total_images: int, epochs: int,
+                           batch_size: int) -> str:
+    """Estimasi waktu training (benchmark mesin ini + riwayat training log)"""
+    estimate = estimator.estimate(epochs, batch_size, split_counts(total_images))
+    return format_estimate(estimate)
 
 # 🎯 MAIN APP
 def main():
@@ -8,7 +8,7 @@ Purpose: Deployment-ready Flask backend dengan keamanan dataset
 Version: 3.0 (Flask Production Version)
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Request, render_template, request, jsonify, send_from_directory, Response, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
@@ -19,12 +19,38 @@ import uuid
 from datetime import datetime
 import threading
 import traceback
+import tempfile
+import time
+import random
+import multiprocessing
+import numpy as np
+import subprocess
+from queue import Queue, Empty
 
 # Import modul dari folder parent
 sys.path.append(str(Path(__file__).parent.parent))
-from modules.classifier import WasteClassifier
+from modules.checkpointing import find_resumable
+from modules.cpu_budget import LatencyMonitor, DEFAULT_NICE as DEFAULT_TRAINING_NICE
+from modules.training_queue import TrainingQueue
+from modules.event_stream import EventHub, format_sse
+from modules.shared_state import SharedState
+from modules.training_estimator import (
+    TrainingEstimator, BENCHMARK_MODES, format_estimate, split_counts
+)
+from modules.classifier import WasteClassifier, StageTimer
+from modules.bulk_ingest import BulkIngestor, is_archive, iter_archive_images
 from modules.data_manager import DataManager
+from modules.knn_classifier import KNNClassifier, blend
+from modules.near_duplicates import DEFAULT_THRESHOLD as DEFAULT_NEAR_DUPLICATE_THRESHOLD
+from modules.tensor_cache import TensorCache
+from modules.dataset_watcher import DatasetWatcher
 from modules.recommender import WasteRecommender
+from modules.similarity_index import EmbeddingIndex
+from utils.metrics import REGISTRY
+from utils.tensor_codec import (
+    decode_tensor_batch, encode_prediction_binary, encode_prediction_msgpack,
+    msgpack_available, BINARY_MIMETYPE, MSGPACK_MIMETYPE
+)
 
 # Lazy import trainer to avoid loading TensorFlow at startup
 _ModelTrainer = None
@@ -40,14 +66,70 @@ BASE_DIR = Path(__file__).parent.parent
 BACKEND_DIR = Path(__file__).parent
 
 # Dataset private - TIDAK BOLEH diakses public!
-DATASET_PRIVATE = BACKEND_DIR / "dataset_private"
+# DATASET_DIR / MODEL_DIR bisa di-override lewat environment (mis. load test)
+DATASET_PRIVATE = Path(os.environ.get('DATASET_DIR', BACKEND_DIR / "dataset_private"))
 RAW_DATA_DIR = DATASET_PRIVATE / "raw"
 PROCESSED_DATA_DIR = DATASET_PRIVATE / "processed"
 
+# Index embedding untuk pencarian gambar mirip
+EMBEDDING_INDEX_PATH = DATASET_PRIVATE / "embedding_index.npz"
+
+# Cache tensor uint8 ter-decode untuk training (diisi saat upload)
+TENSOR_CACHE_DIR = DATASET_PRIVATE / "tensor_cache"
+
+# Cache fitur backbone beku untuk training mode transfer
+FEATURE_CACHE_DIR = DATASET_PRIVATE / "feature_cache"
+
+# Checkpoint training mode full (satu folder per training_id), untuk
+# melanjutkan run yang terputus
+CHECKPOINT_DIR = DATASET_PRIVATE / "checkpoints"
+
+# Antrian job training + training worker (proses terpisah, satu per host):
+# spawn = dijalankan otomatis oleh backend saat ada job, external = worker
+# dijalankan sendiri (python backend/training_worker.py --forever)
+TRAINING_QUEUE_PATH = DATASET_PRIVATE / "training_queue.db"
+
+# State bersama semua worker web + training worker (file mmap, disk lokal):
+# status training, versi & akurasi model, counter
+SHARED_STATE_PATH = DATASET_PRIVATE / "shared_state.bin"
+# Cache micro-benchmark training untuk /api/train/estimate (per mesin)
+TRAINING_BENCHMARK_PATH = DATASET_PRIVATE / "training_benchmark.json"
+TRAINING_WORKER_MODE = os.environ.get('TRAINING_WORKER', 'spawn').lower()
+
+# 🧮 Budget CPU training (modules/cpu_budget.py): core yang disisakan untuk
+# inference, batas thread TF (0 = jumlah core training) dan nice proses
+# training. Training diperlambat selama p95 latency predict melewati
+# PREDICT_P95_THRESHOLD_MS (0 = throttle nonaktif)
+INFERENCE_RESERVED_CORES = int(os.environ.get('INFERENCE_RESERVED_CORES', 1))
+TRAINING_CPU_THREADS = int(os.environ.get('TRAINING_CPU_THREADS', 0))
+TRAINING_NICE = int(os.environ.get('TRAINING_NICE', DEFAULT_TRAINING_NICE))
+PREDICT_P95_THRESHOLD_MS = float(os.environ.get('PREDICT_P95_THRESHOLD_MS', 500))
+PREDICT_LATENCY_DIR = os.environ.get(
+    'PREDICT_LATENCY_DIR',
+    str(Path(tempfile.gettempdir()) / "smart_waste_latency")
+)
+
+# Watcher folder dataset: auto (inotify jika watchdog terinstall, selain itu
+# polling), inotify, poll, atau off
+DATASET_WATCHER_MODE = os.environ.get('DATASET_WATCHER', 'auto').lower()
+
 # Model storage
-MODEL_DIR = BACKEND_DIR / "model"
+MODEL_DIR = Path(os.environ.get('MODEL_DIR', BACKEND_DIR / "model"))
 MODEL_PATH = MODEL_DIR / "keras_model.h5"
 LABELS_PATH = MODEL_DIR / "labels.txt"
+# Backbone lokal opsional untuk mode transfer (default: model yang dipakai)
+BACKBONE_PATH = MODEL_DIR / "backbone.h5"
+
+# Mode training /api/train
+TRAINING_MODES = ['full', 'transfer', 'incremental']
+# Rentang batas waktu training (time_budget_minutes)
+MIN_TIME_BUDGET_MINUTES = 1
+MAX_TIME_BUDGET_MINUTES = 240
+# Jeda minimal antar spawn benchmark estimasi untuk batch size yang sama
+BENCHMARK_SPAWN_INTERVAL = 120
+
+# Mode klasifikasi /api/predict: CNN, k-NN di embedding, atau gabungan
+PREDICT_MODES = ['cnn', 'knn', 'blend']
 
 # Upload temporary storage
 UPLOAD_FOLDER = BACKEND_DIR / "uploads_temp"
@@ -62,18 +144,56 @@ STATIC_DIR = FRONTEND_DIR / "static"
 TRAINING_LOGS_DIR = BACKEND_DIR / "training_logs"
 TRAINING_LOGS_DIR.mkdir(exist_ok=True)
 
+# Metrics: snapshot per worker gunicorn dikumpulkan di folder ini
+# (set METRICS_MULTIPROC_DIR="" untuk menonaktifkan agregasi multi-proses)
+METRICS_DIR = os.environ.get(
+    'METRICS_MULTIPROC_DIR',
+    str(Path(tempfile.gettempdir()) / "smart_waste_metrics")
+)
+
 # 🔧 KONFIGURASI FLASK
+BULK_UPLOAD_PATH = '/api/upload-training/bulk'
+
+class _AppRequest(Request):
+    """Request dengan batas ukuran body lebih besar khusus untuk bulk upload"""
+    @property
+    def max_content_length(self):
+        if self.path == BULK_UPLOAD_PATH:
+            return BULK_MAX_CONTENT_LENGTH
+        return super().max_content_length
+
+    @property
+    def max_form_parts(self):
+        if self.path == BULK_UPLOAD_PATH:
+            return MAX_BULK_FILES + 16
+        return 1000  # Default Werkzeug
+
 app = Flask(__name__, 
             template_folder=str(TEMPLATE_DIR),
             static_folder=str(STATIC_DIR))
 
 # CORS untuk akses API dari frontend berbeda domain
 CORS(app)
+app.request_class = _AppRequest
 
 # Konfigurasi upload
 app.config['UPLOAD_FOLDER'] = str(UPLOAD_FOLDER)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Max 16MB
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'}
+BULK_MAX_CONTENT_LENGTH = int(os.environ.get('BULK_UPLOAD_MAX_MB', 256)) * 1024 * 1024
+MAX_BULK_FILES = 2000  # Maksimal gambar per job bulk upload
+BULK_JOBS_DIR = DATASET_PRIVATE / "bulk_jobs"
+MAX_TENSOR_BATCH = 64  # Maksimal gambar per request /api/predict-tensor
+MAX_SIMILAR_RESULTS = 50  # Maksimal k untuk /api/similar
+
+# 📡 Server-Sent Events (/api/events). Satu stream memakai satu thread
+# worker selama terbuka: jalankan gunicorn dengan --threads dan jaga
+# SSE_MAX_CLIENTS di bawah jumlah thread. Stream ditutup setelah
+# SSE_MAX_STREAM_SECONDS; browser reconnect otomatis dengan Last-Event-ID
+SSE_MAX_CLIENTS = int(os.environ.get('SSE_MAX_CLIENTS', 4))
+SSE_BUFFER_SIZE = 64  # Event tertunda maksimal per klien
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_STREAM_SECONDS = 300
 
 # 🌍 GLOBAL VARIABLES
 # Gunakan dictionary untuk thread-safe storage
@@ -81,19 +201,85 @@ app_state = {
     'classifier': None,
     'data_manager': None,
     'recommender': None,
-    'training_status': {
-        'in_progress': False,
-        'current_epoch': 0,
-        'total_epochs': 0,
-        'progress': 0,
-        'message': 'Idle',
-        'accuracy': 0,
-        'loss': 0
-    },
-    'model_accuracy': 0.0,
-    'total_training_count': 0
+    'training_queue': None,
+    'shared_state': None,
+    'model_fingerprint': None,
+    'similarity_index': None,
+    'knn_classifier': None,
+    'similarity_generation': 0,
+    'similarity_building': False,
+    'dataset_watcher': None,
+    'bulk_ingestor': None,
+    'tensor_cache': None,
+    'latency_monitor': None,
+    'event_hub': None,
+    'training_estimator': None,
+    'benchmark_spawned': {}
 }
 
+_init_lock = threading.Lock()
+_worker_spawn_lock = threading.Lock()
+_similarity_lock = threading.Lock()
+_similarity_tasks = Queue()
+_similarity_worker = None
+_similarity_save_timer = None
+_dataset_event_timer = None
+
+# 📈 METRICS
+REQUEST_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency per route',
+    ('route', 'method', 'status')
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    'http_requests_in_flight', 'Requests currently being handled (queue depth)'
+)
+INFERENCE_BATCH_SIZE = REGISTRY.histogram(
+    'inference_batch_size', 'Images per model forward pass', ('endpoint',),
+    buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+INFERENCE_LATENCY = REGISTRY.histogram(
+    'inference_duration_seconds', 'Prediction latency including preprocessing', ('endpoint',)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'cache_requests_total', 'Lookups of in-process caches', ('cache', 'result')
+)
+MODEL_LOADS = REGISTRY.counter('model_loads_total', 'Number of model loads')
+PREDICTIONS = REGISTRY.counter(
+    'predictions_total', 'Images classified by the model', ('endpoint',)
+)
+MODEL_LOAD_SECONDS = REGISTRY.gauge(
+    'model_load_duration_seconds', 'Duration of the last model load',
+    multiprocess_mode='all'
+)
+TRAINING_IN_PROGRESS = REGISTRY.gauge(
+    'training_in_progress', 'Whether a training run is active', multiprocess_mode='max'
+)
+TRAINING_PROGRESS = REGISTRY.gauge(
+    'training_progress_percent', 'Progress of the active training run',
+    multiprocess_mode='max'
+)
+TRAINING_EPOCH = REGISTRY.gauge(
+    'training_epoch', 'Last completed epoch of the active training run',
+    multiprocess_mode='max'
+)
+
+PREDICT_STAGE_LATENCY = REGISTRY.histogram(
+    'predict_stage_duration_seconds', 'Sampled per-stage latency of /api/predict',
+    ('endpoint', 'stage')
+)
+
+# Maksimal upload yang di-embed dalam satu forward pass background thread
+SIMILARITY_EMBED_BATCH = 64
+
+# Fraksi request predict yang breakdown per tahapnya masuk ke metrics
+STAGE_TIMING_SAMPLE_RATE = float(os.environ.get('STAGE_TIMING_SAMPLE_RATE', 0.1))
+
+# Proses anak multiprocessing (pool bulk upload, spawn) ikut meng-import
+# modul ini sebagai __mp_main__; hanya proses server yang publish metrics
+if METRICS_DIR and multiprocessing.parent_process() is None:
+    # Training worker bergabung ke sesi metrics gunicorn lewat METRICS_SESSION
+    REGISTRY.enable_multiprocess(METRICS_DIR, session=os.environ.get('METRICS_SESSION'))
+
 # 🔐 KATEGORI SAMPAH & KONFIGURASI
 WASTE_CATEGORIES = {
     "cardboard": "Cardboard",
@@ -120,6 +306,353 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def wants_timing_debug():
+    """
+    🐞 Cek apakah klien minta field debug timing
+    (query ?debug=timing atau header X-Debug-Timing: 1)
+    """
+    return request.args.get('debug') == 'timing' or request.headers.get('X-Debug-Timing') == '1'
+
+def timed_response(payload, timer, endpoint, mimetype='application/json'):
+    """
+    ⏱️ Encode payload JSON, pasang header Server-Timing, sampling ke metrics
+    
+    Field debug (payload['data']['timing']) berisi semua tahap kecuali
+    encode, karena dibuat sebelum payload di-encode.
+    """
+    if wants_timing_debug() and isinstance(payload.get('data'), dict):
+        payload['data']['timing'] = timer.as_dict()
+    
+    with timer.stage('encode'):
+        body = app.json.dumps(payload)
+    
+    response = Response(body, mimetype=mimetype)
+    response.headers['Server-Timing'] = timer.server_timing_header()
+    
+    if random.random() < STAGE_TIMING_SAMPLE_RATE:
+        for stage, duration in timer.as_dict().items():
+            PREDICT_STAGE_LATENCY.observe(duration / 1000, endpoint=endpoint, stage=stage)
+    return response
+
+def get_classifier():
+    """
+    🧠 Ambil classifier, lazy load saat request pertama
+    Return None jika model belum tersedia
+    """
+    _check_model_update()
+    if app_state['classifier'] is None:
+        if 'model_path' in app_state and 'labels_path' in app_state:
+            CACHE_REQUESTS.inc(cache='classifier', result='miss')
+            print("  🔄 Loading model for first time...")
+            start = time.perf_counter()
+            app_state['classifier'] = WasteClassifier(
+                app_state['model_path'],
+                app_state['labels_path']
+            )
+            app_state['model_fingerprint'] = _model_fingerprint()
+            MODEL_LOAD_SECONDS.set(time.perf_counter() - start)
+            MODEL_LOADS.inc()
+            print("  ✅ Classifier loaded successfully")
+    else:
+        CACHE_REQUESTS.inc(cache='classifier', result='hit')
+    return app_state['classifier']
+
+def _check_model_update():
+    """
+    🔄 Model diganti training worker (proses lain): buang classifier, index
+    embedding & k-NN lama agar di-load ulang dari file baru
+    """
+    if 'model_path' not in app_state:
+        if not (MODEL_PATH.exists() and LABELS_PATH.exists()):
+            return
+        app_state['model_path'] = str(MODEL_PATH)
+        app_state['labels_path'] = str(LABELS_PATH)
+    if app_state['classifier'] is None:
+        return
+    try:
+        fingerprint = _model_fingerprint()
+    except OSError:
+        return
+    if fingerprint != app_state['model_fingerprint']:
+        print("  🔄 Model baru terdeteksi, reload classifier")
+        app_state['classifier'] = None
+        with _similarity_lock:
+            rebuild = app_state['similarity_index'] is not None or app_state['similarity_building']
+            app_state['similarity_index'] = None  # Embedding berubah bersama model
+            app_state['knn_classifier'] = None
+            app_state['similarity_generation'] += 1
+            app_state['similarity_building'] = False
+        _load_training_history()
+        if rebuild:
+            _request_similarity_build()
+
+def _model_fingerprint(model_path=None):
+    """
+    🔖 Identitas file model (ukuran + mtime) untuk validasi index embedding
+    """
+    stat = os.stat(model_path or app_state['model_path'])
+    return f"{stat.st_size}-{int(stat.st_mtime)}"
+
+def publish_model_state(state, accuracy, trainings=None):
+    """
+    🧷 Versi & akurasi model aktif ke shared state (sama di semua proses)
+    
+    Args:
+        state: SharedState
+        accuracy: Test accuracy model di MODEL_PATH
+        trainings: Jumlah training total (default: counter lama + 1)
+    """
+    with state.transaction() as data:
+        data['model'] = {
+            'version': _model_fingerprint(str(MODEL_PATH)) if MODEL_PATH.exists() else None,
+            'accuracy': accuracy,
+            'updated_at': datetime.now().isoformat()
+        }
+        counters = data.setdefault('counters', {})
+        counters['trainings'] = trainings if trainings is not None else counters.get('trainings', 0) + 1
+
+def get_similarity_index():
+    """
+    🧭 Ambil index embedding jika sudah siap
+    
+    Jika belum, index dibangun di background thread (_similarity_worker_loop)
+    sehingga request tidak menunggu seluruh dataset di-embed.
+    Return None jika index belum siap atau model belum tersedia
+    """
+    index = app_state['similarity_index']
+    if index is not None:
+        CACHE_REQUESTS.inc(cache='similarity_index', result='hit')
+        return index
+    CACHE_REQUESTS.inc(cache='similarity_index', result='miss')
+    if get_classifier() is not None:
+        _request_similarity_build()
+    return None
+
+def get_knn_classifier():
+    """
+    🗳️ Ambil classifier k-NN (dibangun bersama index embedding di background;
+    gambar baru ditambahkan lewat on_dataset_change)
+    Return None jika belum siap atau model belum tersedia
+    """
+    if get_similarity_index() is None:
+        return None
+    return app_state['knn_classifier']
+
+def _request_similarity_build():
+    """🏗️ Antrikan pembangunan index embedding + k-NN (sekali per versi model)"""
+    global _similarity_worker
+    with _similarity_lock:
+        if app_state['similarity_index'] is not None or app_state['similarity_building']:
+            return
+        app_state['similarity_building'] = True
+        _similarity_tasks.put(('build', app_state['similarity_generation'], None))
+        if _similarity_worker is None or not _similarity_worker.is_alive():
+            _similarity_worker = threading.Thread(target=_similarity_worker_loop, daemon=True)
+            _similarity_worker.start()
+
+def _build_similarity_index(generation):
+    """
+    🏗️ Sync index embedding di disk dengan dataset lalu bangun k-NN.
+    Hasilnya dibuang jika model berganti selama pembangunan
+    """
+    classifier = get_classifier()
+    if classifier is None:
+        return
+    index = EmbeddingIndex(
+        str(EMBEDDING_INDEX_PATH),
+        fingerprint=_model_fingerprint(),
+        approximate=os.environ.get('SIMILARITY_APPROXIMATE') == '1'
+    )
+    index.load()
+    sync_result = index.sync_with_directory(
+        str(RAW_DATA_DIR),
+        classifier.extract_embeddings_from_files
+    )
+    if sync_result['added'] or sync_result['removed']:
+        index.save()
+    knn = KNNClassifier.from_index(index, classifier.label_names)
+    with _similarity_lock:
+        if generation != app_state['similarity_generation']:
+            return
+        app_state['similarity_index'] = index
+        app_state['knn_classifier'] = knn
+    print(f"  🧭 Similarity index siap: {len(index)} gambar "
+          f"(+{sync_result['added']} / -{sync_result['removed']}), k-NN {len(knn)} gambar")
+    if sync_result['skipped']:
+        print(f"  ⚠️  {sync_result['skipped']} gambar rusak tidak masuk similarity index")
+
+def _apply_added_images(items):
+    """
+    ➕ Embed gambar baru dalam satu batch lalu tambahkan ke index embedding
+    & k-NN (langsung ikut voting)
+    """
+    with _similarity_lock:
+        index = app_state['similarity_index']
+        knn = app_state['knn_classifier']
+        generation = app_state['similarity_generation']
+    classifier = app_state['classifier']
+    # Model berganti setelah upload: index baru di-sync dari folder dataset
+    items = [(category, path) for item_generation, category, path in items
+             if item_generation == generation and Path(path).exists()]
+    if index is None or classifier is None or not items:
+        return
+    
+    paths = [str(path) for _, path in items]
+    try:
+        embeddings = classifier.extract_embeddings_from_files(paths)
+    except Exception as e:
+        # Satu gambar rusak tidak boleh menggagalkan seluruh batch
+        print(f"⚠️  Embedding batch gagal ({e}), dicoba per gambar")
+        kept, vectors = [], []
+        for item, path in zip(items, paths):
+            try:
+                vectors.append(classifier.extract_embedding(path))
+                kept.append(item)
+            except Exception as item_error:
+                print(f"⚠️  Embedding {path} gagal: {item_error}")
+        if not kept:
+            return
+        items, embeddings = kept, np.stack(vectors)
+    
+    keys = [f"{category}/{Path(path).name}" for category, path in items]
+    index.add(keys, embeddings)
+    if knn is not None:
+        labels = [knn.class_index(category) for category, _ in items]
+        known = [i for i, label in enumerate(labels) if label is not None]
+        if known:
+            knn.add([keys[i] for i in known], [labels[i] for i in known], embeddings[known])
+
+def _apply_deleted_image(generation, category, path):
+    with _similarity_lock:
+        index = app_state['similarity_index']
+        knn = app_state['knn_classifier']
+        if generation != app_state['similarity_generation'] or index is None:
+            return
+    key = f"{category}/{Path(path).name}"
+    index.remove(key)
+    if knn is not None:
+        knn.remove(key)
+
+def _similarity_worker_loop():
+    """
+    🧵 Background thread: satu-satunya yang meng-embed gambar untuk index
+    embedding & k-NN (request predict/similar/upload tidak pernah menunggu)
+    
+    Task diproses berurutan: build, lalu upload/hapus yang terjadi selama
+    build. Upload beruntun (bulk upload) di-embed dalam satu batch.
+    """
+    while True:
+        tasks = [_similarity_tasks.get()]
+        while len(tasks) < SIMILARITY_EMBED_BATCH:
+            try:
+                tasks.append(_similarity_tasks.get_nowait())
+            except Empty:
+                break
+        
+        added = []
+        changed = False
+        for kind, generation, payload in tasks + [(None, None, None)]:
+            if kind == 'added':
+                added.append((generation,) + payload)
+                continue
+            try:
+                if added:
+                    _apply_added_images(added)
+                    changed = True
+                    added = []
+                if kind == 'build':
+                    _build_similarity_index(generation)
+                elif kind == 'deleted':
+                    _apply_deleted_image(generation, *payload)
+                    changed = True
+            except Exception as e:
+                print(f"⚠️  Update similarity index gagal: {e}")
+                traceback.print_exc()
+            finally:
+                if kind == 'build':
+                    with _similarity_lock:
+                        if generation == app_state['similarity_generation']:
+                            app_state['similarity_building'] = False
+        if changed:
+            _schedule_similarity_save()
+
+def _schedule_similarity_save(delay=5.0):
+    """
+    💾 Simpan index ke disk dengan debounce (banyak upload = satu kali tulis)
+    """
+    global _similarity_save_timer
+    if _similarity_save_timer is not None and _similarity_save_timer.is_alive():
+        return
+    
+    def save():
+        index = app_state['similarity_index']
+        if index is not None:
+            index.save()
+    
+    _similarity_save_timer = threading.Timer(delay, save)
+    _similarity_save_timer.daemon = True
+    _similarity_save_timer.start()
+
+def _schedule_dataset_event(delay=2.0):
+    """
+    📡 Beri tahu klien stream bahwa dataset berubah, dengan debounce
+    (bulk upload = satu event)
+    """
+    global _dataset_event_timer
+    if _dataset_event_timer is not None and _dataset_event_timer.is_alive():
+        return
+    
+    def publish():
+        queue = app_state['training_queue']
+        if queue is not None:
+            queue.publish_event('dataset', {'changed_at': datetime.now().isoformat()})
+    
+    _dataset_event_timer = threading.Timer(delay, publish)
+    _dataset_event_timer.daemon = True
+    _dataset_event_timer.start()
+
+def on_dataset_change(event, category, path):
+    """
+    🔔 Listener DataManager: isi tensor cache training, update index
+    embedding serta k-NN secara incremental, dan kirim event "dataset"
+    """
+    _schedule_dataset_event()
+    
+    if event == 'added' and app_state['tensor_cache'] is not None:
+        record = app_state['data_manager'].catalog.get(category, Path(path).name)
+        if record is not None:
+            app_state['tensor_cache'].add(record['sha256'], path)
+    
+    with _similarity_lock:
+        if app_state['similarity_index'] is None and not app_state['similarity_building']:
+            return  # Belum dibangun, folder dataset di-sync saat dibangun
+        generation = app_state['similarity_generation']
+    # Embedding (forward pass CNN) dikerjakan background thread, bukan di request upload
+    if event in ('added', 'deleted'):
+        _similarity_tasks.put((event, generation, (category, str(path))))
+
+def _load_training_history():
+    """
+    📊 Akurasi model & jumlah training dari log training, jika shared state
+    belum mencatat model yang ada di disk (mis. model disalin manual)
+    """
+    model = app_state['shared_state'].get('model') or {}
+    version = _model_fingerprint(str(MODEL_PATH)) if MODEL_PATH.exists() else None
+    if model and model.get('version') == version:
+        return
+    
+    log_files = list(TRAINING_LOGS_DIR.glob("training_log_*.json"))
+    accuracy = 0.0
+    if log_files:
+        latest_log = max(log_files, key=lambda x: x.stat().st_mtime)
+        with open(latest_log, 'r') as f:
+            log_data = json.load(f)
+            accuracy = log_data.get(
+                'test_accuracy', log_data.get('results', {}).get('test_accuracy', 0.0)
+            )
+    publish_model_state(app_state['shared_state'], accuracy, trainings=len(log_files))
+    print(f"  📊 Loaded training history: {len(log_files)} trainings")
+
 def init_backend():
     """
     🚀 Inisialisasi backend saat startup
@@ -131,7 +664,7 @@ def init_backend():
     
     try:
         # Buat folder yang diperlukan
-        MODEL_DIR.mkdir(exist_ok=True)
+        MODEL_DIR.mkdir(parents=True, exist_ok=True)
         RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
         PROCESSED_DATA_DIR.mkdir(parents=True, exist_ok=True)
         
@@ -159,8 +692,28 @@ def init_backend():
             str(RAW_DATA_DIR), 
             str(PROCESSED_DATA_DIR)
         )
+        app_state['tensor_cache'] = TensorCache(str(TENSOR_CACHE_DIR))
+        app_state['data_manager'].add_listener(on_dataset_change)
         print("  ✅ Data Manager initialized")
         
+        # Watcher folder dataset (file yang masuk lewat rsync dsb.)
+        if DATASET_WATCHER_MODE != 'off':
+            app_state['dataset_watcher'] = DatasetWatcher(
+                app_state['data_manager'], mode=DATASET_WATCHER_MODE
+            )
+            app_state['dataset_watcher'].start()
+        
+        # Bulk upload: decode/encode di process pool terbatas
+        app_state['bulk_ingestor'] = BulkIngestor(
+            app_state['data_manager'],
+            str(BULK_JOBS_DIR),
+            max_workers=int(os.environ.get('BULK_UPLOAD_WORKERS', 0)) or None
+        )
+        
+        # Latency predict proses ini -> throttle training worker
+        if PREDICT_P95_THRESHOLD_MS > 0:
+            app_state['latency_monitor'] = LatencyMonitor(PREDICT_LATENCY_DIR)
+        
         # Inisialisasi Recommender
         app_state['recommender'] = WasteRecommender()
         print("  ✅ Recommender initialized")
@@ -175,15 +728,28 @@ def init_backend():
         else:
             print("  ⚠️  Model not found - training required")
         
-        # Load training history
-        log_files = list(TRAINING_LOGS_DIR.glob("training_log_*.json"))
-        if log_files:
-            latest_log = max(log_files, key=lambda x: x.stat().st_mtime)
-            with open(latest_log, 'r') as f:
-                log_data = json.load(f)
-                app_state['model_accuracy'] = log_data.get('test_accuracy', 0.0)
-                app_state['total_training_count'] = len(log_files)
-            print(f"  📊 Loaded training history: {app_state['total_training_count']} trainings")
+        # State bersama antar worker + training history
+        app_state['shared_state'] = SharedState(str(SHARED_STATE_PATH))
+        _load_training_history()
+        
+        # Antrian training; job queued / terputus dijalankan training worker
+        app_state['training_queue'] = TrainingQueue(str(TRAINING_QUEUE_PATH), app_state['shared_state'])
+        app_state['training_queue'].publish_state()
+        app_state['event_hub'] = EventHub(
+            app_state['training_queue'].events_since,
+            app_state['training_queue'].last_event_id,
+            buffer_size=SSE_BUFFER_SIZE,
+            max_clients=SSE_MAX_CLIENTS
+        )
+        if app_state['training_queue'].pending_count():
+            _ensure_training_worker()
+        app_state['training_estimator'] = TrainingEstimator(str(TRAINING_BENCHMARK_PATH), [TRAINING_LOGS_DIR])
+        if EMBEDDING_INDEX_PATH.exists() and 'model_path' in app_state:
+            # Index pernah dipakai: load + sync di background sebelum request k-NN pertama
+            _request_similarity_build()
+        resumable = find_resumable(str(CHECKPOINT_DIR))
+        if resumable:
+            print(f"  ♻️  Training {resumable['run_id']} gagal di tengah - lanjutkan via POST /api/train/resume")
         
         print("\n✅ Backend initialization completed!")
         print("="*60 + "\n")
@@ -192,6 +758,46 @@ def init_backend():
         print(f"\n❌ Error during initialization: {e}")
         traceback.print_exc()
 
+# 🚀 INISIALISASI SAAT REQUEST PERTAMA
+# Di bawah gunicorn blok __main__ tidak pernah jalan, jadi setiap worker
+# menginisialisasi backend saat menerima request pertamanya.
+
+@app.before_request
+def _ensure_backend_initialized():
+    if app_state['data_manager'] is None:
+        with _init_lock:
+            if app_state['data_manager'] is None:
+                init_backend()
+
+# 📈 REQUEST INSTRUMENTATION
+
+# Route yang latency-nya dijaga dari training (lihat PREDICT_P95_THRESHOLD_MS)
+PREDICT_ROUTES = {'/api/predict', '/api/predict-tensor'}
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc()
+
+@app.after_request
+def _record_request_latency(response):
+    if 'request_start' in g:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        duration = time.perf_counter() - g.request_start
+        REQUEST_LATENCY.observe(
+            duration,
+            route=route, method=request.method, status=str(response.status_code)
+        )
+        monitor = app_state['latency_monitor']
+        if monitor is not None and route in PREDICT_ROUTES and response.status_code < 400:
+            monitor.observe(duration)
+    return response
+
+@app.teardown_request
+def _finish_request(exc):
+    if 'request_start' in g:
+        REQUESTS_IN_FLIGHT.dec()
+
 # 🌐 ROUTES - PUBLIC PAGES
 
 @app.route('/')
@@ -212,9 +818,21 @@ def health():
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
         'model_loaded': app_state['classifier'] is not None,
-        'training_in_progress': app_state['training_status']['in_progress']
+        'training_in_progress': _training_status()['in_progress']
     })
 
+@app.route('/metrics')
+def metrics():
+    """
+    📈 Metrics format teks Prometheus
+    Latency per route, batch inferensi, cache, load model, training, RSS
+    (digabung dari semua worker gunicorn)
+    """
+    return Response(
+        REGISTRY.exposition(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
 # 🔌 API ENDPOINTS
 
 @app.route('/api/status', methods=['GET'])
@@ -235,8 +853,13 @@ def api_status():
         # Model status
         model_exists = MODEL_PATH.exists()
         
+        # Versi/akurasi model & counter: sama di semua worker
+        shared = app_state['shared_state'].snapshot()
+        model = shared.get('model') or {}
+        counters = shared.get('counters', {})
+        
         # AI Level calculation
-        accuracy = app_state['model_accuracy']
+        accuracy = model.get('accuracy', 0.0)
         if accuracy < 0.5:
             ai_level = "🥚 AI Telur"
         elif accuracy < 0.7:
@@ -254,17 +877,19 @@ def api_status():
                 'dataset': {
                     'total_images': stats['total_raw'],
                     'by_category': stats['raw'],
-                    'ready_for_training': app_state['data_manager'].check_dataset_ready()['ready']
+                    'ready_for_training': app_state['data_manager'].check_dataset_ready(stats)['ready']
                 },
                 'model': {
                     'exists': model_exists,
                     'loaded': app_state['classifier'] is not None,
-                    'accuracy': app_state['model_accuracy'],
-                    'ai_level': ai_level
+                    'accuracy': accuracy,
+                    'ai_level': ai_level,
+                    'version': model.get('version'),
+                    'predictions_total': int(REGISTRY.total('predictions_total'))
                 },
                 'training': {
-                    'total_count': app_state['total_training_count'],
-                    'status': app_state['training_status']
+                    'total_count': counters.get('trainings', 0),
+                    'status': _training_status()
                 }
             }
         })
@@ -282,6 +907,10 @@ def api_predict():
     
     Request:
         - file: image file (multipart/form-data)
+        - mode (optional): "cnn" (default), "knn" (voting k tetangga
+          terdekat di embedding gambar training, tanpa training ulang),
+          atau "blend" (gabungan keduanya)
+        - knn_weight (optional): bobot k-NN untuk mode blend, 0-1 (default: 0.5)
     
     Returns:
         - Predicted class
@@ -289,30 +918,43 @@ def api_predict():
         - All predictions
         - Recommendation
     """
+    timer = StageTimer()
     try:
         # Lazy load classifier jika belum di-load
-        if app_state['classifier'] is None:
-            if 'model_path' in app_state and 'labels_path' in app_state:
-                print("  🔄 Loading model for first time...")
-                app_state['classifier'] = WasteClassifier(
-                    app_state['model_path'],
-                    app_state['labels_path']
-                )
-                print("  ✅ Classifier loaded successfully")
-            else:
-                return jsonify({
-                    'success': False,
-                    'error': 'Model belum tersedia. Silakan lakukan training terlebih dahulu.'
-                }), 400
+        if get_classifier() is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model belum tersedia. Silakan lakukan training terlebih dahulu.'
+            }), 400
+        
+        # Parsing multipart terjadi saat request.files pertama kali diakses
+        with timer.stage('parse'):
+            files = request.files
+        
+        mode = request.values.get('mode', 'cnn').lower()
+        if mode not in PREDICT_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"Mode harus salah satu dari: {', '.join(PREDICT_MODES)}"
+            }), 400
+        try:
+            knn_weight = float(request.values.get('knn_weight', 0.5))
+        except ValueError:
+            knn_weight = -1
+        if not 0 <= knn_weight <= 1:
+            return jsonify({
+                'success': False,
+                'error': 'knn_weight harus antara 0-1'
+            }), 400
         
         # Cek file upload
-        if 'file' not in request.files:
+        if 'file' not in files:
             return jsonify({
                 'success': False,
                 'error': 'Tidak ada file yang diupload'
             }), 400
         
-        file = request.files['file']
+        file = files['file']
         
         if file.filename == '':
             return jsonify({
@@ -330,15 +972,37 @@ def api_predict():
         filename = secure_filename(file.filename)
         unique_filename = f"{uuid.uuid4()}_{filename}"
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-        file.save(filepath)
+        with timer.stage('save'):
+            file.save(filepath)
         
         try:
-            # Predict
-            result = app_state['classifier'].predict(filepath)
+            # Predict (tahap decode, resize, normalize, inference)
+            neighbors = None
+            start = time.perf_counter()
+            # k-NN belum siap (index sedang dibangun): jawab dengan CNN saja
+            knn = get_knn_classifier() if mode != 'cnn' else None
+            if knn is None:
+                result = app_state['classifier'].predict(filepath, timer)
+            else:
+                classifier = app_state['classifier']
+                probabilities, embedding = classifier.predict_with_embedding(filepath, timer)
+                with timer.stage('knn'):
+                    vote = knn.classify(embedding)
+                if vote is not None:
+                    neighbors = vote['neighbors']
+                    if mode == 'knn':
+                        probabilities = vote['probabilities']
+                    else:
+                        probabilities = blend(vote['probabilities'], probabilities, knn_weight)
+                result = classifier.format_prediction(probabilities)
+            INFERENCE_LATENCY.observe(time.perf_counter() - start, endpoint='predict')
+            INFERENCE_BATCH_SIZE.observe(1, endpoint='predict')
+            PREDICTIONS.inc(endpoint='predict')
             
             # Get recommendation
-            recommendation = app_state['recommender'].get_recommendation(result['class_name'])
-            educational = app_state['recommender'].get_educational_content(result['class_name'])
+            with timer.stage('recommend'):
+                recommendation = app_state['recommender'].get_recommendation(result['class_name'])
+                educational = app_state['recommender'].get_educational_content(result['class_name'])
             
             # Confidence level
             confidence = result['confidence']
@@ -351,7 +1015,7 @@ def api_predict():
             else:
                 confidence_level = "Kurang Yakin ⚠️"
             
-            return jsonify({
+            return timed_response({
                 'success': True,
                 'data': {
                     'prediction': {
@@ -361,7 +1025,9 @@ def api_predict():
                         'confidence_percent': result['confidence_percent'],
                         'confidence_level': confidence_level,
                         'icon': CATEGORY_ICONS.get(result['class_name'].lower(), '♻️'),
-                        'all_predictions': result['all_predictions']
+                        'all_predictions': result['all_predictions'],
+                        'mode': mode if neighbors is not None else 'cnn',
+                        'neighbors': neighbors
                     },
                     'recommendation': {
                         'icon': recommendation['icon'],
@@ -377,7 +1043,7 @@ def api_predict():
                         'recycle_rate': educational['recycle_rate']
                     }
                 }
-            })
+            }, timer, 'predict')
             
         finally:
             # Cleanup temporary file
@@ -390,6 +1056,161 @@ def api_predict():
             'error': f'Error saat prediksi: {str(e)}'
         }), 500
 
+@app.route('/api/predict-tensor', methods=['POST'])
+def api_predict_tensor():
+    """
+    ⚡ Klasifikasi ringkas untuk klien yang sudah resize sendiri (mis. Raspberry Pi)
+    
+    Request:
+        - body: N x 224 x 224 x 3 byte uint8 mentah (application/octet-stream)
+        - format (query, optional): "binary" (default) atau "msgpack"
+          (bisa juga lewat header Accept: application/x-msgpack)
+    
+    Returns:
+        - Response biner SWCP (lihat utils/tensor_codec.py) atau msgpack
+          berisi index kelas dan probabilitas, tanpa rekomendasi
+    """
+    timer = StageTimer()
+    try:
+        classifier = get_classifier()
+        if classifier is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model belum tersedia. Silakan lakukan training terlebih dahulu.'
+            }), 400
+        
+        try:
+            with timer.stage('parse'):
+                images = decode_tensor_batch(request.get_data(cache=False))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        if len(images) > MAX_TENSOR_BATCH:
+            return jsonify({
+                'success': False,
+                'error': f'Maksimal {MAX_TENSOR_BATCH} gambar per request'
+            }), 400
+        
+        # Pilih format response
+        response_format = request.args.get('format')
+        if response_format is None:
+            accept = request.headers.get('Accept', '')
+            response_format = 'msgpack' if MSGPACK_MIMETYPE in accept else 'binary'
+        
+        if response_format not in ('binary', 'msgpack'):
+            return jsonify({
+                'success': False,
+                'error': 'Format tidak valid. Pilih: binary, msgpack'
+            }), 400
+        
+        if response_format == 'msgpack' and not msgpack_available():
+            return jsonify({
+                'success': False,
+                'error': 'Format msgpack tidak tersedia di server'
+            }), 406
+        
+        start = time.perf_counter()
+        with timer.stage('inference'):
+            probabilities = classifier.predict_batch(images)
+        INFERENCE_LATENCY.observe(time.perf_counter() - start, endpoint='predict_tensor')
+        INFERENCE_BATCH_SIZE.observe(len(images), endpoint='predict_tensor')
+        PREDICTIONS.inc(len(images), endpoint='predict_tensor')
+        
+        with timer.stage('encode'):
+            if response_format == 'msgpack':
+                response = Response(encode_prediction_msgpack(probabilities), mimetype=MSGPACK_MIMETYPE)
+            else:
+                response = Response(encode_prediction_binary(probabilities), mimetype=BINARY_MIMETYPE)
+        response.headers['Server-Timing'] = timer.server_timing_header()
+        return response
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error saat prediksi: {str(e)}'
+        }), 500
+
+@app.route('/api/similar', methods=['POST'])
+def api_similar():
+    """
+    🧭 Cari gambar training yang paling mirip dengan gambar upload
+    
+    Request:
+        - file: image file (multipart/form-data)
+        - k: jumlah hasil (default: 5, maksimal 50)
+    
+    Returns:
+        - List gambar mirip (kategori, nama file, similarity)
+        - 503 selama index embedding masih dibangun di background
+    """
+    try:
+        try:
+            k = int(request.values.get('k', 5))
+        except ValueError:
+            k = 0
+        if k < 1 or k > MAX_SIMILAR_RESULTS:
+            return jsonify({
+                'success': False,
+                'error': f'k harus antara 1-{MAX_SIMILAR_RESULTS}'
+            }), 400
+        
+        if 'file' not in request.files or request.files['file'].filename == '':
+            return jsonify({
+                'success': False,
+                'error': 'Tidak ada file yang diupload'
+            }), 400
+        
+        file = request.files['file']
+        if not allowed_file(file.filename):
+            return jsonify({
+                'success': False,
+                'error': 'Format file tidak didukung. Gunakan JPG, JPEG, atau PNG'
+            }), 400
+        
+        if get_classifier() is None:
+            return jsonify({
+                'success': False,
+                'error': 'Model belum tersedia. Silakan lakukan training terlebih dahulu.'
+            }), 400
+        
+        index = get_similarity_index()
+        if index is None:
+            return jsonify({
+                'success': False,
+                'error': 'Index gambar sedang dibangun, coba lagi sebentar lagi'
+            }), 503
+        
+        start = time.perf_counter()
+        embedding = app_state['classifier'].extract_embedding(file.stream)
+        INFERENCE_LATENCY.observe(time.perf_counter() - start, endpoint='similar')
+        INFERENCE_BATCH_SIZE.observe(1, endpoint='similar')
+        
+        results = []
+        for key, score in index.search(embedding, k):
+            category, filename = key.split('/', 1)
+            results.append({
+                'category': category,
+                'filename': filename,
+                'similarity': score
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'results': results,
+                'index_size': len(index)
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error saat mencari gambar mirip: {str(e)}'
+        }), 500
+
 @app.route('/api/upload-training', methods=['POST'])
 def api_upload_training():
     """
@@ -445,10 +1266,19 @@ def api_upload_training():
                 'message': result['message'],
                 'data': {
                     'category': category,
+                    'filename': result['filename'],
+                    'duplicate': result['duplicate'],
                     'category_count': stats['raw'].get(category, 0),
                     'total_images': stats['total_raw']
                 }
             })
+        elif result.get('duplicate'):
+            # Gambar yang sama sudah ada dengan kategori lain
+            return jsonify({
+                'success': False,
+                'error': result['message'],
+                'existing_category': result['existing_category']
+            }), 409
         else:
             return jsonify({
                 'success': False,
@@ -461,6 +1291,183 @@ def api_upload_training():
             'error': f'Error saat upload: {str(e)}'
         }), 500
 
+@app.route(BULK_UPLOAD_PATH, methods=['POST'])
+def api_upload_training_bulk():
+    """
+    📦 Upload banyak gambar training sekaligus (diproses di background)
+    
+    Request:
+        - files: beberapa file gambar dan/atau arsip (.zip/.tar/.tar.gz)
+        - archive: (opsional) satu arsip berisi gambar
+        - category: waste category (cardboard/glass/metal/paper/plastic)
+    
+    Returns:
+        - 202 + job_id; hasil per file lewat GET /api/upload-training/bulk/<job_id>
+    """
+    try:
+        category = request.form.get('category', '').lower()
+        if category not in WASTE_CATEGORIES:
+            return jsonify({
+                'success': False,
+                'error': f'Kategori tidak valid. Pilih: {", ".join(WASTE_CATEGORIES.keys())}'
+            }), 400
+        
+        uploads = request.files.getlist('files') + request.files.getlist('archive')
+        files = []
+        for upload in uploads:
+            name = secure_filename(upload.filename or '') or 'upload'
+            if is_archive(upload.filename or ''):
+                try:
+                    files.extend(iter_archive_images(upload.read(), upload.filename,
+                                                     max_files=MAX_BULK_FILES + 1 - len(files)))
+                except Exception as e:
+                    return jsonify({
+                        'success': False,
+                        'error': f'Arsip {name} tidak bisa dibaca: {e}'
+                    }), 400
+            else:
+                files.append((name, upload.read()))
+            if len(files) > MAX_BULK_FILES:
+                return jsonify({
+                    'success': False,
+                    'error': f'Maksimal {MAX_BULK_FILES} gambar per upload'
+                }), 400
+        
+        if not files:
+            return jsonify({
+                'success': False,
+                'error': 'Tidak ada gambar yang diupload'
+            }), 400
+        
+        job_id = app_state['bulk_ingestor'].submit(category, files)
+        if job_id is None:
+            return jsonify({
+                'success': False,
+                'error': 'Antrean upload sedang penuh, coba lagi sebentar'
+            }), 503
+        
+        return jsonify({
+            'success': True,
+            'message': f'📦 {len(files)} gambar sedang diproses',
+            'data': {
+                'job_id': job_id,
+                'total': len(files),
+                'status_url': f'{BULK_UPLOAD_PATH}/{job_id}'
+            }
+        }), 202
+        
+    except Exception as e:
+        print(f"❌ Bulk upload error: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route(f'{BULK_UPLOAD_PATH}/<job_id>', methods=['GET'])
+def api_upload_training_bulk_status(job_id):
+    """
+    📋 Status job bulk upload + hasil per file
+    """
+    job = app_state['bulk_ingestor'].get_job(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job tidak ditemukan'
+        }), 404
+    
+    if job['status'] == 'completed':
+        stats = app_state['data_manager'].get_dataset_statistics()
+        job['category_count'] = stats['raw'].get(job['category'], 0)
+        job['total_images'] = stats['total_raw']
+    return jsonify({
+        'success': True,
+        'data': job
+    })
+
+def _worker_env():
+    """🌱 Environment proses anak training (training worker, benchmark)"""
+    env = dict(os.environ)
+    if METRICS_DIR:
+        # Gauge training dari proses anak ikut di /metrics sesi gunicorn ini
+        env['METRICS_SESSION'] = str(os.getppid())
+    return env
+
+def _ensure_training_worker():
+    """
+    🏭 Jalankan training worker (proses terpisah) jika belum ada yang hidup
+    di host ini (TRAINING_WORKER=spawn)
+    """
+    if TRAINING_WORKER_MODE != 'spawn':
+        return
+    with _worker_spawn_lock:
+        if app_state['training_queue'].worker_alive():
+            return
+        # Session baru: worker tidak ikut mati saat worker web di-recycle
+        subprocess.Popen([sys.executable, str(BACKEND_DIR / "training_worker.py")],
+                         env=_worker_env(), start_new_session=True)
+        # Beri waktu worker memegang lock agar request lain tidak ikut spawn
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not app_state['training_queue'].worker_alive():
+            time.sleep(0.05)
+
+def _ensure_training_benchmark(batch_size: int, mode: str) -> str:
+    """
+    ⏱️ Pastikan ada benchmark kecepatan training untuk batch size ini;
+    jika belum, jalankan training_worker.py --benchmark di proses terpisah
+    
+    Returns:
+        Status benchmark: "cached", "running", "deferred" (training sedang
+        berjalan, benchmark akan bersaing CPU), atau "unavailable"
+    """
+    estimator = app_state['training_estimator']
+    if mode not in BENCHMARK_MODES:
+        return 'unavailable'
+    if estimator.cached_benchmark(batch_size) is not None:
+        return 'cached'
+    if estimator.benchmark_running():
+        return 'running'
+    if _training_status().get('in_progress'):
+        return 'deferred'
+    if TRAINING_WORKER_MODE != 'spawn' or not app_state['data_manager'].check_dataset_ready()['ready']:
+        return 'unavailable'
+    with _worker_spawn_lock:
+        spawned = app_state['benchmark_spawned']
+        # Proses benchmark butuh beberapa detik sebelum memegang lock-nya
+        if time.monotonic() - spawned.get(batch_size, float("-inf")) < BENCHMARK_SPAWN_INTERVAL:
+            return 'running'
+        spawned[batch_size] = time.monotonic()
+        subprocess.Popen([sys.executable, str(BACKEND_DIR / "training_worker.py"), "--benchmark", str(batch_size)],
+                         env=_worker_env(), start_new_session=True)
+    return 'running'
+
+def _training_status():
+    """
+    📊 Status training untuk UI: job yang sedang berjalan, lalu job queued
+    berikutnya, lalu job terakhir yang selesai (sama di semua worker web,
+    dibaca dari shared state tanpa query)
+    """
+    status = app_state['shared_state'].get('training')
+    if status is None:
+        status = app_state['training_queue'].training_status()
+    return dict(status)
+
+def _job_response(job):
+    """📋 Representasi job untuk API"""
+    return {
+        'training_id': job['id'],
+        'mode': job['mode'],
+        'state': job['state'],
+        'priority': job['priority'],
+        'parameters': job['params'],
+        'status': job['status'],
+        'queue_position': app_state['training_queue'].position(job['id']),
+        'cancel_requested': job['cancel_requested'],
+        'submitted_at': job['submitted_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
+
 @app.route('/api/train', methods=['POST'])
 def api_train():
     """
@@ -470,19 +1477,25 @@ def api_train():
         - epochs: jumlah epoch (default: 20)
         - learning_rate: learning rate (default: 0.001)
         - batch_size: batch size (default: 32)
+        - mode: "full" (default, latih seluruh CNN), "transfer" (head kecil
+          di atas fitur backbone beku yang di-cache), atau "incremental"
+          (fine-tuning model produksi dengan gambar baru + replay; default
+          5 epoch, learning rate 0.0001; dipublikasikan hanya jika
+          akurasi validasi tidak turun)
+    
+        - priority: prioritas antrian (default: 0, lebih besar lebih dulu)
+        - time_budget_minutes: batas waktu training (mode full, 1-240 menit);
+          jumlah epoch direncanakan dari kecepatan batch pertama, epochs
+          menjadi batas atas dan bobot epoch terbaik tetap dipakai
+    
+    Training dijalankan training worker (proses terpisah) satu job per
+    host; job yang masuk saat training lain berjalan menunggu di antrian.
     
     Returns:
         - Success status
-        - Training job ID (untuk tracking)
+        - Training job ID (untuk tracking) & posisi antrian
     """
     try:
-        # Cek apakah sudah ada training yang berjalan
-        if app_state['training_status']['in_progress']:
-            return jsonify({
-                'success': False,
-                'error': 'Training sudah berjalan. Tunggu hingga selesai.'
-            }), 400
-        
         # Cek dataset ready
         ready_check = app_state['data_manager'].check_dataset_ready()
         if not ready_check['ready']:
@@ -493,9 +1506,13 @@ def api_train():
         
         # Get parameters
         data = request.get_json() or {}
-        epochs = data.get('epochs', 20)
-        learning_rate = data.get('learning_rate', 0.001)
+        mode = data.get('mode', 'full')
+        # Fine-tuning incremental: jadwal pendek, learning rate kecil
+        epochs = data.get('epochs', 5 if mode == 'incremental' else 20)
+        learning_rate = data.get('learning_rate', 0.0001 if mode == 'incremental' else 0.001)
         batch_size = data.get('batch_size', 32)
+        priority = data.get('priority', 0)
+        time_budget_minutes = data.get('time_budget_minutes')
         
         # Validasi parameters
         if not isinstance(epochs, int) or epochs < 5 or epochs > 100:
@@ -516,120 +1533,66 @@ def api_train():
                 'error': 'Batch size harus 8, 16, 32, atau 64'
             }), 400
         
-        # Generate training ID
-        training_id = f"train_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # Update training status
-        app_state['training_status'] = {
-            'in_progress': True,
-            'training_id': training_id,
-            'current_epoch': 0,
-            'total_epochs': epochs,
-            'progress': 0,
-            'message': 'Mempersiapkan dataset...',
-            'accuracy': 0,
-            'loss': 0,
-            'start_time': datetime.now().isoformat()
-        }
+        if not _valid_priority(priority):
+            return jsonify({
+                'success': False,
+                'error': 'Priority harus bilangan bulat'
+            }), 400
         
-        # Run training di background thread
-        def run_training():
-            try:
-                # Prepare dataset
-                split_result = app_state['data_manager'].split_dataset()
-                if not split_result['success']:
-                    app_state['training_status']['in_progress'] = False
-                    app_state['training_status']['message'] = f"Error: {split_result['message']}"
-                    return
-                
-                # Progress callback
-                def progress_callback(epoch_data):
-                    app_state['training_status'].update({
-                        'current_epoch': epoch_data['epoch'],
-                        'progress': epoch_data['epoch'] / epochs * 100,
-                        'message': f"Training epoch {epoch_data['epoch']}/{epochs}",
-                        'accuracy': epoch_data['accuracy'],
-                        'val_accuracy': epoch_data['val_accuracy'],
-                        'loss': epoch_data['loss'],
-                        'val_loss': epoch_data['val_loss']
-                    })
-                
-                # Train model
-                ModelTrainer = _get_trainer()
-                trainer = ModelTrainer(str(PROCESSED_DATA_DIR), str(MODEL_PATH))
-                result = trainer.train(
-                    epochs=epochs,
-                    learning_rate=learning_rate,
-                    batch_size=batch_size,
-                    progress_callback=progress_callback
-                )
-                
-                if result['success']:
-                    # Update app state
-                    app_state['model_accuracy'] = result['test_accuracy']
-                    app_state['total_training_count'] += 1
-                    app_state['classifier'] = None  # Force reload
-                    
-                    # Reload classifier
-                    app_state['classifier'] = WasteClassifier(str(MODEL_PATH), str(LABELS_PATH))
-                    
-                    # Save training log
-                    log_file = TRAINING_LOGS_DIR / f"training_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                    with open(log_file, 'w') as f:
-                        json.dump({
-                            'training_id': training_id,
-                            'timestamp': datetime.now().isoformat(),
-                            'parameters': {
-                                'epochs': epochs,
-                                'learning_rate': learning_rate,
-                                'batch_size': batch_size
-                            },
-                            'results': {
-                                'test_accuracy': result['test_accuracy'],
-                                'final_train_accuracy': result['final_train_accuracy'],
-                                'final_val_accuracy': result['final_val_accuracy']
-                            },
-                            'history': result['history']
-                        }, f, indent=2)
-                    
-                    app_state['training_status'].update({
-                        'in_progress': False,
-                        'progress': 100,
-                        'message': f'Training selesai! Akurasi: {result["test_accuracy"]*100:.2f}%',
-                        'completed': True,
-                        'test_accuracy': result['test_accuracy'],
-                        'end_time': datetime.now().isoformat()
-                    })
-                else:
-                    app_state['training_status'].update({
-                        'in_progress': False,
-                        'message': f'Training gagal: {result.get("error", "Unknown error")}',
-                        'completed': False,
-                        'error': result.get('error')
-                    })
-            
-            except Exception as e:
-                app_state['training_status'].update({
-                    'in_progress': False,
-                    'message': f'Error: {str(e)}',
-                    'completed': False,
-                    'error': str(e)
-                })
-                traceback.print_exc()
+        if mode not in TRAINING_MODES:
+            return jsonify({
+                'success': False,
+                'error': f"Mode harus salah satu dari: {', '.join(TRAINING_MODES)}"
+            }), 400
         
-        # Start training thread
-        training_thread = threading.Thread(target=run_training)
-        training_thread.daemon = True
-        training_thread.start()
+        if time_budget_minutes is not None:
+            if (isinstance(time_budget_minutes, bool) or not isinstance(time_budget_minutes, (int, float))
+                    or not MIN_TIME_BUDGET_MINUTES <= time_budget_minutes <= MAX_TIME_BUDGET_MINUTES):
+                return jsonify({
+                    'success': False,
+                    'error': f'Batas waktu harus antara {MIN_TIME_BUDGET_MINUTES}-{MAX_TIME_BUDGET_MINUTES} menit'
+                }), 400
+            if mode != 'full':
+                return jsonify({
+                    'success': False,
+                    'error': 'Batas waktu hanya untuk mode full'
+                }), 400
+        
+        backbone_path = BACKBONE_PATH if BACKBONE_PATH.exists() else MODEL_PATH
+        if mode == 'transfer' and not backbone_path.exists():
+            return jsonify({
+                'success': False,
+                'error': 'Mode transfer butuh model atau backbone yang sudah ada'
+            }), 400
+        
+        if mode == 'incremental' and not MODEL_PATH.exists():
+            return jsonify({
+                'success': False,
+                'error': 'Mode incremental butuh model yang sudah dilatih'
+            }), 400
+        
+        job = app_state['training_queue'].submit(mode, {
+            'epochs': epochs,
+            'learning_rate': learning_rate,
+            'batch_size': batch_size,
+            'backbone_path': str(backbone_path),
+            'time_budget': time_budget_minutes * 60 if time_budget_minutes is not None else None
+        }, priority=priority)
+        _ensure_training_worker()
+        position = app_state['training_queue'].position(job['id'])
         
         return jsonify({
             'success': True,
-            'message': 'Training dimulai!',
+            'message': 'Training dimulai!' if not position else f'Training masuk antrian ({position} job sebelumnya)',
             'data': {
-                'training_id': training_id,
+                'training_id': job['id'],
                 'epochs': epochs,
                 'learning_rate': learning_rate,
-                'batch_size': batch_size
+                'batch_size': batch_size,
+                'mode': mode,
+                'priority': priority,
+                'time_budget_minutes': time_budget_minutes,
+                'queue_position': position
             }
         })
     
@@ -639,6 +1602,140 @@ def api_train():
             'error': f'Error saat memulai training: {str(e)}'
         }), 500
 
+@app.route('/api/train/estimate', methods=['GET'])
+def api_train_estimate():
+    """
+    ⏱️ Estimasi durasi training sebelum job dikirim
+    
+    Query (sama dengan /api/train):
+        - epochs, batch_size, mode, time_budget_minutes (opsional)
+    
+    Estimasi memakai micro-benchmark model + input pipeline di server ini
+    (di-cache; dijalankan otomatis di proses terpisah jika belum ada) yang
+    dikalibrasi dengan training log sebelumnya (lihat
+    modules/training_estimator.py).
+    
+    Returns:
+        - seconds, interval (low, high, confidence), formatted
+        - expected_epochs (early stopping), per_epoch_seconds, overhead_seconds
+        - basis: benchmark+history, benchmark, history, atau heuristic
+        - benchmark_status: cached, running, deferred, atau unavailable
+    """
+    mode = request.args.get('mode', 'full')
+    epochs = request.args.get('epochs', 5 if mode == 'incremental' else 20, type=int)
+    batch_size = request.args.get('batch_size', 32, type=int)
+    time_budget_minutes = request.args.get('time_budget_minutes', type=float)
+    
+    if mode not in TRAINING_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"Mode harus salah satu dari: {', '.join(TRAINING_MODES)}"
+        }), 400
+    if epochs is None or epochs < 5 or epochs > 100:
+        return jsonify({
+            'success': False,
+            'error': 'Epochs harus antara 5-100'
+        }), 400
+    if batch_size not in [8, 16, 32, 64]:
+        return jsonify({
+            'success': False,
+            'error': 'Batch size harus 8, 16, 32, atau 64'
+        }), 400
+    if time_budget_minutes is not None and not MIN_TIME_BUDGET_MINUTES <= time_budget_minutes <= MAX_TIME_BUDGET_MINUTES:
+        return jsonify({
+            'success': False,
+            'error': f'Batas waktu harus antara {MIN_TIME_BUDGET_MINUTES}-{MAX_TIME_BUDGET_MINUTES} menit'
+        }), 400
+    
+    try:
+        stats = app_state['data_manager'].get_dataset_statistics()
+        benchmark_status = _ensure_training_benchmark(batch_size, mode)
+        estimate = app_state['training_estimator'].estimate(
+            epochs, batch_size, split_counts(stats['total_raw']), mode=mode,
+            time_budget=time_budget_minutes * 60 if time_budget_minutes and mode == 'full' else None
+        )
+        estimate.update({
+            'formatted': format_estimate(estimate),
+            'benchmark_status': benchmark_status,
+            'total_images': stats['total_raw']
+        })
+        return jsonify({
+            'success': True,
+            'data': estimate
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error saat menghitung estimasi: {str(e)}'
+        }), 500
+
+def _valid_priority(priority) -> bool:
+    """🔢 Prioritas antrian harus int (bool dan float ditolak)"""
+    return isinstance(priority, int) and not isinstance(priority, bool)
+
+@app.route('/api/train/resume', methods=['POST'])
+def api_train_resume():
+    """
+    ♻️ Lanjutkan training yang terputus (worker di-recycle, mesin mati)
+    dari checkpoint terakhirnya
+    
+    Request (JSON):
+        - training_id: run yang dilanjutkan (default: run terputus terbaru)
+        - priority: prioritas antrian (default: 0, lebih besar lebih dulu)
+    
+    Returns:
+        - Training ID dan parameter run yang dilanjutkan
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        priority = data.get('priority', 0)
+        if not _valid_priority(priority):
+            return jsonify({
+                'success': False,
+                'error': 'Priority harus bilangan bulat'
+            }), 400
+        
+        run = find_resumable(str(CHECKPOINT_DIR), data.get('training_id'))
+        if run is None:
+            return jsonify({
+                'success': False,
+                'error': 'Tidak ada training terputus yang bisa dilanjutkan'
+            }), 404
+        
+        # Job dengan ID yang sama: training worker melanjutkan dari checkpoint
+        try:
+            app_state['training_queue'].submit('full', {
+                'epochs': run['epochs'],
+                'learning_rate': run['learning_rate'],
+                'batch_size': run['batch_size'],
+                'time_budget': run.get('time_budget'),
+                'resume': True
+            }, priority=priority, job_id=run['run_id'])
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        _ensure_training_worker()
+        return jsonify({
+            'success': True,
+            'message': 'Training dilanjutkan!',
+            'data': {
+                'training_id': run['run_id'],
+                'epochs': run['epochs'],
+                'learning_rate': run['learning_rate'],
+                'batch_size': run['batch_size'],
+                'mode': run.get('mode', 'full')
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error saat melanjutkan training: {str(e)}'
+        }), 500
+
 @app.route('/api/training-status', methods=['GET'])
 def api_training_status():
     """
@@ -648,12 +1745,184 @@ def api_training_status():
         - Training progress
         - Current metrics
         - Estimated time remaining
+        - metrics: instrumentasi epoch terakhir (images_per_sec, input_wait
+          vs compute, step_ms_p50/p95, val_time, peak_rss_mb)
+        - instrumentation: ringkasan run setelah selesai (bottleneck
+          "input"/"compute", test_eval_time, save_time, ...); data per
+          epoch & per batch ada di training log
+        - resumable: run terputus terbaru yang bisa dilanjutkan (atau null)
+    """
+    status = _training_status()
+    if not status['in_progress']:
+        run = find_resumable(str(CHECKPOINT_DIR))
+        status['resumable'] = {
+            'training_id': run['run_id'],
+            'epochs': run['epochs'],
+            'status': run.get('status')
+        } if run else None
+    return jsonify({
+        'success': True,
+        'data': status
+    })
+
+@app.route('/api/events', methods=['GET'])
+def api_events():
+    """
+    📡 Stream Server-Sent Events untuk UI (pengganti polling)
+    
+    Event:
+        - training: status job training (setiap perubahan state dan setiap
+          epoch selesai, termasuk ETA); data sama dengan /api/training-status
+        - dataset: dataset berubah (muat ulang /api/status)
+    
+    Header Last-Event-ID (dikirim otomatis browser saat reconnect) atau
+    query ?last_event_id=: event yang terlewat dikirim ulang. Tanpa itu,
+    stream dimulai dengan snapshot status training saat ini.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'Last-Event-ID harus berupa angka'
+            }), 400
+    
+    subscription = app_state['event_hub'].subscribe(last_event_id)
+    if subscription is None:
+        # Klien fallback ke polling /api/training-status
+        return jsonify({
+            'success': False,
+            'error': 'Terlalu banyak koneksi stream, coba lagi nanti'
+        }), 503
+    
+    # Snapshot diambil setelah subscribe: event yang sudah tercakup snapshot
+    # (id <= snapshot_id) dibuang agar status di UI tidak mundur
+    snapshot_id, snapshot = None, None
+    if last_event_id is None:
+        snapshot_id = app_state['training_queue'].last_event_id()
+        snapshot = _training_status()
+    
+    def stream():
+        try:
+            yield 'retry: 3000\n\n'
+            if snapshot_id is not None:
+                yield format_sse({'id': snapshot_id, 'type': 'training', 'data': snapshot})
+            deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+            while time.monotonic() < deadline and not subscription.closed:
+                events = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if not events:
+                    yield ': heartbeat\n\n'
+                for event in events:
+                    if snapshot_id is None or event['id'] > snapshot_id:
+                        yield format_sse(event)
+        finally:
+            subscription.close()
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Nonaktifkan buffering reverse proxy (nginx)
+    })
+
+@app.route('/api/train/jobs', methods=['GET'])
+def api_training_jobs():
+    """
+    📬 Daftar job training: yang berjalan, antrian (urut eksekusi), lalu
+    yang terakhir selesai
+    
+    Query params:
+        - limit: jumlah job (default 20, maksimal 100)
     """
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= 100:
+        return jsonify({
+            'success': False,
+            'error': 'Limit harus antara 1-100'
+        }), 400
+    return jsonify({
+        'success': True,
+        'data': [_job_response(job) for job in app_state['training_queue'].list(limit)]
+    })
+
+@app.route('/api/train/jobs/<job_id>', methods=['GET'])
+def api_training_job(job_id):
+    """
+    📋 Status satu job training
+    """
+    job = app_state['training_queue'].get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job tidak ditemukan'
+        }), 404
     return jsonify({
         'success': True,
-        'data': app_state['training_status']
+        'data': _job_response(job)
     })
 
+@app.route('/api/train/jobs/<job_id>/cancel', methods=['POST'])
+def api_training_job_cancel(job_id):
+    """
+    🛑 Batalkan job training: job di antrian langsung dibatalkan, job yang
+    sedang berjalan dihentikan training worker (model lama tetap dipakai)
+    """
+    job = app_state['training_queue'].get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job tidak ditemukan'
+        }), 404
+    if job['state'] not in ('queued', 'running'):
+        return jsonify({
+            'success': False,
+            'error': f"Job sudah {job['state']}"
+        }), 400
+    job = app_state['training_queue'].cancel(job_id)
+    return jsonify({
+        'success': True,
+        'message': 'Training dibatalkan' if job['state'] == 'cancelled' else 'Training sedang dihentikan',
+        'data': _job_response(job)
+    })
+
+@app.route('/api/near-duplicates', methods=['GET'])
+def api_near_duplicates():
+    """
+    🪞 Laporan cluster gambar near-duplicate di dataset training
+    
+    Query params:
+        - threshold: Jarak Hamming maksimal perceptual hash (0-16, default 6)
+    
+    Returns:
+        - List cluster ("kategori/file"), jumlah gambar berlebih,
+          cluster lintas kategori (kemungkinan salah label)
+    """
+    try:
+        threshold = int(request.args.get('threshold', DEFAULT_NEAR_DUPLICATE_THRESHOLD))
+    except ValueError:
+        threshold = -1
+    if not 0 <= threshold <= 16:
+        return jsonify({
+            'success': False,
+            'error': 'threshold harus angka 0-16'
+        }), 400
+    
+    try:
+        report = app_state['data_manager'].find_near_duplicates(threshold)
+        report.pop('success', None)
+        return jsonify({
+            'success': True,
+            'data': report
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Error saat mencari near-duplicate: {str(e)}'
+        }), 500
+
 @app.route('/api/categories', methods=['GET'])
 def api_categories():
     """
@@ -692,9 +1961,10 @@ def not_found(error):
 @app.errorhandler(413)
 def too_large(error):
     """Handle file too large"""
+    limit = request.max_content_length // (1024 * 1024)
     return jsonify({
         'success': False,
-        'error': 'File terlalu besar. Maksimal 16MB'
+        'error': f'File terlalu besar. Maksimal {limit}MB'
     }), 413
 
 @app.errorhandler(500)
@@ -0,0 +1,383 @@
+"""
+🏭 TRAINING WORKER - PROSES TRAINING TERPISAH DARI WEB SERVER
+=============================================================
+Mengeksekusi job dari antrian training (modules/training_queue.py), satu
+job pada satu waktu per host
+
+Setiap job berjalan di proses anak sendiri (spawn): TensorFlow tidak
+berbagi CPU/GIL dengan worker web, memori training dilepas setelah job
+selesai, dan cancel cukup menghentikan proses anak. Proses anak berjalan
+dengan budget CPU (affinity, nice, batas thread TF) dan diperlambat saat
+latency predict naik (modules/cpu_budget.py). Backend web
+menjalankan worker ini otomatis saat ada job (TRAINING_WORKER=spawn,
+default); dengan TRAINING_WORKER=external worker dijalankan sendiri,
+mis. sebagai proses `worker:` di Procfile.
+
+Cara pakai:
+    python backend/training_worker.py              # berhenti setelah antrian kosong 60 detik
+    python backend/training_worker.py --forever    # proses worker permanen
+    python backend/training_worker.py --benchmark 32   # ukur kecepatan training (estimasi durasi)
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+import app as web  # Path & konfigurasi backend (init_backend tidak dijalankan)
+
+from modules.checkpointing import CheckpointStore
+from modules.cpu_budget import apply_training_budget, TrainingThrottle
+from modules.data_manager import DataManager
+from modules.shared_state import SharedState
+from modules.training_estimator import TrainingEstimator
+from modules.training_queue import TrainingQueue, RUNNING, COMPLETED, FAILED, CANCELLED
+
+POLL_INTERVAL = 1.0  # Detik antar cek antrian / cancel
+TERMINATE_GRACE = 30  # Detik menunggu proses training berhenti sebelum SIGKILL
+
+
+# ============================================
+# 🧠 PROSES ANAK: SATU JOB TRAINING
+# ============================================
+
+def _exit_with_supervisor():
+    """
+    🪢 Proses training ikut berhenti jika supervisor mati (mis. SIGKILL),
+    supaya job yang diantrikan ulang worker baru tidak berjalan dua kali
+    """
+    supervisor_pid = os.getppid()
+
+    def watch():
+        while os.getppid() == supervisor_pid:
+            time.sleep(POLL_INTERVAL)
+        os._exit(1)
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _instrumentation_summary(result: dict):
+    """🔬 Ringkasan instrumentasi untuk status job (tanpa data per epoch/batch)"""
+    instrumentation = result.get('instrumentation')
+    if not instrumentation:
+        return None
+    return {key: value for key, value in instrumentation.items() if key != 'epochs'}
+
+
+def run_job(job_id: str):
+    """
+    🧠 Jalankan satu job training (di proses anak)
+
+    Status per epoch ditulis ke antrian; hasil akhir (completed / failed)
+    juga. Model baru disimpan atomik ke MODEL_PATH, worker web me-reload
+    model saat file berubah.
+    """
+    _exit_with_supervisor()
+    queue = TrainingQueue(str(web.TRAINING_QUEUE_PATH), SharedState(str(web.SHARED_STATE_PATH)))
+    job = queue.get(job_id)
+    mode, params = job['mode'], job['params']
+    epochs = params['epochs']
+
+    # Budget CPU diterapkan sebelum TensorFlow aktif di proses ini
+    cpu_budget = apply_training_budget(
+        reserved_for_inference=web.INFERENCE_RESERVED_CORES,
+        threads=web.TRAINING_CPU_THREADS,
+        niceness=web.TRAINING_NICE
+    )
+    print(f"🧮 Budget CPU training: core {cpu_budget['training_cores']}, "
+          f"{cpu_budget['intra_op_threads']} thread, nice {cpu_budget['nice']}")
+    throttle = None
+    if web.PREDICT_P95_THRESHOLD_MS > 0:
+        throttle = TrainingThrottle(web.PREDICT_LATENCY_DIR, web.PREDICT_P95_THRESHOLD_MS)
+
+    try:
+        # Prepare dataset
+        data_manager = DataManager(str(web.RAW_DATA_DIR), str(web.PROCESSED_DATA_DIR))
+        split_result = data_manager.split_dataset()
+        if not split_result['success']:
+            queue.finish(job_id, FAILED, completed=False,
+                         message=f"Error: {split_result['message']}",
+                         error=split_result['message'])
+            return
+
+        # Progress callback
+        time_budget = params.get('time_budget')
+        if time_budget:
+            queue.update_status(job_id, time_budget=time_budget, budget_remaining=time_budget)
+
+        def progress_callback(epoch_data):
+            # Dengan batas waktu: total epoch = rencana terbaru, progress = yang lebih jauh
+            # antara epoch dan waktu terpakai
+            total_epochs = epoch_data.get('planned_epochs', epochs)
+            progress = epoch_data['epoch'] / total_epochs
+            budget_fields = {}
+            if time_budget:
+                progress = max(progress, 1 - epoch_data['budget_remaining'] / time_budget)
+                budget_fields = {
+                    'time_budget': time_budget,
+                    'budget_remaining': epoch_data['budget_remaining'],
+                    'planned_epochs': total_epochs
+                }
+            queue.update_status(
+                job_id,
+                current_epoch=epoch_data['epoch'],
+                total_epochs=total_epochs,
+                progress=min(progress, 1.0) * 100,
+                message=f"Training epoch {epoch_data['epoch']}/{total_epochs}",
+                accuracy=epoch_data['accuracy'],
+                val_accuracy=epoch_data['val_accuracy'],
+                loss=epoch_data['loss'],
+                val_loss=epoch_data['val_loss'],
+                eta=epoch_data['eta'],
+                cpu_duty=throttle.duty if throttle else 1.0,
+                metrics=epoch_data.get('metrics'),
+                **budget_fields
+            )
+
+        # Train model
+        from modules.trainer import ModelTrainer
+        # Log training ditulis worker (satu log per job di TRAINING_LOGS_DIR), bukan trainer
+        trainer = ModelTrainer(str(web.PROCESSED_DATA_DIR), str(web.MODEL_PATH),
+                               tensor_cache_dir=str(web.TENSOR_CACHE_DIR),
+                               feature_cache_dir=str(web.FEATURE_CACHE_DIR),
+                               log_dir=None)
+        trainer.throttle = throttle
+        if mode == 'transfer':
+            result = trainer.train_transfer(
+                epochs=epochs,
+                learning_rate=params['learning_rate'],
+                batch_size=params['batch_size'],
+                progress_callback=progress_callback,
+                backbone_path=params['backbone_path']
+            )
+        elif mode == 'incremental':
+            result = trainer.train_incremental(
+                epochs=epochs,
+                learning_rate=params['learning_rate'],
+                batch_size=params['batch_size'],
+                progress_callback=progress_callback
+            )
+        else:
+            # Checkpoint per job; job yang diantrikan ulang lanjut dari checkpoint
+            result = trainer.train(
+                epochs=epochs,
+                learning_rate=params['learning_rate'],
+                batch_size=params['batch_size'],
+                progress_callback=progress_callback,
+                checkpoint_dir=str(web.CHECKPOINT_DIR / job_id),
+                time_budget=time_budget
+            )
+
+        if result['success'] and not result.get('published', True):
+            # Fine-tuning incremental ditolak: model lama tetap dipakai
+            queue.finish(
+                job_id, COMPLETED,
+                progress=100,
+                message=(f"Model baru tidak dipakai: akurasi validasi turun "
+                         f"({result['baseline_val_accuracy']*100:.2f}% -> "
+                         f"{result['new_val_accuracy']*100:.2f}%)"),
+                completed=True,
+                published=False,
+                instrumentation=_instrumentation_summary(result)
+            )
+        elif result['success']:
+            # Save training log
+            log_file = web.TRAINING_LOGS_DIR / f"training_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            with open(log_file, 'w') as f:
+                json.dump({
+                    'training_id': job_id,
+                    'timestamp': datetime.now().isoformat(),
+                    'parameters': {
+                        'epochs': epochs,
+                        'learning_rate': params['learning_rate'],
+                        'batch_size': params['batch_size'],
+                        'mode': mode,
+                        'time_budget': time_budget
+                    },
+                    'results': {
+                        'test_accuracy': result['test_accuracy'],
+                        'final_train_accuracy': result['final_train_accuracy'],
+                        'final_val_accuracy': result['final_val_accuracy'],
+                        'training_time': result['training_time'],
+                        'epochs_completed': result['epochs_completed'],
+                        'stopped_by_budget': result.get('stopped_by_budget', False)
+                    },
+                    'history': result['history'],
+                    'instrumentation': result.get('instrumentation'),
+                    'samples': result.get('samples'),
+                    'total_time': result.get('total_time'),
+                    'cpu_budget': dict(cpu_budget, throttle=throttle.stats() if throttle else None)
+                }, f, indent=2)
+
+            # Akurasi & versi model baru terlihat di semua worker web
+            web.publish_model_state(queue.state, result['test_accuracy'])
+            queue.finish(
+                job_id, COMPLETED,
+                progress=100,
+                message=f'Training selesai! Akurasi: {result["test_accuracy"]*100:.2f}%',
+                completed=True,
+                test_accuracy=result['test_accuracy'],
+                instrumentation=_instrumentation_summary(result)
+            )
+        else:
+            queue.finish(
+                job_id, FAILED,
+                message=f'Training gagal: {result.get("error", "Unknown error")}',
+                completed=False,
+                error=result.get('error')
+            )
+
+    except Exception as e:
+        queue.finish(job_id, FAILED, message=f'Error: {str(e)}', completed=False, error=str(e))
+        traceback.print_exc()
+
+
+# ============================================
+# 🏭 SUPERVISOR
+# ============================================
+
+def _cancel_checkpoint(job_id: str):
+    """🧹 Run yang dibatalkan tidak boleh dilanjutkan dari checkpoint"""
+    run_dir = web.CHECKPOINT_DIR / job_id
+    if run_dir.exists():
+        store = CheckpointStore(str(run_dir))
+        store.discard_checkpoint()
+        store.write_run(status="cancelled")
+
+
+def supervise(queue: TrainingQueue, job: dict, context):
+    """
+    👀 Jalankan job di proses anak sampai selesai, dibatalkan, atau mati
+    """
+    job_id = job['id']
+    print(f"🏭 Menjalankan job {job_id} ({job['mode']}, prioritas {job['priority']})")
+    process = context.Process(target=run_job, args=(job_id,), name=f"training-{job_id}")
+    process.start()
+    web.TRAINING_IN_PROGRESS.set(1)
+
+    try:
+        while process.is_alive():
+            process.join(POLL_INTERVAL)
+            current = queue.get(job_id)
+            web.TRAINING_PROGRESS.set(current['status'].get('progress', 0))
+            web.TRAINING_EPOCH.set(current['status'].get('current_epoch', 0))
+            if current['cancel_requested'] and process.is_alive():
+                print(f"🛑 Membatalkan job {job_id}")
+                process.terminate()
+                process.join(TERMINATE_GRACE)
+                if process.is_alive():
+                    process.kill()
+                    process.join()
+    finally:
+        if process.is_alive():
+            # Supervisor dihentikan: job tetap "running", diantrikan ulang
+            # (resume dari checkpoint) oleh worker berikutnya
+            process.terminate()
+            process.join(TERMINATE_GRACE)
+        web.TRAINING_IN_PROGRESS.set(0)
+
+    current = queue.get(job_id)
+    if current['state'] == RUNNING:
+        if current['cancel_requested']:
+            _cancel_checkpoint(job_id)
+            queue.finish(job_id, CANCELLED, completed=False, message='Training dibatalkan')
+        else:
+            print(f"⚠️  Proses training job {job_id} berhenti (exit code {process.exitcode})")
+            queue.requeue_orphans()
+
+
+def serve(forever: bool = False, idle_timeout: float = 60.0) -> int:
+    """
+    🏭 Loop worker: ambil job berikutnya sesuai prioritas, satu per satu
+
+    Returns:
+        Exit code (1 jika sudah ada training worker lain di host ini)
+    """
+    queue = TrainingQueue(str(web.TRAINING_QUEUE_PATH), SharedState(str(web.SHARED_STATE_PATH)))
+    if not queue.acquire_worker_lock():
+        print("🏭 Training worker sudah berjalan di proses lain")
+        return 1
+
+    # SIGTERM (shutdown platform) -> keluar lewat finally di supervise()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    for job in queue.requeue_orphans():
+        print(f"♻️  Job {job['id']} terputus, diantrikan ulang")
+
+    context = multiprocessing.get_context("spawn")
+    print(f"🏭 Training worker siap (pid {os.getpid()})")
+    idle_since = time.monotonic()
+    while True:
+        job = queue.claim_next(os.getpid())
+        if job is not None:
+            supervise(queue, job, context)
+            idle_since = time.monotonic()
+            continue
+        if not forever and time.monotonic() - idle_since > idle_timeout:
+            print("🏭 Antrian kosong, training worker berhenti")
+            return 0
+        time.sleep(POLL_INTERVAL)
+
+
+# ============================================
+# ⏱️ BENCHMARK UNTUK ESTIMASI DURASI
+# ============================================
+
+def run_benchmark(batch_size: int) -> int:
+    """
+    ⏱️ Micro-benchmark model + input pipeline (modules/training_estimator.py)
+    dengan budget CPU yang sama dengan job training; hasil di-cache untuk
+    /api/train/estimate
+
+    Returns:
+        Exit code (1 jika gagal atau benchmark lain sedang berjalan)
+    """
+    estimator = TrainingEstimator(str(web.TRAINING_BENCHMARK_PATH), [web.TRAINING_LOGS_DIR])
+    apply_training_budget(
+        reserved_for_inference=web.INFERENCE_RESERVED_CORES,
+        threads=web.TRAINING_CPU_THREADS,
+        niceness=web.TRAINING_NICE
+    )
+    data_manager = DataManager(str(web.RAW_DATA_DIR), str(web.PROCESSED_DATA_DIR))
+    split_result = data_manager.split_dataset()
+    if not split_result['success']:
+        print(f"❌ Benchmark gagal: {split_result['message']}")
+        return 1
+
+    from modules.trainer import ModelTrainer
+    trainer = ModelTrainer(str(web.PROCESSED_DATA_DIR), str(web.MODEL_PATH),
+                           tensor_cache_dir=str(web.TENSOR_CACHE_DIR),
+                           feature_cache_dir=str(web.FEATURE_CACHE_DIR),
+                           log_dir=None)
+    entry = estimator.benchmark(trainer, batch_size)
+    if entry is None:
+        print("⏱️ Benchmark lain sedang berjalan")
+        return 1
+    print(f"⏱️ Batch {batch_size}: train {entry['train_step'] * 1000:.0f} ms/step, "
+          f"eval {entry['eval_step'] * 1000:.0f} ms/step, biaya tetap {entry['overhead']:.1f} detik")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Training worker (antrian job training)")
+    parser.add_argument("--forever", action="store_true", help="Tetap berjalan walau antrian kosong")
+    parser.add_argument("--idle-timeout", type=float, default=60.0,
+                        help="Detik antrian kosong sebelum worker berhenti (tanpa --forever)")
+    parser.add_argument("--benchmark", type=int, metavar="BATCH_SIZE",
+                        help="Ukur kecepatan training untuk estimasi durasi, lalu keluar")
+    args = parser.parse_args()
+    if args.benchmark:
+        sys.exit(run_benchmark(args.benchmark))
+    sys.exit(serve(forever=args.forever, idle_timeout=args.idle_timeout))
+
+
+if __name__ == "__main__":
+    main()
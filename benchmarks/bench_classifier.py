@@ -0,0 +1,317 @@
+"""
+⏱️ BENCHMARK CLASSIFIER - Micro-benchmark WasteClassifier
+Tidak butuh model produksi: model dibuat dari arsitektur create_model
+(bobot random) atau CNN kecil pengganti.
+
+Yang diukur:
+1. Cold load: import TensorFlow + load model + inferensi pertama (proses baru)
+2. Latency single-image: predict() dari file dan predict_batch() dari tensor
+3. Throughput vs batch size dan jumlah thread TensorFlow
+4. Biaya preprocessing per backend (PIL, PIL draft, OpenCV, TensorFlow)
+
+Cara pakai:
+    python benchmarks/bench_classifier.py --model standin
+    python benchmarks/bench_classifier.py --model random --threads 1,2,4 --batch-sizes 1,8,32
+    python benchmarks/bench_classifier.py --output hasil_baru.json --compare hasil_lama.json
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+_PROCESS_START = time.perf_counter()
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from common import (
+    build_model, write_synthetic_corpus, latency_stats, time_calls, run_child,
+    environment_info, save_results, compare_results
+)
+
+SCRIPT = str(Path(__file__).resolve())
+
+
+# ============================================
+# 🧪 MODE CHILD (dijalankan di proses terpisah)
+# ============================================
+
+def child_cold_load(args) -> dict:
+    """Ukur import + load model + inferensi pertama di proses yang masih dingin"""
+    start = time.perf_counter()
+    from modules.classifier import WasteClassifier
+    imported = time.perf_counter()
+
+    classifier = WasteClassifier(args.model_path, args.labels_path)
+    loaded = time.perf_counter()
+
+    classifier.predict_batch(np.zeros((1, 224, 224, 3), dtype=np.uint8))
+    first_inference = time.perf_counter()
+
+    return {
+        "interpreter_start_s": start - _PROCESS_START,
+        "import_s": imported - start,
+        "load_s": loaded - imported,
+        "first_inference_s": first_inference - loaded,
+        "total_s": first_inference - start
+    }
+
+
+def child_throughput(args) -> dict:
+    """Ukur throughput predict_batch per batch size dengan jumlah thread tertentu"""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(args.child_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(args.child_threads)
+
+    from modules.classifier import WasteClassifier
+    classifier = WasteClassifier(args.model_path, args.labels_path)
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for batch_size in parse_int_list(args.batch_sizes):
+        batch = rng.integers(0, 256, (batch_size, 224, 224, 3), dtype=np.uint8)
+        samples = time_calls(lambda: classifier.predict_batch(batch),
+                             iterations=args.iterations, warmup=3)
+        total = sum(samples)
+        results[str(batch_size)] = {
+            "images_per_sec": batch_size * len(samples) / total,
+            "batch_latency": latency_stats(samples)
+        }
+    return results
+
+
+# ============================================
+# 🖼️ BACKEND PREPROCESSING
+# ============================================
+
+def _normalize(array: np.ndarray) -> np.ndarray:
+    return (array.astype(np.float32) / 127.5) - 1
+
+
+def preprocess_pil_draft(path: str) -> np.ndarray:
+    """PIL dengan JPEG draft mode: decoder langsung men-downscale via DCT"""
+    image = Image.open(path)
+    image.draft("RGB", (448, 448))
+    image = ImageOps.fit(image.convert("RGB"), (224, 224), Image.Resampling.LANCZOS)
+    return _normalize(np.asarray(image))
+
+
+def preprocess_pil_bilinear(path: str) -> np.ndarray:
+    """PIL dengan resampling BILINEAR (lebih murah dari LANCZOS)"""
+    image = Image.open(path).convert("RGB")
+    image = ImageOps.fit(image, (224, 224), Image.Resampling.BILINEAR)
+    return _normalize(np.asarray(image))
+
+
+def make_opencv_backend():
+    try:
+        import cv2
+    except ImportError:
+        return None
+
+    def preprocess_opencv(path: str) -> np.ndarray:
+        image = cv2.imread(path, cv2.IMREAD_REDUCED_COLOR_2)
+        height, width = image.shape[:2]
+        side = min(height, width)
+        top, left = (height - side) // 2, (width - side) // 2
+        image = image[top:top + side, left:left + side]
+        image = cv2.resize(image, (224, 224), interpolation=cv2.INTER_AREA)
+        return _normalize(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+
+    return preprocess_opencv
+
+
+def make_tensorflow_backend():
+    import tensorflow as tf
+
+    def preprocess_tensorflow(path: str) -> np.ndarray:
+        image = tf.io.decode_jpeg(tf.io.read_file(path), channels=3)
+        shape = tf.shape(image)
+        side = tf.minimum(shape[0], shape[1])
+        image = tf.image.resize_with_crop_or_pad(image, side, side)
+        image = tf.image.resize(image, (224, 224), antialias=True)
+        return (image / 127.5 - 1).numpy()
+
+    return preprocess_tensorflow
+
+
+def bench_preprocessing(classifier, image_sets: dict, iterations: int) -> dict:
+    """
+    🖼️ Latency preprocessing per backend dan ukuran gambar
+    Backend "pil" memakai WasteClassifier.preprocess_image (jalur produksi)
+    dan juga mencatat breakdown decode/resize/normalize.
+    """
+    from modules.classifier import StageTimer
+
+    backends = {
+        "pil_draft": preprocess_pil_draft,
+        "pil_bilinear": preprocess_pil_bilinear,
+        "tensorflow": make_tensorflow_backend()
+    }
+    opencv = make_opencv_backend()
+    if opencv is not None:
+        backends["opencv"] = opencv
+
+    results = {}
+    for size_name, paths in image_sets.items():
+        size_results = {}
+
+        # Jalur produksi + breakdown per tahap
+        timers = []
+
+        def run_pil():
+            timer = StageTimer()
+            classifier.preprocess_image(paths[len(timers) % len(paths)], timer)
+            timers.append(timer)
+
+        samples = time_calls(run_pil, iterations, warmup=2)
+        stage_totals = {}
+        for timer in timers[2:]:
+            for stage, duration in timer.as_dict().items():
+                stage_totals[stage] = stage_totals.get(stage, 0.0) + duration
+        size_results["pil"] = dict(
+            latency_stats(samples),
+            stages_mean_ms={k: v / len(samples) for k, v in stage_totals.items()}
+        )
+
+        for name, fn in backends.items():
+            counter = iter(range(10 ** 9))
+            samples = time_calls(lambda: fn(paths[next(counter) % len(paths)]),
+                                 iterations, warmup=2)
+            size_results[name] = latency_stats(samples)
+
+        results[size_name] = size_results
+    return results
+
+
+# ============================================
+# 🚀 MAIN
+# ============================================
+
+def parse_int_list(value: str):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark WasteClassifier")
+    parser.add_argument("--model", choices=["random", "standin", "path"], default="standin",
+                        help="random = create_model bobot random, standin = CNN kecil, "
+                             "path = pakai --model-path")
+    parser.add_argument("--model-path", help="Path model .h5 (untuk --model path)")
+    parser.add_argument("--labels-path", help="Path labels.txt (untuk --model path)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--batch-sizes", default="1,8,32")
+    parser.add_argument("--threads", default=f"1,{os.cpu_count()}")
+    parser.add_argument("--work-dir", default=str(Path(tempfile.gettempdir()) / "swc_bench"))
+    parser.add_argument("--output", default="benchmarks/results/classifier.json")
+    parser.add_argument("--compare", help="File JSON hasil lama untuk dibandingkan")
+    parser.add_argument("--skip", default="", help="Bagian yang dilewati: cold,latency,throughput,preprocess")
+    parser.add_argument("--child", choices=["cold-load", "throughput"], help=argparse.SUPPRESS)
+    parser.add_argument("--child-threads", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import json
+        handler = child_cold_load if args.child == "cold-load" else child_throughput
+        print(json.dumps(handler(args)))
+        return
+
+    skip = set(args.skip.split(","))
+    work_dir = Path(args.work_dir)
+
+    if args.model == "path":
+        if not args.model_path or not args.labels_path:
+            parser.error("--model path butuh --model-path dan --labels-path")
+    else:
+        print(f"🏗️ Membuat model '{args.model}'...")
+        paths = build_model(args.model, str(work_dir))
+        args.model_path, args.labels_path = paths["model_path"], paths["labels_path"]
+
+    child_args = ["--model-path", args.model_path, "--labels-path", args.labels_path,
+                  "--iterations", str(args.iterations), "--batch-sizes", args.batch_sizes]
+    results = {}
+
+    if "cold" not in skip:
+        print("🧊 Cold load...")
+        runs = [run_child(SCRIPT, child_args + ["--child", "cold-load"])
+                for _ in range(args.cold_runs)]
+        results["cold_load"] = {
+            key: float(np.median([run[key] for run in runs])) for key in runs[0]
+        }
+        results["cold_load"]["runs"] = args.cold_runs
+
+    if "throughput" not in skip:
+        results["throughput"] = {}
+        for threads in parse_int_list(args.threads):
+            print(f"📦 Throughput dengan {threads} thread...")
+            results["throughput"][str(threads)] = run_child(
+                SCRIPT, child_args + ["--child", "throughput", "--child-threads", str(threads)]
+            )
+
+    if not {"latency", "preprocess"} <= skip:
+        from modules.classifier import WasteClassifier
+        classifier = WasteClassifier(args.model_path, args.labels_path)
+        image_sets = {
+            "800x600": write_synthetic_corpus(work_dir / "images", 8, (800, 600)),
+            "4000x3000": write_synthetic_corpus(work_dir / "images", 4, (4000, 3000))
+        }
+
+        if "latency" not in skip:
+            print("🎯 Latency single-image...")
+            paths = image_sets["800x600"]
+            counter = iter(range(10 ** 9))
+            tensor = np.zeros((1, 224, 224, 3), dtype=np.uint8)
+            results["single_image"] = {
+                "predict_file": latency_stats(time_calls(
+                    lambda: classifier.predict(paths[next(counter) % len(paths)]),
+                    args.iterations
+                )),
+                "predict_batch_tensor": latency_stats(time_calls(
+                    lambda: classifier.predict_batch(tensor), args.iterations
+                ))
+            }
+
+        if "preprocess" not in skip:
+            print("🖼️ Preprocessing per backend...")
+            results["preprocessing"] = bench_preprocessing(classifier, image_sets, args.iterations)
+
+    report = {
+        "environment": environment_info(),
+        "config": {
+            "model": args.model,
+            "model_path": args.model_path,
+            "iterations": args.iterations,
+            "batch_sizes": parse_int_list(args.batch_sizes),
+            "threads": parse_int_list(args.threads)
+        },
+        "results": results
+    }
+    save_results(report, args.output)
+    _print_summary(results)
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+def _print_summary(results: dict):
+    print("\n📊 RINGKASAN")
+    if "cold_load" in results:
+        cold = results["cold_load"]
+        print(f"   Cold load: {cold['total_s']:.2f}s (import {cold['import_s']:.2f}s, "
+              f"load {cold['load_s']:.2f}s, inferensi pertama {cold['first_inference_s']:.2f}s)")
+    if "single_image" in results:
+        for name, stats in results["single_image"].items():
+            print(f"   {name}: p50 {stats['p50_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms")
+    for threads, per_batch in results.get("throughput", {}).items():
+        line = ", ".join(f"bs{bs}={r['images_per_sec']:.1f}/s" for bs, r in per_batch.items())
+        print(f"   {threads} thread: {line}")
+    for size, backends in results.get("preprocessing", {}).items():
+        line = ", ".join(f"{name}={stats['p50_ms']:.1f}ms" for name, stats in backends.items())
+        print(f"   preprocess {size}: {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+🧮 BENCHMARK CPU ISOLATION - Latency predict saat training berjalan
+Inferensi (WasteClassifier.predict_batch, single image) diukur di proses
+ini sementara proses lain men-training model arsitektur create_model pada
+data random, dalam beberapa skenario:
+
+1. idle: tanpa training (baseline)
+2. unbounded: training tanpa batas (default TensorFlow, semua core)
+3. budget: affinity + nice + batas thread (modules/cpu_budget.py)
+4. budget_throttle: budget + throttle berdasar p95 predict
+
+Throughput training (batch/detik) ikut dicatat, supaya harga isolasi
+kelihatan.
+
+Cara pakai:
+    python benchmarks/bench_cpu_isolation.py --iterations 200
+    python benchmarks/bench_cpu_isolation.py --threshold-ms 150 --output baru.json --compare lama.json
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from common import build_model, environment_info, save_results, compare_results, latency_stats, time_calls
+
+SCRIPT = str(Path(__file__).resolve())
+SCENARIOS = ["idle", "unbounded", "budget", "budget_throttle"]
+
+
+# ============================================
+# 🧪 MODE CHILD: TRAINING SAMPAI DI-SIGTERM
+# ============================================
+
+def child_train(args):
+    """Training terus-menerus; cetak ringkasan JSON saat menerima SIGTERM"""
+    budget, throttle = None, None
+    if args.scenario != "unbounded":
+        from modules.cpu_budget import apply_training_budget, TrainingThrottle
+        budget = apply_training_budget(args.reserved_cores, args.training_threads, args.nice)
+        if args.scenario == "budget_throttle":
+            throttle = TrainingThrottle(args.latency_dir, args.threshold_ms)
+
+    import tensorflow as tf
+    from modules.trainer import ModelTrainer, ThrottleCallback
+
+    trainer = ModelTrainer(args.work_dir, str(Path(args.work_dir) / "unused.h5"))
+    model = trainer.create_model()
+    rng = np.random.default_rng(0)
+    images = rng.random((64, 224, 224, 3), dtype=np.float32)
+    labels = tf.keras.utils.to_categorical(rng.integers(0, 5, 64), 5)
+    dataset = tf.data.Dataset.from_tensor_slices((images, labels)).batch(args.batch_size).repeat()
+
+    stop = {"requested": False}
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.update(requested=True))
+
+    class Meter(tf.keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.batches = 0
+            self.start = None
+
+        def on_train_batch_end(self, batch, logs=None):
+            if self.start is None:
+                # Batch pertama (tracing) tidak dihitung
+                self.start = time.perf_counter()
+                print("ready", flush=True)
+            else:
+                self.batches += 1
+            if stop["requested"]:
+                self.model.stop_training = True
+
+    meter = Meter()
+    callbacks = [meter] + ([ThrottleCallback(throttle)] if throttle else [])
+    model.fit(dataset, steps_per_epoch=1000, epochs=1000, callbacks=callbacks, verbose=0)
+
+    elapsed = time.perf_counter() - meter.start
+    print(json.dumps({
+        "batches_per_s": meter.batches / elapsed,
+        "budget": budget,
+        "throttle": throttle.stats() if throttle else None
+    }))
+
+
+# ============================================
+# ⏱️ PROSES UTAMA: INFERENSI
+# ============================================
+
+def run_scenario(scenario: str, classifier, args, latency_dir: str) -> dict:
+    from modules.cpu_budget import LatencyMonitor
+
+    process = None
+    if scenario != "idle":
+        env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL="2")
+        process = subprocess.Popen(
+            [sys.executable, SCRIPT, "--child", "--scenario", scenario,
+             "--work-dir", args.work_dir, "--latency-dir", latency_dir,
+             "--threshold-ms", str(args.threshold_ms), "--reserved-cores", str(args.reserved_cores),
+             "--training-threads", str(args.training_threads), "--nice", str(args.nice),
+             "--batch-size", str(args.batch_size)],
+            stdout=subprocess.PIPE, text=True, env=env
+        )
+        # Tunggu training benar-benar berjalan (model dibuat + batch pertama)
+        while process.stdout.readline().strip() != "ready":
+            if process.poll() is not None:
+                raise RuntimeError(f"Proses training skenario {scenario} gagal")
+        time.sleep(args.settle)
+
+    monitor = LatencyMonitor(latency_dir, publish_interval=0.25)
+    image = np.random.default_rng(1).integers(0, 256, (1, 224, 224, 3), dtype=np.uint8)
+
+    def predict():
+        start = time.perf_counter()
+        classifier.predict_batch(image)
+        monitor.observe(time.perf_counter() - start)
+
+    samples = time_calls(predict, args.iterations, warmup=0)
+    result = {"predict": latency_stats(samples)}
+
+    if process is not None:
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=120)
+        result["training"] = json.loads(output.strip().splitlines()[-1])
+    monitor.path.unlink(missing_ok=True)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark isolasi CPU training vs inference")
+    parser.add_argument("--iterations", type=int, default=200, help="Predict per skenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--threshold-ms", type=float, default=0,
+                        help="Ambang p95 throttle (0 = 1.5x p95 skenario idle)")
+    parser.add_argument("--reserved-cores", type=int, default=1)
+    parser.add_argument("--training-threads", type=int, default=0)
+    parser.add_argument("--nice", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--settle", type=float, default=2.0,
+                        help="Detik setelah training mulai sebelum pengukuran")
+    parser.add_argument("--work-dir", default=str(Path(tempfile.gettempdir()) / "swc_bench"))
+    parser.add_argument("--output", default="benchmarks/results/cpu_isolation.json")
+    parser.add_argument("--compare", help="File JSON hasil lama untuk dibandingkan")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    parser.add_argument("--latency-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_train(args)
+        return
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    print("🏗️ Membuat model 'random'...")
+    paths = build_model("random", args.work_dir)
+    from modules.classifier import WasteClassifier
+    classifier = WasteClassifier(paths["model_path"], paths["labels_path"])
+    latency_dir = tempfile.mkdtemp(prefix="swc_latency_")
+
+    results = {}
+    for scenario in (["idle"] if "idle" not in scenarios else []) + scenarios:
+        if scenario == "budget_throttle" and args.threshold_ms <= 0:
+            args.threshold_ms = round(results["idle"]["predict"]["p95_ms"] * 1.5, 1)
+        print(f"🧮 Skenario {scenario}...")
+        results[scenario] = run_scenario(scenario, classifier, args, latency_dir)
+
+    report = {
+        "environment": environment_info(),
+        "config": {
+            "iterations": args.iterations, "threshold_ms": args.threshold_ms,
+            "reserved_cores": args.reserved_cores, "training_threads": args.training_threads,
+            "nice": args.nice, "batch_size": args.batch_size
+        },
+        "results": results
+    }
+    save_results(report, args.output)
+
+    print("\n📊 RINGKASAN (predict p50 / p95 / p99, training batch/detik)")
+    for scenario, stats in results.items():
+        predict = stats["predict"]
+        training = stats.get("training")
+        throughput = f"{training['batches_per_s']:.2f} batch/s" if training else "-"
+        print(f"   {scenario}: {predict['p50_ms']:.1f} / {predict['p95_ms']:.1f} / "
+              f"{predict['p99_ms']:.1f} ms, training {throughput}")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
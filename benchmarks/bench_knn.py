@@ -0,0 +1,95 @@
+"""
+🗳️ BENCHMARK KNN - Latency klasifikasi k-NN di embedding
+Mengukur KNNClassifier.classify (exact vs index IVF) pada embedding
+sintetis yang ber-cluster (non-negatif seperti output ReLU), plus recall@k
+index IVF terhadap pencarian exact.
+
+Cara pakai:
+    python benchmarks/bench_knn.py --sizes 5000,20000,50000 --dim 128
+    python benchmarks/bench_knn.py --output baru.json --compare lama.json
+"""
+
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from common import environment_info, save_results, compare_results, latency_stats, time_calls
+
+CLASS_NAMES = ["cardboard", "glass", "metal", "paper", "plastic"]
+
+
+def synthetic_embeddings(count: int, dim: int, clusters: int = 50, seed: int = 0):
+    """🧬 Embedding non-negatif ber-cluster + label kelas"""
+    rng = np.random.default_rng(seed)
+    centers = np.maximum(rng.standard_normal((clusters, dim)), 0) * 2
+    assignment = rng.integers(0, clusters, count)
+    vectors = np.maximum(centers[assignment] + rng.standard_normal((count, dim)) * 0.8, 0)
+    queries = np.maximum(centers[assignment[:200]] + rng.standard_normal((200, dim)) * 0.8, 0)
+    return vectors.astype(np.float32), assignment % len(CLASS_NAMES), queries.astype(np.float32)
+
+
+def bench_size(size: int, dim: int, k: int, iterations: int) -> dict:
+    from modules.knn_classifier import KNNClassifier
+
+    vectors, labels, queries = synthetic_embeddings(size, dim)
+    keys = [f"{CLASS_NAMES[label]}/img_{i}.jpg" for i, label in enumerate(labels)]
+
+    result = {}
+    for name, exact_max in [("exact", size + 1), ("ivf", 4096)]:
+        knn = KNNClassifier(CLASS_NAMES, k=k, exact_max=exact_max)
+        start = time.perf_counter()
+        knn.add(keys, labels, vectors)
+        build_s = time.perf_counter() - start
+
+        query_cycle = itertools.cycle(queries)
+        samples = time_calls(lambda: knn.classify(next(query_cycle)), iterations)
+        result[name] = {"build_s": build_s, "classify": latency_stats(samples)}
+        result[name]["neighbors"] = [
+            {n["key"] for n in knn.classify(query)["neighbors"]} for query in queries
+        ]
+
+    exact, ivf = result["exact"].pop("neighbors"), result["ivf"].pop("neighbors")
+    result["ivf"]["recall_at_k"] = float(np.mean([
+        len(a & b) / max(1, len(a)) for a, b in zip(exact, ivf)
+    ]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark klasifikasi k-NN")
+    parser.add_argument("--sizes", default="5000,20000,50000", help="Jumlah embedding tersimpan")
+    parser.add_argument("--dim", type=int, default=128, help="Dimensi embedding")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", default="benchmarks/results/knn.json")
+    parser.add_argument("--compare", help="File JSON hasil lama untuk dibandingkan")
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",")]
+    results = {}
+    for size in sizes:
+        print(f"🗳️ {size} embedding {args.dim}-d...")
+        results[str(size)] = bench_size(size, args.dim, args.k, args.iterations)
+
+    report = {
+        "environment": environment_info(),
+        "config": {"sizes": sizes, "dim": args.dim, "k": args.k, "iterations": args.iterations},
+        "results": results
+    }
+    save_results(report, args.output)
+
+    print("\n📊 RINGKASAN (classify p50 / p99)")
+    for size, stats in results.items():
+        exact, ivf = stats["exact"]["classify"], stats["ivf"]["classify"]
+        print(f"   {size}: exact {exact['p50_ms']:.3f} / {exact['p99_ms']:.3f} ms, "
+              f"ivf {ivf['p50_ms']:.3f} / {ivf['p99_ms']:.3f} ms "
+              f"(recall@{args.k} {stats['ivf']['recall_at_k']:.3f})")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
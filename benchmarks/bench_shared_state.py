@@ -0,0 +1,131 @@
+"""
+🧷 BENCHMARK SHARED STATE - Biaya akses state bersama antar proses
+Mengukur SharedState (modules/shared_state.py) dibanding query SQLite
+antrian training yang sebelumnya dipakai tiap request status:
+
+1. snapshot() tanpa perubahan (cache per sequence) dan tepat setelah
+   penulisan (parse ulang)
+2. update() dan increment() (flock + tulis mmap)
+3. TrainingQueue.training_status() (2-3 query SQLite)
+4. Konsistensi: beberapa proses menulis bersamaan sementara proses lain
+   membaca; snapshot sobek (a != b) dan increment yang hilang harus 0
+
+Cara pakai:
+    python benchmarks/bench_shared_state.py
+    python benchmarks/bench_shared_state.py --writers 4 --output baru.json --compare lama.json
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from common import environment_info, save_results, compare_results, latency_stats, time_calls
+
+
+def _writer(path: str, count: int):
+    from modules.shared_state import SharedState
+    state = SharedState(path)
+    for i in range(count):
+        with state.transaction() as data:
+            data["a"] = data["b"] = i
+            data["payload"] = "x" * (i % 512)
+        state.increment("writes")
+
+
+def _reader(path: str, seconds: float, result):
+    from modules.shared_state import SharedState
+    state = SharedState(path)
+    reads = torn = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        snapshot = state.snapshot()
+        reads += 1
+        if snapshot.get("a") != snapshot.get("b"):
+            torn += 1
+    result.put({"reads": reads, "torn": torn})
+
+
+def bench_latency(work_dir: Path, iterations: int) -> dict:
+    from modules.shared_state import SharedState
+    from modules.training_queue import TrainingQueue
+
+    state = SharedState(str(work_dir / "latency.state"))
+    queue = TrainingQueue(str(work_dir / "latency.db"), state)
+    job = queue.submit("full", {"epochs": 10})
+    queue.claim_next(1)
+    queue.update_status(job["id"], current_epoch=3, progress=30, eta=42.0)
+
+    def read_after_write():
+        state.update(tick=time.perf_counter())
+        start = time.perf_counter()
+        state.snapshot()
+        return time.perf_counter() - start
+
+    return {
+        "snapshot_cached": latency_stats(time_calls(state.snapshot, iterations)),
+        "snapshot_after_write": latency_stats([read_after_write() for _ in range(iterations)]),
+        "update": latency_stats(time_calls(lambda: state.update(x=1), iterations)),
+        "increment": latency_stats(time_calls(lambda: state.increment("n"), iterations)),
+        "sqlite_training_status": latency_stats(time_calls(queue.training_status, iterations))
+    }
+
+
+def bench_consistency(work_dir: Path, writers: int, writes: int) -> dict:
+    path = str(work_dir / "consistency.state")
+    context = multiprocessing.get_context("spawn")
+    result = context.Queue()
+    readers = [context.Process(target=_reader, args=(path, 3.0, result)) for _ in range(2)]
+    writer_procs = [context.Process(target=_writer, args=(path, writes)) for _ in range(writers)]
+    for process in readers + writer_procs:
+        process.start()
+    for process in writer_procs + readers:
+        process.join()
+    read_stats = [result.get() for _ in readers]
+
+    from modules.shared_state import SharedState
+    counters = SharedState(path).get("counters", {})
+    return {
+        "reads": sum(r["reads"] for r in read_stats),
+        "torn_reads": sum(r["torn"] for r in read_stats),
+        "expected_increments": writers * writes,
+        "lost_increments": writers * writes - counters.get("writes", 0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared state antar proses")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--writes", type=int, default=2000, help="Penulisan per proses writer")
+    parser.add_argument("--output", default="benchmarks/results/shared_state.json")
+    parser.add_argument("--compare", help="File JSON hasil lama untuk dibandingkan")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        print("⏱️ Latency akses...")
+        latency = bench_latency(work_dir, args.iterations)
+        print("🧪 Konsistensi multi-proses...")
+        consistency = bench_consistency(work_dir, args.writers, args.writes)
+
+    report = {
+        "environment": environment_info(),
+        "config": {"iterations": args.iterations, "writers": args.writers, "writes": args.writes},
+        "results": {"latency": latency, "consistency": consistency}
+    }
+    save_results(report, args.output)
+
+    print("\n📊 RINGKASAN (p50 / p99)")
+    for name, stats in latency.items():
+        print(f"   {name}: {stats['p50_ms'] * 1000:.1f} / {stats['p99_ms'] * 1000:.1f} µs")
+    print(f"   {consistency['reads']} baca konkuren: {consistency['torn_reads']} sobek, "
+          f"{consistency['lost_increments']} increment hilang")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+🧰 BENCHMARK COMMON - Helper bersama untuk semua script benchmark
+Model pengganti, gambar sintetis, statistik latency dan metadata hasil
+"""
+
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from PIL import Image
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+LABELS = ["0 Cardboard", "1 Glass", "2 Metal", "3 Paper", "4 Plastic"]
+
+
+def build_model(kind: str, output_dir: str) -> Dict[str, str]:
+    """
+    🏗️ Buat model untuk benchmark tanpa butuh model produksi
+
+    Args:
+        kind: "random" (arsitektur create_model, bobot random) atau
+              "standin" (CNN kecil dengan Dense(128) sebelum output)
+        output_dir: Folder untuk menyimpan model .h5 dan labels.txt
+
+    Returns:
+        Dict berisi model_path dan labels_path
+    """
+    import tensorflow as tf
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = output_dir / f"bench_{kind}.h5"
+    labels_path = output_dir / "labels.txt"
+
+    tf.keras.utils.set_random_seed(42)
+    if kind == "random":
+        from modules.trainer import ModelTrainer
+        model = ModelTrainer(str(output_dir), str(model_path)).create_model()
+    elif kind == "standin":
+        layers = tf.keras.layers
+        model = tf.keras.Sequential([
+            layers.Input(shape=(224, 224, 3)),
+            layers.Conv2D(16, (3, 3), strides=2, activation="relu", padding="same"),
+            layers.Conv2D(32, (3, 3), strides=2, activation="relu", padding="same"),
+            layers.GlobalAveragePooling2D(),
+            layers.Dense(128, activation="relu"),
+            layers.Dropout(0.5),
+            layers.Dense(5, activation="softmax")
+        ])
+        model.compile(optimizer="adam", loss="categorical_crossentropy", metrics=["accuracy"])
+    else:
+        raise ValueError(f"Jenis model tidak dikenal: {kind}")
+
+    model.save(model_path)
+    labels_path.write_text("\n".join(LABELS) + "\n")
+    return {"model_path": str(model_path), "labels_path": str(labels_path)}
+
+
+def synthetic_jpeg(seed: int, size=(800, 600), quality: int = 90) -> bytes:
+    """
+    🖼️ Gambar JPEG sintetis (gradien + noise) agar ukuran file realistis
+    """
+    rng = np.random.default_rng(seed)
+    width, height = size
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :, np.newaxis]
+    base = np.broadcast_to(gradient, (height, width, 3)) * rng.uniform(0.3, 1.0, 3)
+    noise = rng.normal(0, 25, (height, width, 3))
+    array = np.clip(base + noise, 0, 255).astype(np.uint8)
+
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def write_synthetic_corpus(directory: str, count: int, size=(800, 600)) -> List[str]:
+    """
+    📂 Tulis sejumlah JPEG sintetis ke folder, return list path
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = directory / f"synthetic_{size[0]}x{size[1]}_{i:04d}.jpg"
+        if not path.exists():
+            path.write_bytes(synthetic_jpeg(i, size))
+        paths.append(str(path))
+    return paths
+
+
+def latency_stats(samples_seconds: List[float]) -> Dict[str, float]:
+    """
+    📊 Ringkasan distribusi latency dalam milidetik
+    """
+    samples = np.asarray(samples_seconds, dtype=np.float64) * 1000
+    if len(samples) == 0:
+        return {"count": 0}
+    return {
+        "count": int(len(samples)),
+        "mean_ms": float(samples.mean()),
+        "std_ms": float(samples.std()),
+        "min_ms": float(samples.min()),
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p90_ms": float(np.percentile(samples, 90)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "max_ms": float(samples.max())
+    }
+
+
+def time_calls(fn, iterations: int, warmup: int = 3) -> List[float]:
+    """
+    ⏱️ Jalankan fn berulang kali, return list durasi (detik) tanpa warmup
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run_child(script: str, args: List[str], env: Dict[str, str] = None) -> dict:
+    """
+    🧪 Jalankan script benchmark di proses baru (cold start / setting thread
+    TensorFlow hanya bisa diatur sebelum TF diinisialisasi), baca JSON dari
+    baris terakhir stdout
+    """
+    child_env = dict(os.environ)
+    child_env.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+    if env:
+        child_env.update(env)
+    output = subprocess.run(
+        [sys.executable, script] + args,
+        capture_output=True, text=True, env=child_env, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def environment_info() -> Dict[str, str]:
+    """
+    🖥️ Metadata mesin dan kode untuk membandingkan hasil antar commit
+    """
+    info = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__
+    }
+    try:
+        info["git_commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=BASE_DIR
+        ).stdout.strip()
+    except OSError:
+        info["git_commit"] = None
+    try:
+        import tensorflow as tf
+        info["tensorflow"] = tf.__version__
+    except ImportError:
+        info["tensorflow"] = None
+    return info
+
+
+def save_results(results: dict, output_path: str):
+    """💾 Simpan hasil benchmark ke JSON"""
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"📝 Hasil disimpan di {output_path}")
+
+
+def flatten_numbers(data, prefix: str = "") -> Dict[str, float]:
+    """
+    🔢 Ratakan dict bersarang menjadi {"a.b.c": angka} untuk perbandingan
+    """
+    flat = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten_numbers(value, f"{prefix}{key}."))
+    elif isinstance(data, list):
+        for i, value in enumerate(data):
+            flat.update(flatten_numbers(value, f"{prefix}{i}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip(".")] = float(data)
+    return flat
+
+
+def compare_results(current: dict, baseline_path: str, threshold: float = 0.05):
+    """
+    ⚖️ Cetak perubahan relatif angka-angka hasil terhadap file baseline
+    (hanya yang berubah lebih dari threshold)
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = flatten_numbers(baseline.get("results", {}))
+    new = flatten_numbers(current.get("results", {}))
+
+    print(f"\n⚖️  Perbandingan dengan {baseline_path} "
+          f"(commit {baseline.get('environment', {}).get('git_commit')}):")
+    for key in sorted(set(old) & set(new)):
+        if old[key] == 0:
+            continue
+        change = (new[key] - old[key]) / abs(old[key])
+        if abs(change) >= threshold:
+            print(f"   {key}: {old[key]:.3f} -> {new[key]:.3f} ({change:+.1%})")
@@ -0,0 +1,527 @@
+"""
+🚦 LOAD TEST API - Load generator untuk Flask API (backend/app.py)
+Dipakai untuk memvalidasi konfigurasi worker/thread gunicorn sebelum deploy.
+
+Fitur:
+- Endpoint: /api/predict, /api/status, /api/upload-training (campuran bisa diatur)
+- Closed-loop (--concurrency N klien back-to-back) atau open-loop
+  (--rate R request/detik, kedatangan Poisson; latency dihitung dari waktu
+  jadwal sehingga antrean di server ikut terukur)
+- Korpus gambar JPEG sintetis berbagai ukuran
+- Bisa menjalankan server lokal sendiri (Flask dev server atau gunicorn)
+  dengan model pengganti dan dataset sementara
+- Laporan: throughput, p50/p95/p99, error rate per endpoint, RSS server
+  dari waktu ke waktu (JSON)
+
+Cara pakai:
+    # Server lokal gunicorn dengan 2 worker x 4 thread, 20 req/s selama 60 detik
+    python benchmarks/loadtest_api.py --spawn gunicorn --gunicorn-args "--workers 2 --threads 4" \\
+        --rate 20 --duration 60
+
+    # Closed-loop 8 klien ke server yang sudah jalan
+    python benchmarks/loadtest_api.py --url http://localhost:5000 --concurrency 8
+"""
+
+import argparse
+import http.client
+import os
+import random
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+
+from common import (
+    BASE_DIR, build_model, synthetic_jpeg, latency_stats,
+    environment_info, save_results, compare_results
+)
+
+CATEGORIES = ["cardboard", "glass", "metal", "paper", "plastic"]
+IMAGE_SIZES = [(640, 480), (800, 600), (1280, 960)]
+
+
+# ============================================
+# 🖼️ KORPUS & REQUEST
+# ============================================
+
+def build_corpus(count: int):
+    """📂 Korpus JPEG sintetis (bytes) dengan ukuran bervariasi"""
+    return [synthetic_jpeg(i, IMAGE_SIZES[i % len(IMAGE_SIZES)]) for i in range(count)]
+
+
+def multipart_body(fields: dict, file_bytes: bytes, filename: str):
+    """📦 Encode multipart/form-data (tanpa dependency tambahan)"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n"
+            .encode()
+        )
+    parts.append(
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: image/jpeg\r\n\r\n".encode()
+    )
+    parts.append(file_bytes)
+    parts.append(f"\r\n--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class RequestFactory:
+    """
+    🏭 Membuat request untuk setiap endpoint dari korpus sintetis
+    """
+
+    def __init__(self, corpus):
+        self.corpus = corpus
+        self._rng = random.Random(0)
+        self._lock = threading.Lock()
+
+    def _pick(self):
+        with self._lock:
+            return self._rng.randrange(len(self.corpus)), self._rng.choice(CATEGORIES)
+
+    def make(self, endpoint: str):
+        """Return (method, path, body, headers)"""
+        if endpoint == "status":
+            return "GET", "/api/status", None, {}
+        index, category = self._pick()
+        if endpoint == "predict":
+            body, content_type = multipart_body({}, self.corpus[index], f"img_{index}.jpg")
+            return "POST", "/api/predict", body, {"Content-Type": content_type}
+        if endpoint == "upload":
+            body, content_type = multipart_body({"category": category}, self.corpus[index],
+                                                f"img_{index}.jpg")
+            return "POST", "/api/upload-training", body, {"Content-Type": content_type}
+        raise ValueError(f"Endpoint tidak dikenal: {endpoint}")
+
+
+class HttpClient:
+    """
+    🔌 Klien HTTP keep-alive, satu koneksi per thread
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def request(self, method, path, body=None, headers=None):
+        """Return (status, body bytes); status 0 untuk error koneksi"""
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt == 1:
+                    return 0, b""
+
+
+# ============================================
+# 📊 HASIL
+# ============================================
+
+class Recorder:
+    """
+    📝 Kumpulkan latency & status per endpoint (thread-safe)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.errors = {}
+        self.status_codes = {}
+        self.completed = 0
+
+    def record(self, endpoint, latency, status):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append(latency)
+            codes = self.status_codes.setdefault(endpoint, {})
+            codes[str(status)] = codes.get(str(status), 0) + 1
+            if status == 0 or status >= 400:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            self.completed += 1
+
+    def summary(self, elapsed: float) -> dict:
+        with self._lock:
+            result = {}
+            total = 0
+            total_errors = 0
+            for endpoint, samples in self.samples.items():
+                errors = self.errors.get(endpoint, 0)
+                total += len(samples)
+                total_errors += errors
+                result[endpoint] = dict(
+                    latency_stats(samples),
+                    throughput_rps=len(samples) / elapsed,
+                    error_rate=errors / len(samples),
+                    status_codes=self.status_codes.get(endpoint, {})
+                )
+            result["all"] = {
+                "requests": total,
+                "throughput_rps": total / elapsed,
+                "error_rate": total_errors / total if total else 0.0
+            }
+            return result
+
+
+# ============================================
+# 🧠 RSS SERVER
+# ============================================
+
+def _proc_tree_rss(root_pid: int) -> int:
+    """RSS total proses root + semua turunannya (Linux /proc)"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError):
+            continue
+
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError):
+            pass
+        stack.extend(children.get(pid, []))
+    return total
+
+
+_RSS_LINE = re.compile(r'^process_resident_memory_bytes\{pid="(\d+)"\} (\S+)$', re.M)
+
+
+def _metrics_rss(client: HttpClient):
+    """RSS per worker dari endpoint /metrics (jumlah semua worker)"""
+    status, body = client.request("GET", "/metrics")
+    if status != 200:
+        return None
+    values = [float(v) for _, v in _RSS_LINE.findall(body.decode())]
+    return sum(values) if values else None
+
+
+class RssSampler(threading.Thread):
+    """
+    ⏲️ Sampling RSS server setiap interval: dari /proc untuk server yang
+    di-spawn, selain itu dari /metrics
+    """
+
+    def __init__(self, client: HttpClient, recorder: Recorder, server_pid=None, interval=1.0):
+        super().__init__(daemon=True)
+        self.client = client
+        self.recorder = recorder
+        self.server_pid = server_pid
+        self.interval = interval
+        self.timeline = []
+        self._stop_event = threading.Event()
+        self._start = time.perf_counter()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.server_pid and os.path.exists("/proc"):
+                rss = _proc_tree_rss(self.server_pid)
+            else:
+                rss = _metrics_rss(self.client)
+            self.timeline.append({
+                "t": round(time.perf_counter() - self._start, 2),
+                "rss_bytes": rss,
+                "completed": self.recorder.completed
+            })
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ============================================
+# 🚀 GENERATOR BEBAN
+# ============================================
+
+def parse_mix(value: str):
+    """ "predict=8,status=1,upload=1" -> ([endpoint], [bobot]) """
+    endpoints, weights = [], []
+    for item in value.split(","):
+        name, weight = item.split("=")
+        endpoints.append(name.strip())
+        weights.append(float(weight))
+    return endpoints, weights
+
+
+def run_closed_loop(client, factory, recorder, mix, concurrency, duration):
+    """Setiap klien mengirim request berikutnya segera setelah response diterima"""
+    endpoints, weights = mix
+    deadline = time.perf_counter() + duration
+
+    def worker(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, path, body, headers = factory.make(endpoint)
+            start = time.perf_counter()
+            status, _ = client.request(method, path, body, headers)
+            recorder.record(endpoint, time.perf_counter() - start, status)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def run_open_loop(client, factory, recorder, mix, rate, duration, max_in_flight):
+    """
+    Kedatangan Poisson dengan rata-rata `rate` req/s, tidak menunggu response.
+    Latency diukur dari waktu jadwal (menghindari coordinated omission).
+    """
+    endpoints, weights = mix
+    rng = random.Random(0)
+    start = time.perf_counter()
+    dropped = 0
+
+    def send(endpoint, scheduled):
+        method, path, body, headers = factory.make(endpoint)
+        status, _ = client.request(method, path, body, headers)
+        recorder.record(endpoint, time.perf_counter() - scheduled, status)
+
+    semaphore = threading.BoundedSemaphore(max_in_flight)
+
+    def send_bounded(endpoint, scheduled):
+        try:
+            send(endpoint, scheduled)
+        finally:
+            semaphore.release()
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        next_time = start
+        while True:
+            next_time += rng.expovariate(rate)
+            if next_time - start > duration:
+                break
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not semaphore.acquire(blocking=False):
+                dropped += 1  # Klien kehabisan slot in-flight
+                continue
+            pool.submit(send_bounded, rng.choices(endpoints, weights)[0], next_time)
+    return dropped
+
+
+# ============================================
+# 🖥️ SERVER LOKAL
+# ============================================
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(kind: str, work_dir: Path, gunicorn_args: str, seed_images: int):
+    """
+    🖥️ Jalankan backend lokal dengan model pengganti dan dataset sementara
+
+    Returns:
+        Tuple (process, base_url)
+    """
+    model_dir = work_dir / "model"
+    dataset_dir = work_dir / "dataset"
+    shutil.rmtree(dataset_dir, ignore_errors=True)
+
+    paths = build_model("standin", str(model_dir))
+    shutil.copy(paths["model_path"], model_dir / "keras_model.h5")
+
+    for category in CATEGORIES:
+        category_dir = dataset_dir / "raw" / category
+        category_dir.mkdir(parents=True, exist_ok=True)
+        for i in range(seed_images):
+            (category_dir / f"seed_{i:03d}.jpg").write_bytes(synthetic_jpeg(i, (320, 240)))
+
+    port = _free_port()
+    env = dict(os.environ, MODEL_DIR=str(model_dir), DATASET_DIR=str(dataset_dir),
+               PORT=str(port), TF_CPP_MIN_LOG_LEVEL="2", PYTHONUNBUFFERED="1")
+    backend_dir = BASE_DIR / "backend"
+
+    if kind == "gunicorn":
+        command = ["gunicorn", "--chdir", str(backend_dir), "app:app",
+                   "--bind", f"127.0.0.1:{port}", "--timeout", "120"] + gunicorn_args.split()
+    else:
+        command = [sys.executable, str(backend_dir / "app.py")]
+
+    log_file = open(work_dir / "server.log", "w")
+    process = subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT,
+                               cwd=str(backend_dir), start_new_session=True)
+
+    base_url = f"http://127.0.0.1:{port}"
+    client = HttpClient(base_url, timeout=2)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server berhenti, lihat {work_dir / 'server.log'}")
+        if client.request("GET", "/health")[0] == 200:
+            return process, base_url
+        time.sleep(0.5)
+    raise RuntimeError("Server tidak siap dalam 60 detik")
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+# ============================================
+# 🎯 MAIN
+# ============================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test Smart Waste Classifier API")
+    parser.add_argument("--url", help="URL server yang sudah berjalan")
+    parser.add_argument("--spawn", choices=["flask", "gunicorn"],
+                        help="Jalankan server lokal dengan model pengganti")
+    parser.add_argument("--gunicorn-args", default="--workers 2 --threads 4")
+    parser.add_argument("--seed-images", type=int, default=12,
+                        help="Gambar awal per kategori untuk server yang di-spawn")
+    parser.add_argument("--mix", default="predict=8,status=1,upload=1")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Jumlah klien (closed-loop) atau maksimal in-flight (open-loop)")
+    parser.add_argument("--rate", type=float, help="Arrival rate req/s (aktifkan open-loop)")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--corpus-size", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--work-dir", default=str(Path(tempfile.gettempdir()) / "swc_loadtest"))
+    parser.add_argument("--output", default="benchmarks/results/loadtest.json")
+    parser.add_argument("--compare", help="File JSON hasil lama untuk dibandingkan")
+    args = parser.parse_args()
+
+    if not args.url and not args.spawn:
+        parser.error("Pilih --url atau --spawn")
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    process = None
+
+    try:
+        if args.spawn:
+            print(f"🖥️ Menjalankan server {args.spawn}...")
+            process, base_url = spawn_server(args.spawn, work_dir, args.gunicorn_args,
+                                             args.seed_images)
+        else:
+            base_url = args.url.rstrip("/")
+
+        client = HttpClient(base_url, args.timeout)
+        factory = RequestFactory(build_corpus(args.corpus_size))
+        mix = parse_mix(args.mix)
+
+        # Warmup paralel agar model ter-load di setiap worker sebelum pengukuran
+        print("🔥 Warmup...")
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(lambda _: client.request(*factory.make("predict")),
+                          range(args.concurrency * 2)))
+
+        recorder = Recorder()
+        sampler = RssSampler(client, recorder, server_pid=process.pid if process else None)
+        sampler.start()
+
+        mode = "open-loop" if args.rate else "closed-loop"
+        print(f"🚦 {mode}: {args.rate or args.concurrency} "
+              f"{'req/s' if args.rate else 'klien'} selama {args.duration:.0f} detik...")
+        start = time.perf_counter()
+        dropped = 0
+        if args.rate:
+            dropped = run_open_loop(client, factory, recorder, mix, args.rate,
+                                    args.duration, args.concurrency)
+        else:
+            run_closed_loop(client, factory, recorder, mix, args.concurrency, args.duration)
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+
+        results = recorder.summary(elapsed)
+        results["all"]["dropped_client_side"] = dropped
+        if dropped:
+            attempted = results["all"]["requests"] + dropped
+            results["all"]["drop_rate"] = dropped / attempted
+        rss_values = [p["rss_bytes"] for p in sampler.timeline if p["rss_bytes"]]
+        results["server_rss"] = {
+            "start_bytes": rss_values[0] if rss_values else None,
+            "end_bytes": rss_values[-1] if rss_values else None,
+            "peak_bytes": max(rss_values) if rss_values else None
+        }
+
+        report = {
+            "environment": environment_info(),
+            "config": {
+                "target": args.spawn or args.url,
+                "gunicorn_args": args.gunicorn_args if args.spawn == "gunicorn" else None,
+                "mode": mode,
+                "rate": args.rate,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "mix": args.mix
+            },
+            "results": results,
+            "timeline": sampler.timeline
+        }
+        save_results(report, args.output)
+        _print_summary(results)
+
+        if args.compare:
+            compare_results(report, args.compare)
+    finally:
+        if process is not None:
+            stop_server(process)
+
+
+def _print_summary(results: dict):
+    print("\n📊 RINGKASAN")
+    print(f"   {'endpoint':<10} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'error':>7}")
+    for endpoint, stats in results.items():
+        if endpoint in ("all", "server_rss") or "p50_ms" not in stats:
+            continue
+        print(f"   {endpoint:<10} {stats['throughput_rps']:>8.1f} {stats['p50_ms']:>7.1f}ms "
+              f"{stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms {stats['error_rate']:>6.1%}")
+    overall = results["all"]
+    print(f"   Total: {overall['requests']} request, {overall['throughput_rps']:.1f} req/s, "
+          f"error {overall['error_rate']:.1%}")
+    if overall.get("dropped_client_side"):
+        print(f"   ⚠️  {overall['dropped_client_side']} request tidak terkirim "
+              f"(in-flight penuh, {overall['drop_rate']:.1%}) - server kewalahan")
+    rss = results["server_rss"]
+    if rss["peak_bytes"]:
+        print(f"   RSS server: {rss['start_bytes'] / 2**20:.0f} MB -> "
+              f"{rss['end_bytes'] / 2**20:.0f} MB (peak {rss['peak_bytes'] / 2**20:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,13 @@ const API = {
     STATUS: `${API_BASE}/api/status`,
     PREDICT: `${API_BASE}/api/predict`,
     UPLOAD_TRAINING: `${API_BASE}/api/upload-training`,
+    UPLOAD_TRAINING_BULK: `${API_BASE}/api/upload-training/bulk`,
     TRAIN: `${API_BASE}/api/train`,
+    TRAIN_RESUME: `${API_BASE}/api/train/resume`,
+    TRAIN_JOBS: `${API_BASE}/api/train/jobs`,
+    TRAIN_ESTIMATE: `${API_BASE}/api/train/estimate`,
     TRAINING_STATUS: `${API_BASE}/api/training-status`,
+    EVENTS: `${API_BASE}/api/events`,
     CATEGORIES: `${API_BASE}/api/categories`
 };
 
@@ -27,6 +32,11 @@ let appState = {
     currentPage: 'home',
     systemStatus: null,
     trainingInterval: null,
+    statusInterval: null,
+    eventSource: null,
+    trainingId: null,
+    budgetTimer: null,
+    estimateTimer: null,
     charts: {}
 };
 
@@ -52,10 +62,71 @@ document.addEventListener('DOMContentLoaded', function() {
     // Load initial status
     loadSystemStatus();
     
-    // Auto-refresh status setiap 30 detik
-    setInterval(loadSystemStatus, 30000);
+    // Update status & progress training di-push server (tanpa polling)
+    connectEventStream();
 });
 
+// ============================================
+// 📡 EVENT STREAM (SERVER-SENT EVENTS)
+// ============================================
+
+function connectEventStream() {
+    if (!window.EventSource) {
+        startPollingFallback();
+        return;
+    }
+    
+    const source = new EventSource(API.EVENTS);
+    appState.eventSource = source;
+    
+    source.addEventListener('training', function(e) {
+        handleTrainingEvent(JSON.parse(e.data));
+    });
+    
+    source.addEventListener('dataset', function() {
+        loadSystemStatus();
+        if (appState.currentPage === 'upload') {
+            loadDatasetStats();
+        }
+    });
+    
+    source.onerror = function() {
+        // Putus biasa: browser reconnect sendiri (dengan Last-Event-ID).
+        // Ditolak server (mis. 503 terlalu banyak stream): kembali ke polling
+        if (source.readyState === EventSource.CLOSED) {
+            appState.eventSource = null;
+            startPollingFallback();
+        }
+    };
+}
+
+function startPollingFallback() {
+    if (!appState.statusInterval) {
+        appState.statusInterval = setInterval(loadSystemStatus, 30000);
+    }
+    if (appState.trainingId) {
+        monitorTraining(appState.trainingId);
+    }
+}
+
+function handleTrainingEvent(status) {
+    if (!appState.trainingId) {
+        // Training baru (dari tab / pengguna lain) ikut ditampilkan
+        if (!status.in_progress) return;
+        appState.trainingId = status.training_id;
+        document.getElementById('training-progress').style.display = 'block';
+        document.getElementById('start-training-btn').disabled = true;
+    }
+    if (status.training_id !== appState.trainingId) return;
+    
+    updateTrainingProgress(status);
+    if (!status.in_progress) {
+        appState.trainingId = null;
+        handleTrainingComplete(status);
+        checkTrainingStatus();
+    }
+}
+
 // ============================================
 // 🧭 NAVIGATION
 // ============================================
@@ -286,6 +357,10 @@ async function classifyImage(file) {
         // Create FormData
         const formData = new FormData();
         formData.append('file', file);
+        const modeSelect = document.getElementById('classify-mode');
+        if (modeSelect) {
+            formData.append('mode', modeSelect.value);
+        }
         
         // Send request
         const response = await fetch(API.PREDICT, {
@@ -425,18 +500,18 @@ function setupTrainingDataUpload() {
     
     // File input change
     fileInput.addEventListener('change', function(e) {
-        const file = e.target.files[0];
-        if (file) {
-            previewTrainingImage(file);
+        const files = e.target.files;
+        if (files.length > 0) {
+            previewTrainingImage(files[0], files.length);
         }
     });
     
     // Upload button
     uploadBtn.addEventListener('click', function() {
-        const file = fileInput.files[0];
+        const files = Array.from(fileInput.files);
         const category = document.getElementById('upload-category').value;
         
-        if (!file) {
+        if (files.length === 0) {
             showToast('Pilih gambar terlebih dahulu', 'error');
             return;
         }
@@ -446,14 +521,41 @@ function setupTrainingDataUpload() {
             return;
         }
         
-        uploadTrainingData(file, category);
+        // Banyak file atau arsip: lewat endpoint bulk (diproses di server)
+        if (files.length > 1 || isArchiveFile(files[0])) {
+            uploadTrainingBulk(files, category);
+        } else {
+            uploadTrainingData(files[0], category);
+        }
     });
 }
 
-function previewTrainingImage(file) {
+function isArchiveFile(file) {
+    return /\.(zip|tar|tgz|tar\.gz)$/i.test(file.name);
+}
+
+function previewTrainingImage(file, count = 1) {
     const uploadBox = document.getElementById('upload-training-box');
     const preview = document.getElementById('upload-training-preview');
     const previewImg = document.getElementById('upload-training-preview-img');
+    const countLabel = document.getElementById('upload-training-count');
+    
+    if (count > 1 || isArchiveFile(file)) {
+        countLabel.textContent = isArchiveFile(file) && count === 1
+            ? `🗜️ Arsip: ${file.name} (${formatBytes(file.size)})`
+            : `📦 ${count} file dipilih`;
+        countLabel.style.display = 'block';
+    } else {
+        countLabel.style.display = 'none';
+    }
+    
+    if (isArchiveFile(file)) {
+        previewImg.style.display = 'none';
+        uploadBox.style.display = 'none';
+        preview.style.display = 'block';
+        return;
+    }
+    previewImg.style.display = '';
     
     const reader = new FileReader();
     reader.onload = function(e) {
@@ -469,6 +571,7 @@ function resetUploadPage() {
     document.getElementById('upload-training-preview').style.display = 'none';
     document.getElementById('upload-training-file').value = '';
     document.getElementById('upload-category').value = '';
+    document.getElementById('upload-training-count').style.display = 'none';
 }
 
 async function uploadTrainingData(file, category) {
@@ -509,6 +612,113 @@ async function uploadTrainingData(file, category) {
     }
 }
 
+// Batas per request bulk (server: BULK_UPLOAD_MAX_MB, default 256MB)
+const BULK_CHUNK_BYTES = 64 * 1024 * 1024;
+const BULK_CHUNK_FILES = 200;
+
+function chunkFilesForBulk(files) {
+    const chunks = [];
+    let current = [];
+    let currentBytes = 0;
+    
+    files.forEach(file => {
+        if (current.length > 0 &&
+            (currentBytes + file.size > BULK_CHUNK_BYTES || current.length >= BULK_CHUNK_FILES)) {
+            chunks.push(current);
+            current = [];
+            currentBytes = 0;
+        }
+        current.push(file);
+        currentBytes += file.size;
+    });
+    if (current.length > 0) chunks.push(current);
+    return chunks;
+}
+
+async function uploadTrainingBulk(files, category) {
+    const uploadBtn = document.getElementById('upload-training-btn');
+    
+    uploadBtn.disabled = true;
+    uploadBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Mengupload...';
+    
+    try {
+        // Kirim per potongan (beberapa request, bukan satu request per gambar)
+        const jobIds = [];
+        for (const chunk of chunkFilesForBulk(files)) {
+            const formData = new FormData();
+            chunk.forEach(file => formData.append('files', file));
+            formData.append('category', category);
+            
+            const response = await fetch(API.UPLOAD_TRAINING_BULK, {
+                method: 'POST',
+                body: formData
+            });
+            const result = await response.json();
+            
+            if (response.status !== 202 || !result.success) {
+                throw new Error(result.error || 'Gagal mengupload gambar');
+            }
+            jobIds.push(result.data.job_id);
+        }
+        
+        // Pantau semua job sampai selesai
+        const jobs = await pollBulkJobs(jobIds, (processed, total) => {
+            uploadBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Memproses ${processed}/${total}...`;
+        });
+        
+        const added = jobs.reduce((sum, job) => sum + job.added, 0);
+        const duplicates = jobs.reduce((sum, job) => sum + job.duplicates, 0);
+        const errors = jobs.reduce((sum, job) => sum + job.errors, 0);
+        
+        let message = `✅ ${added} gambar ditambahkan`;
+        if (duplicates > 0) message += `, ${duplicates} duplikat dilewati`;
+        if (errors > 0) message += `, ${errors} gagal`;
+        showToast(message, errors > 0 ? 'warning' : 'success');
+        
+        resetUploadPage();
+        loadDatasetStats();
+        loadSystemStatus();
+    } catch (error) {
+        console.error('Bulk upload error:', error);
+        showToast(error.message || 'Terjadi kesalahan saat mengupload', 'error');
+    } finally {
+        uploadBtn.disabled = false;
+        uploadBtn.innerHTML = '<i class="fas fa-plus"></i> Tambah ke Dataset';
+    }
+}
+
+async function pollBulkJobs(jobIds, onProgress) {
+    const finished = {};
+    
+    while (Object.keys(finished).length < jobIds.length) {
+        let processed = 0;
+        let total = 0;
+        
+        for (const jobId of jobIds) {
+            let job = finished[jobId];
+            if (!job) {
+                const response = await fetch(`${API.UPLOAD_TRAINING_BULK}/${jobId}`);
+                const result = await response.json();
+                if (!result.success) {
+                    throw new Error(result.error || 'Status upload tidak ditemukan');
+                }
+                job = result.data;
+                if (job.status === 'completed' || job.status === 'failed') {
+                    finished[jobId] = job;
+                }
+            }
+            processed += job.processed;
+            total += job.total;
+        }
+        
+        onProgress(processed, total);
+        if (Object.keys(finished).length < jobIds.length) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    }
+    return Object.values(finished);
+}
+
 async function loadDatasetStats() {
     try {
         const response = await fetch(API.STATUS);
@@ -584,17 +794,157 @@ function setupTrainingControls() {
         });
     }
     
+    // Estimasi waktu: hitung ulang setiap parameter berubah
+    ['train-epochs', 'train-batch', 'train-mode', 'train-budget'].forEach(id => {
+        const input = document.getElementById(id);
+        if (input) {
+            input.addEventListener('change', () => scheduleTrainingEstimate(300));
+        }
+    });
+    scheduleTrainingEstimate(0);
+    
     // Start training button
     const startBtn = document.getElementById('start-training-btn');
     if (startBtn) {
         startBtn.addEventListener('click', startTraining);
     }
+    
+    // Resume training button (run terputus)
+    const resumeBtn = document.getElementById('resume-training-btn');
+    if (resumeBtn) {
+        resumeBtn.addEventListener('click', resumeTraining);
+    }
+    
+    // Cancel training button
+    const cancelBtn = document.getElementById('cancel-training-btn');
+    if (cancelBtn) {
+        cancelBtn.addEventListener('click', cancelTraining);
+    }
+}
+
+const ESTIMATE_BASIS_LABELS = {
+    'benchmark+history': 'benchmark mesin ini + riwayat training',
+    'benchmark': 'benchmark mesin ini',
+    'history': 'riwayat training',
+    'heuristic': 'perkiraan kasar'
+};
+
+function scheduleTrainingEstimate(delay) {
+    if (appState.estimateTimer) {
+        clearTimeout(appState.estimateTimer);
+    }
+    appState.estimateTimer = setTimeout(updateTrainingEstimate, delay);
+}
+
+async function updateTrainingEstimate() {
+    const estimateEl = document.getElementById('train-estimate');
+    if (!estimateEl) return;
+    
+    const params = new URLSearchParams({
+        epochs: document.getElementById('train-epochs').value,
+        batch_size: document.getElementById('train-batch').value,
+        mode: document.getElementById('train-mode').value
+    });
+    const budgetMinutes = document.getElementById('train-budget').value;
+    if (budgetMinutes) {
+        params.set('time_budget_minutes', budgetMinutes);
+    }
+    
+    try {
+        const response = await fetch(`${API.TRAIN_ESTIMATE}?${params}`);
+        const result = await response.json();
+        if (!result.success) {
+            estimateEl.textContent = result.error;
+            return;
+        }
+        
+        const data = result.data;
+        let note = `berdasarkan ${ESTIMATE_BASIS_LABELS[data.basis] || data.basis}`;
+        if (data.benchmark_status === 'running') {
+            note += ', mengukur kecepatan mesin...';
+            // Benchmark berjalan di server: perbarui setelah hasilnya ada
+            scheduleTrainingEstimate(5000);
+        }
+        estimateEl.textContent = `${data.formatted} — ${note}`;
+    } catch (error) {
+        console.error('Error loading training estimate:', error);
+    }
+}
+
+async function cancelTraining() {
+    const cancelBtn = document.getElementById('cancel-training-btn');
+    const trainingId = cancelBtn.dataset.trainingId;
+    if (!trainingId) return;
+    
+    cancelBtn.disabled = true;
+    try {
+        const response = await fetch(`${API.TRAIN_JOBS}/${encodeURIComponent(trainingId)}/cancel`, {
+            method: 'POST'
+        });
+        const result = await response.json();
+        showToast(result.success ? result.message : (result.error || 'Gagal membatalkan training'),
+                  result.success ? 'info' : 'error');
+    } catch (error) {
+        console.error('Training cancel error:', error);
+        showToast('Terjadi kesalahan saat membatalkan training', 'error');
+    }
+    cancelBtn.disabled = false;
+}
+
+async function resumeTraining() {
+    const resumeBtn = document.getElementById('resume-training-btn');
+    const startBtn = document.getElementById('start-training-btn');
+    resumeBtn.disabled = true;
+    startBtn.disabled = true;
+    
+    try {
+        const response = await fetch(API.TRAIN_RESUME, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                training_id: resumeBtn.dataset.trainingId
+            })
+        });
+        
+        const result = await response.json();
+        
+        if (result.success) {
+            showToast('Training dilanjutkan dari checkpoint! ♻️', 'success');
+            resumeBtn.style.display = 'none';
+            document.getElementById('training-progress').style.display = 'block';
+            monitorTraining(result.data.training_id);
+        } else {
+            showToast(result.error || 'Gagal melanjutkan training', 'error');
+            startBtn.disabled = false;
+        }
+    } catch (error) {
+        console.error('Training resume error:', error);
+        showToast('Terjadi kesalahan saat melanjutkan training', 'error');
+        startBtn.disabled = false;
+    }
+    resumeBtn.disabled = false;
+}
+
+function updateResumeButton(status) {
+    const resumeBtn = document.getElementById('resume-training-btn');
+    if (!resumeBtn) return;
+    
+    if (status.resumable) {
+        resumeBtn.dataset.trainingId = status.resumable.training_id;
+        resumeBtn.style.display = '';
+    } else {
+        resumeBtn.style.display = 'none';
+    }
 }
 
 async function startTraining() {
     const epochs = parseInt(document.getElementById('train-epochs').value);
     const learningRate = parseFloat(document.getElementById('train-lr').value);
     const batchSize = parseInt(document.getElementById('train-batch').value);
+    const mode = document.getElementById('train-mode').value;
+    const budgetMinutes = document.getElementById('train-budget').value;
     
     const startBtn = document.getElementById('start-training-btn');
     const progressSection = document.getElementById('training-progress');
@@ -612,18 +962,20 @@ async function startTraining() {
             body: JSON.stringify({
                 epochs: epochs,
                 learning_rate: learningRate,
-                batch_size: batchSize
+                batch_size: batchSize,
+                mode: mode,
+                time_budget_minutes: budgetMinutes && mode === 'full' ? parseInt(budgetMinutes) : null
             })
         });
         
         const result = await response.json();
         
         if (result.success) {
-            showToast('Training dimulai! 🚀', 'success');
+            showToast(result.data.queue_position ? `${result.message} ⏳` : 'Training dimulai! 🚀', 'success');
             progressSection.style.display = 'block';
             
             // Start monitoring
-            monitorTraining();
+            monitorTraining(result.data.training_id);
         } else {
             showToast(result.error || 'Gagal memulai training', 'error');
             startBtn.disabled = false;
@@ -635,13 +987,17 @@ async function startTraining() {
     }
 }
 
-function monitorTraining() {
-    // Clear existing interval
+function monitorTraining(trainingId) {
+    appState.trainingId = trainingId;
+    
+    // Progress datang lewat event stream
+    if (appState.eventSource) return;
+    
+    // Fallback tanpa stream: poll training status every 2 seconds
     if (appState.trainingInterval) {
         clearInterval(appState.trainingInterval);
     }
     
-    // Poll training status every 2 seconds
     appState.trainingInterval = setInterval(async () => {
         try {
             const response = await fetch(API.TRAINING_STATUS);
@@ -653,7 +1009,9 @@ function monitorTraining() {
                 // Check if completed
                 if (!result.data.in_progress) {
                     clearInterval(appState.trainingInterval);
+                    appState.trainingId = null;
                     handleTrainingComplete(result.data);
+                    updateResumeButton(result.data);
                 }
             }
         } catch (error) {
@@ -673,6 +1031,17 @@ function updateTrainingProgress(status) {
     
     if (progressText) {
         progressText.textContent = status.message;
+        // Training mengalah ke prediksi yang sedang ramai
+        if (status.cpu_duty !== undefined && status.cpu_duty < 1) {
+            progressText.textContent += ' (diperlambat, server sedang sibuk melayani prediksi)';
+        }
+    }
+    
+    updateBudgetCountdown(status);
+    
+    const cancelBtn = document.getElementById('cancel-training-btn');
+    if (cancelBtn && status.training_id) {
+        cancelBtn.dataset.trainingId = status.training_id;
     }
     
     // Metrics
@@ -697,6 +1066,37 @@ function updateTrainingProgress(status) {
     }
 }
 
+function formatDuration(seconds) {
+    const total = Math.max(0, Math.round(seconds));
+    return `${Math.floor(total / 60)}:${String(total % 60).padStart(2, '0')}`;
+}
+
+function updateBudgetCountdown(status) {
+    // Sisa waktu dari server per epoch; di antaranya dihitung mundur di browser
+    const budgetText = document.getElementById('progress-budget');
+    if (!budgetText) return;
+    
+    if (appState.budgetTimer) {
+        clearInterval(appState.budgetTimer);
+        appState.budgetTimer = null;
+    }
+    if (!status.in_progress || !status.time_budget || status.budget_remaining === undefined) {
+        budgetText.style.display = 'none';
+        return;
+    }
+    
+    const deadline = Date.now() + status.budget_remaining * 1000;
+    const render = () => {
+        const remaining = (deadline - Date.now()) / 1000;
+        budgetText.textContent = `⏱️ Sisa waktu ${formatDuration(remaining)} dari ${formatDuration(status.time_budget)}`;
+    };
+    render();
+    budgetText.style.display = 'block';
+    if (status.state === 'running') {
+        appState.budgetTimer = setInterval(render, 1000);
+    }
+}
+
 function handleTrainingComplete(status) {
     const progressSection = document.getElementById('training-progress');
     const resultSection = document.getElementById('training-result');
@@ -749,7 +1149,9 @@ async function checkTrainingStatus() {
         
         if (result.success && result.data.in_progress) {
             document.getElementById('training-progress').style.display = 'block';
-            monitorTraining();
+            monitorTraining(result.data.training_id);
+        } else if (result.success) {
+            updateResumeButton(result.data);
         }
     } catch (error) {
         console.error('Error checking training status:', error);
@@ -0,0 +1,399 @@
+"""
+📦 MODUL BULK INGEST - UPLOAD BANYAK GAMBAR SEKALIGUS
+Memproses banyak file (atau arsip zip/tar) untuk satu kategori di process
+pool terbatas, dengan status job yang bisa dipantau
+"""
+
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import queue
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from modules.data_manager import content_filename, encode_dataset_image, write_file_atomic
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+
+def is_archive(filename: str) -> bool:
+    return filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def iter_archive_images(data: bytes,
+                        filename: str,
+                        max_files: int = 2000,
+                        max_member_size: int = 20 * 1024 * 1024) -> Iterator[Tuple[str, bytes]]:
+    """
+    🗜️ Baca gambar dari arsip zip/tar di memori (tanpa ekstrak ke disk)
+
+    Hanya member berekstensi gambar yang dibaca; file tersembunyi, folder,
+    symlink dan member yang terlalu besar dilewati.
+
+    Yields:
+        Tuple (nama member, bytes)
+    """
+    count = 0
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or not _wanted_member(name) or info.file_size > max_member_size:
+                    continue
+                yield name, archive.read(info)
+                count += 1
+                if count >= max_files:
+                    return
+    else:
+        with tarfile.open(fileobj=io.BytesIO(data), mode='r:*') as archive:
+            for member in archive:
+                if not member.isfile() or not _wanted_member(member.name) or member.size > max_member_size:
+                    continue
+                yield member.name, archive.extractfile(member).read()
+                count += 1
+                if count >= max_files:
+                    return
+
+
+def _wanted_member(name: str) -> bool:
+    base = Path(name).name
+    return (base.lower().endswith(IMAGE_EXTENSIONS) and not base.startswith('.')
+            and '__MACOSX' not in name)
+
+
+def _ingest_worker(data: bytes, label: str, raw_data_dir: str, source_hash: str) -> Dict[str, str]:
+    """
+    ⚙️ Dijalankan di proses pool: decode, thumbnail, encode JPEG, tulis atomik
+
+    Harus fungsi top-level (picklable). Update katalog dilakukan di proses
+    induk karena katalog di memori milik proses tersebut.
+    """
+    filename = content_filename(label, source_hash)
+    encoded = encode_dataset_image(data)
+    written = write_file_atomic(Path(raw_data_dir) / label / filename, encoded)
+    return {
+        "status": "added" if written else "duplicate",
+        "filename": filename,
+        "sha256": hashlib.sha256(encoded).hexdigest()
+    }
+
+
+class BulkIngestor:
+    """
+    Pemroses upload massal untuk DataManager
+
+    🧠 Cara Kerja:
+    1. Job (kategori + list file) masuk antrean terbatas; satu thread
+       dispatcher memproses job satu per satu (FIFO)
+    2. Duplikat persis dicek di proses induk (hash, O(1)) sebelum dikirim
+    3. Decode/resize/encode berjalan di ProcessPoolExecutor (spawn) dengan
+       jumlah worker dan jumlah task in-flight yang dibatasi
+    4. File yang berhasil dicatat ke katalog per batch + listener dipanggil
+    5. Status job (ringkasan + hasil per file) disimpan ke JSON agar bisa
+       dibaca worker gunicorn mana pun
+    """
+
+    def __init__(self,
+                 data_manager,
+                 jobs_dir: str,
+                 max_workers: int = None,
+                 max_queued_jobs: int = 8,
+                 use_processes: bool = True):
+        """
+        Inisialisasi ingestor
+
+        Args:
+            data_manager: Instance DataManager tujuan
+            jobs_dir: Folder file status job (JSON)
+            max_workers: Jumlah proses pool (default: min(4, jumlah CPU))
+            max_queued_jobs: Maksimal job yang menunggu di antrean
+            use_processes: False = proses di thread dispatcher (tanpa pool)
+        """
+        self.data_manager = data_manager
+        self.jobs_dir = Path(jobs_dir)
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.use_processes = use_processes
+
+        self._queue = queue.Queue(maxsize=max_queued_jobs)
+        self._jobs: Dict[str, dict] = {}
+        self._jobs_lock = threading.Lock()
+        self._pool = None
+        self._dispatcher = None
+
+    # ============================================
+    # 📥 SUBMIT & STATUS
+    # ============================================
+
+    def submit(self, label: str, files: List[Tuple[str, bytes]]) -> Optional[str]:
+        """
+        📤 Masukkan job ke antrean (diproses di background)
+
+        Args:
+            label: Kategori sampah
+            files: List (nama file, bytes)
+
+        Returns:
+            job_id, atau None jika antrean penuh
+        """
+        self._prune_jobs()
+        job = self._new_job(label, len(files))
+        try:
+            self._queue.put_nowait((job, files))
+        except queue.Full:
+            with self._jobs_lock:
+                del self._jobs[job["job_id"]]
+            return None
+        self._save_job(job)
+        self._ensure_dispatcher()
+        return job["job_id"]
+
+    def ingest(self, label: str, files: List[Tuple[str, bytes]],
+               progress_callback: Callable[[dict], None] = None) -> dict:
+        """
+        ⏳ Proses job secara sinkron (untuk Streamlit / script)
+
+        Returns:
+            Dict status job final
+        """
+        job = self._new_job(label, len(files))
+        try:
+            self._run_job(job, files, progress_callback)
+        finally:
+            with self._jobs_lock:
+                self._jobs.pop(job["job_id"], None)
+        return self._public(job)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """
+        🔎 Status job: dari memori proses ini, atau dari file JSON (job milik
+        worker lain)
+        """
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return self._public(job)
+        if not job_id or not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(self.jobs_dir / f"{job_id}.json", "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _new_job(self, label: str, total: int) -> dict:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "category": label,
+            "status": "queued",
+            "total": total,
+            "processed": 0,
+            "added": 0,
+            "duplicates": 0,
+            "errors": 0,
+            "results": [],
+            "created": datetime.now().isoformat(),
+            "finished": None
+        }
+        with self._jobs_lock:
+            self._jobs[job["job_id"]] = job
+        return job
+
+    def _public(self, job: dict) -> dict:
+        with self._jobs_lock:
+            return dict(job, results=list(job["results"]))
+
+    def _prune_jobs(self, max_age: float = 24 * 3600):
+        """🧹 Hapus file status job yang lebih tua dari max_age detik"""
+        cutoff = time.time() - max_age
+        for path in self.jobs_dir.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _save_job(self, job: dict):
+        """💾 Tulis status job secara atomik"""
+        snapshot = self._public(job)
+        path = self.jobs_dir / f"{job['job_id']}.json"
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    # ============================================
+    # ⚙️ PEMROSESAN
+    # ============================================
+
+    def _ensure_dispatcher(self):
+        with self._jobs_lock:
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True,
+                                                    name="bulk-ingest-dispatcher")
+                self._dispatcher.start()
+
+    def _dispatch_loop(self):
+        while True:
+            job, files = self._queue.get()
+            try:
+                self._run_job(job, files)
+            except Exception as e:
+                print(f"⚠️  Bulk ingest job {job['job_id']} gagal: {e}")
+                with self._jobs_lock:
+                    job["status"] = "failed"
+                    job["error"] = str(e)
+                self._save_job(job)
+            finally:
+                # Data file tidak disimpan lagi setelah job selesai
+                with self._jobs_lock:
+                    self._jobs.pop(job["job_id"], None)
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: aman dipakai dari proses multi-thread (Flask, TensorFlow)
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _discard_pool(self, pool):
+        """Pool rusak (proses anak mati): dibuat ulang untuk task berikutnya"""
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit_task(self, *args):
+        """
+        Kirim task ke pool; pool yang sudah rusak diganti pool baru sekali
+        sebelum BrokenProcessPool diteruskan
+
+        Returns:
+            Tuple (future, pool yang menjalankannya)
+        """
+        for attempt in range(2):
+            pool = self._get_pool()
+            try:
+                return pool.submit(_ingest_worker, *args), pool
+            except BrokenProcessPool:
+                self._discard_pool(pool)
+                if attempt:
+                    raise
+
+    def _record(self, job: dict, result: dict):
+        with self._jobs_lock:
+            job["results"].append(result)
+            job["processed"] += 1
+            key = {"added": "added", "duplicate": "duplicates"}.get(result["status"], "errors")
+            job[key] += 1
+
+    def _run_job(self, job: dict, files: List[Tuple[str, bytes]],
+                 progress_callback: Callable[[dict], None] = None):
+        label = job["category"]
+        raw_dir = str(self.data_manager.raw_data_dir)
+        with self._jobs_lock:
+            job["status"] = "running"
+
+        # Cek duplikat di proses induk (termasuk duplikat di dalam batch ini)
+        tasks = []
+        seen = {}
+        for name, data in files:
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                self._record(job, {"file": name, "status": "error",
+                                   "message": "Format file tidak didukung"})
+                continue
+            source_hash = hashlib.sha256(data).hexdigest()
+            duplicate = seen.get(source_hash) or self.data_manager.find_duplicate(source_hash)
+            if duplicate is not None:
+                self._record(job, {"file": name, "status": "duplicate",
+                                   "category": duplicate[0], "filename": duplicate[1]})
+                continue
+            seen[source_hash] = (label, content_filename(label, source_hash))
+            tasks.append((name, data, source_hash))
+
+        pending_register = []
+
+        def flush():
+            if pending_register:
+                self.data_manager.register_ingested(label, pending_register)
+                pending_register.clear()
+            self._save_job(job)
+            if progress_callback:
+                progress_callback(self._public(job))
+
+        def handle(name, outcome):
+            if isinstance(outcome, Exception):
+                self._record(job, {"file": name, "status": "error", "message": str(outcome)})
+                return
+            result = dict(outcome, file=name)
+            if result["status"] == "added":
+                pending_register.append((result["filename"], result["sha256"]))
+            else:
+                result["category"] = label
+            result.pop("sha256", None)
+            self._record(job, result)
+
+        try:
+            if self.use_processes and tasks:
+                max_in_flight = self.max_workers * 2
+                in_flight = {}
+                task_iter = iter(tasks)
+                exhausted = False
+                while in_flight or not exhausted:
+                    while not exhausted and len(in_flight) < max_in_flight:
+                        task = next(task_iter, None)
+                        if task is None:
+                            exhausted = True
+                            break
+                        name, data, source_hash = task
+                        try:
+                            future, pool = self._submit_task(data, label, raw_dir, source_hash)
+                        except BrokenProcessPool as e:
+                            handle(name, e)
+                            continue
+                        in_flight[future] = (name, pool)
+                    if not in_flight:
+                        break
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, pool = in_flight.pop(future)
+                        try:
+                            handle(name, future.result())
+                        except BrokenProcessPool as e:
+                            self._discard_pool(pool)
+                            handle(name, e)
+                        except Exception as e:
+                            handle(name, e)
+                    if len(pending_register) >= 32:
+                        flush()
+            else:
+                for i, (name, data, source_hash) in enumerate(tasks, 1):
+                    try:
+                        handle(name, _ingest_worker(data, label, raw_dir, source_hash))
+                    except Exception as e:
+                        handle(name, e)
+                    if i % 32 == 0:
+                        flush()
+
+            with self._jobs_lock:
+                job["status"] = "completed"
+                job["finished"] = datetime.now().isoformat()
+        finally:
+            # File yang sudah ditulis selalu dicatat ke katalog, walau job gagal
+            flush()
+
+    def shutdown(self):
+        """⏹️ Matikan process pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,269 @@
+"""
+💾 MODUL CHECKPOINTING - TRAINING YANG BISA DILANJUTKAN
+Menyimpan state training (bobot, optimizer, epoch, state callback, RNG)
+secara periodik ke folder run, supaya run yang terputus (worker gunicorn
+di-recycle, mesin preemptible dimatikan) bisa dilanjutkan dari epoch
+terakhir yang tersimpan
+
+Penulisan ke disk berjalan di thread terpisah, jadi epoch berikutnya tidak
+menunggu disk.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: status run hanya dari run.json
+    fcntl = None
+
+RUN_FILE = "run.json"
+CHECKPOINT_FILE = "checkpoint.npz"
+LOCK_FILE = "run.lock"
+
+
+class CheckpointStore:
+    """
+    Folder satu run training: run.json (parameter + status) dan
+    checkpoint.npz (state training terakhir)
+
+    🧠 Cara Kerja:
+    1. save_async() hanya menyimpan snapshot (array numpy yang sudah
+       di-copy) ke slot pending lalu kembali; satu thread writer menulis
+       ke file sementara + fsync + os.replace, jadi checkpoint di disk
+       selalu utuh
+    2. Jika writer masih sibuk saat snapshot baru datang, snapshot pending
+       yang lama diganti (yang ditulis selalu yang terbaru)
+    3. Proses yang sedang menjalankan run memegang flock di run.lock;
+       lock otomatis lepas saat proses mati, jadi run "running" tanpa
+       pemegang lock = run yang terputus dan bisa dilanjutkan
+    """
+
+    def __init__(self, run_dir: str):
+        """
+        Inisialisasi store
+
+        Args:
+            run_dir: Folder run (dibuat jika belum ada)
+        """
+        self.run_dir = Path(run_dir)
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.run_path = self.run_dir / RUN_FILE
+        self.checkpoint_path = self.run_dir / CHECKPOINT_FILE
+        self.last_error: Optional[Exception] = None
+
+        self._cond = threading.Condition()
+        self._run_lock = threading.Lock()
+        self._pending = None
+        self._writer = None
+        self._lock_file = None
+
+    @property
+    def run_id(self) -> str:
+        return self.run_dir.name
+
+    # ============================================
+    # 📋 METADATA RUN
+    # ============================================
+
+    def read_run(self) -> Dict:
+        """📋 Isi run.json ({} jika belum ada)"""
+        try:
+            with open(self.run_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def write_run(self, **fields) -> Dict:
+        """📝 Update run.json (merge dengan isi lama, tulis atomik)"""
+        with self._run_lock:
+            run = self.read_run()
+            run.update(fields)
+            run["updated_at"] = datetime.now().isoformat()
+            tmp_path = self.run_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(run, f, indent=2)
+            os.replace(tmp_path, self.run_path)
+        return run
+
+    # ============================================
+    # 🔒 LOCK PROSES
+    # ============================================
+
+    def acquire(self) -> bool:
+        """
+        🔒 Tandai run sedang dijalankan proses ini
+
+        Returns:
+            bool: False jika run sedang dijalankan proses lain
+        """
+        if fcntl is None or self._lock_file is not None:
+            return True
+        lock_file = open(self.run_dir / LOCK_FILE, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def release(self):
+        """🔓 Lepas lock run"""
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def is_active(self) -> bool:
+        """🏃 True jika run sedang dijalankan (di proses ini atau proses lain)"""
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            return self.read_run().get("status") == "running"
+        lock_path = self.run_dir / LOCK_FILE
+        if not lock_path.exists():
+            return False
+        with open(lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return False
+
+    # ============================================
+    # 💾 CHECKPOINT
+    # ============================================
+
+    def has_checkpoint(self) -> bool:
+        return self.checkpoint_path.exists()
+
+    def save_async(self, arrays: Dict[str, List[np.ndarray]], state: Dict):
+        """
+        💾 Jadwalkan penulisan checkpoint di thread writer
+
+        Args:
+            arrays: Dict grup -> list array (mis. "weights", "optimizer");
+                array harus sudah berupa copy, tidak diubah lagi oleh pemanggil
+            state: State JSON-serializable (epoch, callback, RNG, history)
+        """
+        with self._cond:
+            self._pending = (arrays, state)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                if self._pending is None:
+                    self._writer = None
+                    self._cond.notify_all()
+                    return
+                arrays, state = self._pending
+                self._pending = None
+            try:
+                self._write(arrays, state)
+            except Exception as e:
+                self.last_error = e
+                print(f"⚠️  Gagal menulis checkpoint {self.checkpoint_path}: {e}")
+
+    def _write(self, arrays: Dict[str, List[np.ndarray]], state: Dict):
+        payload = {
+            f"{group}/{i:05d}": np.asarray(array)
+            for group, items in arrays.items() for i, array in enumerate(items)
+        }
+        payload["state"] = np.array(json.dumps(state))
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        # Jumlah epoch yang sudah selesai menurut checkpoint di disk
+        self.write_run(checkpoint_epoch=state["epoch"] + 1)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        ⏳ Tunggu sampai semua checkpoint yang dijadwalkan selesai ditulis
+
+        Returns:
+            bool: True jika selesai sebelum timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._writer is None, timeout)
+
+    def load(self) -> Optional[Tuple[Dict[str, List[np.ndarray]], Dict]]:
+        """
+        📂 Baca checkpoint terakhir
+
+        Returns:
+            (arrays per grup, state) atau None jika belum ada checkpoint
+        """
+        if not self.has_checkpoint():
+            return None
+        arrays: Dict[str, List[np.ndarray]] = {}
+        with np.load(self.checkpoint_path, allow_pickle=False) as data:
+            state = json.loads(str(data["state"]))
+            for key in sorted(data.files):
+                if key != "state":
+                    group = key.rsplit("/", 1)[0]
+                    arrays.setdefault(group, []).append(data[key])
+        return arrays, state
+
+    def discard_checkpoint(self):
+        """🧹 Hapus checkpoint (run selesai, tidak perlu dilanjutkan lagi)"""
+        self.flush()
+        self.checkpoint_path.unlink(missing_ok=True)
+
+
+def list_runs(checkpoint_root: str) -> List[Dict]:
+    """
+    📋 Semua run di folder checkpoint, terbaru dulu
+
+    Returns:
+        List isi run.json + run_id, active (sedang berjalan) dan resumable
+        (terputus dan punya checkpoint)
+    """
+    root = Path(checkpoint_root)
+    if not root.exists():
+        return []
+    runs = []
+    for run_dir in root.iterdir():
+        if not (run_dir / RUN_FILE).exists():
+            continue
+        store = CheckpointStore(str(run_dir))
+        run = store.read_run()
+        active = store.is_active()
+        run.update({
+            "run_id": store.run_id,
+            "active": active,
+            "resumable": (not active and store.has_checkpoint()
+                          and run.get("status") not in ("completed", "cancelled"))
+        })
+        runs.append(run)
+    runs.sort(key=lambda run: run.get("started_at", ""), reverse=True)
+    return runs
+
+
+def find_resumable(checkpoint_root: str, run_id: str = None) -> Optional[Dict]:
+    """
+    🔎 Run terputus yang bisa dilanjutkan
+
+    Args:
+        checkpoint_root: Folder berisi folder-folder run
+        run_id: Run tertentu (default: run resumable terbaru)
+
+    Returns:
+        Dict run (lihat list_runs) atau None
+    """
+    for run in list_runs(checkpoint_root):
+        if run["resumable"] and (run_id is None or run["run_id"] == run_id):
+            return run
+    return None
@@ -6,8 +6,10 @@ Modul ini mengintegrasikan kode klasifikasi existing dengan improvement
 import numpy as np
 from PIL import Image, ImageOps
 import os
+import time
+from contextlib import contextmanager, nullcontext
 from pathlib import Path
-from typing import Tuple, Dict
+from typing import Tuple, Dict, List
 
 # Lazy import TensorFlow to avoid slow startup
 _tf = None
@@ -27,6 +29,84 @@ def _get_keras():
         _keras = tf.keras
     return _keras
 
+class StageTimer:
+    """
+    ⏱️ Pencatat durasi per tahap (dalam milidetik)
+    
+    Dipakai bersama oleh WasteClassifier (decode, resize, normalize,
+    inference) dan route Flask (parse, save, recommend, encode) untuk
+    header Server-Timing. StageTimer(enabled=False) tidak mencatat apa pun.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.stages: List[Tuple[str, float]] = []
+    
+    def stage(self, name: str):
+        """
+        Context manager untuk mengukur satu tahap
+        
+        Contoh:
+            with timer.stage("decode"):
+                image = Image.open(path).convert("RGB")
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(name)
+    
+    @contextmanager
+    def _measure(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, (time.perf_counter() - start) * 1000))
+    
+    def as_dict(self) -> Dict[str, float]:
+        """📋 Durasi per tahap dalam ms (tahap berulang dijumlahkan)"""
+        durations = {}
+        for name, duration in self.stages:
+            durations[name] = durations.get(name, 0.0) + duration
+        return durations
+    
+    def server_timing_header(self) -> str:
+        """📝 Nilai header Server-Timing, mis. decode;dur=3.21, inference;dur=40.50"""
+        return ", ".join(f"{name};dur={duration:.2f}" for name, duration in self.as_dict().items())
+
+_NO_TIMER = StageTimer(enabled=False)
+
+def feature_extractor(model):
+    """
+    🧬 Sub-model yang mengeluarkan fitur dari layer sebelum output
+
+    - Model hasil transfer learning (ModelTrainer.train_transfer): sub-model
+      bernama "backbone", jadi fitur tetap sama walau head dilatih ulang
+    - Arsitektur create_model: layer Dense(128)
+    - Model tanpa Dense tersembunyi di level atas (mis. model Teachable
+      Machine yang berisi sub-model): output layer kedua dari belakang
+
+    Args:
+        model: keras.Model klasifikasi
+
+    Returns:
+        keras.Model dengan input gambar dan output vektor fitur
+    """
+    keras = _get_keras()
+    layer_names = [layer.name for layer in model.layers]
+    if "backbone" in layer_names:
+        return model.get_layer("backbone")
+
+    hidden_layers = model.layers[:-1]
+    embedding_layer = None
+    for layer in reversed(hidden_layers):
+        if isinstance(layer, keras.layers.Dense):
+            embedding_layer = layer
+            break
+    if embedding_layer is None:
+        embedding_layer = hidden_layers[-1]
+
+    return keras.Model(inputs=model.inputs, outputs=embedding_layer.output)
+
 class WasteClassifier:
     """
     Kelas untuk klasifikasi gambar sampah menggunakan model deep learning
@@ -49,6 +129,8 @@ class WasteClassifier:
         self.labels_path = labels_path
         self.model = None
         self.class_names = []
+        self._embedding_model = None
+        self._dual_model = None
         
         # Disable scientific notation untuk clarity
         np.set_printoptions(suppress=True)
@@ -66,6 +148,8 @@ class WasteClassifier:
             if os.path.exists(self.model_path):
                 keras = _get_keras()
                 self.model = keras.models.load_model(self.model_path, compile=False)
+                self._embedding_model = None
+                self._dual_model = None
                 print(f"✅ Model berhasil dimuat dari {self.model_path}")
             else:
                 raise FileNotFoundError(f"Model tidak ditemukan di {self.model_path}")
@@ -82,7 +166,7 @@ class WasteClassifier:
             print(f"❌ Error loading model/labels: {e}")
             raise
     
-    def preprocess_image(self, image_path: str) -> np.ndarray:
+    def preprocess_image(self, image_path: str, timer: StageTimer = None) -> np.ndarray:
         """
         📸 Preprocess gambar untuk input model
         
@@ -93,28 +177,33 @@ class WasteClassifier:
         
         Args:
             image_path: Path ke file gambar
+            timer: StageTimer opsional untuk mencatat durasi per tahap
             
         Returns:
             np.ndarray: Array gambar yang sudah dipreprocess
         """
+        timer = timer or _NO_TIMER
         try:
             # Load dan convert gambar ke RGB
-            image = Image.open(image_path).convert("RGB")
+            with timer.stage("decode"):
+                image = Image.open(image_path).convert("RGB")
             
             # Resize gambar ke 224x224 dengan cropping dari center
-            size = (224, 224)
-            image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
-            
-            # Convert ke numpy array
-            image_array = np.asarray(image)
+            with timer.stage("resize"):
+                size = (224, 224)
+                image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
             
-            # Normalisasi: ubah range [0, 255] ke [-1, 1]
-            # Formula: (pixel / 127.5) - 1
-            normalized_image_array = (image_array.astype(np.float32) / 127.5) - 1
-            
-            # Reshape untuk batch: (1, 224, 224, 3)
-            data = np.ndarray(shape=(1, 224, 224, 3), dtype=np.float32)
-            data[0] = normalized_image_array
+            with timer.stage("normalize"):
+                # Convert ke numpy array
+                image_array = np.asarray(image)
+                
+                # Normalisasi: ubah range [0, 255] ke [-1, 1]
+                # Formula: (pixel / 127.5) - 1
+                normalized_image_array = (image_array.astype(np.float32) / 127.5) - 1
+                
+                # Reshape untuk batch: (1, 224, 224, 3)
+                data = np.ndarray(shape=(1, 224, 224, 3), dtype=np.float32)
+                data[0] = normalized_image_array
             
             return data
             
@@ -122,12 +211,13 @@ class WasteClassifier:
             print(f"❌ Error preprocessing image: {e}")
             raise
     
-    def predict(self, image_path: str) -> Dict[str, any]:
+    def predict(self, image_path: str, timer: StageTimer = None) -> Dict[str, any]:
         """
         🎯 Prediksi kelas sampah dari gambar
         
         Args:
             image_path: Path ke file gambar yang akan diprediksi
+            timer: StageTimer opsional untuk mencatat durasi per tahap
             
         Returns:
             Dict dengan keys:
@@ -137,39 +227,16 @@ class WasteClassifier:
                 - class_index: Index kelas (int)
                 - all_predictions: Semua prediksi untuk visualisasi (dict)
         """
+        timer = timer or _NO_TIMER
         try:
             # Preprocess gambar
-            processed_image = self.preprocess_image(image_path)
+            processed_image = self.preprocess_image(image_path, timer)
             
             # Prediksi menggunakan model
-            prediction = self.model.predict(processed_image, verbose=0)
+            with timer.stage("inference"):
+                prediction = self.model.predict(processed_image, verbose=0)
             
-            # Ambil kelas dengan confidence tertinggi
-            class_index = np.argmax(prediction)
-            confidence_score = float(prediction[0][class_index])
-            
-            # Parse nama kelas (format: "0 Cardboard\n")
-            class_name = self.class_names[class_index].strip()
-            # Ambil nama kelas saja (skip index di awal)
-            if " " in class_name:
-                class_name = class_name.split(" ", 1)[1]
-            
-            # Buat dictionary untuk semua prediksi (untuk visualisasi)
-            all_predictions = {}
-            for idx, score in enumerate(prediction[0]):
-                label = self.class_names[idx].strip()
-                if " " in label:
-                    label = label.split(" ", 1)[1]
-                all_predictions[label] = float(score)
-            
-            # Return hasil prediksi
-            result = {
-                "class_name": class_name,
-                "confidence": confidence_score,
-                "confidence_percent": confidence_score * 100,
-                "class_index": int(class_index),
-                "all_predictions": all_predictions
-            }
+            result = self.format_prediction(prediction[0])
             
             return result
             
@@ -177,6 +244,59 @@ class WasteClassifier:
             print(f"❌ Error during prediction: {e}")
             raise
     
+    def format_prediction(self, probabilities: np.ndarray) -> Dict[str, any]:
+        """
+        📋 Probabilitas per kelas menjadi dict hasil prediksi
+        (format sama dengan predict)
+        """
+        names = self.label_names
+        
+        # Ambil kelas dengan confidence tertinggi
+        class_index = np.argmax(probabilities)
+        confidence_score = float(probabilities[class_index])
+        
+        # Buat dictionary untuk semua prediksi (untuk visualisasi)
+        all_predictions = {}
+        for idx, score in enumerate(probabilities):
+            all_predictions[names[idx]] = float(score)
+        
+        return {
+            "class_name": names[class_index],
+            "confidence": confidence_score,
+            "confidence_percent": confidence_score * 100,
+            "class_index": int(class_index),
+            "all_predictions": all_predictions
+        }
+    
+    @property
+    def label_names(self) -> List[str]:
+        """🏷️ Nama kelas tanpa index (format labels.txt: "0 Cardboard")"""
+        names = []
+        for label in self.class_names:
+            label = label.strip()
+            if " " in label:
+                label = label.split(" ", 1)[1]
+            names.append(label)
+        return names
+    
+    def predict_with_embedding(self, image_path: str, timer: StageTimer = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        🧬 Softmax CNN dan embedding dari satu forward pass (untuk k-NN)
+        
+        Args:
+            image_path: Path ke file gambar
+            timer: StageTimer opsional untuk mencatat durasi per tahap
+            
+        Returns:
+            Tuple (probabilitas float32 per kelas, embedding float32)
+        """
+        timer = timer or _NO_TIMER
+        processed_image = self.preprocess_image(image_path, timer)
+        with timer.stage("inference"):
+            embedding, prediction = self.get_dual_model().predict_on_batch(processed_image)
+        return (np.asarray(prediction, dtype=np.float32)[0],
+                np.asarray(embedding, dtype=np.float32).reshape(-1))
+    
     def predict_from_pil_image(self, pil_image: Image.Image) -> Dict[str, any]:
         """
         🖼️ Prediksi dari PIL Image object (untuk Streamlit upload)
@@ -229,6 +349,129 @@ class WasteClassifier:
             print(f"❌ Error during prediction: {e}")
             raise
     
+    def predict_batch(self, images: np.ndarray) -> np.ndarray:
+        """
+        📦 Prediksi batch dari tensor uint8 yang sudah di-resize klien
+
+        Tidak ada decode, resize, maupun temp file: tensor langsung
+        dinormalisasi ke [-1, 1] lalu masuk ke model.
+
+        Args:
+            images: Array uint8 dengan shape (N, 224, 224, 3)
+
+        Returns:
+            np.ndarray: Probabilitas float32 dengan shape (N, jumlah_kelas)
+        """
+        data = self._normalize_batch(images)
+
+        # predict_on_batch menghindari overhead pembuatan dataset di model.predict
+        prediction = self.model.predict_on_batch(data)
+        return np.asarray(prediction, dtype=np.float32)
+
+    def _normalize_batch(self, images: np.ndarray) -> np.ndarray:
+        """
+        🔢 Validasi shape dan normalisasi batch uint8 ke float32 [-1, 1]
+        """
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        if images.shape[1:] != (224, 224, 3):
+            raise ValueError(f"Shape tensor harus (N, 224, 224, 3), bukan {images.shape}")
+
+        # Normalisasi: ubah range [0, 255] ke [-1, 1] dalam satu operasi vektor
+        data = images.astype(np.float32)
+        data /= 127.5
+        data -= 1
+        return data
+
+    def get_embedding_model(self):
+        """
+        🧬 Model yang mengeluarkan embedding dari layer sebelum output
+
+        Lihat feature_extractor: Dense(128) untuk create_model, sub-model
+        backbone untuk model transfer learning.
+
+        Returns:
+            keras.Model dengan input yang sama dan output embedding
+        """
+        if self._embedding_model is None:
+            self._embedding_model = feature_extractor(self.model)
+        return self._embedding_model
+
+    def get_dual_model(self):
+        """
+        🔀 Model dengan dua output: (embedding, softmax) dalam satu forward pass
+        """
+        if self._dual_model is None:
+            keras = _get_keras()
+            features = self.get_embedding_model()
+            if features in self.model.layers:
+                # Sub-model backbone: ambil output pemanggilannya di graph model luar
+                embedding = features.get_output_at(-1)
+            else:
+                embedding = features.output
+            self._dual_model = keras.Model(inputs=self.model.inputs, outputs=[embedding, self.model.output])
+        return self._dual_model
+
+    @property
+    def embedding_dim(self) -> int:
+        """📏 Dimensi vektor embedding"""
+        return int(self.get_embedding_model().output_shape[-1])
+
+    def extract_embeddings(self, images: np.ndarray) -> np.ndarray:
+        """
+        🧬 Ekstrak embedding dari batch tensor uint8
+
+        Args:
+            images: Array uint8 dengan shape (N, 224, 224, 3)
+
+        Returns:
+            np.ndarray float32 dengan shape (N, embedding_dim)
+        """
+        data = self._normalize_batch(images)
+        embeddings = self.get_embedding_model().predict_on_batch(data)
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(data), -1)
+
+    def extract_embeddings_from_files(self, image_paths, batch_size: int = 32) -> np.ndarray:
+        """
+        📂 Ekstrak embedding dari daftar file gambar (per batch)
+
+        Preprocessing sama dengan predict (center crop 224x224 LANCZOS).
+
+        Args:
+            image_paths: List path file gambar
+            batch_size: Jumlah gambar per forward pass
+
+        Returns:
+            np.ndarray float32 dengan shape (N, embedding_dim)
+        """
+        chunks = []
+        for start in range(0, len(image_paths), batch_size):
+            batch = np.stack([
+                self.load_image_tensor(path)
+                for path in image_paths[start:start + batch_size]
+            ])
+            chunks.append(self.extract_embeddings(batch))
+        if not chunks:
+            return np.zeros((0, self.embedding_dim), dtype=np.float32)
+        return np.concatenate(chunks)
+
+    def extract_embedding(self, image_path: str) -> np.ndarray:
+        """
+        🧬 Ekstrak embedding dari satu file gambar
+
+        Returns:
+            np.ndarray float32 dengan shape (embedding_dim,)
+        """
+        return self.extract_embeddings(self.load_image_tensor(image_path))[0]
+
+    def load_image_tensor(self, image_path: str) -> np.ndarray:
+        """
+        📸 Load gambar sebagai tensor uint8 224x224x3 (tanpa normalisasi)
+        """
+        image = Image.open(image_path).convert("RGB")
+        image = ImageOps.fit(image, (224, 224), Image.Resampling.LANCZOS)
+        return np.asarray(image, dtype=np.uint8)
+
     def get_confidence_level(self, confidence: float) -> str:
         """
         📊 Kategorisasi tingkat confidence
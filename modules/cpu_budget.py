@@ -0,0 +1,219 @@
+"""
+🧮 MODUL CPU BUDGET - ISOLASI CPU ANTARA TRAINING DAN INFERENCE
+Training TensorFlow default memakai semua core, sehingga latency
+/api/predict di host yang sama melonjak selama training berjalan. Modul ini
+membatasi proses training:
+
+1. Budget statis: CPU affinity ke core non-cadangan, nice, dan batas thread
+   intra/inter-op TensorFlow (diatur di proses training sebelum TF aktif)
+2. Throttle dinamis: worker web mencatat latency predict ke file kecil per
+   proses; training membacanya dan menambah jeda antar batch selama p95
+   predict melewati ambang
+"""
+
+import json
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_NICE = 10
+LATENCY_FILE_PREFIX = "predict_"
+
+
+def available_cores() -> List[int]:
+    """🖥️ Core yang boleh dipakai proses ini"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def split_cores(reserved_for_inference: int, cores: List[int] = None) -> Tuple[List[int], List[int]]:
+    """
+    ✂️ Bagi core antara inference dan training
+
+    Args:
+        reserved_for_inference: Jumlah core yang tidak boleh dipakai training
+        cores: Core yang tersedia (default: affinity proses ini)
+
+    Returns:
+        (core cadangan inference, core training); training selalu dapat
+        minimal satu core, jadi di mesin 1 core tidak ada core cadangan
+    """
+    cores = sorted(cores if cores is not None else available_cores())
+    reserved = min(max(reserved_for_inference, 0), len(cores) - 1)
+    return cores[:reserved], cores[reserved:]
+
+
+def apply_training_budget(reserved_for_inference: int = 1, threads: int = 0,
+                          niceness: int = DEFAULT_NICE) -> Dict:
+    """
+    🧮 Terapkan budget CPU ke proses training ini
+
+    Harus dipanggil sebelum TensorFlow menjalankan operasi pertama (batas
+    thread tidak bisa diubah setelah runtime TF aktif).
+
+    Args:
+        reserved_for_inference: Core yang disisakan untuk worker web
+        threads: Batas thread intra-op TF (0 = jumlah core training)
+        niceness: Penambahan nilai nice proses (0 = tidak diubah)
+
+    Returns:
+        Dict budget yang benar-benar diterapkan
+    """
+    reserved, training_cores = split_cores(reserved_for_inference)
+    if reserved and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, training_cores)
+
+    if niceness and hasattr(os, "nice"):
+        try:
+            os.nice(niceness)
+        except OSError:
+            niceness = 0
+
+    intra_op = threads if threads > 0 else len(training_cores)
+    inter_op = min(2, intra_op)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+    return {
+        "training_cores": training_cores,
+        "reserved_cores": reserved,
+        "intra_op_threads": intra_op,
+        "inter_op_threads": inter_op,
+        "nice": os.nice(0) if hasattr(os, "nice") else None
+    }
+
+
+class LatencyMonitor:
+    """
+    ⏱️ Latency predict terbaru satu worker web, dipublikasikan ke file
+
+    🧠 Cara Kerja:
+    1. observe() menyimpan (waktu, durasi) ke ring buffer
+    2. Paling sering sekali per publish_interval, p95 sampel dalam jendela
+       waktu terakhir ditulis atomik ke <directory>/predict_<pid>.json
+    3. Pembaca (throttle training) mengambil p95 terbesar dari file yang
+       masih segar; file worker yang tidak lagi menerima traffic otomatis
+       kedaluwarsa
+    """
+
+    def __init__(self, directory: str, window_seconds: float = 30.0,
+                 max_samples: int = 512, publish_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{LATENCY_FILE_PREFIX}{os.getpid()}.json"
+        self.window_seconds = window_seconds
+        self.publish_interval = publish_interval
+        self._samples = deque(maxlen=max_samples)
+        self._last_publish = 0.0
+
+    def observe(self, seconds: float):
+        now = time.time()
+        self._samples.append((now, seconds))
+        if now - self._last_publish >= self.publish_interval:
+            self._last_publish = now
+            self._publish(now)
+
+    def p95_ms(self, now: float = None) -> Optional[float]:
+        """📊 p95 latency (ms) sampel dalam jendela waktu, None jika kosong"""
+        now = now or time.time()
+        recent = sorted(d for t, d in list(self._samples) if now - t <= self.window_seconds)
+        if not recent:
+            return None
+        return recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000
+
+    def _publish(self, now: float):
+        p95 = self.p95_ms(now)
+        if p95 is None:
+            return
+        tmp_path = self.path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"pid": os.getpid(), "p95_ms": p95, "updated_at": now}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Throttle hanya optimasi: gagal tulis tidak boleh ganggu predict
+
+
+def read_predict_p95(directory: str, max_age: float = 30.0) -> Optional[float]:
+    """
+    📖 p95 latency predict terburuk (ms) dari semua worker web yang masih
+    menerima traffic; None jika tidak ada data segar
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return None
+    now = time.time()
+    worst = None
+    for path in directory.glob(f"{LATENCY_FILE_PREFIX}*.json"):
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - data.get("updated_at", 0) <= max_age:
+            worst = data["p95_ms"] if worst is None else max(worst, data["p95_ms"])
+    return worst
+
+
+class TrainingThrottle:
+    """
+    🐢 Duty cycle training yang mengalah ke inference
+
+    🧠 Cara Kerja:
+    1. Setiap check_interval detik, p95 predict dibaca dari LatencyMonitor
+       semua worker web
+    2. p95 di atas ambang -> duty cycle dipotong setengah (minimal
+       min_duty, training tidak pernah berhenti total); di bawah ambang ->
+       naik bertahap +0.1 sampai 1.0 (tanpa jeda)
+    3. Setelah setiap batch berdurasi d, training tidur d * (1 - duty) / duty
+    """
+
+    def __init__(self, latency_dir: str, threshold_ms: float, check_interval: float = 1.0,
+                 min_duty: float = 0.1, max_age: float = 10.0):
+        self.latency_dir = latency_dir
+        self.threshold_ms = threshold_ms
+        self.check_interval = check_interval
+        self.min_duty = min_duty
+        self.max_age = max_age
+        self.duty = 1.0
+        self.paused_seconds = 0.0
+        self.throttled_checks = 0
+        self.last_p95_ms = None
+        self._last_check = 0.0
+
+    def after_batch(self, batch_seconds: float):
+        """😴 Panggil setelah tiap batch training; tidur sesuai duty cycle"""
+        now = time.monotonic()
+        if now - self._last_check >= self.check_interval:
+            self._last_check = now
+            self._update_duty()
+        if self.duty < 1.0:
+            pause = batch_seconds * (1 - self.duty) / self.duty
+            time.sleep(pause)
+            self.paused_seconds += pause
+
+    def _update_duty(self):
+        previous = self.duty
+        self.last_p95_ms = read_predict_p95(self.latency_dir, self.max_age)
+        if self.last_p95_ms is not None and self.last_p95_ms > self.threshold_ms:
+            self.duty = max(self.min_duty, self.duty / 2)
+            self.throttled_checks += 1
+        else:
+            self.duty = min(1.0, round(self.duty + 0.1, 2))
+        if previous == 1.0 and self.duty < 1.0:
+            print(f"🐢 Training diperlambat: p95 predict {self.last_p95_ms:.0f} ms "
+                  f"> {self.threshold_ms:.0f} ms")
+        elif previous < 1.0 and self.duty == 1.0:
+            print("🐇 Latency predict normal, training kembali penuh")
+
+    def stats(self) -> Dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "duty": self.duty,
+            "paused_seconds": round(self.paused_seconds, 3),
+            "throttled_checks": self.throttled_checks
+        }
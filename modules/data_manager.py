@@ -3,14 +3,100 @@
 Modul untuk upload dan organize dataset gambar sampah
 """
 
+import hashlib
+import io
 import os
 import shutil
+import uuid
 from pathlib import Path
 from PIL import Image
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List
 import json
 
+from modules.dataset_catalog import DatasetCatalog
+from modules.near_duplicates import DEFAULT_THRESHOLD, NearDuplicateIndex
+
+
+def read_upload_bytes(image_file) -> bytes:
+    """📥 Ambil bytes dari file upload (Streamlit/Flask), file object, atau path"""
+    if isinstance(image_file, (str, Path)):
+        return Path(image_file).read_bytes()
+    if hasattr(image_file, "seek"):
+        image_file.seek(0)
+    return image_file.read()
+
+
+def content_filename(label: str, source_hash: str) -> str:
+    """🏷️ Nama file berbasis hash isi upload: {label}_{16 hex pertama}.jpg"""
+    return f"{label}_{source_hash[:16]}.jpg"
+
+
+def encode_dataset_image(data: bytes, max_size=(800, 800), quality: int = 95) -> bytes:
+    """
+    🖼️ Normalisasi gambar untuk dataset: RGB, maksimal 800x800, JPEG
+    (deterministik: input yang sama selalu menghasilkan bytes yang sama)
+    """
+    image = Image.open(io.BytesIO(data))
+    
+    # Convert ke RGB jika perlu (untuk PNG dengan alpha channel)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Resize untuk efisiensi storage
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def write_file_atomic(destination: Path, data: bytes) -> bool:
+    """
+    💾 Tulis file secara atomik tanpa menimpa file yang sudah ada
+    
+    Data ditulis ke temp file tersembunyi di folder yang sama lalu di-link
+    ke nama tujuan; link gagal jika tujuan sudah ada, sehingga dua proses
+    yang menulis nama sama tidak saling menimpa dan pembaca tidak pernah
+    melihat file setengah jadi.
+    
+    Returns:
+        bool: False jika file tujuan sudah ada
+    """
+    destination = Path(destination)
+    tmp_path = destination.with_name(f".{destination.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    try:
+        os.link(tmp_path, destination)
+        return True
+    except FileExistsError:
+        return False
+    except OSError:
+        # Filesystem tanpa hardlink: rename (atomik, tapi cek-lalu-tulis)
+        if destination.exists():
+            return False
+        os.replace(tmp_path, destination)
+        return True
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def assign_split(sha256: str, train_ratio: float = 0.7, test_ratio: float = 0.15) -> str:
+    """
+    🎲 Split deterministik dari hash isi file
+    
+    8 hex pertama hash dipetakan ke [0, 1); hasilnya stabil untuk file yang
+    sama dan tidak berubah saat dataset bertambah.
+    """
+    position = int(sha256[:8], 16) / 2 ** 32
+    if position < train_ratio:
+        return "train"
+    if position < train_ratio + test_ratio:
+        return "test"
+    return "validation"
+
 class DataManager:
     """
     Kelas untuk manajemen dataset:
@@ -20,19 +106,86 @@ class DataManager:
     - Get statistik dataset
     """
     
-    def __init__(self, raw_data_dir: str, processed_data_dir: str):
+    def __init__(self, raw_data_dir: str, processed_data_dir: str, catalog_path: str = None):
         """
         Inisialisasi Data Manager
         
         Args:
             raw_data_dir: Path ke folder dataset/raw
             processed_data_dir: Path ke folder dataset/processed
+            catalog_path: Path SQLite katalog dataset
+                (default: catalog.db di sebelah folder raw)
         """
         self.raw_data_dir = Path(raw_data_dir)
         self.processed_data_dir = Path(processed_data_dir)
         
+        # Callback yang dipanggil saat dataset berubah (add/delete)
+        self._listeners = []
+        
         # Pastikan folder exist
         self._ensure_directories()
+        
+        # Katalog dataset: statistik tanpa scan folder, disamakan saat startup
+        if catalog_path is None:
+            catalog_path = self.raw_data_dir.parent / "catalog.db"
+        self.catalog = DatasetCatalog(catalog_path, self.raw_data_dir, self.processed_data_dir)
+        self.refresh_catalog()
+        
+        # Index perceptual hash (dibuat saat pertama dipakai)
+        self._near_duplicates = None
+    
+    def refresh_catalog(self) -> Dict[str, int]:
+        """
+        🔄 Samakan katalog dengan isi folder (untuk perubahan di luar
+        add_image/delete_image, mis. file disalin manual)
+        """
+        changes = self.catalog.reconcile()
+        if any(changes.values()):
+            print(f"🗂️ Katalog dataset disinkronkan: {changes}")
+        return changes
+    
+    def apply_external_changes(self, entries: List[tuple] = (), categories: List[str] = ()) -> Dict[str, list]:
+        """
+        👀 Terapkan perubahan file yang terjadi di luar add_image/delete_image
+        (dipanggil DatasetWatcher dengan batch event yang sudah digabung)
+        
+        Args:
+            entries: List (kategori, nama file) yang berubah
+            categories: Kategori yang foldernya perlu di-scan ulang
+            
+        Returns:
+            Dict list (kategori, nama file) yang "added", "updated", "removed"
+        """
+        changes = self.catalog.sync_entries(entries)
+        for category in categories:
+            for kind, items in self.catalog.sync_category(category).items():
+                changes[kind].extend(items)
+        
+        for category, filename in changes["added"] + changes["updated"]:
+            self._notify("added", category, self.raw_data_dir / category / filename)
+        for category, filename in changes["removed"]:
+            self._notify("deleted", category, self.raw_data_dir / category / filename)
+        return changes
+    
+    def add_listener(self, callback: Callable[[str, str, Path], None]):
+        """
+        🔔 Daftarkan callback perubahan dataset
+        
+        Callback dipanggil dengan (event, category, path) di mana event
+        adalah "added" atau "deleted". Dipakai untuk update index secara
+        incremental tanpa scan ulang seluruh dataset.
+        """
+        self._listeners.append(callback)
+    
+    def _notify(self, event: str, category: str, path: Path):
+        """
+        📣 Panggil semua listener, error listener tidak menggagalkan operasi
+        """
+        for callback in list(self._listeners):
+            try:
+                callback(event, category, path)
+            except Exception as e:
+                print(f"⚠️  Listener dataset error: {e}")
     
     def _ensure_directories(self):
         """
@@ -54,10 +207,15 @@ class DataManager:
         """
         📸 Tambahkan gambar baru ke dataset
         
+        Nama file diturunkan dari hash isi upload ({label}_{hash16}.jpg),
+        sehingga upload ulang gambar yang sama langsung dikenali sebagai
+        duplikat tanpa decode. File ditulis atomik (temp file lalu link),
+        aman untuk upload bersamaan dari beberapa worker.
+        
         Args:
-            image_file: File gambar (dari Streamlit uploader)
+            image_file: File gambar (dari Streamlit uploader / Flask) atau path
             label: Label kategori (cardboard/glass/metal/paper/plastic)
-            filename: Nama file (optional, akan auto-generate jika None)
+            filename: Nama file (optional, default dari hash isi)
             
         Returns:
             Dict dengan info hasil upload
@@ -70,39 +228,49 @@ class DataManager:
                     "success": False,
                     "message": f"Label tidak valid. Harus salah satu dari: {valid_labels}"
                 }
+            label = label.lower()
+            
+            data = read_upload_bytes(image_file)
+            source_hash = hashlib.sha256(data).hexdigest()
+            
+            # Duplikat persis: O(1), tanpa decode gambar
+            duplicate = self.find_duplicate(source_hash)
+            if duplicate is not None:
+                return self._duplicate_result(label, *duplicate)
             
             # Generate filename jika tidak ada
             if filename is None:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                filename = f"{label}_{timestamp}.jpg"
+                filename = content_filename(label, source_hash)
             
             # Pastikan extension adalah .jpg
             if not filename.lower().endswith(('.jpg', '.jpeg', '.png')):
                 filename = f"{filename}.jpg"
             
             # Path tujuan
-            destination = self.raw_data_dir / label.lower() / filename
+            destination = self.raw_data_dir / label / filename
             
-            # Buka dan save gambar
-            image = Image.open(image_file)
+            # Convert ke RGB + resize untuk efisiensi storage, encode JPEG
+            encoded = encode_dataset_image(data)
             
-            # Convert ke RGB jika perlu (untuk PNG dengan alpha channel)
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Resize untuk efisiensi storage (optional)
-            max_size = (800, 800)
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            if not write_file_atomic(destination, encoded):
+                # Worker lain baru saja menyimpan file yang sama
+                if filename == content_filename(label, source_hash):
+                    return self._duplicate_result(label, label, filename)
+                return {
+                    "success": False,
+                    "message": f"❌ File {filename} sudah ada"
+                }
             
-            # Save gambar
-            image.save(destination, 'JPEG', quality=95)
+            self.catalog.add(label, destination, sha256=hashlib.sha256(encoded).hexdigest())
+            self._notify("added", label, destination)
             
             return {
                 "success": True,
                 "message": "✅ Gambar berhasil ditambahkan!",
                 "path": str(destination),
                 "label": label,
-                "filename": filename
+                "filename": filename,
+                "duplicate": False
             }
             
         except Exception as e:
@@ -111,60 +279,90 @@ class DataManager:
                 "message": f"❌ Error: {str(e)}"
             }
     
-    def get_dataset_statistics(self) -> Dict[str, any]:
+    def register_ingested(self, label: str, items: List[tuple]):
         """
-        📊 Dapatkan statistik dataset
+        🗂️ Catat file yang sudah ditulis oleh proses lain (bulk ingest) ke
+        katalog dalam satu transaksi, lalu panggil listener
         
-        Returns:
-            Dict berisi statistik jumlah gambar per kategori
+        Args:
+            label: Kategori sampah
+            items: List (nama file, sha256 isi file)
         """
-        stats = {
-            "raw": {},
-            "processed": {"train": {}, "test": {}, "validation": {}},
-            "total_raw": 0,
-            "total_processed": 0
-        }
+        self.catalog.add_many(label, [(self.raw_data_dir / label / name, sha256) for name, sha256 in items])
+        for name, _ in items:
+            self._notify("added", label, self.raw_data_dir / label / name)
+    
+    def find_duplicate(self, source_hash: str):
+        """
+        🔍 Cari gambar yang isinya persis sama dengan upload
         
-        categories = ["cardboard", "glass", "metal", "paper", "plastic"]
+        Dicek dari nama file berbasis hash (upload sebelumnya) dan dari
+        hash isi file di katalog (file yang disalin langsung ke folder).
         
-        # Hitung raw data
-        for category in categories:
-            category_dir = self.raw_data_dir / category
-            if category_dir.exists():
-                count = len([f for f in category_dir.iterdir() if f.is_file() and f.suffix.lower() in ['.jpg', '.jpeg', '.png']])
-                stats["raw"][category] = count
-                stats["total_raw"] += count
-            else:
-                stats["raw"][category] = 0
+        Returns:
+            Tuple (kategori, nama file) atau None
+        """
+        for category in ["cardboard", "glass", "metal", "paper", "plastic"]:
+            name = content_filename(category, source_hash)
+            if (self.raw_data_dir / category / name).exists():
+                return category, name
         
-        # Hitung processed data
-        for split in ["train", "test", "validation"]:
-            for category in categories:
-                split_dir = self.processed_data_dir / split / category
-                if split_dir.exists():
-                    count = len([f for f in split_dir.iterdir() if f.is_file()])
-                    stats["processed"][split][category] = count
-                    stats["total_processed"] += count
-                else:
-                    stats["processed"][split][category] = 0
+        matches = self.catalog.find_sha256(source_hash)
+        if matches:
+            return matches[0]["category"], matches[0]["filename"]
+        return None
+    
+    def _duplicate_result(self, label: str, category: str, filename: str) -> Dict[str, any]:
+        if category == label:
+            return {
+                "success": True,
+                "message": "ℹ️ Gambar ini sudah ada di dataset",
+                "path": str(self.raw_data_dir / category / filename),
+                "label": label,
+                "filename": filename,
+                "duplicate": True
+            }
+        return {
+            "success": False,
+            "message": f"❌ Gambar ini sudah ada di dataset dengan kategori {category}",
+            "duplicate": True,
+            "existing_category": category,
+            "filename": filename
+        }
+    
+    def get_dataset_statistics(self) -> Dict[str, any]:
+        """
+        📊 Dapatkan statistik dataset (dari katalog, tanpa scan folder)
         
-        return stats
+        Returns:
+            Dict berisi statistik jumlah gambar per kategori
+        """
+        return self.catalog.statistics()
     
-    def split_dataset(self, train_ratio: float = 0.7, test_ratio: float = 0.15, validation_ratio: float = 0.15) -> Dict[str, any]:
+    def split_dataset(self, train_ratio: float = 0.7, test_ratio: float = 0.15, validation_ratio: float = 0.15,
+                      link_files: bool = True, group_near_duplicates: bool = True) -> Dict[str, any]:
         """
         📦 Split dataset dari raw ke train/test/validation
         
+        Split ditentukan dari hash isi file (deterministik): gambar yang sama
+        selalu masuk split yang sama, dan menambah gambar hanya meng-assign
+        file baru. Hasilnya disimpan di manifest (processed/manifest.json)
+        yang bisa dibaca trainer langsung tanpa menyalin file.
+        
         Args:
             train_ratio: Proporsi data untuk training (default 70%)
             test_ratio: Proporsi data untuk testing (default 15%)
             validation_ratio: Proporsi data untuk validation (default 15%)
+            link_files: Sinkronkan folder processed/{split}/{kategori} dengan
+                hardlink ke file raw (incremental, tanpa copy)
+            group_near_duplicates: Gambar near-duplicate (satu cluster)
+                selalu masuk split yang sama, agar tidak bocor dari train
+                ke test/validation
             
         Returns:
             Dict dengan info hasil split
         """
         try:
-            import random
-            
             # Validasi ratio
             if abs(train_ratio + test_ratio + validation_ratio - 1.0) > 0.01:
                 return {
@@ -172,60 +370,69 @@ class DataManager:
                     "message": "❌ Total ratio harus = 1.0"
                 }
             
+            ratios = {"train": train_ratio, "test": test_ratio, "validation": validation_ratio}
+            previous = self.load_split_manifest()
+            reassign_all = previous is None or previous.get("ratios") != ratios
+            
             categories = ["cardboard", "glass", "metal", "paper", "plastic"]
             split_info = {}
+            manifest_splits = {"train": [], "test": [], "validation": []}
+            newly_assigned = 0
+            
+            cluster_splits, cluster_count = {}, 0
+            if group_near_duplicates:
+                cluster_splits, cluster_count = self._near_duplicate_splits(
+                    reassign_all, train_ratio, test_ratio
+                )
             
             for category in categories:
-                # Get all images dari raw folder
-                raw_dir = self.raw_data_dir / category
-                if not raw_dir.exists():
-                    continue
+                records = self.catalog.records(category)
                 
-                images = [f for f in raw_dir.iterdir() if f.is_file() and f.suffix.lower() in ['.jpg', '.jpeg', '.png']]
-                
-                if len(images) == 0:
+                if len(records) == 0:
                     split_info[category] = "Tidak ada gambar"
                     continue
                 
-                # Shuffle images
-                random.shuffle(images)
-                
-                # Calculate split indices
-                total = len(images)
-                train_end = int(total * train_ratio)
-                test_end = train_end + int(total * test_ratio)
+                # Assign hanya file yang belum punya split (kecuali ratio berubah)
+                assignments = {}
+                for record in records:
+                    key = f"{category}/{record['filename']}"
+                    if key in cluster_splits:
+                        split = cluster_splits[key]
+                    elif reassign_all or record["split"] is None:
+                        split = assign_split(record["sha256"], train_ratio, test_ratio)
+                    else:
+                        split = record["split"]
+                    if split != record["split"]:
+                        newly_assigned += 1
+                    assignments[record["filename"]] = split
+                    manifest_splits[split].append([category, record["filename"], record["sha256"]])
                 
-                # Split files
-                train_files = images[:train_end]
-                test_files = images[train_end:test_end]
-                val_files = images[test_end:]
+                if reassign_all or any(r["split"] != assignments[r["filename"]] for r in records):
+                    self.catalog.set_splits(category, assignments)
                 
-                # Copy ke processed folders
-                for split_name, files in [("train", train_files), ("test", test_files), ("validation", val_files)]:
-                    dest_dir = self.processed_data_dir / split_name / category
-                    
-                    # Clear existing files
-                    if dest_dir.exists():
-                        for f in dest_dir.iterdir():
-                            if f.is_file():
-                                f.unlink()
-                    
-                    dest_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    # Copy files
-                    for file in files:
-                        shutil.copy2(file, dest_dir / file.name)
+                if link_files:
+                    self._sync_split_links(category, assignments)
                 
                 split_info[category] = {
-                    "train": len(train_files),
-                    "test": len(test_files),
-                    "validation": len(val_files)
+                    split_name: sum(1 for split in assignments.values() if split == split_name)
+                    for split_name in ["train", "test", "validation"]
                 }
             
+            self._write_split_manifest({
+                "version": 2,
+                "created": datetime.now().isoformat(),
+                "ratios": ratios,
+                "raw_data_dir": str(self.raw_data_dir),
+                "splits": manifest_splits
+            })
+            
             return {
                 "success": True,
                 "message": "✅ Dataset berhasil di-split!",
-                "split_info": split_info
+                "split_info": split_info,
+                "newly_assigned": newly_assigned,
+                "near_duplicate_clusters": cluster_count,
+                "manifest_path": str(self.split_manifest_path)
             }
             
         except Exception as e:
@@ -234,6 +441,170 @@ class DataManager:
                 "message": f"❌ Error: {str(e)}"
             }
     
+    def _near_duplicate_splits(self, reassign_all: bool, train_ratio: float, test_ratio: float):
+        """
+        🧩 Tentukan satu split untuk setiap cluster near-duplicate
+        
+        Cluster mengikuti split mayoritas anggota yang sudah di-assign
+        (gambar lama tidak ikut pindah saat cluster bertambah); cluster
+        baru di-assign dari hash anggota dengan sha256 terkecil.
+        
+        Returns:
+            Tuple (dict "kategori/file" -> split, jumlah cluster)
+        """
+        self._sync_near_duplicates()
+        records = {f"{r['category']}/{r['filename']}": r for r in self.catalog.records()}
+        clusters = self._near_duplicates.clusters()
+        
+        cluster_splits = {}
+        for cluster in clusters:
+            members = [records[key] for key in cluster if key in records]
+            if not members:
+                continue
+            existing = [] if reassign_all else [m["split"] for m in members if m["split"]]
+            if existing:
+                split = max(sorted(set(existing)), key=existing.count)
+            else:
+                canonical = min(m["sha256"] for m in members)
+                split = assign_split(canonical, train_ratio, test_ratio)
+            for key in cluster:
+                cluster_splits[key] = split
+        return cluster_splits, len(clusters)
+    
+    def _sync_near_duplicates(self) -> int:
+        """
+        🪞 Samakan index near-duplicate dengan katalog (hanya gambar baru
+        yang di-hash)
+        
+        Returns:
+            Jumlah gambar yang baru di-hash
+        """
+        if self._near_duplicates is None:
+            self._near_duplicates = NearDuplicateIndex(self.raw_data_dir.parent / "phash_cache.db")
+        return self._near_duplicates.sync(self.catalog.records(), self.raw_data_dir)
+    
+    def find_near_duplicates(self, threshold: int = DEFAULT_THRESHOLD) -> Dict[str, any]:
+        """
+        🪞 Laporan cluster gambar near-duplicate di seluruh dataset
+        
+        Args:
+            threshold: Jarak Hamming maksimal dari 64 bit perceptual hash
+            
+        Returns:
+            Dict berisi cluster ("kategori/file"), jumlah gambar berlebih dan
+            cluster yang anggotanya beda kategori (kemungkinan salah label)
+        """
+        newly_hashed = self._sync_near_duplicates()
+        clusters = self._near_duplicates.clusters(threshold)
+        return {
+            "success": True,
+            "threshold": threshold,
+            "total_images": len(self._near_duplicates.keys),
+            "newly_hashed": newly_hashed,
+            "clusters": clusters,
+            "redundant_images": sum(len(c) - 1 for c in clusters),
+            "label_conflicts": [c for c in clusters if len({key.split("/")[0] for key in c}) > 1]
+        }
+    
+    def collapse_near_duplicates(self, threshold: int = DEFAULT_THRESHOLD) -> Dict[str, any]:
+        """
+        🧹 Sisakan satu gambar per cluster near-duplicate dalam kategori yang
+        sama (file terbesar), sisanya dipindah ke folder near_duplicates_removed
+        
+        Cluster lintas kategori tidak disentuh karena perlu dicek manual.
+        
+        Returns:
+            Dict dengan jumlah gambar yang dipindah
+        """
+        try:
+            removed_dir = self.raw_data_dir.parent / "near_duplicates_removed"
+            removed = 0
+            for cluster in self.find_near_duplicates(threshold)["clusters"]:
+                by_category = {}
+                for key in cluster:
+                    category, filename = key.split("/", 1)
+                    by_category.setdefault(category, []).append(filename)
+                
+                for category, filenames in by_category.items():
+                    if len(filenames) < 2:
+                        continue
+                    sizes = {name: (self.catalog.get(category, name) or {}).get("size", 0)
+                             for name in filenames}
+                    keep = max(sorted(filenames), key=lambda name: sizes[name])
+                    for filename in filenames:
+                        if filename == keep:
+                            continue
+                        source = self.raw_data_dir / category / filename
+                        dest = removed_dir / category / filename
+                        dest.parent.mkdir(parents=True, exist_ok=True)
+                        try:
+                            os.replace(source, dest)
+                        except FileNotFoundError:
+                            pass
+                        self.catalog.remove(category, filename)
+                        self._notify("deleted", category, source)
+                        removed += 1
+            
+            return {
+                "success": True,
+                "message": f"✅ {removed} gambar near-duplicate dipindahkan",
+                "removed": removed,
+                "moved_to": str(removed_dir)
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"❌ Error: {str(e)}"
+            }
+    
+    @property
+    def split_manifest_path(self) -> Path:
+        return self.processed_data_dir / "manifest.json"
+    
+    def load_split_manifest(self) -> Dict[str, any]:
+        """
+        📄 Baca manifest split terakhir (None jika belum pernah split)
+        """
+        try:
+            with open(self.split_manifest_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    
+    def _write_split_manifest(self, manifest: Dict[str, any]):
+        """💾 Tulis manifest secara atomik (temp file lalu rename)"""
+        tmp_path = self.split_manifest_path.with_name(f".manifest.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.split_manifest_path)
+    
+    def _sync_split_links(self, category: str, assignments: Dict[str, str]):
+        """
+        🔗 Samakan folder processed/{split}/{kategori} dengan assignment:
+        hapus file yang tidak lagi masuk split itu, hardlink file baru
+        (fallback copy jika filesystem tidak mendukung hardlink)
+        """
+        for split_name in ["train", "test", "validation"]:
+            dest_dir = self.processed_data_dir / split_name / category
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            wanted = {name for name, split in assignments.items() if split == split_name}
+            
+            for f in dest_dir.iterdir():
+                if f.is_file() and f.name not in wanted:
+                    f.unlink()
+            
+            for name in wanted:
+                source = self.raw_data_dir / category / name
+                dest = dest_dir / name
+                if dest.exists():
+                    if os.path.samefile(source, dest):
+                        continue
+                    dest.unlink()  # Salinan lama / file raw sudah diganti
+                try:
+                    os.link(source, dest)
+                except OSError:
+                    shutil.copy2(source, dest)
+    
     def delete_image(self, category: str, filename: str) -> Dict[str, any]:
         """
         🗑️ Hapus gambar dari dataset
@@ -250,6 +621,8 @@ class DataManager:
             
             if file_path.exists():
                 file_path.unlink()
+                self.catalog.remove(category, filename)
+                self._notify("deleted", category, file_path)
                 return {
                     "success": True,
                     "message": f"✅ {filename} berhasil dihapus"
@@ -277,34 +650,29 @@ class DataManager:
         """
         images_list = []
         
-        if category:
-            categories = [category]
-        else:
-            categories = ["cardboard", "glass", "metal", "paper", "plastic"]
-        
-        for cat in categories:
-            cat_dir = self.raw_data_dir / cat
-            if cat_dir.exists():
-                for img_file in cat_dir.iterdir():
-                    if img_file.is_file() and img_file.suffix.lower() in ['.jpg', '.jpeg', '.png']:
-                        images_list.append({
-                            "category": cat,
-                            "filename": img_file.name,
-                            "path": str(img_file),
-                            "size": img_file.stat().st_size,
-                            "modified": datetime.fromtimestamp(img_file.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-                        })
+        for record in self.catalog.records(category):
+            images_list.append({
+                "category": record["category"],
+                "filename": record["filename"],
+                "path": str(self.raw_data_dir / record["category"] / record["filename"]),
+                "size": record["size"],
+                "modified": datetime.fromtimestamp(record["mtime"]).strftime("%Y-%m-%d %H:%M:%S")
+            })
         
         return images_list
     
-    def check_dataset_ready(self) -> Dict[str, any]:
+    def check_dataset_ready(self, stats: Dict[str, any] = None) -> Dict[str, any]:
         """
         ✅ Cek apakah dataset siap untuk training
         
+        Args:
+            stats: Hasil get_dataset_statistics yang sudah ada (optional)
+        
         Returns:
             Dict dengan status dan rekomendasi
         """
-        stats = self.get_dataset_statistics()
+        if stats is None:
+            stats = self.get_dataset_statistics()
         min_images_per_class = 10  # Minimal 10 gambar per kelas
         
         ready = True
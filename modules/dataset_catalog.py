@@ -0,0 +1,486 @@
+"""
+🗂️ MODUL DATASET CATALOG - INDEX DATASET INCREMENTAL
+Katalog semua gambar dataset (di memori + SQLite) agar statistik tidak
+perlu scan ulang folder setiap kali diminta
+"""
+
+import hashlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CATEGORIES = ["cardboard", "glass", "metal", "paper", "plastic"]
+SPLITS = ["train", "test", "validation"]
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    category TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT,
+    split TEXT,
+    PRIMARY KEY (category, filename)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    category TEXT NOT NULL,
+    filename TEXT NOT NULL
+);
+"""
+
+# Jumlah entri changelog yang disimpan untuk sinkronisasi antar proses
+CHANGELOG_KEEP = 50000
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """🔑 Hash SHA-256 isi file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetCatalog:
+    """
+    Katalog persisten gambar dataset
+
+    🧠 Cara Kerja:
+    1. Setiap gambar raw dicatat: kategori, ukuran, mtime, hash isi, split
+    2. Salinan lengkap ada di memori + counter per kategori/split, sehingga
+       statistik adalah lookup O(1)
+    3. SQLite menyimpan katalog antar restart; saat startup katalog
+       direkonsiliasi dengan folder (hanya file baru/berubah yang di-hash)
+    4. Beberapa proses (worker gunicorn) berbagi file SQLite yang sama;
+       perubahan dari proses lain dideteksi lewat PRAGMA data_version lalu
+       diterapkan incremental dari tabel changes (reload penuh hanya jika
+       changelog sudah terpangkas)
+    """
+
+    def __init__(self, db_path: str, raw_data_dir: str, processed_data_dir: str):
+        """
+        Inisialisasi katalog
+
+        Args:
+            db_path: Path file SQLite katalog
+            raw_data_dir: Path ke folder dataset/raw
+            processed_data_dir: Path ke folder dataset/processed
+        """
+        self.db_path = Path(db_path)
+        self.raw_data_dir = Path(raw_data_dir)
+        self.processed_data_dir = Path(processed_data_dir)
+
+        self._lock = threading.RLock()
+        self._records: Dict[str, dict] = {}
+        self._by_sha256: Dict[str, set] = {}
+        self._raw_counts = {category: 0 for category in CATEGORIES}
+        self._split_counts = {split: {category: 0 for category in CATEGORIES} for split in SPLITS}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: transaksi tulis dibuka manual dengan BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._load_from_db()
+
+    # ============================================
+    # 🔧 STATE DI MEMORI
+    # ============================================
+
+    @staticmethod
+    def _key(category: str, filename: str) -> str:
+        return f"{category}/{filename}"
+
+    def _data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _max_change_id(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+
+    def _load_from_db(self):
+        """📂 Isi ulang state di memori dari SQLite"""
+        with self._lock:
+            self._records.clear()
+            self._by_sha256.clear()
+            self._raw_counts = {category: 0 for category in CATEGORIES}
+            self._split_counts = {split: {category: 0 for category in CATEGORIES} for split in SPLITS}
+
+            rows = self._conn.execute(
+                "SELECT category, filename, size, mtime, sha256, split FROM images"
+            )
+            for row in rows:
+                self._put(self._row_to_record(row))
+            self._last_change = self._max_change_id()
+            self._version = self._data_version()
+
+    @staticmethod
+    def _row_to_record(row) -> dict:
+        category, filename, size, mtime, sha256, split = row
+        return {"category": category, "filename": filename, "size": size,
+                "mtime": mtime, "sha256": sha256, "split": split}
+
+    def _put(self, record: dict):
+        key = self._key(record["category"], record["filename"])
+        self._drop(key)
+        self._records[key] = record
+        if record["sha256"]:
+            self._by_sha256.setdefault(record["sha256"], set()).add(key)
+        self._count(record, +1)
+
+    def _drop(self, key: str) -> Optional[dict]:
+        record = self._records.pop(key, None)
+        if record is not None:
+            keys = self._by_sha256.get(record["sha256"])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_sha256[record["sha256"]]
+            self._count(record, -1)
+        return record
+
+    def _count(self, record: dict, delta: int):
+        category = record["category"]
+        self._raw_counts[category] = self._raw_counts.get(category, 0) + delta
+        if record["split"] in self._split_counts:
+            counts = self._split_counts[record["split"]]
+            counts[category] = counts.get(category, 0) + delta
+
+    def _refresh_if_changed(self):
+        """
+        🔄 Terapkan perubahan dari proses lain (data_version hanya berubah
+        karena commit dari koneksi lain, jadi cek ini murah)
+        """
+        if self._data_version() == self._version:
+            return
+        oldest = self._conn.execute("SELECT MIN(id) FROM changes").fetchone()[0]
+        if oldest is not None and oldest > self._last_change + 1:
+            self._load_from_db()  # Changelog terpangkas, tidak bisa incremental
+            return
+
+        rows = self._conn.execute(
+            "SELECT c.id, c.category, c.filename, i.size, i.mtime, i.sha256, i.split "
+            "FROM changes c LEFT JOIN images i "
+            "ON i.category = c.category AND i.filename = c.filename "
+            "WHERE c.id > ? ORDER BY c.id", (self._last_change,)
+        ).fetchall()
+        for change_id, category, filename, size, mtime, sha256, split in rows:
+            if size is None:
+                self._drop(self._key(category, filename))
+            else:
+                self._put(self._row_to_record((category, filename, size, mtime, sha256, split)))
+            self._last_change = change_id
+        self._version = self._data_version()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        ✍️ Transaksi tulis: ambil kunci tulis SQLite, terapkan dulu perubahan
+        proses lain, lalu commit + pangkas changelog (rollback jika error)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh_if_changed()
+                yield
+                last = self._max_change_id()
+                self._conn.execute("DELETE FROM changes WHERE id <= ?", (last - CHANGELOG_KEEP,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._last_change = last
+            self._version = self._data_version()
+
+    def _log_changes(self, keys):
+        self._conn.executemany("INSERT INTO changes (category, filename) VALUES (?, ?)", keys)
+
+    # ============================================
+    # ✏️ UPDATE INCREMENTAL
+    # ============================================
+
+    def add(self, category: str, path: Path, sha256: str = None) -> dict:
+        """
+        ➕ Catat (atau perbarui) satu gambar raw
+
+        Args:
+            category: Kategori sampah
+            path: Path file gambar yang sudah tersimpan
+            sha256: Hash isi file (dihitung jika None)
+
+        Returns:
+            Record katalog
+        """
+        return self.add_many(category, [(path, sha256)])[0]
+
+    def add_many(self, category: str, items: List[Tuple[Path, Optional[str]]]) -> List[dict]:
+        """
+        ➕ Catat banyak gambar raw dalam satu transaksi
+
+        Args:
+            category: Kategori sampah
+            items: List (path file, hash isi atau None)
+
+        Returns:
+            List record katalog
+        """
+        records = []
+        for path, sha256 in items:
+            path = Path(path)
+            stat = path.stat()
+            records.append({
+                "category": category,
+                "filename": path.name,
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha256": sha256 or file_sha256(path),
+                "split": None
+            })
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)",
+                    [(category, r["filename"], r["size"], r["mtime"], r["sha256"], None)
+                     for r in records]
+                )
+                self._log_changes([(category, r["filename"]) for r in records])
+            for record in records:
+                self._put(record)
+        return records
+
+    def remove(self, category: str, filename: str) -> bool:
+        """
+        ➖ Hapus satu gambar dari katalog
+
+        Returns:
+            bool: True jika gambar tercatat dan dihapus
+        """
+        with self._lock:
+            with self._transaction():
+                self._conn.execute("DELETE FROM images WHERE category = ? AND filename = ?",
+                                   (category, filename))
+                self._log_changes([(category, filename)])
+            return self._drop(self._key(category, filename)) is not None
+
+    def set_splits(self, category: str, assignments: Dict[str, str]):
+        """
+        📦 Simpan hasil split untuk satu kategori
+
+        Args:
+            category: Kategori sampah
+            assignments: Dict nama file -> "train" / "test" / "validation"
+        """
+        with self._lock:
+            with self._transaction():
+                self._conn.execute("UPDATE images SET split = NULL WHERE category = ?", (category,))
+                self._conn.executemany(
+                    "UPDATE images SET split = ? WHERE category = ? AND filename = ?",
+                    [(split, category, filename) for filename, split in assignments.items()]
+                )
+                self._conn.execute(
+                    "INSERT INTO changes (category, filename) "
+                    "SELECT category, filename FROM images WHERE category = ?", (category,)
+                )
+            for record in self._records.values():
+                if record["category"] == category:
+                    self._count(record, -1)
+                    record["split"] = assignments.get(record["filename"])
+                    self._count(record, +1)
+
+    # ============================================
+    # 🔄 REKONSILIASI
+    # ============================================
+
+    def _scan_splits(self) -> Dict[str, str]:
+        """Split tiap file raw berdasarkan isi folder processed"""
+        splits = {}
+        for split in SPLITS:
+            for category in CATEGORIES:
+                split_dir = self.processed_data_dir / split / category
+                if split_dir.exists():
+                    for f in split_dir.iterdir():
+                        splits[self._key(category, f.name)] = split
+        return splits
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        🔄 Samakan katalog dengan isi folder (dipanggil saat startup)
+
+        File baru atau yang ukuran/mtime-nya berubah di-hash ulang, record
+        yang filenya hilang dihapus. Split file yang belum tercatat diambil
+        dari folder processed (migrasi dari split lama berbasis copy).
+
+        Returns:
+            Dict jumlah record yang ditambah, diperbarui, dan dihapus
+        """
+        on_disk = {}
+        for category in CATEGORIES:
+            category_dir = self.raw_data_dir / category
+            if not category_dir.exists():
+                continue
+            for f in category_dir.iterdir():
+                if f.suffix.lower() in IMAGE_EXTENSIONS and f.is_file():
+                    on_disk[self._key(category, f.name)] = (category, f)
+        splits = None
+
+        # Hash dihitung di luar transaksi agar worker lain tidak terkunci lama
+        with self._lock:
+            self._refresh_if_changed()
+            known = {key: (r["size"], r["mtime"], r["sha256"], r["split"])
+                     for key, r in self._records.items()}
+
+        added = updated = 0
+        rows = []
+        for key, (category, path) in on_disk.items():
+            stat = path.stat()
+            existing = known.get(key)
+            if existing is not None and existing[:2] == (stat.st_size, stat.st_mtime):
+                continue
+            sha256 = file_sha256(path)
+            if existing is None:
+                added += 1
+                if splits is None:
+                    splits = self._scan_splits()
+                split = splits.get(key)
+            else:
+                updated += 1
+                split = None  # Isi berubah, di-assign ulang saat split berikutnya
+            rows.append((category, path.name, stat.st_size, stat.st_mtime, sha256, split))
+        stale = [key for key in known if key not in on_disk]
+
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._conn.executemany(
+                    "DELETE FROM images WHERE category = ? AND filename = ?",
+                    [tuple(key.split("/", 1)) for key in stale]
+                )
+                self._log_changes([row[:2] for row in rows] + [tuple(key.split("/", 1)) for key in stale])
+            for row in rows:
+                self._put(self._row_to_record(row))
+            for key in stale:
+                self._drop(key)
+
+        return {"added": added, "updated": updated, "removed": len(stale)}
+
+    def sync_entries(self, entries: Iterable[Tuple[str, str]]) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        🔁 Samakan sebagian katalog dengan disk dalam satu transaksi
+        (dipakai watcher untuk batch event file)
+
+        Setiap (kategori, nama file) di-stat: file yang ada dan baru/berubah
+        dicatat, file yang hilang dihapus dari katalog. Split yang sudah
+        tercatat dipertahankan jika file tidak berubah.
+
+        Args:
+            entries: Iterable (kategori, nama file)
+
+        Returns:
+            Dict list entri yang "added", "updated" dan "removed"
+        """
+        changes = {"added": [], "updated": [], "removed": []}
+        rows = []
+        for category, filename in set(entries):
+            path = self.raw_data_dir / category / filename
+            with self._lock:
+                existing = self._records.get(self._key(category, filename))
+                existing = dict(existing) if existing else None
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                if existing is not None:
+                    changes["removed"].append((category, filename))
+                continue
+            if existing is not None and (existing["size"], existing["mtime"]) == (stat.st_size, stat.st_mtime):
+                continue
+            try:
+                sha256 = file_sha256(path)
+            except FileNotFoundError:
+                continue  # Terhapus saat sedang dibaca
+            rows.append((category, filename, stat.st_size, stat.st_mtime, sha256, None))
+            changes["updated" if existing else "added"].append((category, filename))
+
+        if not rows and not changes["removed"]:
+            return changes
+
+        with self._lock:
+            with self._transaction():
+                self._conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._conn.executemany("DELETE FROM images WHERE category = ? AND filename = ?",
+                                       changes["removed"])
+                self._log_changes([row[:2] for row in rows] + changes["removed"])
+            for row in rows:
+                self._put(self._row_to_record(row))
+            for category, filename in changes["removed"]:
+                self._drop(self._key(category, filename))
+        return changes
+
+    def sync_category(self, category: str) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        📁 Samakan satu folder kategori (dipakai watcher mode polling saat
+        mtime folder berubah)
+        """
+        category_dir = self.raw_data_dir / category
+        on_disk = set()
+        if category_dir.exists():
+            on_disk = {f.name for f in category_dir.iterdir()
+                       if f.suffix.lower() in IMAGE_EXTENSIONS and not f.name.startswith(".")}
+        with self._lock:
+            self._refresh_if_changed()
+            known = {r["filename"] for r in self._records.values() if r["category"] == category}
+        return self.sync_entries((category, name) for name in on_disk | known)
+
+    # ============================================
+    # 📊 QUERY
+    # ============================================
+
+    def statistics(self) -> Dict[str, any]:
+        """
+        📊 Statistik dataset (format sama dengan DataManager.get_dataset_statistics)
+        """
+        with self._lock:
+            self._refresh_if_changed()
+            raw = {category: self._raw_counts.get(category, 0) for category in CATEGORIES}
+            processed = {split: {category: counts.get(category, 0) for category in CATEGORIES}
+                         for split, counts in self._split_counts.items()}
+        return {
+            "raw": raw,
+            "processed": processed,
+            "total_raw": sum(raw.values()),
+            "total_processed": sum(sum(counts.values()) for counts in processed.values())
+        }
+
+    def records(self, category: str = None) -> List[dict]:
+        """
+        📋 Salinan record katalog (opsional filter kategori)
+        """
+        with self._lock:
+            self._refresh_if_changed()
+            return [dict(record) for record in self._records.values()
+                    if category is None or record["category"] == category]
+
+    def get(self, category: str, filename: str) -> Optional[dict]:
+        """🔎 Record satu gambar, None jika tidak tercatat"""
+        with self._lock:
+            self._refresh_if_changed()
+            record = self._records.get(self._key(category, filename))
+            return dict(record) if record else None
+
+    def find_sha256(self, sha256: str) -> List[dict]:
+        """🔑 Record dengan hash isi tertentu (deteksi duplikat persis), O(1)"""
+        with self._lock:
+            self._refresh_if_changed()
+            return [dict(self._records[key]) for key in sorted(self._by_sha256.get(sha256, ()))]
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,292 @@
+"""
+👀 MODUL DATASET WATCHER - PANTAU PERUBAHAN FOLDER DATASET
+Menjaga katalog dataset tetap sinkron saat file ditambah/dihapus langsung
+di folder (mis. lewat rsync), tanpa lewat DataManager.add_image
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from modules.dataset_catalog import CATEGORIES, IMAGE_EXTENSIONS
+
+try:
+    import fcntl
+except ImportError:  # Windows: tidak ada leader election, setiap proses memantau
+    fcntl = None
+
+
+def watchdog_available() -> bool:
+    """Cek apakah package watchdog (inotify/FSEvents/ReadDirectoryChangesW) terinstall"""
+    try:
+        import watchdog.observers  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class DatasetWatcher:
+    """
+    Watcher folder dataset/raw
+
+    🧠 Cara Kerja:
+    1. Event file (watchdog/inotify) atau perubahan mtime folder kategori
+       (polling) dikumpulkan ke antrean
+    2. Antrean di-debounce: diproses setelah tidak ada event selama
+       `debounce` detik (paling lama `max_delay` detik saat burst)
+    3. Event untuk file yang sama digabung; jika satu kategori menerima
+       lebih dari `overflow_threshold` event, kategori itu di-scan sekali
+       saja alih-alih per file
+    4. Perubahan diterapkan ke katalog dalam satu transaksi, sehingga
+       query statistik tidak pernah perlu scan folder
+    5. Dengan beberapa worker gunicorn hanya satu proses yang memantau
+       (file lock); worker lain melihat perubahan lewat katalog SQLite
+    """
+
+    def __init__(self,
+                 data_manager,
+                 mode: str = "auto",
+                 debounce: float = 1.0,
+                 max_delay: float = 10.0,
+                 poll_interval: float = 5.0,
+                 safety_interval: float = 60.0,
+                 overflow_threshold: int = 1000):
+        """
+        Inisialisasi watcher
+
+        Args:
+            data_manager: Instance DataManager yang katalognya dijaga
+            mode: "auto" (inotify jika ada, selain itu polling), "inotify" atau "poll"
+            debounce: Jeda tanpa event sebelum antrean diproses (detik)
+            max_delay: Batas tunda maksimal selama burst event (detik)
+            poll_interval: Interval cek mtime folder pada mode polling (detik)
+            safety_interval: Interval cek mtime folder pada mode inotify,
+                jaring pengaman jika ada event yang hilang (detik)
+            overflow_threshold: Batas event per kategori sebelum diganti scan folder
+        """
+        self.data_manager = data_manager
+        self.raw_data_dir = Path(data_manager.raw_data_dir)
+        self.mode = mode
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.safety_interval = safety_interval
+        self.overflow_threshold = overflow_threshold
+
+        self.backend: Optional[str] = None
+        self.stats = {"events": 0, "batches": 0, "added": 0, "removed": 0, "rescans": 0}
+
+        self._cond = threading.Condition()
+        self._pending_files: Dict[str, Set[str]] = {}
+        self._pending_dirs: Set[str] = set()
+        self._first_event = None
+        self._last_event = None
+        self._dir_mtimes: Dict[str, int] = {}
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._observer = None
+        self._lock_file = None
+
+    # ============================================
+    # 🚀 START / STOP
+    # ============================================
+
+    def _acquire_leader_lock(self) -> bool:
+        """🔒 Hanya satu proses per folder dataset yang menjalankan watcher"""
+        if fcntl is None:
+            return True
+        lock_path = self.raw_data_dir.parent / ".dataset_watcher.lock"
+        self._lock_file = open(lock_path, "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+
+    def start(self) -> bool:
+        """
+        ▶️ Mulai memantau folder
+
+        Returns:
+            bool: True jika watcher berjalan di proses ini
+        """
+        if not self._acquire_leader_lock():
+            print("  👀 Dataset watcher sudah berjalan di proses lain")
+            return False
+
+        use_inotify = self.mode in ("auto", "inotify") and watchdog_available()
+        if self.mode == "inotify" and not use_inotify:
+            print("  ⚠️  watchdog tidak terinstall, watcher memakai polling")
+
+        self._snapshot_dir_mtimes()
+        if use_inotify:
+            self._start_observer()
+            self.backend = "inotify"
+            interval = self.safety_interval
+        else:
+            self.backend = "poll"
+            interval = self.poll_interval
+
+        for target, args in [(self._poll_loop, (interval,)), (self._flush_loop, ())]:
+            thread = threading.Thread(target=target, args=args, daemon=True,
+                                      name=f"dataset-watcher-{target.__name__.strip('_')}")
+            thread.start()
+            self._threads.append(thread)
+
+        print(f"  👀 Dataset watcher aktif ({self.backend})")
+        return True
+
+    def stop(self):
+        """⏹️ Hentikan watcher dan proses sisa antrean"""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._flush()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _start_observer(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ("opened", "closed_no_write"):
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", "")):
+                    if path:
+                        watcher._on_path_event(path, event.is_directory)
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), str(self.raw_data_dir), recursive=True)
+        self._observer.daemon = True
+        self._observer.start()
+
+    # ============================================
+    # 📥 ANTREAN EVENT
+    # ============================================
+
+    def _on_path_event(self, path: str, is_directory: bool = False):
+        """Terjemahkan path event ke (kategori, nama file) lalu masukkan antrean"""
+        try:
+            relative = Path(os.fsdecode(path)).relative_to(self.raw_data_dir)
+        except ValueError:
+            return
+        parts = relative.parts
+        if not parts or parts[0] not in CATEGORIES:
+            return
+        if is_directory or len(parts) == 1:
+            self.enqueue_rescan(parts[0])
+        elif len(parts) == 2:
+            self.enqueue_file(parts[0], parts[1])
+
+    def enqueue_file(self, category: str, filename: str):
+        """➕ Catat event untuk satu file (temp file / non-gambar diabaikan)"""
+        if filename.startswith(".") or Path(filename).suffix.lower() not in IMAGE_EXTENSIONS:
+            return
+        with self._cond:
+            self.stats["events"] += 1
+            if category not in self._pending_dirs:
+                files = self._pending_files.setdefault(category, set())
+                files.add(filename)
+                if len(files) > self.overflow_threshold:
+                    # Burst besar: satu scan folder lebih murah dari ribuan stat
+                    del self._pending_files[category]
+                    self._pending_dirs.add(category)
+            self._touch()
+
+    def enqueue_rescan(self, category: str):
+        """📁 Jadwalkan scan ulang satu folder kategori"""
+        with self._cond:
+            self.stats["events"] += 1
+            self._pending_files.pop(category, None)
+            self._pending_dirs.add(category)
+            self._touch()
+
+    def _touch(self):
+        now = time.monotonic()
+        if self._first_event is None:
+            self._first_event = now
+        self._last_event = now
+        self._cond.notify()
+
+    # ============================================
+    # 🔄 POLLING & FLUSH
+    # ============================================
+
+    def _snapshot_dir_mtimes(self) -> Dict[str, int]:
+        mtimes = {}
+        for category in CATEGORIES:
+            try:
+                mtimes[category] = (self.raw_data_dir / category).stat().st_mtime_ns
+            except FileNotFoundError:
+                mtimes[category] = 0
+        changed = {c: m for c, m in mtimes.items() if self._dir_mtimes.get(c) != m}
+        self._dir_mtimes = mtimes
+        return changed
+
+    def _poll_loop(self, interval: float):
+        """
+        ⏱️ Cek mtime folder kategori (5 stat per interval); folder berubah
+        jika ada file ditambah, dihapus atau di-rename di dalamnya
+        """
+        while not self._stop.wait(interval):
+            for category in self._snapshot_dir_mtimes():
+                self.enqueue_rescan(category)
+
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._stop.is_set():
+                    if self._last_event is None:
+                        self._cond.wait()
+                        continue
+                    now = time.monotonic()
+                    quiet_until = self._last_event + self.debounce
+                    deadline = self._first_event + self.max_delay
+                    if now >= quiet_until or now >= deadline:
+                        break
+                    self._cond.wait(min(quiet_until, deadline) - now)
+            if not self._stop.is_set():
+                self._flush()
+
+    def _take_batch(self) -> Tuple[Dict[str, Set[str]], Set[str]]:
+        with self._cond:
+            files, dirs = self._pending_files, self._pending_dirs
+            self._pending_files, self._pending_dirs = {}, set()
+            self._first_event = self._last_event = None
+        return files, dirs
+
+    def _flush(self):
+        """📤 Terapkan satu batch event ke katalog"""
+        files, dirs = self._take_batch()
+        if not files and not dirs:
+            return
+        try:
+            changes = self.data_manager.apply_external_changes(
+                entries=[(category, name) for category, names in files.items() for name in names],
+                categories=sorted(dirs)
+            )
+        except Exception as e:
+            print(f"⚠️  Dataset watcher gagal memproses perubahan: {e}")
+            return
+        self.stats["batches"] += 1
+        self.stats["rescans"] += len(dirs)
+        self.stats["added"] += len(changes["added"])
+        self.stats["removed"] += len(changes["removed"])
+        if changes["added"] or changes["removed"]:
+            print(f"  👀 Dataset berubah di luar aplikasi: +{len(changes['added'])} "
+                  f"/ -{len(changes['removed'])} gambar")
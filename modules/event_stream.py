@@ -0,0 +1,160 @@
+"""
+📡 MODUL EVENT STREAM - PUSH STATUS KE BROWSER (SERVER-SENT EVENTS)
+Menggantikan polling /api/training-status dan /api/status dari setiap
+browser: satu thread per worker web membaca log event (tabel events di
+antrian training) lalu membagikannya ke semua klien SSE yang terhubung ke
+worker itu.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+
+def format_sse(event: Dict) -> str:
+    """📨 Satu event dalam format text/event-stream"""
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+class Subscription:
+    """
+    📬 Buffer event satu klien stream
+
+    Buffer dibatasi buffer_size: klien lambat kehilangan event tertua (dan
+    `dropped` bertambah), bukan membuat memori server tumbuh. Event training
+    berisi status lengkap, jadi event terbaru sudah cukup untuk UI.
+    """
+
+    def __init__(self, hub: "EventHub", buffer_size: int):
+        self._hub = hub
+        self._events = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, event: Dict):
+        # Dipanggil hub dengan hub._cond dipegang
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+
+    def get(self, timeout: float) -> List[Dict]:
+        """
+        ⏳ Tunggu event baru
+
+        Returns:
+            List event (urut ID), kosong jika timeout (waktunya heartbeat)
+        """
+        with self._hub._cond:
+            self._hub._cond.wait_for(lambda: self._events or self.closed, timeout)
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def close(self):
+        self._hub._unsubscribe(self)
+
+
+class EventHub:
+    """
+    Fan-out event dari log persisten ke klien stream di proses ini
+
+    🧠 Cara Kerja:
+    1. Satu thread poller membaca event baru (ID > cursor) setiap
+       poll_interval selama ada subscriber; query ringan di primary key,
+       berapa pun jumlah klien
+    2. Event baru didorong ke buffer setiap Subscription lalu klien
+       dibangunkan
+    3. subscribe(last_event_id): klien yang reconnect (header
+       Last-Event-ID) menerima event yang terlewat dari log dulu, jadi
+       tidak ada event yang hilang di antara dua koneksi
+    4. Jumlah klien per proses dibatasi max_clients (satu stream memakai
+       satu thread worker selama koneksi terbuka)
+    """
+
+    def __init__(self, fetch: Callable[[int, int], List[Dict]], last_id: Callable[[], int],
+                 poll_interval: float = 0.25, buffer_size: int = 64, max_clients: int = 4):
+        """
+        Inisialisasi hub
+
+        Args:
+            fetch: fetch(last_id, limit) -> event dengan ID > last_id (urut naik)
+            last_id: ID event terakhir di log
+            poll_interval: Detik antar pembacaan log
+            buffer_size: Maksimal event tertunda per klien
+            max_clients: Maksimal klien stream di proses ini
+        """
+        self._fetch = fetch
+        self._last_id = last_id
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.max_clients = max_clients
+
+        self._cond = threading.Condition()
+        self._subscribers: List[Subscription] = []
+        self._cursor = None
+        self._poller = None
+
+    @property
+    def client_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, last_event_id: int = None) -> Optional[Subscription]:
+        """
+        📥 Daftarkan klien stream
+
+        Args:
+            last_event_id: ID event terakhir yang sudah diterima klien
+                (None = hanya event baru)
+
+        Returns:
+            Subscription, atau None jika klien sudah mencapai max_clients
+        """
+        with self._cond:
+            if len(self._subscribers) >= self.max_clients:
+                return None
+            if self._cursor is None:
+                self._cursor = self._last_id()
+            subscription = Subscription(self, self.buffer_size)
+            if last_event_id is not None and last_event_id < self._cursor:
+                for event in self._fetch(last_event_id, self._cursor - last_event_id):
+                    if event["id"] <= self._cursor:
+                        subscription._push(event)
+            self._subscribers.append(subscription)
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, daemon=True,
+                                                name="event-hub")
+                self._poller.start()
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._cond:
+            subscription.closed = True
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            self._cond.notify_all()
+
+    def _poll_loop(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._cond:
+                if not self._subscribers:
+                    # Tanpa klien: berhenti; cursor diambil ulang saat ada klien baru
+                    self._cursor = None
+                    self._poller = None
+                    return
+                cursor = self._cursor
+            try:
+                events = self._fetch(cursor, 500)
+            except Exception as e:
+                print(f"⚠️  Gagal membaca event: {e}")
+                continue
+            if not events:
+                continue
+            with self._cond:
+                for event in events:
+                    for subscription in self._subscribers:
+                        subscription._push(event)
+                self._cursor = events[-1]["id"]
+                self._cond.notify_all()
@@ -0,0 +1,229 @@
+"""
+🧬 MODUL FEATURE CACHE - FITUR BACKBONE BEKU UNTUK TRANSFER LEARNING
+Menyimpan vektor fitur setiap gambar (output backbone yang dibekukan) sekali
+saja, dengan key hash isi file (sha256)
+
+Cache terpisah per backbone: key backbone adalah hash bobotnya, jadi fitur
+lama tidak pernah tercampur dengan backbone lain, dan melatih ulang head
+tidak membatalkan cache.
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Lazy import TensorFlow to avoid slow startup
+_keras = None
+
+
+def _get_keras():
+    global _keras
+    if _keras is None:
+        import tensorflow as tf
+        _keras = tf.keras
+    return _keras
+
+
+class FrozenBackbone:
+    """
+    Feature extractor beku dari file model Keras
+
+    🧠 Cara Kerja:
+    1. File model klasifikasi (output = jumlah kelas, mis. model yang sedang
+       dipakai) -> fitur diambil dari layer sebelum output
+       (classifier.feature_extractor)
+    2. File backbone lokal (mis. MobileNetV2 include_top=False yang
+       di-bundle) -> output model itu sendiri, di-pool jika masih 4D
+    3. Input gambar uint8 dinormalisasi ke [-1, 1], sama dengan
+       WasteClassifier
+    4. fingerprint = sha256 bobot backbone (bukan file), sehingga model
+       hasil transfer learning yang berisi backbone yang sama tetap memakai
+       cache fitur yang sama
+    """
+
+    def __init__(self, model_path: str, num_classes: int = 5):
+        """
+        Load backbone
+
+        Args:
+            model_path: Path file model (.h5) klasifikasi atau backbone
+            num_classes: Jumlah kelas (untuk mengenali file model klasifikasi)
+        """
+        from modules.classifier import feature_extractor
+
+        keras = _get_keras()
+        self.model_path = str(model_path)
+        model = keras.models.load_model(self.model_path, compile=False)
+
+        if len(model.output_shape) == 2 and model.output_shape[-1] == num_classes:
+            model = feature_extractor(model)
+        if len(model.output_shape) == 4:
+            pooled = keras.layers.GlobalAveragePooling2D()(model.output)
+            model = keras.Model(inputs=model.inputs, outputs=pooled)
+
+        # Nama "backbone" dikenali feature_extractor pada model gabungan
+        self.model = keras.Model(inputs=model.inputs, outputs=model.outputs, name="backbone")
+        self.model.trainable = False
+        self._fingerprint = None
+
+    @property
+    def feature_dim(self) -> int:
+        """📏 Dimensi vektor fitur"""
+        return int(self.model.output_shape[-1])
+
+    @property
+    def fingerprint(self) -> str:
+        """🔖 sha256 dari seluruh bobot backbone"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for weight in self.model.get_weights():
+                digest.update(str(weight.shape).encode())
+                digest.update(np.ascontiguousarray(weight).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def extract(self, images: np.ndarray) -> np.ndarray:
+        """
+        🧬 Fitur untuk batch tensor uint8
+
+        Args:
+            images: Array uint8 dengan shape (N, 224, 224, 3)
+
+        Returns:
+            np.ndarray float32 dengan shape (N, feature_dim)
+        """
+        data = images.astype(np.float32)
+        data /= 127.5
+        data -= 1
+        features = self.model.predict_on_batch(data)
+        return np.asarray(features, dtype=np.float32).reshape(len(data), -1)
+
+
+class FeatureCache:
+    """
+    Cache vektor fitur per gambar untuk satu backbone
+
+    🧠 Cara Kerja:
+    1. Satu file SQLite per backbone (features_<fingerprint>.db), tabel
+       features(sha256, vector float32)
+    2. ensure() hanya menjalankan forward pass untuk gambar yang belum
+       punya fitur, jadi retraining setelah menambah gambar cukup
+       meng-embed gambar baru
+    3. Tulis per batch dalam satu transaksi (WAL), aman dipakai beberapa
+       proses sekaligus
+    """
+
+    def __init__(self, cache_dir: str, fingerprint: str, feature_dim: int):
+        """
+        Inisialisasi cache
+
+        Args:
+            cache_dir: Folder file cache
+            fingerprint: Identitas backbone (FrozenBackbone.fingerprint)
+            feature_dim: Dimensi vektor fitur
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.fingerprint = fingerprint
+        self.feature_dim = feature_dim
+        self.path = self.cache_dir / f"features_{fingerprint[:16]}.db"
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS features (sha256 TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def missing(self, sha256_list: List[str]) -> List[str]:
+        """🔎 sha256 yang belum punya fitur (urutan dipertahankan, tanpa duplikat)"""
+        found = set(self.get_many(sha256_list))
+        return [sha for sha in dict.fromkeys(sha256_list) if sha not in found]
+
+    def put_many(self, sha256_list: List[str], vectors: np.ndarray):
+        """💾 Simpan fitur untuk beberapa gambar"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(sha256_list), self.feature_dim)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO features VALUES (?, ?)",
+                    [(sha, vector.tobytes()) for sha, vector in zip(sha256_list, vectors)]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def get_many(self, sha256_list: List[str]) -> Dict[str, np.ndarray]:
+        """📤 Dict sha256 -> vektor fitur (yang belum di-cache tidak ada di dict)"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(sha256_list), 900):
+                chunk = sha256_list[start:start + 900]
+                rows = self._conn.execute(
+                    f"SELECT sha256, vector FROM features WHERE sha256 IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                found.update((sha, np.frombuffer(blob, dtype=np.float32)) for sha, blob in rows)
+        return found
+
+    def matrix(self, sha256_list: List[str]) -> np.ndarray:
+        """
+        🧮 Matriks fitur float32 (N, feature_dim) sesuai urutan sha256_list
+
+        Raises:
+            KeyError: Jika ada gambar yang belum punya fitur
+        """
+        found = self.get_many(sha256_list)
+        matrix = np.empty((len(sha256_list), self.feature_dim), dtype=np.float32)
+        for i, sha in enumerate(sha256_list):
+            matrix[i] = found[sha]
+        return matrix
+
+    def ensure(self, sha256_list: List[str], load_batch: Callable[[List[str]], np.ndarray],
+               backbone: FrozenBackbone, batch_size: int = 64) -> int:
+        """
+        🧬 Hitung fitur untuk gambar yang belum ada di cache
+
+        Args:
+            sha256_list: Gambar yang dibutuhkan
+            load_batch: Fungsi list sha256 -> tensor uint8 (N, 224, 224, 3)
+            backbone: Backbone yang sama dengan fingerprint cache
+            batch_size: Gambar per forward pass
+
+        Returns:
+            Jumlah gambar yang baru dihitung fiturnya
+        """
+        if backbone.fingerprint != self.fingerprint:
+            raise ValueError("Backbone tidak cocok dengan feature cache")
+        todo = self.missing(list(sha256_list))
+        for start in range(0, len(todo), batch_size):
+            chunk = todo[start:start + batch_size]
+            self.put_many(chunk, backbone.extract(load_batch(chunk)))
+        return len(todo)
+
+    def prune(self, live_sha256) -> int:
+        """
+        🧹 Hapus fitur gambar yang tidak ada lagi di dataset
+
+        Returns:
+            Jumlah fitur yang dihapus
+        """
+        live = set(live_sha256)
+        with self._lock:
+            stale = [(sha,) for (sha,) in self._conn.execute("SELECT sha256 FROM features") if sha not in live]
+            if stale:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("DELETE FROM features WHERE sha256 = ?", stale)
+                self._conn.execute("COMMIT")
+        return len(stale)
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
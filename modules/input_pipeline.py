@@ -0,0 +1,272 @@
+"""
+🚰 MODUL INPUT PIPELINE - tf.data UNTUK TRAINING
+Pengganti ImageDataGenerator: decode paralel, augmentasi per batch di
+TensorFlow (multi-thread), cache dan prefetch dengan autotune
+
+Augmentasi identik dengan ImageDataGenerator di trainer: satu matriks
+affine (rotasi, shift, shear, zoom) + flip horizontal, interpolasi bilinear,
+fill nearest, lalu normalisasi (x - 1) / 127.5.
+"""
+
+import math
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+IMAGE_SIZE = (224, 224)
+NUM_CLASSES = 5
+SHUFFLE_BUFFER = 1000  # Gambar uint8 di buffer shuffle (~150 MB)
+FILE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.ppm', '.tif', '.tiff')  # Sama dengan flow_from_directory
+
+# Parameter augmentasi (sama dengan ImageDataGenerator di ModelTrainer)
+AUGMENTATION = {
+    "rotation_range": 20,        # Derajat
+    "width_shift_range": 0.2,    # Fraksi lebar
+    "height_shift_range": 0.2,   # Fraksi tinggi
+    "shear_range": 0.2,          # Derajat (semantik Keras, bukan radian)
+    "zoom_range": 0.2,           # Zoom x dan y independen di [0.8, 1.2]
+    "horizontal_flip": True
+}
+
+_tf = None
+
+
+def _get_tf():
+    global _tf
+    if _tf is None:
+        import tensorflow as tf
+        _tf = tf
+    return _tf
+
+
+# ============================================
+# 📂 DAFTAR FILE
+# ============================================
+
+def list_directory_split(split_dir, class_names: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    📁 File di processed/{split}/{kelas} (layout flow_from_directory)
+
+    Returns:
+        Tuple (list path, list index kelas)
+    """
+    paths, labels = [], []
+    for index, name in enumerate(class_names):
+        class_dir = Path(split_dir) / name
+        if not class_dir.is_dir():
+            continue
+        for path in sorted(class_dir.iterdir()):
+            if path.is_file() and path.suffix.lower() in FILE_EXTENSIONS:
+                paths.append(str(path))
+                labels.append(index)
+    return paths, labels
+
+
+def list_manifest_split(manifest: Dict, split_name: str, class_names: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    📄 File satu split dari manifest (processed/manifest.json)
+
+    Returns:
+        Tuple (list path, list index kelas)
+    """
+    raw_dir = Path(manifest["raw_data_dir"])
+    entries = manifest["splits"].get(split_name, [])
+    return ([str(raw_dir / entry[0] / entry[1]) for entry in entries],
+            [class_names.index(entry[0]) for entry in entries])
+
+
+# ============================================
+# 🎨 AUGMENTASI & NORMALISASI
+# ============================================
+
+def affine_transforms(theta, tx, ty, shear, zx, zy, flip, height: int, width: int):
+    """
+    📐 Matriks transform per gambar dalam format ImageProjectiveTransform
+    (8 angka, memetakan koordinat output ke input)
+
+    Dibangun persis seperti ImageDataGenerator.apply_affine_transform:
+    M = rotasi @ shift @ shear @ zoom, digeser ke tengah gambar; koordinat
+    pertama matriks adalah kolom (x), sama dengan konvensi TensorFlow.
+    Flip horizontal diterapkan setelah transform (seperti Keras).
+
+    Args:
+        theta, shear: Sudut (radian), tensor [B]
+        tx, ty: Shift (piksel), tensor [B]
+        zx, zy: Faktor zoom, tensor [B]
+        flip: Flip horizontal, tensor bool [B]
+    """
+    tf = _get_tf()
+
+    # rotasi @ shift @ shear @ zoom, dijabarkan per elemen (baris ketiga = [0, 0, 1])
+    cos, sin = tf.cos(theta), tf.sin(theta)
+    sh_sin, sh_cos = -tf.sin(shear), tf.cos(shear)
+    a0 = cos * zx
+    a1 = (cos * sh_sin - sin * sh_cos) * zy
+    a2 = cos * tx - sin * ty
+    b0 = sin * zx
+    b1 = (sin * sh_sin + cos * sh_cos) * zy
+    b2 = sin * tx + cos * ty
+
+    # Geser ke tengah: offset @ M @ reset (transform_matrix_offset_center)
+    o_x, o_y = height / 2 - 0.5, width / 2 - 0.5
+    a2 = a2 + o_x - a0 * o_x - a1 * o_y
+    b2 = b2 + o_y - b0 * o_x - b1 * o_y
+
+    # M @ F dengan F: x -> (width - 1) - x
+    a2 = tf.where(flip, a2 + a0 * (width - 1), a2)
+    b2 = tf.where(flip, b2 + b0 * (width - 1), b2)
+    a0 = tf.where(flip, -a0, a0)
+    b0 = tf.where(flip, -b0, b0)
+
+    zeros = tf.zeros_like(a0)
+    return tf.stack([a0, a1, a2, b0, b1, b2, zeros, zeros], axis=1)
+
+
+def augmentation_transforms(batch_size, height: int, width: int, params: Dict = None):
+    """
+    🎲 Parameter acak per gambar dengan distribusi yang sama seperti
+    ImageDataGenerator.get_random_transform, lalu affine_transforms
+    """
+    tf = _get_tf()
+    params = params or AUGMENTATION
+    shape = tf.reshape(batch_size, [1])
+
+    def uniform(limit):
+        return tf.random.uniform(shape, -limit, limit)
+
+    flip = tf.random.uniform(shape) < 0.5
+    if not params["horizontal_flip"]:
+        flip = tf.zeros(shape, dtype=tf.bool)
+    return affine_transforms(
+        theta=uniform(params["rotation_range"]) * (math.pi / 180),
+        tx=uniform(params["height_shift_range"]) * height,
+        ty=uniform(params["width_shift_range"]) * width,
+        shear=uniform(params["shear_range"]) * (math.pi / 180),
+        zx=1 + uniform(params["zoom_range"]),
+        zy=1 + uniform(params["zoom_range"]),
+        flip=flip,
+        height=height,
+        width=width
+    )
+
+
+def augment_batch(images, params: Dict = None):
+    """🎨 Augmentasi satu batch float32 [B, H, W, 3] dalam satu warp affine"""
+    tf = _get_tf()
+    height, width = images.shape[1], images.shape[2]
+    transforms = augmentation_transforms(tf.shape(images)[0], height, width, params)
+    return tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=tf.constant([height, width], dtype=tf.int32),
+        fill_value=tf.constant(0.0),
+        interpolation="BILINEAR",
+        fill_mode="NEAREST"
+    )
+
+
+def normalize(images):
+    """➗ Sama dengan ImageDataGenerator(preprocessing_function=x - 1, rescale=1/127.5)"""
+    return (images - 1.0) * (1.0 / 127.5)
+
+
+def _finish_batch(training: bool):
+    tf = _get_tf()
+
+    def finish(images, labels):
+        images = tf.cast(images, tf.float32)
+        if training:
+            images = augment_batch(images)
+        return normalize(images), tf.one_hot(labels, NUM_CLASSES)
+    return finish
+
+
+def _load_image(path, label):
+    """Decode + resize nearest (seperti load_img Keras), hasil uint8"""
+    tf = _get_tf()
+    data = tf.io.read_file(path)
+    # INTEGER_ACCURATE = IDCT yang sama dengan PIL (hasil decode identik)
+    image = tf.cond(
+        tf.io.is_jpeg(data),
+        lambda: tf.io.decode_jpeg(data, channels=3, dct_method="INTEGER_ACCURATE"),
+        lambda: tf.io.decode_image(data, channels=3, expand_animations=False)
+    )
+    image = tf.image.resize(image, IMAGE_SIZE, method="nearest")
+    image = tf.cast(image, tf.uint8)
+    image.set_shape(IMAGE_SIZE + (3,))
+    return image, label
+
+
+# ============================================
+# 🚰 DATASET
+# ============================================
+
+def dataset_from_files(paths: List[str], labels: List[int], batch_size: int, training: bool,
+                       memory_cache_bytes: int = 2 * 1024 ** 3, stamps=None):
+    """
+    🚰 Dataset dari file gambar: decode paralel, cache uint8 di memori
+    (jika muat dalam memory_cache_bytes), shuffle, batch, augmentasi,
+    prefetch
+
+    Args:
+        stamps: InputStamps (modules/training_metrics.py) yang mencatat
+            kapan tiap batch siap, opsional
+
+    Returns:
+        tf.data.Dataset berisi (gambar float32, label one-hot)
+    """
+    tf = _get_tf()
+    autotune = tf.data.AUTOTUNE
+    dataset = tf.data.Dataset.from_tensor_slices((
+        tf.constant(paths, dtype=tf.string), np.asarray(labels, dtype=np.int32)
+    ))
+    if training:
+        # Shuffle path dulu agar urutan decode (dan isi cache) sudah acak
+        dataset = dataset.shuffle(max(1, len(paths)), reshuffle_each_iteration=False)
+    dataset = dataset.map(_load_image, num_parallel_calls=autotune, deterministic=not training)
+    if len(paths) * IMAGE_SIZE[0] * IMAGE_SIZE[1] * 3 <= memory_cache_bytes:
+        dataset = dataset.cache()
+    if training:
+        dataset = dataset.shuffle(min(max(1, len(paths)), SHUFFLE_BUFFER), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(_finish_batch(training), num_parallel_calls=autotune)
+    if stamps is not None:
+        dataset = dataset.map(stamps.stamp)
+    return dataset.prefetch(autotune)
+
+
+def dataset_from_tensor_cache(cache, shards, slots, labels: List[int], batch_size: int, training: bool,
+                              stamps=None):
+    """
+    🧊 Dataset dari TensorCache: yang di-shuffle hanya index (shard, slot),
+    batch uint8 diambil dari shard memory-mapped lalu diaugmentasi
+
+    Args:
+        stamps: InputStamps yang mencatat kapan tiap batch siap, opsional
+
+    Returns:
+        tf.data.Dataset berisi (gambar float32, label one-hot)
+    """
+    tf = _get_tf()
+    autotune = tf.data.AUTOTUNE
+    image_shape = tuple(cache.image_size) + (3,)
+
+    def gather(batch_shards, batch_slots, batch_labels):
+        images = tf.numpy_function(cache.gather, [batch_shards, batch_slots], tf.uint8)
+        images.set_shape((None,) + image_shape)
+        return images, batch_labels
+
+    dataset = tf.data.Dataset.from_tensor_slices((
+        np.asarray(shards, dtype=np.int64),
+        np.asarray(slots, dtype=np.int64),
+        np.asarray(labels, dtype=np.int32)
+    ))
+    if training:
+        dataset = dataset.shuffle(max(1, len(labels)), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(gather, num_parallel_calls=autotune, deterministic=not training)
+    dataset = dataset.map(_finish_batch(training), num_parallel_calls=autotune)
+    if stamps is not None:
+        dataset = dataset.map(stamps.stamp)
+    return dataset.prefetch(autotune)
@@ -0,0 +1,319 @@
+"""
+🗳️ MODUL KNN CLASSIFIER - KLASIFIKASI TANPA TRAINING
+Klasifikasi dengan voting k tetangga terdekat (cosine similarity) di antara
+embedding semua gambar berlabel
+
+Gambar yang baru ditambahkan langsung ikut voting, tanpa /api/train.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class KNNClassifier:
+    """
+    Classifier k-NN di atas embedding gambar berlabel
+
+    🧠 Cara Kerja:
+    1. Embedding ter-normalisasi L2 disimpan di satu matriks float32
+       (kapasitas doubling), label kelas di array int
+    2. Sampai exact_max vektor: cosine similarity ke semua vektor dalam
+       satu perkalian matriks, lalu argpartition (exact)
+    3. Di atas exact_max: index IVF. Centroid k-means (±sqrt(N) list),
+       query hanya men-scan nprobe list terdekat lalu top-k exact di
+       kandidat. Vektor baru langsung masuk list centroid terdekatnya;
+       centroid dilatih ulang setiap jumlah vektor naik 2x
+    4. Hapus/timpa = tombstone (skor -inf), dibersihkan saat compact
+    5. Voting berbobot similarity -> probabilitas per kelas; blend()
+       menggabungkannya dengan softmax CNN
+    """
+
+    def __init__(self, class_names: List[str], k: int = 10, exact_max: int = 4096,
+                 nprobe: int = 8, seed: int = 42):
+        """
+        Inisialisasi classifier
+
+        Args:
+            class_names: Nama kelas, urutan sama dengan output CNN
+            k: Jumlah tetangga yang ikut voting
+            exact_max: Di bawah jumlah ini selalu pakai pencarian exact
+            nprobe: Jumlah list IVF yang di-scan per query
+            seed: Seed k-means
+        """
+        self.class_names = list(class_names)
+        self.k = k
+        self.exact_max = exact_max
+        self.nprobe = nprobe
+        self.seed = seed
+
+        self.keys: List[Optional[str]] = []
+        self._key_to_row: Dict[str, int] = {}
+        self._matrix = None
+        self._labels = None
+        self._alive = None
+        self._size = 0
+        self._live = 0
+        self._lock = threading.RLock()
+
+        # Struktur IVF (dibuat oleh _train_ivf)
+        self._centroids = None
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = None
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    @classmethod
+    def from_index(cls, index, class_names: List[str], **kwargs) -> "KNNClassifier":
+        """
+        🧭 Bangun dari EmbeddingIndex (key "kategori/nama_file"); kategori
+        yang tidak ada di class_names dilewati
+        """
+        knn = cls(class_names, **kwargs)
+        keys = list(index.keys)
+        vectors = index.vectors()
+        rows, labels = [], []
+        for row, key in enumerate(keys):
+            label = knn.class_index(key.split("/", 1)[0])
+            if label is not None:
+                rows.append(row)
+                labels.append(label)
+        if rows:
+            knn.add([keys[row] for row in rows], labels, vectors[rows])
+        return knn
+
+    def class_index(self, category: str) -> Optional[int]:
+        """🏷️ Index kelas untuk nama kategori (tidak case-sensitive), None jika tidak ada"""
+        names = [name.lower() for name in self.class_names]
+        category = category.lower()
+        return names.index(category) if category in names else None
+
+    # ============================================
+    # ➕ UPDATE
+    # ============================================
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _ensure_capacity(self, dim: int, extra: int):
+        """📏 Alokasi ulang matriks dengan strategi doubling"""
+        if self._matrix is None:
+            capacity = max(1024, extra)
+            self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+            self._labels = np.zeros(capacity, dtype=np.int32)
+            self._alive = np.zeros(capacity, dtype=bool)
+            return
+        if dim != self._matrix.shape[1]:
+            raise ValueError(f"Dimensi embedding {dim} != dimensi classifier {self._matrix.shape[1]}")
+        needed = self._size + extra
+        if needed > len(self._matrix):
+            capacity = max(needed, len(self._matrix) * 2)
+            for name in ("_matrix", "_labels", "_alive"):
+                old = getattr(self, name)
+                grown = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+                grown[:self._size] = old[:self._size]
+                setattr(self, name, grown)
+
+    def add(self, keys: List[str], labels, vectors: np.ndarray):
+        """
+        ➕ Tambah (atau timpa) embedding berlabel; langsung ikut voting
+
+        Args:
+            keys: List key unik, format "kategori/nama_file"
+            labels: Index kelas (sesuai class_names) per key
+            vectors: Array float (N, dim)
+        """
+        vectors = self._normalize(np.atleast_2d(vectors))
+        labels = np.asarray(labels, dtype=np.int32).reshape(-1)
+        if not (len(keys) == len(labels) == len(vectors)):
+            raise ValueError("Jumlah key, label, dan vektor harus sama")
+        if len(keys) == 0:
+            return
+
+        with self._lock:
+            for key in keys:
+                self._discard(key)
+            self._ensure_capacity(vectors.shape[1], len(keys))
+
+            rows = np.arange(self._size, self._size + len(keys))
+            self._matrix[rows] = vectors
+            self._labels[rows] = labels
+            self._alive[rows] = True
+            for key, row in zip(keys, rows):
+                self.keys.append(key)
+                self._key_to_row[key] = int(row)
+            self._size += len(keys)
+            self._live += len(keys)
+
+            if self._centroids is not None:
+                self._assign_to_lists(rows)
+            if self._live >= self.exact_max and self._live >= 2 * self._trained_size:
+                self._train_ivf()
+            elif self._size - self._live > max(1024, self._live):
+                self._compact()
+
+    def _discard(self, key: str) -> bool:
+        row = self._key_to_row.pop(key, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self.keys[row] = None
+        self._live -= 1
+        return True
+
+    def remove(self, key: str) -> bool:
+        """
+        ➖ Hapus embedding (tombstone)
+
+        Returns:
+            bool: True jika key ada dan dihapus
+        """
+        with self._lock:
+            return self._discard(key)
+
+    def _compact(self):
+        """🧹 Buang baris tombstone; list IVF dibangun ulang"""
+        rows = np.flatnonzero(self._alive[:self._size])
+        self._matrix[:len(rows)] = self._matrix[rows]
+        self._labels[:len(rows)] = self._labels[rows]
+        self._alive[:len(rows)] = True
+        self._alive[len(rows):] = False
+        self.keys = [self.keys[row] for row in rows]
+        self._key_to_row = {key: row for row, key in enumerate(self.keys)}
+        self._size = len(rows)
+        if self._centroids is not None:
+            self._rebuild_lists()
+
+    # ============================================
+    # 🗂️ INDEX IVF
+    # ============================================
+
+    def _nearest_centroid(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), 8192):
+            assignment[start:start + 8192] = np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1)
+        return assignment
+
+    def _train_ivf(self, iterations: int = 8):
+        """
+        🎯 Spherical k-means pada sampel vektor, lalu semua vektor
+        dimasukkan ke list centroid terdekat
+        """
+        self._compact()
+        vectors = self._matrix[:self._size]
+        nlist = int(np.clip(np.sqrt(self._size), 16, 1024))
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(self._size, size=min(self._size, nlist * 40), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._nearest_centroid(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=nlist)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = self._normalize(sums)
+
+        self._centroids = centroids
+        self._trained_size = self._size
+        self._rebuild_lists()
+
+    def _rebuild_lists(self):
+        assignment = self._nearest_centroid(self._matrix[:self._size], self._centroids)
+        order = np.argsort(assignment, kind="stable")
+        sizes = np.bincount(assignment, minlength=len(self._centroids))
+        self._lists = np.split(order, np.cumsum(sizes)[:-1])
+        self._list_sizes = sizes.astype(np.int64)
+
+    def _assign_to_lists(self, rows: np.ndarray):
+        """Masukkan baris baru ke list centroid terdekat (kapasitas doubling)"""
+        assignment = self._nearest_centroid(self._matrix[rows], self._centroids)
+        for row, centroid in zip(rows, assignment):
+            size = self._list_sizes[centroid]
+            members = self._lists[centroid]
+            if size == len(members):
+                grown = np.empty(max(16, size * 2), dtype=np.int64)
+                grown[:size] = members[:size]
+                members = self._lists[centroid] = grown
+            members[size] = row
+            self._list_sizes[centroid] = size + 1
+
+    # ============================================
+    # 🗳️ KLASIFIKASI
+    # ============================================
+
+    def _neighbors(self, query: np.ndarray, k: int):
+        """(rows, similarity) k tetangga hidup, urut dari yang paling mirip"""
+        candidates = None
+        if self._centroids is not None:
+            nprobe = min(self.nprobe, len(self._centroids))
+            probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+            candidates = np.concatenate([self._lists[c][:self._list_sizes[c]] for c in probe])
+            if len(candidates) < k:
+                candidates = None  # Kandidat kurang, fallback ke exact
+
+        if candidates is None:
+            candidates = np.arange(self._size)
+            scores = self._matrix[:self._size] @ query
+        else:
+            scores = self._matrix[candidates] @ query
+        scores[~self._alive[candidates]] = -np.inf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        return candidates[top], scores[top]
+
+    def classify(self, vector: np.ndarray, k: int = None) -> Optional[Dict]:
+        """
+        🗳️ Klasifikasi satu embedding dengan voting k tetangga
+
+        Args:
+            vector: Embedding query (dim,)
+            k: Jumlah tetangga (default: self.k)
+
+        Returns:
+            Dict probabilities (np.ndarray float32 per kelas) dan neighbors
+            (list dict key, class_name, similarity), atau None jika belum
+            ada embedding
+        """
+        query = self._normalize(np.atleast_2d(vector))[0]
+        with self._lock:
+            if self._live == 0:
+                return None
+            rows, scores = self._neighbors(query, k or self.k)
+            labels = self._labels[rows]
+            neighbors = [
+                {"key": self.keys[row], "class_name": self.class_names[label], "similarity": float(score)}
+                for row, label, score in zip(rows, labels, scores)
+            ]
+
+        votes = np.bincount(labels, weights=np.maximum(scores, 0), minlength=len(self.class_names))
+        if votes.sum() == 0:
+            votes = np.bincount(labels, minlength=len(self.class_names)).astype(np.float64)
+        return {
+            "probabilities": (votes / votes.sum()).astype(np.float32),
+            "neighbors": neighbors
+        }
+
+
+def blend(knn_probabilities: np.ndarray, cnn_probabilities: np.ndarray, knn_weight: float = 0.5) -> np.ndarray:
+    """
+    🔀 Gabungkan probabilitas k-NN dan softmax CNN (rata-rata berbobot)
+
+    Args:
+        knn_probabilities: Probabilitas voting k-NN per kelas
+        cnn_probabilities: Softmax CNN per kelas (urutan kelas sama)
+        knn_weight: Bobot k-NN, 0 = CNN saja, 1 = k-NN saja
+    """
+    return (knn_weight * np.asarray(knn_probabilities, dtype=np.float32)
+            + (1 - knn_weight) * np.asarray(cnn_probabilities, dtype=np.float32))
@@ -0,0 +1,341 @@
+"""
+🪞 MODUL NEAR DUPLICATES - DETEKSI GAMBAR HAMPIR SAMA
+Mencari gambar yang hampir identik (burst shot, crop/kompresi ulang) di
+dataset dengan perceptual hash + multi-index hashing (LSH berbasis band)
+
+Cara pakai (offline):
+    python -m modules.near_duplicates --dataset-dir backend/dataset_private
+    python -m modules.near_duplicates --dataset-dir backend/dataset_private --collapse
+"""
+
+import sqlite3
+import threading
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+BAND_BITS = 16
+BANDS = HASH_BITS // BAND_BITS
+DEFAULT_THRESHOLD = 6  # Jarak Hamming maksimal (dari 64 bit) untuk dianggap near-duplicate
+
+# Popcount per 16 bit untuk menghitung jarak Hamming secara vektor
+_POPCOUNT = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Jumlah bit 1 per elemen array uint64"""
+    return _POPCOUNT[values.view(np.uint16).reshape(values.shape + (4,))].sum(axis=-1, dtype=np.int64)
+
+
+def dhash(image_path, hash_size: int = 8) -> int:
+    """
+    🔑 Difference hash 64-bit
+
+    Gambar dikecilkan ke (hash_size+1) x hash_size grayscale, tiap bit = apakah
+    piksel lebih terang dari tetangga kanannya. Tahan terhadap resize,
+    kompresi ulang dan perubahan kecerahan; cepat karena memakai JPEG draft.
+    """
+    with Image.open(image_path) as image:
+        image.draft("L", (hash_size * 8, hash_size * 8))
+        pixels = np.asarray(
+            image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR),
+            dtype=np.int16
+        )
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming_distances(hash_value: int, hashes: np.ndarray) -> np.ndarray:
+    """📏 Jarak Hamming satu hash ke array hash uint64"""
+    return _popcount(np.bitwise_xor(hashes, np.uint64(hash_value)))
+
+
+def _flip_masks(radius: int) -> np.ndarray:
+    """Semua mask 16 bit dengan maksimal `radius` bit 1 (termasuk 0)"""
+    masks = [0]
+    for count in range(1, radius + 1):
+        masks.extend(sum(1 << bit for bit in bits) for bits in combinations(range(BAND_BITS), count))
+    return np.array(masks, dtype=np.int64)
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+class NearDuplicateIndex:
+    """
+    Index perceptual hash untuk seluruh dataset
+
+    🧠 Cara Kerja:
+    1. Setiap gambar di-hash (dHash 64-bit); hash di-cache di SQLite dengan
+       key hash isi file (sha256), jadi hanya gambar baru yang di-hash
+    2. Multi-index hashing: 64 bit dibagi menjadi 4 band 16 bit. Dua hash
+       berjarak <= threshold pasti berbeda <= threshold // 4 bit di minimal
+       satu band (pigeonhole), jadi kandidat cukup dicari di bucket band
+       tersebut dan tetangganya (tanpa kehilangan pasangan)
+    3. Kandidat diverifikasi dengan jarak Hamming (numpy), pasangan yang
+       lolos digabung dengan union-find menjadi cluster
+    4. Biaya ~ N * kandidat per gambar, bukan N^2
+    """
+
+    def __init__(self, cache_path: str, threshold: int = DEFAULT_THRESHOLD):
+        """
+        Inisialisasi index
+
+        Args:
+            cache_path: Path SQLite cache hash (key: sha256 isi file)
+            threshold: Jarak Hamming maksimal untuk near-duplicate
+        """
+        self.cache_path = Path(cache_path)
+        self.threshold = threshold
+
+        self.keys: List[str] = []
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self._index_unique()
+        self._cache: Dict[str, int] = {}  # sha256 -> hash (signed 64-bit)
+        self._bands = None
+        self._lock = threading.Lock()
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.cache_path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS phash (sha256 TEXT PRIMARY KEY, hash INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    # ============================================
+    # 🔄 SINKRONISASI DENGAN KATALOG
+    # ============================================
+
+    def sync(self, records: List[dict], raw_data_dir: str) -> int:
+        """
+        🔄 Samakan index dengan record katalog dataset
+
+        Args:
+            records: Record DatasetCatalog (category, filename, sha256)
+            raw_data_dir: Folder dataset/raw
+
+        Returns:
+            Jumlah gambar yang baru di-hash
+        """
+        raw_data_dir = Path(raw_data_dir)
+        with self._lock:
+            cached = self._cache
+            shas = [r["sha256"] for r in records if r["sha256"] not in cached]
+            for start in range(0, len(shas), 900):
+                chunk = shas[start:start + 900]
+                rows = self._conn.execute(
+                    f"SELECT sha256, hash FROM phash WHERE sha256 IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                cached.update(rows)
+
+            computed = []
+            keys, values = [], []
+            for record in records:
+                value = cached.get(record["sha256"])
+                if value is None:
+                    path = raw_data_dir / record["category"] / record["filename"]
+                    try:
+                        value = np.int64(np.uint64(dhash(path))).item()  # SQLite: signed 64-bit
+                    except Exception as e:
+                        print(f"⚠️  Gagal hash {path}: {e}")
+                        continue
+                    cached[record["sha256"]] = value
+                    computed.append((record["sha256"], value))
+                keys.append(f"{record['category']}/{record['filename']}")
+                values.append(value)
+
+            if computed:
+                self._conn.executemany("INSERT OR REPLACE INTO phash VALUES (?, ?)", computed)
+                self._conn.commit()
+
+            self.keys = keys
+            self.hashes = np.array(values, dtype=np.int64).view(np.uint64)
+            self._index_unique()
+            return len(computed)
+
+    def _index_unique(self):
+        """
+        Hash identik (duplikat persis, gambar polos) digabung dulu: pencarian
+        berjalan di hash unik, lalu diperluas ke semua baris dengan hash itu
+        """
+        self._unique, inverse = np.unique(self.hashes, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(self._unique))
+        self._rows = np.argsort(inverse, kind="stable")
+        self._row_starts = np.cumsum(counts) - counts
+        self._row_counts = counts
+        self._bands = None
+
+    def _rows_of(self, unique_id: int) -> np.ndarray:
+        start = self._row_starts[unique_id]
+        return self._rows[start:start + self._row_counts[unique_id]]
+
+    # ============================================
+    # 🔎 PENCARIAN
+    # ============================================
+
+    def _band_tables(self):
+        """
+        Per band 16 bit: (nilai band per hash unik, urutan, awal bucket,
+        ukuran bucket); bucket dialamatkan langsung dengan nilai band
+        (tabel 65536 entri). Di-cache sampai sync berikutnya
+        """
+        if self._bands is None:
+            self._bands = []
+            for band in range(BANDS):
+                values = ((self._unique >> np.uint64(band * BAND_BITS))
+                          & np.uint64((1 << BAND_BITS) - 1)).astype(np.int64)
+                order = np.argsort(values, kind="stable")
+                counts = np.bincount(values, minlength=1 << BAND_BITS)
+                self._bands.append((values, order, np.cumsum(counts) - counts, counts))
+        return self._bands
+
+    def query(self, hash_value: int, threshold: int = None) -> List[Tuple[str, int]]:
+        """
+        🔎 Gambar yang mirip dengan satu hash (mis. untuk upload baru)
+
+        Returns:
+            List (key, jarak) urut dari yang paling mirip
+        """
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            if len(self._unique) == 0:
+                return []
+
+            candidates = []
+            flips = _flip_masks(threshold // BANDS)
+            for band, (_, order, starts, counts) in enumerate(self._band_tables()):
+                targets = ((hash_value >> (band * BAND_BITS)) & ((1 << BAND_BITS) - 1)) ^ flips
+                candidates.extend(order[a:a + n] for a, n in zip(starts[targets], counts[targets]) if n)
+            if not candidates:
+                return []
+            unique_ids = np.unique(np.concatenate(candidates))
+            distances = hamming_distances(hash_value, self._unique[unique_ids])
+            result = []
+            for distance, unique_id in sorted(zip(distances.tolist(), unique_ids.tolist())):
+                if distance <= threshold:
+                    result.extend((self.keys[row], distance) for row in self._rows_of(unique_id))
+            return result
+
+    def _unique_pairs(self, threshold: int, max_block: int = 4_000_000) -> np.ndarray:
+        """
+        🔗 Pasangan hash unik (i, j), i < j, dengan jarak <= threshold
+
+        Untuk setiap band dan setiap variasi band (flip <= threshold // 4
+        bit), hash dicocokkan dengan isi bucket nilai band tersebut. Semua
+        langkah vektor numpy; kandidat diproses per blok agar memori
+        terbatas walau ada bucket sangat besar.
+        """
+        size = len(self._unique)
+        flips = _flip_masks(threshold // BANDS)
+        found = []
+        for values, order, bucket_starts, bucket_counts in self._band_tables():
+            for flip in flips:
+                targets = values ^ flip
+                lo = bucket_starts[targets]
+                counts = bucket_counts[targets]
+                ends = np.cumsum(counts)
+
+                start = 0
+                while start < size:
+                    base = ends[start - 1] if start else 0
+                    stop = max(start + 1, int(np.searchsorted(ends, base + max_block, side="right")))
+                    block_counts = counts[start:stop]
+                    total = int(block_counts.sum())
+                    if total:
+                        i = np.repeat(np.arange(start, stop), block_counts)
+                        offsets = np.arange(total) - np.repeat(np.cumsum(block_counts) - block_counts,
+                                                               block_counts)
+                        j = order[np.repeat(lo[start:stop], block_counts) + offsets]
+                        upper = i < j
+                        i, j = i[upper], j[upper]
+                        close = _popcount(np.bitwise_xor(self._unique[i], self._unique[j])) <= threshold
+                        if close.any():
+                            found.append(np.stack([i[close], j[close]], axis=1))
+                    start = stop
+        if not found:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.unique(np.concatenate(found), axis=0)
+
+    def clusters(self, threshold: int = None) -> List[List[str]]:
+        """
+        🧩 Cluster near-duplicate (komponen terhubung, ukuran >= 2)
+
+        Returns:
+            List cluster (list key), cluster terbesar dulu
+        """
+        threshold = self.threshold if threshold is None else threshold
+        with self._lock:
+            pairs = self._unique_pairs(threshold)
+            union_find = _UnionFind(len(self._unique))
+            for i, j in pairs:
+                union_find.union(int(i), int(j))
+
+            members: Dict[int, List[str]] = {}
+            grouped = np.union1d(pairs.ravel(), np.flatnonzero(self._row_counts > 1))
+            for unique_id in grouped:
+                members.setdefault(union_find.find(int(unique_id)), []).extend(
+                    self.keys[row] for row in self._rows_of(unique_id)
+                )
+        return sorted((sorted(c) for c in members.values()), key=lambda c: (-len(c), c[0]))
+
+    def close(self):
+        self._conn.close()
+
+
+# 🧪 CLI
+if __name__ == "__main__":
+    import argparse
+    import json
+    import sys
+    import time
+
+    sys.path.append(str(Path(__file__).parent.parent))
+    from modules.data_manager import DataManager
+
+    parser = argparse.ArgumentParser(description="Cari gambar near-duplicate di dataset")
+    parser.add_argument("--dataset-dir", required=True, help="Folder berisi raw/ dan processed/")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--collapse", action="store_true",
+                        help="Sisakan satu gambar per cluster (lainnya dipindah ke near_duplicates_removed/)")
+    parser.add_argument("--output", help="Simpan daftar cluster ke file JSON")
+    args = parser.parse_args()
+
+    dataset_dir = Path(args.dataset_dir)
+    manager = DataManager(str(dataset_dir / "raw"), str(dataset_dir / "processed"))
+
+    start = time.perf_counter()
+    report = manager.find_near_duplicates(args.threshold)
+    print(f"🪞 {len(report['clusters'])} cluster, {report['redundant_images']} gambar berlebih "
+          f"dari {report['total_images']} ({time.perf_counter() - start:.1f}s, "
+          f"{report['newly_hashed']} gambar baru di-hash)")
+    for cluster in report["clusters"][:20]:
+        print(f"   {len(cluster)}x: {', '.join(cluster[:5])}{' ...' if len(cluster) > 5 else ''}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.collapse:
+        result = manager.collapse_near_duplicates(args.threshold)
+        print(f"🧹 {result['removed']} gambar dipindah ke {result['moved_to']}")
@@ -0,0 +1,183 @@
+"""
+🧷 MODUL SHARED STATE - STATE BERSAMA ANTAR PROSES (MMAP)
+State kecil yang harus sama di semua worker gunicorn dan training worker
+(status training, versi & akurasi model, counter) disimpan di satu file
+yang di-mmap semua proses. Baca tanpa lock dalam hitungan mikrodetik,
+tulis atomik.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict
+
+try:
+    import fcntl
+except ImportError:  # Windows: penulis hanya diserialisasi per proses
+    fcntl = None
+
+MAGIC = b"SWCSTAT1"
+# magic (8) | sequence (u64) | panjang payload (u32) | padding -> 32 byte
+_HEADER = struct.Struct("<8sQI")
+_SEQ = struct.Struct("<Q")
+_LENGTH = struct.Struct("<I")
+HEADER_SIZE = 32
+DEFAULT_SIZE = 64 * 1024
+
+
+class StateOverflowError(ValueError):
+    """Payload JSON melebihi kapasitas file state; state lama tidak berubah"""
+
+
+class SharedState:
+    """
+    Dict JSON kecil di file mmap, dibagi semua proses di host
+
+    🧠 Cara Kerja (seqlock):
+    1. Penulis (diserialisasi thread lock + flock) menaikkan sequence
+       menjadi ganjil, menulis payload JSON, lalu menaikkan sequence
+       menjadi genap
+    2. Pembaca tidak mengambil lock: baca sequence, salin payload, baca
+       sequence lagi. Jika ganjil atau berubah, ada penulisan di tengah
+       jalan -> ulangi
+    3. Hasil parse di-cache per sequence: selama tidak ada penulisan baru,
+       snapshot() hanya membaca 8 byte sequence
+    4. Penulis yang mati di tengah penulisan (sequence ganjil, flock sudah
+       lepas) diperbaiki pembaca berikutnya di bawah lock penulis
+    """
+
+    def __init__(self, path: str, size: int = DEFAULT_SIZE):
+        """
+        Inisialisasi store
+
+        Args:
+            path: File state (dibuat jika belum ada); harus di disk lokal
+            size: Ukuran file = batas ukuran payload JSON + header
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread_lock = threading.Lock()
+        self._file = open(self.path, "a+b")
+
+        with self._write_lock():
+            self._file.seek(0, os.SEEK_END)
+            if self._file.tell() < size:
+                self._file.truncate(size)
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+            if self._mm[:len(MAGIC)] != MAGIC:
+                self._publish({}, sequence=0)
+        self.size = len(self._mm)
+        self._cache_seq = None
+        self._cache = {}
+
+    # ============================================
+    # 📖 BACA (TANPA LOCK)
+    # ============================================
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        📖 Snapshot konsisten seluruh state
+
+        Returns:
+            Dict state; dipakai bersama antar pemanggil, jangan diubah
+        """
+        spins = 0
+        while True:
+            seq = _SEQ.unpack_from(self._mm, 8)[0]
+            if seq == self._cache_seq:
+                return self._cache
+            if not seq & 1:
+                length = _LENGTH.unpack_from(self._mm, 16)[0]
+                payload = self._mm[HEADER_SIZE:HEADER_SIZE + length]
+                if _SEQ.unpack_from(self._mm, 8)[0] == seq:
+                    try:
+                        data = json.loads(payload)
+                    except ValueError:
+                        data = None  # Payload sobek: ulangi
+                    if data is not None:
+                        self._cache, self._cache_seq = data, seq
+                        return data
+            spins += 1
+            if spins > 1000:
+                self._repair()
+                spins = 0
+            time.sleep(0)
+
+    def get(self, key: str, default=None):
+        return self.snapshot().get(key, default)
+
+    # ============================================
+    # ✏️ TULIS (ATOMIK)
+    # ============================================
+
+    @contextmanager
+    def transaction(self):
+        """
+        ✏️ Read-modify-write atomik antar proses
+
+        Contoh:
+            with state.transaction() as data:
+                data["counters"]["trainings"] += 1
+        """
+        with self._write_lock():
+            data = json.loads(json.dumps(self._read_locked()))
+            yield data
+            self._publish(data)
+
+    def update(self, **entries):
+        """📝 Ganti nilai beberapa key sekaligus"""
+        with self.transaction() as data:
+            data.update(entries)
+
+    def increment(self, name: str, amount: int = 1) -> int:
+        """➕ Tambah counter di key "counters", return nilai baru"""
+        with self.transaction() as data:
+            counters = data.setdefault("counters", {})
+            counters[name] = counters.get(name, 0) + amount
+            return counters[name]
+
+    @contextmanager
+    def _write_lock(self):
+        with self._thread_lock:
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _read_locked(self) -> Dict:
+        # Pemegang lock penulis: tidak ada penulisan lain yang berjalan
+        length = _LENGTH.unpack_from(self._mm, 16)[0]
+        try:
+            return json.loads(self._mm[HEADER_SIZE:HEADER_SIZE + length])
+        except ValueError:
+            return {}  # Sisa penulis yang mati di tengah jalan
+
+    def _publish(self, data: Dict, sequence: int = None):
+        payload = json.dumps(data, separators=(",", ":")).encode()
+        if HEADER_SIZE + len(payload) > len(self._mm):
+            raise StateOverflowError(f"State {len(payload)} byte melebihi kapasitas {self.path}")
+        if sequence is None:
+            sequence = _SEQ.unpack_from(self._mm, 8)[0]
+        sequence |= 1
+        _HEADER.pack_into(self._mm, 0, MAGIC, sequence, _LENGTH.unpack_from(self._mm, 16)[0])
+        self._mm[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+        _LENGTH.pack_into(self._mm, 16, len(payload))
+        _SEQ.pack_into(self._mm, 8, sequence + 1)
+
+    def _repair(self):
+        """🩹 Sequence ganjil tanpa penulis aktif: terbitkan ulang payload"""
+        with self._write_lock():
+            if _SEQ.unpack_from(self._mm, 8)[0] & 1:
+                self._publish(self._read_locked())
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
@@ -0,0 +1,341 @@
+"""
+🧭 MODUL SIMILARITY INDEX - PENCARIAN GAMBAR MIRIP
+Index vektor embedding untuk mencari gambar training yang paling mirip
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png']
+
+
+class EmbeddingIndex:
+    """
+    Index embedding gambar dataset
+
+    🧠 Cara Kerja:
+    1. Setiap gambar disimpan sebagai vektor embedding ter-normalisasi (L2)
+    2. Pencarian exact: satu perkalian matriks (cosine similarity) + argpartition
+    3. Pencarian approximate (opsional): LSH random-hyperplane, kandidat
+       dari bucket yang sama lalu di-rerank secara exact
+    4. Update incremental: tambah/hapus satu vektor tanpa rebuild
+    """
+
+    def __init__(self,
+                 index_path: str = None,
+                 fingerprint: str = "",
+                 approximate: bool = False,
+                 approximate_min_size: int = 5000,
+                 num_tables: int = 8,
+                 num_bits: int = 12,
+                 seed: int = 42):
+        """
+        Inisialisasi index
+
+        Args:
+            index_path: Path file .npz untuk persistensi (None = hanya di memori)
+            fingerprint: Identitas model pembuat embedding; index di disk
+                dengan fingerprint berbeda diabaikan
+            approximate: Aktifkan index LSH untuk pencarian approximate
+            approximate_min_size: Di bawah ukuran ini selalu pakai exact search
+            num_tables: Jumlah tabel hash LSH
+            num_bits: Jumlah hyperplane (bit) per tabel
+            seed: Seed random hyperplane
+        """
+        self.index_path = Path(index_path) if index_path else None
+        self.fingerprint = fingerprint
+        self.approximate = approximate
+        self.approximate_min_size = approximate_min_size
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self.seed = seed
+
+        self.keys: List[str] = []
+        self._key_to_row: Dict[str, int] = {}
+        self._matrix = None
+        self._size = 0
+        self._lock = threading.RLock()
+
+        # Struktur LSH (dibuat saat dimensi diketahui)
+        self._planes = None
+        self._codes = None
+        self._buckets = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def dim(self) -> int:
+        return 0 if self._matrix is None else self._matrix.shape[1]
+
+    def _ensure_capacity(self, dim: int, extra: int):
+        """
+        📏 Alokasi ulang matriks dengan strategi doubling
+        """
+        if self._matrix is None:
+            capacity = max(1024, extra)
+            self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+            if self.approximate:
+                rng = np.random.default_rng(self.seed)
+                self._planes = rng.standard_normal(
+                    (dim, self.num_tables * self.num_bits)
+                ).astype(np.float32)
+                self._codes = np.zeros((capacity, self.num_tables), dtype=np.int64)
+                self._buckets = [dict() for _ in range(self.num_tables)]
+            return
+
+        if dim != self._matrix.shape[1]:
+            raise ValueError(f"Dimensi embedding {dim} != dimensi index {self._matrix.shape[1]}")
+
+        needed = self._size + extra
+        if needed > len(self._matrix):
+            capacity = max(needed, len(self._matrix) * 2)
+            matrix = np.zeros((capacity, dim), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            self._matrix = matrix
+            if self._codes is not None:
+                codes = np.zeros((capacity, self.num_tables), dtype=np.int64)
+                codes[:self._size] = self._codes[:self._size]
+                self._codes = codes
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        🔑 Hitung kode LSH (satu int per tabel) untuk vektor ter-normalisasi
+        """
+        bits = (vectors @ self._planes) > 0
+        bits = bits.reshape(len(vectors), self.num_tables, self.num_bits)
+        weights = 1 << np.arange(self.num_bits, dtype=np.int64)
+        return (bits * weights).sum(axis=-1)
+
+    def _bucket_add(self, row: int):
+        for table, code in enumerate(self._codes[row]):
+            self._buckets[table].setdefault(int(code), set()).add(row)
+
+    def _bucket_discard(self, row: int):
+        for table, code in enumerate(self._codes[row]):
+            bucket = self._buckets[table].get(int(code))
+            if bucket is not None:
+                bucket.discard(row)
+                if not bucket:
+                    del self._buckets[table][int(code)]
+
+    def add(self, keys: List[str], vectors: np.ndarray):
+        """
+        ➕ Tambah (atau timpa) vektor untuk daftar key
+
+        Args:
+            keys: List key unik, format "kategori/nama_file"
+            vectors: Array float (N, dim)
+        """
+        vectors = self._normalize(np.atleast_2d(vectors))
+        if len(keys) != len(vectors):
+            raise ValueError("Jumlah key dan vektor harus sama")
+        if len(keys) == 0:
+            return
+
+        with self._lock:
+            self._ensure_capacity(vectors.shape[1], len(keys))
+            codes = self._hash(vectors) if self._codes is not None else None
+
+            for i, key in enumerate(keys):
+                row = self._key_to_row.get(key)
+                if row is None:
+                    row = self._size
+                    self._size += 1
+                    self.keys.append(key)
+                    self._key_to_row[key] = row
+                elif codes is not None:
+                    self._bucket_discard(row)
+
+                self._matrix[row] = vectors[i]
+                if codes is not None:
+                    self._codes[row] = codes[i]
+                    self._bucket_add(row)
+
+    def remove(self, key: str) -> bool:
+        """
+        ➖ Hapus vektor (swap dengan baris terakhir agar matriks tetap padat)
+
+        Returns:
+            bool: True jika key ada dan dihapus
+        """
+        with self._lock:
+            row = self._key_to_row.pop(key, None)
+            if row is None:
+                return False
+
+            last = self._size - 1
+            if self._codes is not None:
+                self._bucket_discard(row)
+                if row != last:
+                    self._bucket_discard(last)
+
+            if row != last:
+                moved_key = self.keys[last]
+                self._matrix[row] = self._matrix[last]
+                self.keys[row] = moved_key
+                self._key_to_row[moved_key] = row
+                if self._codes is not None:
+                    self._codes[row] = self._codes[last]
+                    self._bucket_add(row)
+
+            self.keys.pop()
+            self._size -= 1
+            return True
+
+    def contains(self, key: str) -> bool:
+        return key in self._key_to_row
+
+    def search(self, vector: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        🔎 Cari k vektor paling mirip (cosine similarity)
+
+        Args:
+            vector: Embedding query (dim,)
+            k: Jumlah hasil
+
+        Returns:
+            List (key, similarity) urut dari yang paling mirip
+        """
+        query = self._normalize(np.atleast_2d(vector))[0]
+
+        with self._lock:
+            if self._size == 0:
+                return []
+            k = min(k, self._size)
+
+            candidates = None
+            if self._codes is not None and self._size >= self.approximate_min_size:
+                candidates = self._lsh_candidates(query)
+                if len(candidates) < k:
+                    candidates = None  # Kandidat kurang, fallback ke exact
+
+            if candidates is None:
+                scores = self._matrix[:self._size] @ query
+                rows = np.arange(self._size)
+            else:
+                rows = candidates
+                scores = self._matrix[rows] @ query
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self.keys[rows[i]], float(scores[i])) for i in top]
+
+    def _lsh_candidates(self, query: np.ndarray) -> np.ndarray:
+        codes = self._hash(query[np.newaxis])[0]
+        rows = set()
+        for table, code in enumerate(codes):
+            rows.update(self._buckets[table].get(int(code), ()))
+        return np.fromiter(rows, dtype=np.int64, count=len(rows))
+
+    def vectors(self) -> np.ndarray:
+        """📦 View matriks embedding ter-normalisasi (N, dim), tanpa copy"""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+    def save(self):
+        """
+        💾 Simpan index ke disk secara atomik (tulis temp lalu rename)
+        """
+        if self.index_path is None:
+            return
+        with self._lock:
+            keys = np.array(self.keys, dtype=str)
+            matrix = self.vectors().copy()
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, keys=keys, matrix=matrix, fingerprint=np.array(self.fingerprint))
+        os.replace(tmp_path, self.index_path)
+
+    def load(self) -> bool:
+        """
+        📂 Load index dari disk
+
+        Returns:
+            bool: True jika berhasil dan fingerprint cocok
+        """
+        if self.index_path is None or not self.index_path.exists():
+            return False
+        try:
+            with np.load(self.index_path, allow_pickle=False) as data:
+                if str(data["fingerprint"]) != self.fingerprint:
+                    print("⚠️  Index embedding dari model lain, dibangun ulang")
+                    return False
+                keys = [str(k) for k in data["keys"]]
+                matrix = data["matrix"]
+        except Exception as e:
+            print(f"⚠️  Gagal load index embedding: {e}")
+            return False
+
+        if keys:
+            self.add(keys, matrix)
+        return True
+
+    def sync_with_directory(self,
+                            raw_data_dir: str,
+                            embed_fn: Callable[[List[Path]], np.ndarray],
+                            batch_size: int = 64) -> Dict[str, int]:
+        """
+        🔄 Samakan isi index dengan folder dataset
+
+        Hanya gambar yang belum ada di index yang di-embed; key yang
+        filenya sudah hilang dihapus. Dipakai saat startup / ganti model.
+
+        Args:
+            raw_data_dir: Folder dataset/raw (subfolder per kategori)
+            embed_fn: Fungsi list path -> array embedding (N, dim)
+            batch_size: Jumlah gambar per panggilan embed_fn
+
+        Returns:
+            Dict jumlah vektor yang ditambah dan dihapus, serta gambar yang
+            dilewati karena gagal di-embed (file rusak)
+        """
+        raw_data_dir = Path(raw_data_dir)
+        on_disk = {}
+        for category_dir in sorted(p for p in raw_data_dir.iterdir() if p.is_dir()):
+            for image_file in category_dir.iterdir():
+                if image_file.is_file() and image_file.suffix.lower() in IMAGE_EXTENSIONS:
+                    on_disk[f"{category_dir.name}/{image_file.name}"] = image_file
+
+        stale = [key for key in list(self.keys) if key not in on_disk]
+        for key in stale:
+            self.remove(key)
+
+        missing = [key for key in on_disk if not self.contains(key)]
+        added, skipped = 0, 0
+        for start in range(0, len(missing), batch_size):
+            batch_keys = missing[start:start + batch_size]
+            try:
+                vectors = embed_fn([on_disk[key] for key in batch_keys])
+            except Exception as e:
+                # Satu file rusak/terpotong tidak boleh menggagalkan seluruh sync
+                print(f"⚠️  Embedding batch gagal ({e}), dicoba per gambar")
+                kept, rows = [], []
+                for key in batch_keys:
+                    try:
+                        rows.append(np.asarray(embed_fn([on_disk[key]]))[0])
+                        kept.append(key)
+                    except Exception as item_error:
+                        print(f"⚠️  Embedding {on_disk[key]} gagal, dilewati: {item_error}")
+                        skipped += 1
+                if not kept:
+                    continue
+                batch_keys, vectors = kept, np.stack(rows)
+            self.add(batch_keys, vectors)
+            added += len(batch_keys)
+
+        return {"added": added, "removed": len(stale), "skipped": skipped}
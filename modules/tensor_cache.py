@@ -0,0 +1,240 @@
+"""
+🧊 MODUL TENSOR CACHE - CACHE GAMBAR TER-DECODE UNTUK TRAINING
+Menyimpan setiap gambar sekali sebagai tensor uint8 224x224x3 di shard .npy
+yang di-memory-map, dengan key hash isi file (sha256)
+
+Training membaca slice langsung dari shard (tanpa decode JPEG per epoch).
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+IMAGE_SIZE = (224, 224)
+SHARD_SIZE = 1024  # Gambar per shard (~154 MB, file sparse)
+
+
+def decode_for_training(image_path, target_size: Tuple[int, int] = IMAGE_SIZE) -> np.ndarray:
+    """
+    🖼️ Decode + resize gambar persis seperti Keras load_img pada
+    flow_from_directory (RGB, interpolasi nearest), hasil uint8 HxWx3
+    """
+    with Image.open(image_path) as image:
+        image = image.convert("RGB")
+        if image.size != (target_size[1], target_size[0]):
+            image = image.resize((target_size[1], target_size[0]), Image.NEAREST)
+        return np.asarray(image, dtype=np.uint8)
+
+
+class TensorCache:
+    """
+    Cache tensor uint8 berbasis shard memory-mapped
+
+    🧠 Cara Kerja:
+    1. Shard = file .npy berukuran tetap (SHARD_SIZE x 224 x 224 x 3 uint8),
+       dibuat sparse sehingga hanya slot terisi yang memakai disk
+    2. Index SQLite memetakan sha256 -> (shard, slot); slot milik gambar
+       yang sudah dihapus dipakai ulang
+    3. Decode dilakukan di luar transaksi; alokasi slot + salin piksel +
+       commit berjalan dalam BEGIN IMMEDIATE, jadi aman untuk beberapa
+       proses (worker gunicorn, trainer) sekaligus
+    4. Pembaca membuka shard read-only (np.load mmap_mode="r"); slice satu
+       gambar tidak menyalin data
+    """
+
+    def __init__(self, cache_dir: str, image_size: Tuple[int, int] = IMAGE_SIZE,
+                 shard_size: int = SHARD_SIZE):
+        """
+        Inisialisasi cache
+
+        Args:
+            cache_dir: Folder shard + index
+            image_size: Ukuran tensor (tinggi, lebar)
+            shard_size: Jumlah gambar per shard
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.image_size = tuple(image_size)
+        self.shard_size = shard_size
+
+        self._lock = threading.Lock()
+        self._readers: Dict[int, np.ndarray] = {}
+        self._writers: Dict[int, np.ndarray] = {}
+
+        self._conn = sqlite3.connect(str(self.cache_dir / "index.db"), timeout=30,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS slots (
+                shard INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                sha256 TEXT UNIQUE,
+                PRIMARY KEY (shard, slot)
+            )
+        """)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        layout = f"{self.image_size[0]}x{self.image_size[1]}x3/{self.shard_size}"
+        stored = self._conn.execute("SELECT value FROM meta WHERE key = 'layout'").fetchone()
+        if stored is None:
+            self._conn.execute("INSERT OR IGNORE INTO meta VALUES ('layout', ?)", (layout,))
+        elif stored[0] != layout:
+            raise ValueError(f"Tensor cache di {self.cache_dir} memakai layout {stored[0]}, bukan {layout}")
+
+    # ============================================
+    # 📥 MENULIS
+    # ============================================
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.cache_dir / f"shard_{shard:05d}.npy"
+
+    def _writer(self, shard: int) -> np.ndarray:
+        """Memmap r+ untuk shard (dibuat sparse jika belum ada)"""
+        array = self._writers.get(shard)
+        if array is None:
+            path = self._shard_path(shard)
+            if path.exists():
+                array = np.load(path, mmap_mode="r+")
+            else:
+                array = np.lib.format.open_memmap(
+                    path, mode="w+", dtype=np.uint8,
+                    shape=(self.shard_size,) + self.image_size + (3,)
+                )
+            self._writers[shard] = array
+        return array
+
+    def _allocate(self) -> Tuple[int, int]:
+        """Slot kosong pertama, atau slot baru setelah slot terakhir"""
+        row = self._conn.execute(
+            "SELECT shard, slot FROM slots WHERE sha256 IS NULL ORDER BY shard, slot LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            return row
+        row = self._conn.execute("SELECT shard, slot FROM slots ORDER BY shard DESC, slot DESC LIMIT 1").fetchone()
+        if row is None:
+            return 0, 0
+        shard, slot = row
+        return (shard, slot + 1) if slot + 1 < self.shard_size else (shard + 1, 0)
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> int:
+        """
+        ➕ Decode dan simpan banyak gambar (yang belum ada di cache)
+
+        Args:
+            items: Iterable (sha256, path gambar)
+
+        Returns:
+            Jumlah gambar yang baru disimpan
+        """
+        items = list(items)
+        if not items:
+            return 0
+        existing = self.locations([sha for sha, _ in items])
+        decoded = []
+        for (sha256, path), found in zip(items, existing):
+            if found is not None:
+                continue
+            try:
+                decoded.append((sha256, decode_for_training(path, self.image_size)))
+            except Exception as e:
+                print(f"⚠️  Tensor cache gagal decode {path}: {e}")
+        if not decoded:
+            return 0
+
+        added = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                touched = set()
+                for sha256, pixels in decoded:
+                    if self._conn.execute("SELECT 1 FROM slots WHERE sha256 = ?", (sha256,)).fetchone():
+                        continue  # Proses lain baru saja menyimpan gambar yang sama
+                    shard, slot = self._allocate()
+                    self._writer(shard)[slot] = pixels
+                    touched.add(shard)
+                    self._conn.execute("INSERT OR REPLACE INTO slots VALUES (?, ?, ?)", (shard, slot, sha256))
+                    added += 1
+                for shard in touched:
+                    self._writers[shard].flush()  # Piksel di disk sebelum index terlihat
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def add(self, sha256: str, path) -> bool:
+        """➕ Simpan satu gambar; False jika sudah ada di cache"""
+        return self.add_many([(sha256, path)]) > 0
+
+    def prune(self, live_sha256: Iterable[str]) -> int:
+        """
+        🧹 Bebaskan slot gambar yang tidak ada lagi di dataset (slot dipakai
+        ulang oleh gambar berikutnya)
+
+        Returns:
+            Jumlah slot yang dibebaskan
+        """
+        live = set(live_sha256)
+        with self._lock:
+            stale = [(sha,) for (sha,) in self._conn.execute(
+                "SELECT sha256 FROM slots WHERE sha256 IS NOT NULL") if sha not in live]
+            if stale:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("UPDATE slots SET sha256 = NULL WHERE sha256 = ?", stale)
+                self._conn.execute("COMMIT")
+        return len(stale)
+
+    # ============================================
+    # 📤 MEMBACA
+    # ============================================
+
+    def locations(self, sha256_list: List[str]) -> List[Optional[Tuple[int, int]]]:
+        """📍 (shard, slot) untuk setiap sha256, None jika belum di-cache"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(sha256_list), 900):
+                chunk = sha256_list[start:start + 900]
+                rows = self._conn.execute(
+                    f"SELECT sha256, shard, slot FROM slots WHERE sha256 IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                found.update((sha, (shard, slot)) for sha, shard, slot in rows)
+        return [found.get(sha) for sha in sha256_list]
+
+    def shard(self, shard: int) -> np.ndarray:
+        """🗂️ Shard read-only (memmap, tidak dimuat ke RAM)"""
+        array = self._readers.get(shard)
+        if array is None:
+            array = np.load(self._shard_path(shard), mmap_mode="r")
+            self._readers[shard] = array
+        return array
+
+    def get(self, sha256: str) -> Optional[np.ndarray]:
+        """🖼️ Tensor uint8 satu gambar (view ke memmap, tanpa salin)"""
+        location = self.locations([sha256])[0]
+        if location is None:
+            return None
+        return self.shard(location[0])[location[1]]
+
+    def gather(self, shards: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        """
+        📦 Kumpulkan satu batch (uint8, N x H x W x 3) dari beberapa shard;
+        dibaca per shard dengan urutan slot naik agar akses disk berurutan
+        """
+        batch = np.empty((len(slots),) + self.image_size + (3,), dtype=np.uint8)
+        for shard in np.unique(shards):
+            positions = np.flatnonzero(shards == shard)
+            order = positions[np.argsort(slots[positions])]
+            batch[order] = self.shard(int(shard))[slots[order]]
+        return batch
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM slots WHERE sha256 IS NOT NULL").fetchone()[0]
+
+    def close(self):
+        self._readers.clear()
+        self._writers.clear()
+        self._conn.close()
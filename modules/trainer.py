@@ -5,6 +5,7 @@ Dengan visualisasi real-time!
 """
 
 import os
+import random
 import numpy as np
 from pathlib import Path
 from typing import Dict, Callable
@@ -71,32 +72,112 @@ def _get_reduce_lr_on_plateau():
         from tensorflow.keras.callbacks import ReduceLROnPlateau
         _ReduceLROnPlateau = ReduceLROnPlateau
     return _ReduceLROnPlateau
+
+# Modul ini sendiri di-import secara lazy oleh backend (_get_trainer),
+# jadi nama-nama Keras di bawah boleh di-resolve saat import modul.
+# TrainingProgressCallback butuh kelas dasar Callback saat definisi kelas.
+keras = _get_keras()
+layers = _get_keras_layers()
+ImageDataGenerator = _get_image_data_generator()
+Callback = _get_callback()
+EarlyStopping = _get_early_stopping()
+ReduceLROnPlateau = _get_reduce_lr_on_plateau()
+
 import json
 from datetime import datetime
 
+from modules.checkpointing import CheckpointStore
+from modules.feature_cache import FeatureCache, FrozenBackbone
+from modules.input_pipeline import (
+    dataset_from_files, dataset_from_tensor_cache, list_directory_split, list_manifest_split
+)
+from modules.tensor_cache import TensorCache
+from modules.training_metrics import InputStamps, bottleneck, peak_rss_mb, summarize_epoch
+
+# Urutan kelas sama dengan flow_from_directory (nama folder, alfabetis)
+CLASS_NAMES = ["cardboard", "glass", "metal", "paper", "plastic"]
+
+
+class CachedImageSequence(keras.utils.Sequence):
+    """
+    📦 Batch training dari TensorCache (pengganti flow_from_dataframe)
+    
+    Gambar dibaca sebagai slice uint8 dari shard memory-mapped, lalu
+    random_transform + standardize dari ImageDataGenerator yang sama,
+    jadi augmentasi & normalisasi identik dengan iterator Keras.
+    Atribut samples/classes/class_indices juga sama.
+    """
+    
+    def __init__(self, cache: TensorCache, shards, slots, labels, datagen,
+                 batch_size: int = 32, shuffle: bool = False, augment: bool = False):
+        super().__init__()
+        self.cache = cache
+        self.shards = np.asarray(shards, dtype=np.int64)
+        self.slots = np.asarray(slots, dtype=np.int64)
+        self.classes = np.asarray(labels, dtype=np.int32)
+        self.class_indices = {name: i for i, name in enumerate(CLASS_NAMES)}
+        self.num_classes = len(CLASS_NAMES)
+        self.samples = len(self.classes)
+        self.datagen = datagen
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.augment = augment
+        self.index_array = np.arange(self.samples)
+        self.on_epoch_end()
+    
+    def __len__(self):
+        return int(np.ceil(self.samples / self.batch_size))
+    
+    def __getitem__(self, index):
+        rows = self.index_array[index * self.batch_size:(index + 1) * self.batch_size]
+        x = self.cache.gather(self.shards[rows], self.slots[rows]).astype(keras.backend.floatx())
+        for i in range(len(x)):
+            if self.augment:
+                x[i] = self.datagen.random_transform(x[i])
+            x[i] = self.datagen.standardize(x[i])
+        y = np.zeros((len(rows), self.num_classes), dtype=keras.backend.floatx())
+        y[np.arange(len(rows)), self.classes[rows]] = 1.0
+        return x, y
+    
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.shuffle(self.index_array)
+
 class TrainingProgressCallback(Callback):
     """
     📊 Custom callback untuk tracking progress training
     Digunakan untuk update UI real-time di Streamlit
     """
     
-    def __init__(self, total_epochs: int, progress_callback: Callable = None):
+    def __init__(self, total_epochs: int, progress_callback: Callable = None, budget=None,
+                 instrumentation=None):
         super().__init__()
         self.total_epochs = total_epochs
         self.progress_callback = progress_callback
+        # TimeBudgetCallback (opsional): total epoch mengikuti rencananya
+        self.budget = budget
+        # InstrumentationCallback (opsional): metrik throughput epoch ikut dilaporkan
+        self.instrumentation = instrumentation
         self.epoch_logs = []
         self.start_time = None
+        self.first_epoch = None
         
     def on_train_begin(self, logs=None):
         self.start_time = time.time()
         
+    def on_epoch_begin(self, epoch, logs=None):
+        # Run yang dilanjutkan dari checkpoint tidak mulai dari epoch 0
+        if self.first_epoch is None:
+            self.first_epoch = epoch
+        
     def on_epoch_end(self, epoch, logs=None):
         logs = logs or {}
         
         # Hitung waktu
         elapsed_time = time.time() - self.start_time
-        avg_time_per_epoch = elapsed_time / (epoch + 1)
-        eta = avg_time_per_epoch * (self.total_epochs - epoch - 1)
+        avg_time_per_epoch = elapsed_time / (epoch + 1 - (self.first_epoch or 0))
+        total_epochs = self.budget.planned_epochs if self.budget is not None else self.total_epochs
+        eta = avg_time_per_epoch * max(0, total_epochs - epoch - 1)
         
         # Store logs
         epoch_data = {
@@ -108,6 +189,16 @@ class TrainingProgressCallback(Callback):
             "elapsed_time": elapsed_time,
             "eta": eta
         }
+        if self.budget is not None:
+            remaining = self.budget.remaining()
+            epoch_data.update({
+                "eta": min(eta, remaining),
+                "planned_epochs": total_epochs,
+                "time_budget": self.budget.budget,
+                "budget_remaining": remaining
+            })
+        if self.instrumentation is not None and self.instrumentation.latest is not None:
+            epoch_data["metrics"] = self.instrumentation.latest
         
         self.epoch_logs.append(epoch_data)
         
@@ -116,6 +207,348 @@ class TrainingProgressCallback(Callback):
             self.progress_callback(epoch_data)
 
 
+class ThrottleCallback(Callback):
+    """
+    🐢 Jeda antar batch dari TrainingThrottle (modules/cpu_budget.py) agar
+    training mengalah saat latency predict naik
+    """
+
+    def __init__(self, throttle):
+        super().__init__()
+        self.throttle = throttle
+        self.batch_start = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self.batch_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.throttle.after_batch(time.perf_counter() - self.batch_start)
+
+
+class TimeBudgetCallback(Callback):
+    """
+    ⏱️ Training dengan batas waktu (wall-clock), bukan jumlah epoch tetap
+
+    🧠 Cara Kerja:
+    1. Durasi batch diukur pada beberapa batch pertama (batch pertama =
+       tracing graph, tidak dihitung) -> rencana awal jumlah epoch yang
+       muat: sisa waktu / (steps per epoch x durasi batch + validasi)
+    2. Setiap akhir epoch rencana dihitung ulang dari durasi epoch
+       sebenarnya (termasuk validasi); dibatasi epochs maksimum
+    3. Sebelum tiap batch dicek: jika batch berikutnya + validasi +
+       evaluasi test & simpan model tidak muat lagi, training dihentikan
+       di tengah epoch (epoch berjalan tetap divalidasi)
+    4. Di akhir training bobot epoch terbaik dari EarlyStopping
+       dipulihkan, juga saat yang menghentikan training adalah batas waktu
+    """
+
+    MEASURE_BATCHES = 5
+    # Cadangan untuk menyimpan model setelah evaluasi test
+    SAVE_RESERVE = 2.0
+
+    def __init__(self, budget_seconds: float, max_epochs: int, early_stopping=None,
+                 start_time: float = None):
+        """
+        Args:
+            budget_seconds: Batas waktu seluruh training (termasuk evaluasi test)
+            max_epochs: Batas atas jumlah epoch
+            early_stopping: Callback EarlyStopping yang bobot terbaiknya dipakai
+            start_time: time.monotonic() saat train() dimulai (default: awal fit)
+        """
+        super().__init__()
+        self.budget = float(budget_seconds)
+        self.max_epochs = max_epochs
+        self.early_stopping = early_stopping
+        self.start_time = start_time
+        self.planned_epochs = max_epochs
+        # Waktu terpakai sebelum fit ini (ikut checkpoint untuk run yang dilanjutkan)
+        self.budget_used = 0.0
+        self.stopped_by_budget = False
+        self._offset = None
+        self._first_epoch = 0
+        self._batches_seen = 0
+        self._batch_times = []
+        self._epoch_times = []
+        self._val_time = None
+
+    def elapsed(self) -> float:
+        offset = self.budget_used if self._offset is None else self._offset
+        return offset + time.monotonic() - self.start_time
+
+    def remaining(self) -> float:
+        return max(0.0, self.budget - self.elapsed())
+
+    def _batch_estimate(self) -> float:
+        recent = self._batch_times[-20:]
+        return sum(recent) / len(recent)
+
+    def _val_estimate(self) -> float:
+        if self._val_time is not None:
+            return self._val_time
+        # Belum ada validasi: perkiraan kasar dari forward pass ~ 1/3 train step
+        return (self.params.get("steps") or 0) * self._batch_estimate() / 3
+
+    def _eval_reserve(self) -> float:
+        return self._val_estimate() + self.SAVE_RESERVE
+
+    def _plan(self, completed_epochs: int):
+        if self._epoch_times:
+            epoch_time = sum(self._epoch_times[-3:]) / len(self._epoch_times[-3:])
+        else:
+            epoch_time = (self.params.get("steps") or 0) * self._batch_estimate() + self._val_estimate()
+        if epoch_time <= 0:
+            return
+        available = self.budget - self.elapsed() - self._eval_reserve()
+        fits = int(max(0.0, available) // epoch_time)
+        self.planned_epochs = min(self.max_epochs, max(completed_epochs + fits, completed_epochs, 1))
+
+    def _stop(self):
+        self.model.stop_training = True
+        self.stopped_by_budget = True
+
+    def on_train_begin(self, logs=None):
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+        self.stopped_by_budget = False
+
+    def on_epoch_begin(self, epoch, logs=None):
+        if self._offset is None:
+            # budget_used sudah dipulihkan CheckpointCallback (jika dilanjutkan)
+            self._offset = self.budget_used
+            self._first_epoch = epoch
+        self._epoch_start = time.monotonic()
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._batch_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        duration = time.perf_counter() - self._batch_start
+        self._batches_seen += 1
+        if self._batches_seen == 1:
+            return
+        self._batch_times.append(duration)
+        del self._batch_times[:-100]
+        if len(self._batch_times) == self.MEASURE_BATCHES and not self._epoch_times:
+            self._plan(self._first_epoch)
+            print(f"\n⏱️  {self._batch_estimate() * 1000:.0f} ms/batch -> rencana "
+                  f"{self.planned_epochs} epoch dalam {self.budget:.0f} detik")
+        if self.remaining() < self._batch_estimate() + self._eval_reserve():
+            self._stop()
+
+    def on_test_begin(self, logs=None):
+        self._test_start = time.monotonic()
+
+    def on_test_end(self, logs=None):
+        self._val_time = time.monotonic() - self._test_start
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._epoch_times.append(time.monotonic() - self._epoch_start)
+        self.budget_used = self.elapsed()
+        self._plan(epoch + 1)
+        if self.planned_epochs <= epoch + 1 < self.max_epochs:
+            self._stop()
+
+    def on_train_end(self, logs=None):
+        self.restore_best_weights()
+        if self.stopped_by_budget:
+            print(f"\n⏱️  Batas waktu {self.budget:.0f} detik tercapai, memakai bobot epoch terbaik")
+
+    def restore_best_weights(self):
+        """🏆 Pulihkan bobot terbaik jika EarlyStopping tidak memulihkannya sendiri"""
+        early_stopping = self.early_stopping
+        if (early_stopping is not None and early_stopping.best_weights is not None
+                and not early_stopping.stopped_epoch):
+            self.model.set_weights(early_stopping.best_weights)
+
+
+class InstrumentationCallback(Callback):
+    """
+    🔬 Instrumentasi training per batch & per epoch (lihat
+    modules/training_metrics.py)
+
+    🧠 Cara Kerja:
+    1. Durasi tiap step train diukur dari on_train_batch_begin sampai
+       on_train_batch_end
+    2. Jika dataset train dipasangi InputStamps, bagian step yang menunggu
+       input pipeline = waktu batch siap - awal step; sisanya compute
+    3. Validasi diukur lewat on_test_begin / on_test_end
+    4. Akhir epoch: gambar/detik, input wait vs compute, p50/p95 step,
+       waktu validasi dan peak RSS; durasi per batch disimpan untuk log
+    """
+
+    def __init__(self, batch_size: int, train_samples: int = None, stamps=None):
+        """
+        Args:
+            batch_size: Ukuran batch train
+            train_samples: Jumlah gambar train per epoch (batas jumlah gambar)
+            stamps: InputStamps yang dipasang di dataset train (opsional)
+        """
+        super().__init__()
+        self.batch_size = batch_size
+        self.train_samples = train_samples
+        self.stamps = stamps
+        self.epochs = []
+        self.latest = None
+
+    def on_train_begin(self, logs=None):
+        if self.stamps is not None:
+            self.stamps.clear()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._steps, self._waits = [], []
+        self._val_time = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        step = time.perf_counter() - self._step_start
+        self._steps.append(step)
+        if self.stamps is not None:
+            ready = self.stamps.pop()
+            self._waits.append(0.0 if ready is None else min(step, max(0.0, ready - self._step_start)))
+
+    def on_test_begin(self, logs=None):
+        self._test_start = time.perf_counter()
+
+    def on_test_end(self, logs=None):
+        self._val_time = time.perf_counter() - self._test_start
+
+    def on_epoch_end(self, epoch, logs=None):
+        images = len(self._steps) * self.batch_size
+        if self.train_samples:
+            images = min(images, self.train_samples)
+        summary = summarize_epoch(self._steps, self._waits if self.stamps is not None else None,
+                                  images, self._val_time)
+        summary.update(epoch=epoch + 1, epoch_time=time.perf_counter() - self._epoch_start)
+        self.latest = summary
+        waits = self._waits if self.stamps is not None else [0.0] * len(self._steps)
+        self.epochs.append(dict(summary, batch_ms=[
+            [round(step * 1000, 1), round(wait * 1000, 1)] for step, wait in zip(self._steps, waits)
+        ]))
+
+    def report(self, **timings) -> Dict:
+        """
+        📋 Ringkasan seluruh run untuk training log
+
+        Args:
+            **timings: Durasi tambahan (mis. test_eval_time, save_time)
+        """
+        train_time = sum(epoch["train_time"] for epoch in self.epochs)
+        images = sum(epoch["images"] for epoch in self.epochs)
+        measured = [epoch for epoch in self.epochs if epoch["input_wait"] is not None]
+        return dict({
+            "images_per_sec": images / train_time if train_time > 0 else 0.0,
+            "input_wait_pct": (sum(epoch["input_wait"] for epoch in measured) /
+                               sum(epoch["train_time"] for epoch in measured) * 100
+                               if measured and train_time > 0 else None),
+            "bottleneck": bottleneck(self.epochs),
+            "val_time": sum(epoch["val_time"] or 0.0 for epoch in self.epochs),
+            "peak_rss_mb": peak_rss_mb(),
+            "epochs": self.epochs
+        }, **timings)
+
+
+class CheckpointCallback(Callback):
+    """
+    💾 Checkpoint periodik untuk run yang bisa dilanjutkan
+
+    Snapshot (copy numpy bobot, variabel optimizer, best_weights early
+    stopping) diambil di thread training; penulisan ke disk dikerjakan
+    thread writer CheckpointStore. Harus dipasang paling akhir di daftar
+    callback: on_train_begin-nya memulihkan state callback lain setelah
+    callback itu me-reset dirinya sendiri.
+    """
+
+    # Atribut EarlyStopping / ReduceLROnPlateau / TimeBudgetCallback yang ikut disimpan
+    CALLBACK_STATE = ("wait", "best", "best_epoch", "stopped_epoch", "cooldown_counter", "budget_used")
+
+    def __init__(self, store, callbacks: list, every: int = 1, restore=None):
+        """
+        Args:
+            store: CheckpointStore run ini
+            callbacks: Callback ber-state yang ikut disimpan/dipulihkan
+            every: Simpan setiap N epoch
+            restore: Hasil store.load() jika run dilanjutkan
+        """
+        super().__init__()
+        self.store = store
+        self.stateful_callbacks = callbacks
+        self.every = max(1, every)
+        self.restore = restore
+        # History semua epoch run ini, termasuk sebelum dilanjutkan
+        self.history = {}
+
+    @staticmethod
+    def _optimizer_variables(optimizer):
+        variables = optimizer.variables
+        return variables() if callable(variables) else variables
+
+    def on_train_begin(self, logs=None):
+        if self.restore is None:
+            return
+        arrays, state = self.restore
+        self.model.set_weights(arrays["weights"])
+
+        optimizer = self.model.optimizer
+        optimizer.build(self.model.trainable_variables)
+        for variable, value in zip(self._optimizer_variables(optimizer), arrays.get("optimizer", [])):
+            variable.assign(value)
+        keras.backend.set_value(optimizer.learning_rate, state["learning_rate"])
+
+        for callback, saved in zip(self.stateful_callbacks, state["callbacks"]):
+            for name, value in saved.items():
+                setattr(callback, name, value)
+            if "best_weights" in arrays and hasattr(callback, "best_weights"):
+                callback.best_weights = arrays["best_weights"]
+
+        python_state, numpy_state = state["rng"]["python"], state["rng"]["numpy"]
+        random.setstate((python_state[0], tuple(python_state[1]), python_state[2]))
+        np.random.set_state((numpy_state[0], arrays["numpy_rng"][0]) + tuple(numpy_state[1:]))
+        self.history = state["history"]
+        self.restore = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        for key, value in (logs or {}).items():
+            self.history.setdefault(key, []).append(float(value))
+        if (epoch + 1) % self.every:
+            return
+
+        optimizer = self.model.optimizer
+        arrays = {
+            "weights": self.model.get_weights(),
+            "optimizer": [v.numpy() for v in self._optimizer_variables(optimizer)],
+        }
+        callback_state = []
+        for callback in self.stateful_callbacks:
+            saved = {}
+            for name in self.CALLBACK_STATE:
+                value = getattr(callback, name, None)
+                if isinstance(value, (int, float, np.number)):
+                    saved[name] = value.item() if isinstance(value, np.number) else value
+            if getattr(callback, "best_weights", None) is not None:
+                arrays["best_weights"] = list(callback.best_weights)
+            callback_state.append(saved)
+
+        numpy_state = np.random.get_state()
+        arrays["numpy_rng"] = [numpy_state[1].copy()]
+        state = {
+            "epoch": epoch,
+            "stop_training": bool(self.model.stop_training),
+            "learning_rate": float(keras.backend.get_value(optimizer.learning_rate)),
+            "callbacks": callback_state,
+            "rng": {
+                "python": random.getstate(),
+                "numpy": [numpy_state[0]] + [v.item() if isinstance(v, np.generic) else v
+                                             for v in numpy_state[2:]]
+            },
+            "history": {key: list(values) for key, values in self.history.items()},
+            "saved_at": datetime.now().isoformat()
+        }
+        self.store.save_async(arrays, state)
+
+
 class ModelTrainer:
     """
     🎓 Kelas untuk training model klasifikasi sampah
@@ -125,24 +558,46 @@ class ModelTrainer:
     - Visualisasi real-time
     - Data augmentation
     - Model checkpoint & early stopping
+    - Transfer learning: head kecil di atas fitur backbone beku yang di-cache
+    - Fine-tuning incremental dari model produksi (gambar baru + replay)
     """
     
-    def __init__(self, processed_data_dir: str, model_save_path: str):
+    def __init__(self, processed_data_dir: str, model_save_path: str, tensor_cache_dir: str = None,
+                 feature_cache_dir: str = None, log_dir: str = "training_logs"):
         """
         Inisialisasi trainer
         
         Args:
             processed_data_dir: Path ke folder dataset/processed
             model_save_path: Path untuk save model hasil training
+            tensor_cache_dir: Folder cache tensor ter-decode
+                (default: tensor_cache di sebelah folder processed)
+            feature_cache_dir: Folder cache fitur backbone untuk
+                train_transfer (default: feature_cache di sebelah folder processed)
+            log_dir: Folder training log hasil train(); None = tidak menulis
+                log (pemanggil yang menulis log sendiri, mis. training worker)
         """
         self.processed_data_dir = Path(processed_data_dir)
         self.model_save_path = model_save_path
         self.train_dir = self.processed_data_dir / "train"
         self.test_dir = self.processed_data_dir / "test"
         self.val_dir = self.processed_data_dir / "validation"
+        self.manifest_path = self.processed_data_dir / "manifest.json"
+        self.tensor_cache_dir = Path(tensor_cache_dir) if tensor_cache_dir else \
+            self.processed_data_dir.parent / "tensor_cache"
+        self.feature_cache_dir = Path(feature_cache_dir) if feature_cache_dir else \
+            self.processed_data_dir.parent / "feature_cache"
+        # sha256 gambar train yang sudah dilihat model di model_save_path
+        model_path = Path(model_save_path)
+        self.trained_images_path = model_path.with_name(f"{model_path.stem}_images.json")
+        self.log_dir = Path(log_dir) if log_dir else None
         
         self.model = None
         self.history = None
+        # InstrumentationCallback run terakhir (lihat _training_callbacks)
+        self.instrumentation = None
+        # TrainingThrottle opsional (dipasang training worker)
+        self.throttle = None
     
     def create_model(self, learning_rate: float = 0.001) -> keras.Model:
         """
@@ -211,10 +666,42 @@ class ModelTrainer:
         
         return model
     
-    def prepare_data_generators(self, batch_size: int = 32):
+    def create_head(self, feature_dim: int, learning_rate: float = 0.001) -> keras.Model:
+        """
+        🎯 Head klasifikasi kecil untuk transfer learning
+        
+        Hanya Dropout + Dense softmax di atas vektor fitur backbone, jadi
+        bisa dilatih dalam hitungan detik di CPU.
+        
+        Args:
+            feature_dim: Dimensi vektor fitur backbone
+            learning_rate: Learning rate untuk optimizer
+            
+        Returns:
+            keras.Model bernama "transfer_head" yang sudah di-compile
+        """
+        head = keras.Sequential([
+            layers.Input(shape=(feature_dim,)),
+            layers.Dropout(0.2),
+            layers.Dense(len(CLASS_NAMES), activation='softmax')
+        ], name="transfer_head")
+        
+        head.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+            loss='categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        return head
+    
+    def prepare_data_generators(self, batch_size: int = 32, use_tensor_cache: bool = True):
         """
         📦 Prepare data generators dengan augmentation
         
+        Jika ada manifest split (processed/manifest.json), gambar dibaca dari
+        tensor cache (decode JPEG hanya sekali per gambar, bukan per epoch);
+        tanpa cache file raw dibaca lewat manifest, dan tanpa manifest dari
+        folder processed/{split}.
+        
         Data Augmentation untuk training:
         - Rotation: rotasi gambar untuk variasi
         - Shift: geser gambar
@@ -223,6 +710,7 @@ class ModelTrainer:
         
         Args:
             batch_size: Ukuran batch untuk training
+            use_tensor_cache: Pakai tensor cache jika manifest tersedia
             
         Returns:
             Tuple (train_generator, validation_generator, test_generator)
@@ -248,107 +736,494 @@ class ModelTrainer:
         )
         
         # Create generators
-        train_generator = train_datagen.flow_from_directory(
-            self.train_dir,
-            target_size=(224, 224),
-            batch_size=batch_size,
-            class_mode='categorical',
-            shuffle=True
-        )
+        manifest = self._load_manifest()
+        if manifest is not None and use_tensor_cache:
+            cached = self._cached_generators(manifest, batch_size, train_datagen, val_test_datagen)
+            if cached is not None:
+                return cached
         
-        validation_generator = val_test_datagen.flow_from_directory(
-            self.val_dir,
-            target_size=(224, 224),
-            batch_size=batch_size,
-            class_mode='categorical',
-            shuffle=False
-        )
+        manifest_frames = self._manifest_frames(manifest) if manifest is not None else None
+        generators = []
+        for split_name, split_dir, datagen, shuffle in [
+            ("train", self.train_dir, train_datagen, True),
+            ("validation", self.val_dir, val_test_datagen, False),
+            ("test", self.test_dir, val_test_datagen, False)
+        ]:
+            if manifest_frames is not None:
+                generators.append(datagen.flow_from_dataframe(
+                    manifest_frames[split_name],
+                    x_col='filename',
+                    y_col='class',
+                    classes=CLASS_NAMES,
+                    target_size=(224, 224),
+                    batch_size=batch_size,
+                    class_mode='categorical',
+                    shuffle=shuffle
+                ))
+            else:
+                generators.append(datagen.flow_from_directory(
+                    split_dir,
+                    target_size=(224, 224),
+                    batch_size=batch_size,
+                    class_mode='categorical',
+                    shuffle=shuffle
+                ))
         
-        test_generator = val_test_datagen.flow_from_directory(
-            self.test_dir,
-            target_size=(224, 224),
-            batch_size=batch_size,
-            class_mode='categorical',
-            shuffle=False
-        )
+        train_generator, validation_generator, test_generator = generators
+        return train_generator, validation_generator, test_generator
+    
+    def _load_manifest(self):
+        """
+        📄 Baca manifest split (None jika belum ada)
+        """
+        if not self.manifest_path.exists():
+            return None
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+    
+    def _manifest_frames(self, manifest: Dict):
+        """
+        📄 Manifest split menjadi DataFrame (filename, class) per split
+        
+        Returns:
+            Dict split -> DataFrame
+        """
+        import pandas as pd
+        
+        raw_dir = Path(manifest['raw_data_dir'])
+        frames = {}
+        for split_name in ["train", "validation", "test"]:
+            entries = manifest['splits'].get(split_name, [])
+            frames[split_name] = pd.DataFrame({
+                'filename': [str(raw_dir / entry[0] / entry[1]) for entry in entries],
+                'class': [entry[0] for entry in entries]
+            }, columns=['filename', 'class'])
+        return frames
+    
+    def _tensor_cache_splits(self, manifest: Dict):
+        """
+        🧊 Pastikan semua gambar manifest ada di tensor cache (yang belum
+        ada di-decode sekali lalu disimpan), lalu lokasi per split
+        
+        Returns:
+            Tuple (TensorCache, dict split -> (shards, slots, labels, sha256)), atau
+            None jika manifest lama belum berisi sha256 (versi 1)
+        """
+        splits = {name: manifest['splits'].get(name, []) for name in ["train", "validation", "test"]}
+        entries = [entry for split_entries in splits.values() for entry in split_entries]
+        if any(len(entry) < 3 for entry in entries):
+            return None
+        
+        raw_dir = Path(manifest['raw_data_dir'])
+        cache = TensorCache(self.tensor_cache_dir)
+        start = time.time()
+        added = cache.add_many((sha, raw_dir / category / name) for category, name, sha in entries)
+        freed = cache.prune(sha for _, _, sha in entries)
+        if added or freed:
+            print(f"🧊 Tensor cache: {added} gambar di-decode, {freed} slot dibebaskan "
+                  f"({time.time() - start:.1f}s)")
+        
+        located = {}
+        for split_name, split_entries in splits.items():
+            locations = cache.locations([sha for _, _, sha in split_entries])
+            kept = [(entry, loc) for entry, loc in zip(split_entries, locations) if loc is not None]
+            if len(kept) < len(split_entries):
+                print(f"⚠️  {len(split_entries) - len(kept)} gambar {split_name} dilewati (gagal decode)")
+            located[split_name] = (
+                [loc[0] for _, loc in kept],
+                [loc[1] for _, loc in kept],
+                [CLASS_NAMES.index(entry[0]) for entry, _ in kept],
+                [entry[2] for entry, _ in kept]
+            )
+        return cache, located
+    
+    def _cached_generators(self, manifest: Dict, batch_size: int, train_datagen, val_test_datagen):
+        """
+        🧊 CachedImageSequence per split dari tensor cache
+        
+        Returns:
+            Tuple (train, validation, test), atau None jika manifest versi 1
+        """
+        prepared = self._tensor_cache_splits(manifest)
+        if prepared is None:
+            return None
+        cache, located = prepared
         
+        generators = []
+        for split_name, datagen, shuffle in [
+            ("train", train_datagen, True),
+            ("validation", val_test_datagen, False),
+            ("test", val_test_datagen, False)
+        ]:
+            shards, slots, labels, _ = located[split_name]
+            generators.append(CachedImageSequence(
+                cache, shards=shards, slots=slots, labels=labels, datagen=datagen,
+                batch_size=batch_size, shuffle=shuffle, augment=shuffle
+            ))
+        
+        train_generator, validation_generator, test_generator = generators
         return train_generator, validation_generator, test_generator
     
+    def prepare_datasets(self, batch_size: int = 32, use_tensor_cache: bool = True,
+                         input_stamps: InputStamps = None):
+        """
+        🚰 Prepare input pipeline tf.data (default untuk training)
+        
+        Sumber data sama dengan prepare_data_generators: tensor cache jika
+        ada manifest, file raw lewat manifest, atau folder processed/{split}.
+        Decode & augmentasi berjalan paralel di TensorFlow, dengan cache
+        dan prefetch (autotune). Augmentasi dan normalisasi sama dengan
+        ImageDataGenerator (lihat modules/input_pipeline.py).
+        
+        Args:
+            batch_size: Ukuran batch untuk training
+            use_tensor_cache: Pakai tensor cache jika manifest tersedia
+            input_stamps: InputStamps untuk dataset train (instrumentasi
+                waktu tunggu input), opsional
+            
+        Returns:
+            Tuple (train_dataset, validation_dataset, test_dataset, dict
+            jumlah gambar per split)
+        """
+        manifest = self._load_manifest()
+        prepared = None
+        if manifest is not None and use_tensor_cache:
+            prepared = self._tensor_cache_splits(manifest)
+        
+        datasets = []
+        samples = {}
+        for split_name, split_dir, training in [
+            ("train", self.train_dir, True),
+            ("validation", self.val_dir, False),
+            ("test", self.test_dir, False)
+        ]:
+            if prepared is not None:
+                cache, located = prepared
+                shards, slots, labels, _ = located[split_name]
+                dataset = dataset_from_tensor_cache(cache, shards, slots, labels, batch_size, training,
+                                                    stamps=input_stamps if training else None)
+            else:
+                if manifest is not None:
+                    paths, labels = list_manifest_split(manifest, split_name, CLASS_NAMES)
+                else:
+                    paths, labels = list_directory_split(split_dir, CLASS_NAMES)
+                dataset = dataset_from_files(paths, labels, batch_size, training,
+                                             stamps=input_stamps if training else None)
+            datasets.append(dataset)
+            samples[split_name] = len(labels)
+        
+        train_dataset, validation_dataset, test_dataset = datasets
+        return train_dataset, validation_dataset, test_dataset, samples
+    
     def train(self, 
               epochs: int = 20, 
               learning_rate: float = 0.001,
               batch_size: int = 32,
-              progress_callback: Callable = None) -> Dict[str, any]:
+              progress_callback: Callable = None,
+              input_pipeline: str = "tf_data",
+              checkpoint_dir: str = None,
+              checkpoint_every: int = 1,
+              time_budget: float = None) -> Dict[str, any]:
         """
         🚀 Mulai training model!
         
         Args:
-            epochs: Jumlah epoch untuk training
+            epochs: Jumlah epoch untuk training (batas atas jika time_budget diisi)
             learning_rate: Learning rate optimizer
             batch_size: Ukuran batch
             progress_callback: Fungsi callback untuk update progress (untuk UI)
+            input_pipeline: "tf_data" (default) atau "generator"
+                (ImageDataGenerator, cara lama)
+            checkpoint_dir: Folder run untuk checkpoint (lihat
+                modules/checkpointing). Jika sudah berisi checkpoint, training
+                dilanjutkan dari epoch setelah checkpoint itu
+            checkpoint_every: Simpan checkpoint setiap N epoch
+            time_budget: Batas waktu training dalam detik, termasuk persiapan
+                data, evaluasi test dan simpan model (lihat TimeBudgetCallback).
+                Run yang dilanjutkan memakai sisa budget di checkpoint
             
         Returns:
             Dict dengan hasil training
         """
+        budget_start = time.monotonic()
+        store = CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        if store is not None and not store.acquire():
+            return {
+                "success": False,
+                "error": f"Run {store.run_id} sedang dijalankan proses lain"
+            }
         try:
+            initial_epoch, finished, restore = 0, False, None
+            if store is not None:
+                restore = store.load()
+                run = store.read_run()
+                if restore is not None:
+                    state = restore[1]
+                    initial_epoch = state["epoch"] + 1
+                    finished = state["stop_training"] or initial_epoch >= epochs
+                    print(f"♻️  Melanjutkan run {store.run_id} dari epoch {initial_epoch + 1}/{epochs}")
+                run = store.write_run(
+                    status="running", mode="full", epochs=epochs, learning_rate=learning_rate,
+                    batch_size=batch_size, input_pipeline=input_pipeline, time_budget=time_budget,
+                    seed=run.get("seed", random.randrange(2 ** 31)),
+                    started_at=run.get("started_at", datetime.now().isoformat()),
+                    resumed_from_epoch=initial_epoch if restore is not None else None
+                )
+                # Urutan shuffle/augmentasi tf.data deterministik per run;
+                # epoch lanjutan memakai seed turunan (tidak mengulang urutan epoch 0)
+                _get_tf().random.set_seed(run["seed"] + initial_epoch)
+            
             print(f"\n{'='*50}")
             print(f"🚀 MEMULAI TRAINING MODEL")
             print(f"{'='*50}")
             print(f"📊 Parameter:")
-            print(f"   - Epochs: {epochs}")
+            print(f"   - Epochs: {epochs}" + (" (maksimum)" if time_budget else ""))
+            if time_budget:
+                print(f"   - Batas Waktu: {time_budget:.0f} detik")
             print(f"   - Learning Rate: {learning_rate}")
             print(f"   - Batch Size: {batch_size}")
             print(f"{'='*50}\n")
             
             # Prepare data
-            train_gen, val_gen, test_gen = self.prepare_data_generators(batch_size)
+            input_stamps = None
+            if input_pipeline == "generator":
+                train_gen, val_gen, test_gen = self.prepare_data_generators(batch_size)
+                samples = {"train": train_gen.samples, "validation": val_gen.samples,
+                           "test": test_gen.samples}
+            else:
+                input_stamps = InputStamps()
+                train_gen, val_gen, test_gen, samples = self.prepare_datasets(
+                    batch_size, input_stamps=input_stamps
+                )
             
-            print(f"📦 Data berhasil di-load:")
-            print(f"   - Training: {train_gen.samples} gambar")
-            print(f"   - Validation: {val_gen.samples} gambar")
-            print(f"   - Test: {test_gen.samples} gambar\n")
+            print(f"📦 Data berhasil di-load ({input_pipeline}):")
+            print(f"   - Training: {samples['train']} gambar")
+            print(f"   - Validation: {samples['validation']} gambar")
+            print(f"   - Test: {samples['test']} gambar\n")
             
             # Create model
             print("🏗️ Membuat model...")
             self.model = self.create_model(learning_rate)
             print(f"✅ Model siap! Total parameters: {self.model.count_params():,}\n")
             
-            # Callbacks
-            callbacks_list = []
+            callbacks_list = self._training_callbacks(epochs, progress_callback, time_budget, budget_start,
+                                                      batch_size, samples["train"], input_stamps)
+            budget_cb = next((cb for cb in callbacks_list if isinstance(cb, TimeBudgetCallback)), None)
+            checkpoint_cb = None
+            if store is not None:
+                stateful = [cb for cb in callbacks_list if isinstance(cb, (EarlyStopping, ReduceLROnPlateau))]
+                checkpoint_cb = CheckpointCallback(
+                    store, stateful + ([budget_cb] if budget_cb is not None else []),
+                    every=checkpoint_every, restore=restore
+                )
+                callbacks_list.append(checkpoint_cb)
+            
+            # TRAINING!
+            print("🧠 Training dimulai...\n")
+            start_time = time.time()
+            
+            if finished:
+                # Checkpoint terakhir sudah di akhir training (epoch habis atau
+                # early stopping): cukup pulihkan bobot
+                checkpoint_cb.set_model(self.model)
+                checkpoint_cb.on_train_begin()
+                if budget_cb is not None:
+                    budget_cb.set_model(self.model)
+                    budget_cb.restore_best_weights()
+                self.history = keras.callbacks.History()
+            else:
+                self.history = self.model.fit(
+                    train_gen,
+                    epochs=epochs,
+                    initial_epoch=initial_epoch,
+                    validation_data=val_gen,
+                    callbacks=callbacks_list,
+                    verbose=1
+                )
+            if checkpoint_cb is not None:
+                self.history.history = checkpoint_cb.history
             
-            # Progress callback
-            if progress_callback:
-                progress_cb = TrainingProgressCallback(epochs, progress_callback)
-                callbacks_list.append(progress_cb)
+            training_time = time.time() - start_time
             
-            # Early stopping (stop jika tidak ada improvement)
-            early_stop = EarlyStopping(
-                monitor='val_loss',
-                patience=5,
-                restore_best_weights=True,
-                verbose=1
-            )
-            callbacks_list.append(early_stop)
-            
-            # Reduce learning rate jika stuck
-            reduce_lr = ReduceLROnPlateau(
-                monitor='val_loss',
-                factor=0.5,
-                patience=3,
-                min_lr=1e-7,
-                verbose=1
+            # Evaluate on test set
+            print("\n📊 Evaluating on test set...")
+            eval_start = time.time()
+            test_loss, test_accuracy = self.model.evaluate(test_gen, verbose=0)
+            test_eval_time = time.time() - eval_start
+            
+            # Save model
+            print(f"\n💾 Menyimpan model ke {self.model_save_path}...")
+            save_start = time.time()
+            self._publish_model()
+            save_time = time.time() - save_start
+            self._record_trained_images(self._manifest_train_sha256())
+            
+            result = self._summarize(training_time, test_loss, test_accuracy)
+            result["instrumentation"] = self.instrumentation.report(
+                test_eval_time=test_eval_time, save_time=save_time
             )
-            callbacks_list.append(reduce_lr)
+            result.update({
+                "parameters": {"epochs": epochs, "learning_rate": learning_rate,
+                               "batch_size": batch_size, "mode": "full", "time_budget": time_budget},
+                "samples": samples,
+                "total_time": time.monotonic() - budget_start
+            })
+            if budget_cb is not None:
+                result.update({
+                    "time_budget": time_budget,
+                    "planned_epochs": budget_cb.planned_epochs,
+                    "stopped_by_budget": budget_cb.stopped_by_budget,
+                    "budget_used": budget_cb.elapsed()
+                })
+            if store is not None:
+                store.discard_checkpoint()
+                store.write_run(status="completed", finished_at=datetime.now().isoformat(),
+                                test_accuracy=result["test_accuracy"], error=None)
             
-            # TRAINING!
-            print("🧠 Training dimulai...\n")
+            # Save training log
+            self._save_training_log(result)
+            
+            return result
+            
+        except Exception as e:
+            print(f"\n❌ Error during training: {e}")
+            import traceback
+            traceback.print_exc()
+            if store is not None:
+                # Checkpoint tetap disimpan: run gagal bisa dilanjutkan
+                store.flush()
+                store.write_run(status="failed", error=str(e))
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        finally:
+            if store is not None:
+                store.flush()
+                store.release()
+    
+    def resume(self, checkpoint_dir: str, progress_callback: Callable = None) -> Dict[str, any]:
+        """
+        ♻️ Lanjutkan run yang terputus dari checkpoint terakhirnya
+        
+        Parameter training (epochs, learning rate, batch size, input
+        pipeline, batas waktu) diambil dari run.json run tersebut.
+        
+        Args:
+            checkpoint_dir: Folder run (yang dulu diberikan ke train())
+            progress_callback: Fungsi callback untuk update progress (untuk UI)
+            
+        Returns:
+            Dict dengan hasil training (sama dengan train())
+        """
+        store = CheckpointStore(checkpoint_dir)
+        run = store.read_run()
+        if not store.has_checkpoint() or not run:
+            return {
+                "success": False,
+                "error": f"Run {store.run_id} tidak punya checkpoint"
+            }
+        return self.train(
+            epochs=run["epochs"],
+            learning_rate=run["learning_rate"],
+            batch_size=run["batch_size"],
+            progress_callback=progress_callback,
+            input_pipeline=run.get("input_pipeline", "tf_data"),
+            checkpoint_dir=checkpoint_dir,
+            time_budget=run.get("time_budget")
+        )
+    
+    def train_transfer(self,
+                       epochs: int = 20,
+                       learning_rate: float = 0.001,
+                       batch_size: int = 32,
+                       progress_callback: Callable = None,
+                       backbone_path: str = None) -> Dict[str, any]:
+        """
+        ⚡ Training mode transfer learning: backbone beku + head kecil
+        
+        1. Backbone = model yang sedang dipakai (layer sebelum output) atau
+           file backbone lokal (lihat FrozenBackbone)
+        2. Fitur setiap gambar dihitung sekali dari tensor cache dan disimpan
+           di feature cache (key sha256); retraining hanya meng-embed gambar
+           baru
+        3. Hanya head (create_head) yang dilatih, langsung dari matriks
+           fitur (tanpa augmentasi, karena fitur dihitung sekali)
+        4. Backbone + head disimpan sebagai satu model di model_save_path,
+           jadi WasteClassifier tidak perlu diubah
+        
+        Args:
+            epochs: Jumlah epoch untuk head
+            learning_rate: Learning rate optimizer
+            batch_size: Ukuran batch
+            progress_callback: Fungsi callback untuk update progress (untuk UI)
+            backbone_path: File backbone (default: model di model_save_path)
+            
+        Returns:
+            Dict dengan hasil training (format sama dengan train, plus
+            mode dan features_computed)
+        """
+        try:
+            run_start = time.monotonic()
+            backbone_path = Path(backbone_path or self.model_save_path)
+            if not backbone_path.exists():
+                return {"success": False, "error": f"Backbone tidak ditemukan di {backbone_path}"}
+            
+            manifest = self._load_manifest()
+            prepared = self._tensor_cache_splits(manifest) if manifest is not None else None
+            if prepared is None:
+                return {"success": False, "error": "Transfer learning butuh manifest split berisi sha256 (jalankan split_dataset)"}
+            cache, located = prepared
+            
+            print(f"\n{'='*50}")
+            print("⚡ MEMULAI TRANSFER LEARNING")
+            print(f"{'='*50}")
+            print(f"🧬 Backbone: {backbone_path}")
+            print("📊 Parameter:")
+            print(f"   - Epochs: {epochs}")
+            print(f"   - Learning Rate: {learning_rate}")
+            print(f"   - Batch Size: {batch_size}")
+            print(f"{'='*50}\n")
+            
+            splits = {name: (shas, labels) for name, (_, _, labels, shas) in located.items()}
+            all_sha256 = [sha for shas, _ in splits.values() for sha in shas]
+            
+            def load_batch(sha256_list):
+                locations = cache.locations(sha256_list)
+                return cache.gather(np.array([loc[0] for loc in locations]),
+                                    np.array([loc[1] for loc in locations]))
+            
+            # Fitur: hanya gambar baru yang melewati backbone
             start_time = time.time()
+            backbone = FrozenBackbone(backbone_path, num_classes=len(CLASS_NAMES))
+            features = FeatureCache(self.feature_cache_dir, backbone.fingerprint, backbone.feature_dim)
+            computed = features.ensure(all_sha256, load_batch, backbone, batch_size=max(batch_size, 32))
+            features.prune(all_sha256)
+            feature_time = time.time() - start_time
+            print(f"🧬 Fitur {backbone.feature_dim}-d: {computed} gambar baru di-embed, "
+                  f"{len(all_sha256) - computed} dari cache ({feature_time:.1f}s)\n")
             
-            self.history = self.model.fit(
-                train_gen,
+            arrays = {}
+            for split_name, (shas, labels) in splits.items():
+                arrays[split_name] = (
+                    features.matrix(shas),
+                    keras.utils.to_categorical(labels, num_classes=len(CLASS_NAMES))
+                )
+            features.close()
+            
+            head = self.create_head(backbone.feature_dim, learning_rate)
+            callbacks_list = self._training_callbacks(epochs, progress_callback, batch_size=batch_size,
+                                                      train_samples=len(arrays["train"][1]))
+            
+            print("🧠 Training head dimulai...\n")
+            start_time = time.time()
+            
+            self.history = head.fit(
+                *arrays["train"],
+                batch_size=batch_size,
                 epochs=epochs,
-                validation_data=val_gen,
+                validation_data=arrays["validation"],
+                shuffle=True,
                 callbacks=callbacks_list,
                 verbose=1
             )
@@ -357,45 +1232,191 @@ class ModelTrainer:
             
             # Evaluate on test set
             print("\n📊 Evaluating on test set...")
-            test_loss, test_accuracy = self.model.evaluate(test_gen, verbose=0)
+            eval_start = time.time()
+            test_loss, test_accuracy = head.evaluate(*arrays["test"], verbose=0)
+            test_eval_time = time.time() - eval_start
+            
+            # Gabungkan backbone + head menjadi satu model gambar -> kelas
+            inputs = keras.Input(shape=(224, 224, 3))
+            self.model = keras.Model(inputs=inputs, outputs=head(backbone.model(inputs)))
             
-            # Save model
             print(f"\n💾 Menyimpan model ke {self.model_save_path}...")
-            self.model.save(self.model_save_path)
+            save_start = time.time()
+            self._publish_model()
+            save_time = time.time() - save_start
+            self._record_trained_images(splits["train"][0])
+            
+            result = self._summarize(training_time, test_loss, test_accuracy)
+            result["instrumentation"] = self.instrumentation.report(
+                test_eval_time=test_eval_time, save_time=save_time
+            )
+            result.update({
+                "mode": "transfer",
+                "features_computed": computed,
+                "feature_time": feature_time,
+                "parameters": {"epochs": epochs, "learning_rate": learning_rate,
+                               "batch_size": batch_size, "mode": "transfer"},
+                "samples": {name: len(shas) for name, (shas, _) in splits.items()},
+                "total_time": time.monotonic() - run_start
+            })
+            
+            # Save training log
+            self._save_training_log(result)
+            
+            return result
+            
+        except Exception as e:
+            print(f"\n❌ Error during transfer learning: {e}")
+            import traceback
+            traceback.print_exc()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
+    def train_incremental(self,
+                          epochs: int = 5,
+                          learning_rate: float = 0.0001,
+                          batch_size: int = 32,
+                          progress_callback: Callable = None,
+                          replay_ratio: float = 3.0,
+                          min_replay: int = 200,
+                          tolerance: float = 0.0) -> Dict[str, any]:
+        """
+        🔁 Fine-tuning incremental dari model produksi (warm start)
+        
+        1. Load bobot model di model_save_path (bukan create_model)
+        2. Data train = semua gambar baru (belum pernah dilihat model, lihat
+           trained_images_path) + sampel replay acak dari data lama agar
+           model tidak melupakan kelas lama
+        3. Jadwal pendek dengan learning rate kecil; BatchNormalization
+           dibekukan supaya statistik lama tidak rusak oleh batch kecil
+        4. Model baru hanya dipublikasikan (disimpan atomik ke
+           model_save_path) jika akurasi validasi tidak turun lebih dari
+           tolerance dibanding model lama pada split validasi yang sama
+        
+        Args:
+            epochs: Jumlah epoch fine-tuning
+            learning_rate: Learning rate optimizer
+            batch_size: Ukuran batch
+            progress_callback: Fungsi callback untuk update progress (untuk UI)
+            replay_ratio: Jumlah gambar lama per gambar baru
+            min_replay: Minimal gambar lama yang diikutkan
+            tolerance: Penurunan akurasi validasi yang masih diterima
+            
+        Returns:
+            Dict dengan hasil training (format sama dengan train, plus mode,
+            published, baseline_val_accuracy, new_images, replay_images)
+        """
+        try:
+            run_start = time.monotonic()
+            if not Path(self.model_save_path).exists():
+                return {"success": False, "error": f"Model produksi tidak ditemukan di {self.model_save_path}"}
+            
+            manifest = self._load_manifest()
+            prepared = self._tensor_cache_splits(manifest) if manifest is not None else None
+            if prepared is None:
+                return {"success": False, "error": "Fine-tuning incremental butuh manifest split berisi sha256 (jalankan split_dataset)"}
+            cache, located = prepared
+            
+            # Gambar baru vs lama di split train
+            shards, slots, labels, shas = (np.asarray(values) for values in located["train"])
+            seen = self._seen_images(manifest, shas)
+            is_new = np.array([sha not in seen for sha in shas], dtype=bool)
+            new_rows = np.flatnonzero(is_new)
+            if len(new_rows) == 0:
+                return {"success": False, "error": "Tidak ada gambar baru sejak training terakhir"}
             
-            # Get final metrics
-            final_train_acc = self.history.history['accuracy'][-1]
-            final_val_acc = self.history.history['val_accuracy'][-1]
-            final_train_loss = self.history.history['loss'][-1]
-            final_val_loss = self.history.history['val_loss'][-1]
+            old_rows = np.flatnonzero(~is_new)
+            replay_count = min(len(old_rows), max(min_replay, int(len(new_rows) * replay_ratio)))
+            replay_rows = np.random.default_rng().choice(old_rows, size=replay_count, replace=False)
+            rows = np.concatenate([new_rows, replay_rows])
             
             print(f"\n{'='*50}")
-            print(f"🎉 TRAINING SELESAI!")
+            print("🔁 MEMULAI FINE-TUNING INCREMENTAL")
             print(f"{'='*50}")
-            print(f"⏱️  Waktu training: {training_time:.2f} detik")
-            print(f"🎯 Final Training Accuracy: {final_train_acc*100:.2f}%")
-            print(f"✅ Final Validation Accuracy: {final_val_acc*100:.2f}%")
-            print(f"🧪 Test Accuracy: {test_accuracy*100:.2f}%")
+            print("📊 Parameter:")
+            print(f"   - Epochs: {epochs}")
+            print(f"   - Learning Rate: {learning_rate}")
+            print(f"   - Batch Size: {batch_size}")
+            print(f"   - Gambar baru: {len(new_rows)}, replay: {replay_count} dari {len(old_rows)}")
             print(f"{'='*50}\n")
             
-            # Return hasil
-            result = {
-                "success": True,
-                "training_time": training_time,
-                "final_train_accuracy": float(final_train_acc),
-                "final_val_accuracy": float(final_val_acc),
-                "test_accuracy": float(test_accuracy),
-                "final_train_loss": float(final_train_loss),
-                "final_val_loss": float(final_val_loss),
-                "test_loss": float(test_loss),
-                "epochs_completed": len(self.history.history['accuracy']),
-                "history": {
-                    "accuracy": [float(x) for x in self.history.history['accuracy']],
-                    "val_accuracy": [float(x) for x in self.history.history['val_accuracy']],
-                    "loss": [float(x) for x in self.history.history['loss']],
-                    "val_loss": [float(x) for x in self.history.history['val_loss']]
-                }
-            }
+            input_stamps = InputStamps()
+            train_ds = dataset_from_tensor_cache(cache, shards[rows], slots[rows], labels[rows], batch_size, True,
+                                                 stamps=input_stamps)
+            val_ds, test_ds = (
+                dataset_from_tensor_cache(cache, *located[split_name][:3], batch_size, False)
+                for split_name in ["validation", "test"]
+            )
+            
+            # Warm start dari model produksi
+            self.model = keras.models.load_model(self.model_save_path, compile=False)
+            for layer in self.model.submodules:
+                if isinstance(layer, layers.BatchNormalization):
+                    layer.trainable = False
+            self.model.compile(
+                optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+                loss='categorical_crossentropy',
+                metrics=['accuracy']
+            )
+            baseline_loss, baseline_accuracy = self.model.evaluate(val_ds, verbose=0)
+            print(f"📏 Model lama: validation accuracy {baseline_accuracy*100:.2f}%\n")
+            
+            callbacks_list = self._training_callbacks(epochs, progress_callback, batch_size=batch_size,
+                                                      train_samples=len(rows), input_stamps=input_stamps)
+            
+            print("🧠 Fine-tuning dimulai...\n")
+            start_time = time.time()
+            
+            self.history = self.model.fit(
+                train_ds,
+                epochs=epochs,
+                validation_data=val_ds,
+                callbacks=callbacks_list,
+                verbose=1
+            )
+            
+            training_time = time.time() - start_time
+            
+            val_loss, val_accuracy = self.model.evaluate(val_ds, verbose=0)
+            published = val_accuracy >= baseline_accuracy - tolerance
+            
+            print("\n📊 Evaluating on test set...")
+            eval_start = time.time()
+            test_loss, test_accuracy = self.model.evaluate(test_ds, verbose=0)
+            test_eval_time = time.time() - eval_start
+            
+            save_time = None
+            if published:
+                print(f"\n💾 Validasi {baseline_accuracy*100:.2f}% -> {val_accuracy*100:.2f}%, "
+                      f"menyimpan model ke {self.model_save_path}...")
+                save_start = time.time()
+                self._publish_model()
+                save_time = time.time() - save_start
+                self._record_trained_images(shas)
+            else:
+                print(f"\n⛔ Validasi turun {baseline_accuracy*100:.2f}% -> {val_accuracy*100:.2f}%, "
+                      f"model lama tetap dipakai")
+            
+            result = self._summarize(training_time, test_loss, test_accuracy)
+            result["instrumentation"] = self.instrumentation.report(
+                test_eval_time=test_eval_time, save_time=save_time
+            )
+            result.update({
+                "mode": "incremental",
+                "published": bool(published),
+                "baseline_val_accuracy": float(baseline_accuracy),
+                "baseline_val_loss": float(baseline_loss),
+                "new_val_accuracy": float(val_accuracy),
+                "new_images": int(len(new_rows)),
+                "replay_images": int(replay_count),
+                "parameters": {"epochs": epochs, "learning_rate": learning_rate,
+                               "batch_size": batch_size, "mode": "incremental"},
+                "samples": {"train": int(len(rows)), "validation": len(located["validation"][2]),
+                            "test": len(located["test"][2])},
+                "total_time": time.monotonic() - run_start
+            })
             
             # Save training log
             self._save_training_log(result)
@@ -403,7 +1424,7 @@ class ModelTrainer:
             return result
             
         except Exception as e:
-            print(f"\n❌ Error during training: {e}")
+            print(f"\n❌ Error during incremental training: {e}")
             import traceback
             traceback.print_exc()
             return {
@@ -411,15 +1432,158 @@ class ModelTrainer:
                 "error": str(e)
             }
     
+    def _publish_model(self):
+        """
+        📤 Simpan self.model ke model_save_path secara atomik (tulis file
+        sementara lalu rename), jadi worker lain tidak pernah membaca file
+        setengah jadi
+        """
+        path = Path(self.model_save_path)
+        tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.tmp{path.suffix}")
+        self.model.save(str(tmp_path))
+        os.replace(tmp_path, path)
+    
+    def _manifest_train_sha256(self):
+        """🔑 sha256 split train di manifest (kosong jika manifest versi 1 / tidak ada)"""
+        manifest = self._load_manifest()
+        if manifest is None:
+            return []
+        return [entry[2] for entry in manifest['splits'].get('train', []) if len(entry) >= 3]
+    
+    def _record_trained_images(self, sha256_list):
+        """
+        📝 Catat gambar train yang sudah dilihat model yang baru disimpan
+        (dasar penentuan gambar baru untuk train_incremental)
+        """
+        with open(self.trained_images_path, 'w') as f:
+            json.dump({
+                "model_path": str(self.model_save_path),
+                "timestamp": datetime.now().isoformat(),
+                "train_sha256": sorted(set(str(sha) for sha in sha256_list))
+            }, f)
+    
+    def _seen_images(self, manifest: Dict, sha256_list) -> set:
+        """
+        👀 sha256 gambar yang sudah pernah dilihat model produksi
+        
+        Dari trained_images_path; untuk model lama tanpa catatan, gambar
+        yang file-nya lebih tua dari file model dianggap sudah dilihat.
+        """
+        if self.trained_images_path.exists():
+            with open(self.trained_images_path, 'r') as f:
+                return set(json.load(f).get("train_sha256", []))
+        
+        model_mtime = os.path.getmtime(self.model_save_path)
+        raw_dir = Path(manifest['raw_data_dir'])
+        wanted = set(sha256_list)
+        seen = set()
+        for category, name, sha in manifest['splits'].get('train', []):
+            path = raw_dir / category / name
+            if sha in wanted and path.exists() and path.stat().st_mtime <= model_mtime:
+                seen.add(sha)
+        return seen
+    
+    def _training_callbacks(self, epochs: int, progress_callback: Callable = None,
+                            time_budget: float = None, budget_start: float = None,
+                            batch_size: int = 32, train_samples: int = None,
+                            input_stamps: InputStamps = None):
+        """
+        📋 Callback training: batas waktu, instrumentasi, progress UI,
+        early stopping, reduce LR, throttle
+        
+        InstrumentationCallback run ini disimpan di self.instrumentation.
+        """
+        callbacks_list = []
+        
+        # Batas waktu paling depan: rencana epoch diperbarui sebelum progress dilaporkan
+        budget_cb = None
+        if time_budget:
+            budget_cb = TimeBudgetCallback(time_budget, epochs, start_time=budget_start)
+            callbacks_list.append(budget_cb)
+        
+        # Instrumentasi sebelum progress: metrik epoch sudah lengkap saat dilaporkan
+        self.instrumentation = InstrumentationCallback(batch_size, train_samples, input_stamps)
+        callbacks_list.append(self.instrumentation)
+        
+        # Progress callback
+        if progress_callback:
+            progress_cb = TrainingProgressCallback(epochs, progress_callback, budget=budget_cb,
+                                                   instrumentation=self.instrumentation)
+            callbacks_list.append(progress_cb)
+        
+        # Early stopping (stop jika tidak ada improvement)
+        early_stop = EarlyStopping(
+            monitor='val_loss',
+            patience=5,
+            restore_best_weights=True,
+            verbose=1
+        )
+        callbacks_list.append(early_stop)
+        if budget_cb is not None:
+            budget_cb.early_stopping = early_stop
+        
+        # Reduce learning rate jika stuck
+        reduce_lr = ReduceLROnPlateau(
+            monitor='val_loss',
+            factor=0.5,
+            patience=3,
+            min_lr=1e-7,
+            verbose=1
+        )
+        callbacks_list.append(reduce_lr)
+
+        # Mengalah ke inference saat latency predict naik
+        if self.throttle is not None:
+            callbacks_list.append(ThrottleCallback(self.throttle))
+        return callbacks_list
+    
+    def _summarize(self, training_time: float, test_loss: float, test_accuracy: float) -> Dict:
+        """
+        🎉 Cetak ringkasan dan susun dict hasil training dari self.history
+        """
+        # Get final metrics
+        final_train_acc = self.history.history['accuracy'][-1]
+        final_val_acc = self.history.history['val_accuracy'][-1]
+        final_train_loss = self.history.history['loss'][-1]
+        final_val_loss = self.history.history['val_loss'][-1]
+        
+        print(f"\n{'='*50}")
+        print("🎉 TRAINING SELESAI!")
+        print(f"{'='*50}")
+        print(f"⏱️  Waktu training: {training_time:.2f} detik")
+        print(f"🎯 Final Training Accuracy: {final_train_acc*100:.2f}%")
+        print(f"✅ Final Validation Accuracy: {final_val_acc*100:.2f}%")
+        print(f"🧪 Test Accuracy: {test_accuracy*100:.2f}%")
+        print(f"{'='*50}\n")
+        
+        return {
+            "success": True,
+            "training_time": training_time,
+            "final_train_accuracy": float(final_train_acc),
+            "final_val_accuracy": float(final_val_acc),
+            "test_accuracy": float(test_accuracy),
+            "final_train_loss": float(final_train_loss),
+            "final_val_loss": float(final_val_loss),
+            "test_loss": float(test_loss),
+            "epochs_completed": len(self.history.history['accuracy']),
+            "history": {
+                "accuracy": [float(x) for x in self.history.history['accuracy']],
+                "val_accuracy": [float(x) for x in self.history.history['val_accuracy']],
+                "loss": [float(x) for x in self.history.history['loss']],
+                "val_loss": [float(x) for x in self.history.history['val_loss']]
+            }
+        }
+    
     def _save_training_log(self, result: Dict):
         """
         📝 Save training log ke file
         """
-        log_dir = Path("training_logs")
-        log_dir.mkdir(exist_ok=True)
+        if self.log_dir is None:
+            return
+        self.log_dir.mkdir(parents=True, exist_ok=True)
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = log_dir / f"training_log_{timestamp}.json"
+        log_file = self.log_dir / f"training_log_{timestamp}.json"
         
         with open(log_file, 'w') as f:
             json.dump(result, f, indent=2)
@@ -0,0 +1,415 @@
+"""
+⏱️ MODUL TRAINING ESTIMATOR - ESTIMASI DURASI TRAINING TERKALIBRASI
+Pengganti heuristik tetap (0.1 detik per batch): durasi training diprediksi
+dari micro-benchmark model + input pipeline yang sebenarnya di mesin ini
+(di-cache per batch size), dikalibrasi dengan riwayat training log
+(instrumentasi modules/training_metrics.py), lengkap dengan interval.
+"""
+
+import json
+import math
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: benchmark tidak dikunci antar proses
+    fcntl = None
+
+BENCHMARK_STEPS = 5          # Step train yang diukur (setelah step tracing)
+BENCHMARK_EVAL_STEPS = 3     # Step evaluasi yang diukur
+BENCHMARK_MAX_AGE = 7 * 24 * 3600
+SPLIT_RATIOS = {"train": 0.7, "validation": 0.15, "test": 0.15}  # Sama dengan split_dataset
+DEFAULT_SPREAD = 0.25        # Lebar interval (+-) sebelum ada riwayat untuk kalibrasi
+MIN_SPREAD = 0.10
+MIN_EPOCHS_EARLY_STOP = 6    # EarlyStopping patience 5: paling cepat berhenti di epoch 6
+HEURISTIC_BATCH_SECONDS = 0.1  # Heuristik lama, hanya jika belum ada data sama sekali
+BENCHMARK_MODES = ("full", "incremental")  # Mode yang melatih seluruh CNN
+
+
+def split_counts(total_images: int) -> Dict[str, int]:
+    """📦 Perkiraan jumlah gambar per split dari total dataset"""
+    return {name: int(round(total_images * ratio)) for name, ratio in SPLIT_RATIOS.items()}
+
+
+def machine_fingerprint() -> Dict:
+    """🖥️ Identitas mesin + TensorFlow; benchmark tidak berlaku jika berubah"""
+    try:
+        from importlib.metadata import version
+        tensorflow = version("tensorflow")
+    except Exception:
+        tensorflow = None
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cores": cores,
+        "tensorflow": tensorflow
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """🕐 Durasi dalam detik / menit / jam"""
+    if seconds < 60:
+        return f"{seconds:.0f} detik"
+    elif seconds < 3600:
+        return f"{seconds/60:.1f} menit"
+    return f"{seconds/3600:.1f} jam"
+
+
+def format_estimate(estimate: Dict) -> str:
+    """🕐 "4.2 menit (3.1 menit - 5.0 menit)" """
+    text = format_duration(estimate["seconds"])
+    interval = estimate.get("interval")
+    if interval and interval["high"] - interval["low"] >= 1:
+        text += f" ({format_duration(interval['low'])} - {format_duration(interval['high'])})"
+    return text
+
+
+# ============================================
+# 🧪 MICRO-BENCHMARK
+# ============================================
+
+def run_benchmark(trainer, batch_size: int, steps: int = BENCHMARK_STEPS,
+                  eval_steps: int = BENCHMARK_EVAL_STEPS) -> Dict:
+    """
+    🧪 Ukur model + input pipeline training yang sebenarnya
+
+    Memakai prepare_datasets dan create_model milik trainer (data split
+    sudah harus ada). Waktu step train/eval termasuk mengambil batch dari
+    pipeline, jadi pipeline yang lambat ikut terukur.
+
+    Args:
+        trainer: ModelTrainer
+        batch_size: Batch size yang diukur
+        steps: Jumlah step train yang diukur setelah step tracing
+        eval_steps: Jumlah step evaluasi yang diukur setelah tracing
+
+    Returns:
+        Dict hasil benchmark (detik)
+    """
+    start = time.perf_counter()
+    train_ds, val_ds, _, samples = trainer.prepare_datasets(batch_size)
+    model = trainer.create_model()
+    setup_time = time.perf_counter() - start
+
+    def timed(step, iterator, count):
+        durations = []
+        for _ in range(count + 1):
+            begin = time.perf_counter()
+            x, y = next(iterator)
+            step(x, y)
+            durations.append(time.perf_counter() - begin)
+        # Durasi pertama = tracing graph + isi buffer pipeline
+        return durations[0], float(np.median(durations[1:]))
+
+    train_first, train_step = timed(model.train_on_batch, iter(train_ds.repeat()), steps)
+    eval_first, eval_step = timed(model.test_on_batch, iter(val_ds.repeat()), eval_steps)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        begin = time.perf_counter()
+        model.save(str(Path(tmp) / "benchmark.h5"))
+        save_time = time.perf_counter() - begin
+
+    return {
+        "batch_size": batch_size,
+        "train_step": train_step,
+        "eval_step": eval_step,
+        # Biaya tetap per run: siapkan data & model, tracing, simpan model
+        "overhead": setup_time + (train_first - train_step) + (eval_first - eval_step) + save_time,
+        "steps": steps,
+        "samples": samples,
+        "measured_at": datetime.now().isoformat(),
+        "measured_ts": time.time()
+    }
+
+
+# ============================================
+# 📜 RIWAYAT TRAINING
+# ============================================
+
+def load_history(log_dirs: Iterable, mode: str = "full") -> List[Dict]:
+    """
+    📜 Run sebelumnya dari training log yang punya instrumentasi
+
+    Mendukung log training worker (parameters/results) dan log
+    ModelTrainer (dict hasil train()). Satu run yang tercatat di kedua
+    format (log lama: worker dan trainer sama-sama menulis log) dihitung
+    sekali; log worker yang dipakai.
+
+    Returns:
+        List run: batch_size, epochs, epochs_completed, early_stopped,
+        epoch_time & images per epoch, eval/overhead (detik), samples
+    """
+    runs = {}
+    for log_dir in log_dirs:
+        log_dir = Path(log_dir)
+        if not log_dir.is_dir():
+            continue
+        for path in sorted(log_dir.glob("training_log_*.json")):
+            try:
+                with open(path) as f:
+                    log = json.load(f)
+            except (OSError, ValueError):
+                continue
+            params = log.get("parameters") or {}
+            epochs_log = (log.get("instrumentation") or {}).get("epochs") or []
+            if not params.get("batch_size") or not epochs_log or params.get("mode", "full") != mode:
+                continue
+            results = log.get("results", log)
+            completed = results.get("epochs_completed", len(epochs_log))
+            epoch_wall = sum(epoch["epoch_time"] for epoch in epochs_log)
+            total_time = log.get("total_time")
+            # Salinan satu run punya waktu total & jumlah epoch yang persis sama
+            key = (params["batch_size"], completed, round(total_time, 3)) if total_time else path
+            if key in runs and "training_id" not in log:
+                continue
+            runs[key] = {
+                "log": path.name,
+                "batch_size": params["batch_size"],
+                "epochs": params.get("epochs", completed),
+                "epochs_completed": completed,
+                # Run dengan batas waktu berhenti karena waktu, bukan early stopping
+                "early_stopped": completed < params.get("epochs", completed) and not params.get("time_budget"),
+                "epoch_time": epoch_wall / len(epochs_log),
+                "images": sum(epoch["images"] for epoch in epochs_log) / len(epochs_log),
+                "samples": log.get("samples"),
+                "overhead": total_time - epoch_wall if total_time else None
+            }
+    return list(runs.values())
+
+
+# ============================================
+# ⏱️ ESTIMATOR
+# ============================================
+
+class TrainingEstimator:
+    """
+    Estimasi durasi training sebelum job dikirim
+
+    🧠 Cara Kerja:
+    1. Benchmark: step train & evaluasi diukur di mesin ini (run_benchmark,
+       dijalankan proses training) lalu di-cache per batch size bersama
+       fingerprint mesin; kadaluarsa setelah BENCHMARK_MAX_AGE
+    2. Waktu per epoch = step train x batch train + step eval x batch
+       validasi; biaya tetap (siapkan data, tracing, evaluasi test, simpan)
+       ditambahkan sekali
+    3. Kalibrasi: untuk setiap run di training log, rasio waktu epoch
+       sebenarnya / prediksi benchmark. Median rasio mengoreksi prediksi,
+       sebarannya (persentil 10-90) menjadi interval. Tanpa benchmark,
+       waktu per gambar diambil langsung dari riwayat
+    4. Early stopping: epoch tempat run sebelumnya berhenti menentukan
+       jumlah epoch yang diharapkan dan batas bawah interval
+    """
+
+    CONFIDENCE = 0.8
+
+    def __init__(self, cache_path: str, log_dirs: Iterable = ()):
+        """
+        Args:
+            cache_path: File JSON cache hasil benchmark
+            log_dirs: Folder training log untuk kalibrasi
+        """
+        self.cache_path = Path(cache_path)
+        self.lock_path = self.cache_path.with_suffix(".lock")
+        self.log_dirs = [Path(d) for d in log_dirs]
+        self._lock_file = None
+
+    # ============================================
+    # 💾 CACHE BENCHMARK
+    # ============================================
+
+    def _read_cache(self) -> Dict:
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def cached_benchmark(self, batch_size: int) -> Optional[Dict]:
+        """💾 Benchmark batch size ini yang masih berlaku (mesin sama, belum kadaluarsa)"""
+        cache = self._read_cache()
+        if cache.get("fingerprint") != machine_fingerprint():
+            return None
+        entry = cache.get("benchmarks", {}).get(str(batch_size))
+        if entry is None or time.time() - entry.get("measured_ts", 0) > BENCHMARK_MAX_AGE:
+            return None
+        return entry
+
+    def save_benchmark(self, entry: Dict):
+        """💾 Simpan hasil run_benchmark (atomik)"""
+        fingerprint = machine_fingerprint()
+        cache = self._read_cache()
+        if cache.get("fingerprint") != fingerprint:
+            cache = {"fingerprint": fingerprint, "benchmarks": {}}
+        cache["benchmarks"][str(entry["batch_size"])] = entry
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, self.cache_path)
+
+    def benchmark(self, trainer, batch_size: int) -> Optional[Dict]:
+        """
+        🧪 Jalankan + cache benchmark
+
+        Returns:
+            Hasil benchmark, atau None jika benchmark lain sedang berjalan
+        """
+        if not self._acquire():
+            return None
+        try:
+            entry = run_benchmark(trainer, batch_size)
+            self.save_benchmark(entry)
+            return entry
+        finally:
+            self._release()
+
+    def _acquire(self) -> bool:
+        if fcntl is None:
+            return True
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def benchmark_running(self) -> bool:
+        """🏃 True jika ada proses yang sedang menjalankan benchmark"""
+        if self._lock_file is not None:
+            return True
+        if fcntl is None or not self.lock_path.exists():
+            return False
+        with open(self.lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return False
+
+    # ============================================
+    # ⏱️ ESTIMASI
+    # ============================================
+
+    @staticmethod
+    def _epoch_seconds(benchmark: Dict, samples: Dict, batch_size: int) -> float:
+        # Biaya per gambar dari benchmark, diskalakan ke batch size yang diminta
+        train_cost = benchmark["train_step"] / benchmark["batch_size"]
+        eval_cost = benchmark["eval_step"] / benchmark["batch_size"]
+        train_batches = math.ceil(samples["train"] / batch_size)
+        val_batches = math.ceil(samples["validation"] / batch_size)
+        return (train_batches * train_cost + val_batches * eval_cost) * batch_size
+
+    @staticmethod
+    def _spread(ratios: List[float]):
+        """Faktor interval (bawah, atas) dari sebaran rasio di sekitar median"""
+        if len(ratios) < 3:
+            return 1 - DEFAULT_SPREAD, 1 + DEFAULT_SPREAD
+        median = float(np.median(ratios))
+        low = float(np.percentile(ratios, 10)) / median
+        high = float(np.percentile(ratios, 90)) / median
+        return min(low, 1 - MIN_SPREAD), max(high, 1 + MIN_SPREAD)
+
+    def estimate(self, epochs: int, batch_size: int, samples: Dict, mode: str = "full",
+                 time_budget: float = None) -> Dict:
+        """
+        ⏱️ Prediksi durasi training
+
+        Args:
+            epochs: Jumlah epoch (maksimum)
+            batch_size: Batch size
+            samples: Jumlah gambar per split (train, validation, test)
+            mode: Mode training (riwayat hanya dari mode yang sama)
+            time_budget: Batas waktu training (detik), opsional
+
+        Returns:
+            Dict: seconds, interval {low, high, confidence}, expected_epochs,
+            per_epoch_seconds, overhead_seconds, basis ("benchmark+history",
+            "benchmark", "history", "heuristic"), history_runs, benchmark
+        """
+        history = load_history(self.log_dirs, mode)
+        benchmark = self.cached_benchmark(batch_size) if mode in BENCHMARK_MODES else None
+        if benchmark is None and mode in BENCHMARK_MODES:
+            # Batch size lain di mesin yang sama masih lebih baik dari heuristik
+            cache = self._read_cache()
+            if cache.get("fingerprint") == machine_fingerprint():
+                entries = [entry for entry in cache.get("benchmarks", {}).values()
+                           if time.time() - entry.get("measured_ts", 0) <= BENCHMARK_MAX_AGE]
+                if entries:
+                    benchmark = min(entries, key=lambda entry: abs(entry["batch_size"] - batch_size))
+
+        low_factor, high_factor = 1 - DEFAULT_SPREAD, 1 + DEFAULT_SPREAD
+        per_epoch, overhead = None, None
+        if benchmark is not None:
+            per_epoch = self._epoch_seconds(benchmark, samples, batch_size)
+            overhead = benchmark["overhead"] + math.ceil(samples["test"] / batch_size) * \
+                benchmark["eval_step"] / benchmark["batch_size"] * batch_size
+            ratios = []
+            for run in history:
+                run_samples = run["samples"] or samples
+                predicted = self._epoch_seconds(benchmark, {
+                    "train": run["images"], "validation": run_samples.get("validation", samples["validation"])
+                }, run["batch_size"])
+                if predicted > 0:
+                    ratios.append(run["epoch_time"] / predicted)
+            if ratios:
+                per_epoch *= float(np.median(ratios))
+                low_factor, high_factor = self._spread(ratios)
+            basis = "benchmark+history" if ratios else "benchmark"
+        elif history:
+            # Waktu epoch per gambar train (validasi ikut proporsional); batch size sama diutamakan
+            same_batch = [run for run in history if run["batch_size"] == batch_size] or history
+            costs = [run["epoch_time"] / run["images"] for run in same_batch if run["images"]]
+            per_epoch = float(np.median(costs)) * samples["train"]
+            low_factor, high_factor = self._spread(costs)
+            basis = "history"
+        else:
+            per_epoch = math.ceil(samples["train"] / batch_size) * HEURISTIC_BATCH_SECONDS
+            overhead = 0.0
+            low_factor, high_factor = 0.5, 2.0
+            basis = "heuristic"
+
+        overheads = [run["overhead"] for run in history if run["overhead"] is not None]
+        if overheads:
+            overhead = float(np.median(overheads))
+        overhead = overhead or 0.0
+
+        # Early stopping: epoch berhenti run sebelumnya (run yang habis = tidak berhenti sebelum epochs)
+        stops = [run["epochs_completed"] if run["early_stopped"] else math.inf for run in history]
+        expected_epochs = min(epochs, float(np.median(stops))) if stops else epochs
+        low_epochs = min(epochs, min(stops)) if stops else min(epochs, MIN_EPOCHS_EARLY_STOP)
+        expected_epochs = int(math.ceil(expected_epochs))
+
+        seconds = overhead + expected_epochs * per_epoch
+        low = overhead + low_epochs * per_epoch * low_factor
+        high = overhead + epochs * per_epoch * high_factor
+        if time_budget:
+            seconds, low, high = (min(value, time_budget) for value in (seconds, low, high))
+
+        return {
+            "seconds": seconds,
+            "interval": {"low": low, "high": high, "confidence": self.CONFIDENCE},
+            "expected_epochs": expected_epochs,
+            "per_epoch_seconds": per_epoch,
+            "overhead_seconds": overhead,
+            "basis": basis,
+            "history_runs": len(history),
+            "benchmark": benchmark
+        }
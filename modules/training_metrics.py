@@ -0,0 +1,131 @@
+"""
+🔬 MODUL TRAINING METRICS - INSTRUMENTASI THROUGHPUT TRAINING
+Mengukur ke mana waktu training habis: menunggu input pipeline atau
+menghitung di model, ditambah throughput (gambar/detik), waktu evaluasi,
+waktu simpan model dan peak RSS. Dipakai InstrumentationCallback di
+modules/trainer.py; hasilnya masuk training log dan /api/training-status.
+"""
+
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS tidak tersedia
+    resource = None
+
+# Input pipeline dianggap bottleneck jika step menunggu data >= sekian persen
+INPUT_BOUND_PCT = 20.0
+
+_tf = None
+
+
+def _get_tf():
+    global _tf
+    if _tf is None:
+        import tensorflow as tf
+        _tf = tf
+    return _tf
+
+
+def peak_rss_mb() -> Optional[float]:
+    """📈 Peak resident memory proses ini (MB), None jika tidak didukung OS"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class InputStamps:
+    """
+    ⏲️ Waktu setiap batch train selesai diproduksi input pipeline
+
+    🧠 Cara Kerja:
+    1. stamp() dipasang sebagai stage map terakhir sebelum prefetch; untuk
+       setiap batch, py_function kecil (sekali per batch, bukan per gambar)
+       mencatat time.perf_counter() ke antrian FIFO
+    2. Konsumen (InstrumentationCallback) mengambil satu waktu per step:
+       batch siap setelah step dimulai berarti step menunggu input selama
+       selisihnya; batch yang sudah menunggu di buffer prefetch = 0
+    """
+
+    def __init__(self, maxlen: int = 4096):
+        self._ready = deque(maxlen=maxlen)
+
+    def _record(self):
+        self._ready.append(time.perf_counter())
+        return np.float64(0.0)
+
+    def stamp(self, *batch):
+        """Fungsi map tf.data: batch diteruskan apa adanya setelah waktunya dicatat"""
+        tf = _get_tf()
+        marker = tf.numpy_function(self._record, [], tf.float64, stateful=True)
+        with tf.control_dependencies([marker]):
+            return tuple(tf.identity(tensor) for tensor in batch)
+
+    def pop(self) -> Optional[float]:
+        """Waktu siap batch berikutnya (urut produksi), None jika tidak ada"""
+        try:
+            return self._ready.popleft()
+        except IndexError:
+            return None
+
+    def clear(self):
+        self._ready.clear()
+
+
+def summarize_epoch(step_times: List[float], wait_times: Optional[List[float]], images: int,
+                    val_time: Optional[float]) -> Dict:
+    """
+    📊 Ringkasan satu epoch
+
+    Args:
+        step_times: Durasi tiap step train (detik)
+        wait_times: Bagian step yang menunggu input (None = tidak diukur)
+        images: Jumlah gambar yang dilatih epoch ini
+        val_time: Durasi validasi (detik)
+
+    Returns:
+        Dict metrik epoch (tanpa data per batch)
+    """
+    steps = np.asarray(step_times, dtype=np.float64)
+    train_time = float(steps.sum())
+    summary = {
+        "batches": len(steps),
+        "images": images,
+        "train_time": train_time,
+        "images_per_sec": images / train_time if train_time > 0 else 0.0,
+        "step_ms_p50": float(np.percentile(steps, 50) * 1000) if len(steps) else 0.0,
+        "step_ms_p95": float(np.percentile(steps, 95) * 1000) if len(steps) else 0.0,
+        "input_wait": None,
+        "compute": None,
+        "input_wait_pct": None,
+        "val_time": val_time,
+        "peak_rss_mb": peak_rss_mb()
+    }
+    if wait_times is not None and train_time > 0:
+        input_wait = float(np.sum(wait_times))
+        summary.update({
+            "input_wait": input_wait,
+            "compute": train_time - input_wait,
+            "input_wait_pct": input_wait / train_time * 100
+        })
+    return summary
+
+
+def bottleneck(epochs: List[Dict]) -> Optional[str]:
+    """
+    🎯 "input" jika step rata-rata menunggu data >= INPUT_BOUND_PCT,
+    "compute" jika tidak, None jika waktu tunggu input tidak diukur
+    """
+    measured = [epoch for epoch in epochs if epoch.get("input_wait") is not None]
+    if not measured:
+        return None
+    wait = sum(epoch["input_wait"] for epoch in measured)
+    total = sum(epoch["train_time"] for epoch in measured)
+    return "input" if total > 0 and wait / total * 100 >= INPUT_BOUND_PCT else "compute"
@@ -0,0 +1,497 @@
+"""
+📬 MODUL TRAINING QUEUE - ANTRIAN JOB TRAINING PERSISTEN
+Antrian job training di SQLite yang dipakai bersama oleh semua worker web
+(submit, status, cancel) dan satu proses training worker per host
+(backend/training_worker.py) yang mengeksekusinya
+
+Job bertahan saat worker web di-recycle; job yang sedang berjalan saat
+training worker mati diantrikan ulang dan dilanjutkan dari checkpoint.
+"""
+
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from modules.shared_state import StateOverflowError
+
+try:
+    import fcntl
+except ImportError:  # Windows: satu worker per host tidak dijamin lock
+    fcntl = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    params TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    submitted_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, priority, submitted_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+QUEUED, RUNNING = "queued", "running"
+COMPLETED, FAILED, CANCELLED = "completed", "failed", "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+# Percobaan maksimal satu job (crash berulang -> failed, bukan loop)
+MAX_ATTEMPTS = 3
+
+# Event terbaru yang disimpan untuk klien stream yang reconnect
+MAX_EVENTS = 1000
+
+
+class TrainingQueue:
+    """
+    Antrian job training (SQLite, WAL)
+
+    🧠 Cara Kerja:
+    1. submit() menambah job "queued" dengan prioritas (lebih besar = lebih
+       dulu, lalu yang paling lama menunggu)
+    2. claim_next() (training worker) mengambil job berikutnya dalam satu
+       transaksi BEGIN IMMEDIATE, dan menolak jika masih ada job "running":
+       paling banyak satu training per host
+    3. Selama training, proses training menulis status (epoch, akurasi,
+       pesan, ETA) ke kolom status; semua worker web membaca status yang sama
+    4. cancel(): job queued langsung dibatalkan; job running ditandai
+       cancel_requested dan dihentikan oleh training worker
+    5. Lock file worker (flock) menandai training worker yang hidup;
+       worker baru yang menemukan job "running" tanpa pemilik
+       mengantrikannya ulang (resume dari checkpoint)
+    6. Setiap perubahan job juga ditulis sebagai event "training" ke tabel
+       events dalam transaksi yang sama; ID event naik monoton dan sama di
+       semua proses, jadi bisa dipakai sebagai ID Server-Sent Events
+    7. Jika diberi SharedState, status training untuk UI (training_status())
+       ikut diterbitkan ke sana setelah setiap perubahan, sehingga worker
+       web membacanya tanpa query
+    """
+
+    def __init__(self, db_path: str, state=None):
+        """
+        Inisialisasi antrian
+
+        Args:
+            db_path: Path file SQLite antrian (dibuat jika belum ada)
+            state: SharedState opsional untuk snapshot status training
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.worker_lock_path = self.db_path.with_suffix(".worker.lock")
+
+        self.state = state
+        self._lock = threading.Lock()
+        self._worker_lock_file = None
+        # Autocommit: transaksi tulis dibuka manual dengan BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def _to_dict(row) -> Optional[Dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["status"] = json.loads(job["status"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    @staticmethod
+    def event_data(job: Dict) -> Dict:
+        """📡 Status job untuk UI / event stream"""
+        data = dict(job["status"])
+        data.update(training_id=job["id"], mode=job["mode"], state=job["state"],
+                    priority=job["priority"], cancel_requested=job["cancel_requested"])
+        if job["cancel_requested"] and job["state"] == RUNNING:
+            data["message"] = "Membatalkan training..."
+        return data
+
+    def _append_event(self, event_type: str, data: Dict) -> int:
+        """Tulis event (dipanggil di dalam transaksi, dengan self._lock)"""
+        event_id = self._conn.execute(
+            "INSERT INTO events (type, data, created_at) VALUES (?, ?, ?)",
+            (event_type, json.dumps(data), datetime.now().isoformat())
+        ).lastrowid
+        self._conn.execute("DELETE FROM events WHERE id <= ?", (event_id - MAX_EVENTS,))
+        return event_id
+
+    def _append_job_event(self, job_id: str):
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is not None:
+            self._append_event("training", self.event_data(self._to_dict(row)))
+
+    def _update(self, job_id: str, status_fields: Dict, **columns):
+        """
+        ✏️ Update status (merge) + kolom job dalam satu transaksi, lalu
+        tulis event "training"
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is not None:
+                    status = json.loads(row["status"])
+                    status.update(status_fields)
+                    columns["status"] = json.dumps(status)
+                    assignments = ", ".join(f"{name} = ?" for name in columns)
+                    self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?",
+                                       (*columns.values(), job_id))
+                    self._append_job_event(job_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.publish_state()
+
+    # ============================================
+    # 📥 SUBMIT / CANCEL
+    # ============================================
+
+    def submit(self, mode: str, params: Dict, priority: int = 0, job_id: str = None) -> Dict:
+        """
+        📥 Tambah job ke antrian
+
+        Args:
+            mode: Mode training ("full", "transfer", "incremental")
+            params: Parameter training (epochs, learning_rate, batch_size, ...)
+            priority: Prioritas, lebih besar dijalankan lebih dulu
+            job_id: ID job (default: dibuat otomatis). Job selesai dengan
+                ID yang sama diantrikan ulang (mis. resume dari checkpoint)
+
+        Returns:
+            Dict job
+
+        Raises:
+            ValueError: Jika job dengan ID itu masih queued/running
+        """
+        job_id = job_id or f"train_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        status = {
+            "in_progress": True,
+            "training_id": job_id,
+            "state": QUEUED,
+            "current_epoch": 0,
+            "total_epochs": params.get("epochs", 0),
+            "progress": 0,
+            "message": "Menunggu giliran training...",
+            "accuracy": 0,
+            "loss": 0
+        }
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if existing is not None and existing["state"] not in FINISHED_STATES:
+                    raise ValueError(f"Job {job_id} masih {existing['state']}")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, mode, params, priority, state, status, submitted_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, mode, json.dumps(params), int(priority), QUEUED, json.dumps(status), now)
+                )
+                self._append_job_event(job_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.publish_state()
+        return self.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        🛑 Batalkan job: queued langsung cancelled, running ditandai
+        cancel_requested (dihentikan training worker)
+
+        Returns:
+            Dict job terbaru, atau None jika job tidak ada
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is not None and row["state"] == QUEUED:
+                    status = json.loads(row["status"])
+                    status.update({"in_progress": False, "state": CANCELLED, "message": "Training dibatalkan"})
+                    self._conn.execute(
+                        "UPDATE jobs SET state = ?, status = ?, finished_at = ? WHERE id = ?",
+                        (CANCELLED, json.dumps(status), now, job_id)
+                    )
+                elif row is not None and row["state"] == RUNNING:
+                    self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+                if row is not None and row["state"] in (QUEUED, RUNNING):
+                    self._append_job_event(job_id)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.publish_state()
+        return self.get(job_id)
+
+    # ============================================
+    # 📋 STATUS
+    # ============================================
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """📋 Dict job (None jika tidak ada)"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def list(self, limit: int = 20) -> List[Dict]:
+        """📋 Job aktif (running, lalu queued sesuai urutan eksekusi) dan job selesai terbaru"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY state = 'running' DESC, state = 'queued' DESC, "
+                "CASE WHEN state = 'queued' THEN -priority END, "
+                "CASE WHEN state = 'queued' THEN submitted_at END, "
+                "COALESCE(finished_at, submitted_at) DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def position(self, job_id: str) -> Optional[int]:
+        """
+        🔢 Jumlah job yang jalan lebih dulu (termasuk yang sedang running);
+        0 = job ini langsung dijalankan. None jika job tidak queued
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT priority, submitted_at FROM jobs WHERE id = ? AND state = ?", (job_id, QUEUED)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = ? OR (state = ? AND "
+                "(priority > ? OR (priority = ? AND submitted_at < ?)))",
+                (RUNNING, QUEUED, row["priority"], row["priority"], row["submitted_at"])
+            ).fetchone()[0]
+
+    def current(self) -> Optional[Dict]:
+        """
+        🎯 Job yang paling relevan untuk UI: yang sedang running, lalu
+        queued berikutnya, lalu yang terakhir selesai
+        """
+        jobs = self.list(limit=1)
+        return jobs[0] if jobs else None
+
+    def training_status(self) -> Dict:
+        """
+        📊 Status training untuk UI: job current() + jumlah job yang masih
+        menunggu, atau status Idle
+        """
+        job = self.current()
+        if job is None:
+            return {
+                "in_progress": False,
+                "current_epoch": 0,
+                "total_epochs": 0,
+                "progress": 0,
+                "message": "Idle",
+                "accuracy": 0,
+                "loss": 0
+            }
+        status = self.event_data(job)
+        status["queued"] = self.pending_count() - (job["state"] == RUNNING)
+        return status
+
+    def publish_state(self):
+        """
+        🧷 Terbitkan training_status() ke SharedState. Dihitung di bawah lock
+        penulis state, jadi penulis terakhir selalu membawa status terbaru
+        """
+        if self.state is None:
+            return
+        try:
+            with self.state.transaction() as data:
+                data["training"] = self.training_status()
+            return
+        except StateOverflowError as e:
+            print(f"⚠️  Status training terlalu besar untuk shared state ({e}), diterbitkan ringkas")
+        # Tanpa field bertingkat (metrics, instrumentation, ...): ukurannya terbatas.
+        # Jika masih tidak muat, None membuat pembaca kembali ke training_status()
+        for compact in (True, False):
+            try:
+                with self.state.transaction() as data:
+                    data["training"] = self._compact_status(self.training_status()) if compact else None
+                return
+            except StateOverflowError:
+                continue
+
+    @staticmethod
+    def _compact_status(status: Dict) -> Dict:
+        return {key: value for key, value in status.items()
+                if not isinstance(value, (dict, list)) and not (isinstance(value, str) and len(value) > 1024)}
+
+    def pending_count(self) -> int:
+        """⏳ Jumlah job queued + running"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    # ============================================
+    # 🏃 TRAINING WORKER
+    # ============================================
+
+    def claim_next(self, worker_pid: int) -> Optional[Dict]:
+        """
+        🏃 Ambil job queued berikutnya dan tandai running
+
+        Returns:
+            Dict job, atau None jika antrian kosong / masih ada job running
+        """
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM jobs WHERE state = ?", (RUNNING,)).fetchone():
+                    self._conn.execute("COMMIT")
+                    return None
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE state = ? ORDER BY priority DESC, submitted_at LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                status = json.loads(row["status"])
+                status.update({"state": RUNNING, "message": "Mempersiapkan dataset...",
+                               "start_time": now})
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, status = ?, worker_pid = ?, started_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, json.dumps(status), worker_pid, now, row["id"])
+                )
+                self._append_job_event(row["id"])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        self.publish_state()
+        return self.get(row["id"])
+
+    def update_status(self, job_id: str, **fields):
+        """📊 Update status job (epoch, akurasi, pesan, ...)"""
+        self._update(job_id, fields)
+
+    def finish(self, job_id: str, state: str, **fields):
+        """🏁 Tandai job selesai (completed / failed / cancelled) + update status"""
+        now = datetime.now().isoformat()
+        self._update(job_id, dict(fields, in_progress=False, state=state, end_time=now),
+                     state=state, finished_at=now)
+
+    def requeue_orphans(self) -> List[Dict]:
+        """
+        ♻️ Job running yang worker-nya sudah mati: diantrikan ulang dengan
+        resume=True (lanjut dari checkpoint jika ada), atau failed setelah
+        MAX_ATTEMPTS percobaan. Hanya boleh dipanggil pemegang lock worker.
+
+        Returns:
+            List job yang diantrikan ulang
+        """
+        requeued = []
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs WHERE state = ?", (RUNNING,)).fetchall()
+        for row in rows:
+            job = self._to_dict(row)
+            if job["cancel_requested"]:
+                self.finish(job["id"], CANCELLED, message="Training dibatalkan")
+            elif job["attempts"] >= MAX_ATTEMPTS:
+                self.finish(job["id"], FAILED, completed=False,
+                            message=f"Training gagal setelah {job['attempts']} percobaan",
+                            error="Proses training berhenti berulang kali")
+            else:
+                params = dict(job["params"], resume=True)
+                self._update(job["id"],
+                             {"state": QUEUED, "message": "Training terputus, menunggu dilanjutkan..."},
+                             state=QUEUED, params=json.dumps(params), worker_pid=None)
+                requeued.append(self.get(job["id"]))
+        return requeued
+
+    # ============================================
+    # 📡 EVENT
+    # ============================================
+
+    def publish_event(self, event_type: str, data: Dict) -> int:
+        """📡 Tulis event lain (mis. "dataset") ke log event yang sama"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                event_id = self._append_event(event_type, data)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return event_id
+
+    def events_since(self, last_id: int, limit: int = MAX_EVENTS) -> List[Dict]:
+        """📜 Event dengan ID > last_id, urut naik"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM events WHERE id > ? ORDER BY id LIMIT ?", (last_id, limit)
+            ).fetchall()
+        return [{"id": row["id"], "type": row["type"], "data": json.loads(row["data"])}
+                for row in rows]
+
+    def last_event_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    # ============================================
+    # 🔒 LOCK WORKER
+    # ============================================
+
+    def acquire_worker_lock(self) -> bool:
+        """
+        🔒 Jadikan proses ini satu-satunya training worker di host
+
+        Returns:
+            bool: False jika sudah ada training worker lain
+        """
+        if fcntl is None or self._worker_lock_file is not None:
+            return True
+        lock_file = open(self.worker_lock_path, "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._worker_lock_file = lock_file
+        return True
+
+    def worker_alive(self) -> bool:
+        """🏃 True jika ada training worker yang memegang lock (proses mana pun)"""
+        if self._worker_lock_file is not None:
+            return True
+        if fcntl is None or not self.worker_lock_path.exists():
+            return False
+        with open(self.worker_lock_path, "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return False
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,85 @@
+"""
+🧪 TEST BULK INGEST - upload massal di process pool (modules/bulk_ingest.py)
+"""
+
+import io
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from PIL import Image
+
+from modules import bulk_ingest
+from modules.bulk_ingest import BulkIngestor
+from modules.data_manager import DataManager
+
+
+def _png(value):
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 12), (value, 255 - value, value // 2)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class FakePool:
+    """
+    Pengganti ProcessPoolExecutor yang menjalankan task langsung; broken=True
+    meniru pool yang proses anaknya mati: future pertama gagal, submit
+    berikutnya langsung BrokenProcessPool
+    """
+
+    created = []
+
+    def __init__(self, *args, **kwargs):
+        self.broken = not FakePool.created
+        self.submitted = 0
+        self.shut_down = False
+        FakePool.created.append(self)
+
+    def submit(self, fn, *args):
+        if self.broken and self.submitted:
+            raise BrokenProcessPool("pool rusak")
+        self.submitted += 1
+        future = Future()
+        if self.broken:
+            future.set_exception(BrokenProcessPool("proses anak mati"))
+        else:
+            future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.fixture
+def ingestor(tmp_path, monkeypatch):
+    FakePool.created = []
+    monkeypatch.setattr(bulk_ingest, "ProcessPoolExecutor", FakePool)
+    manager = DataManager(str(tmp_path / "raw"), str(tmp_path / "processed"))
+    return BulkIngestor(manager, tmp_path / "jobs", max_workers=1)
+
+
+def test_pool_rusak_diganti_dan_sisa_file_tetap_diproses(ingestor):
+    files = [(f"img{i}.png", _png(i * 40)) for i in range(5)]
+    job = ingestor.ingest("plastic", files)
+
+    assert job["status"] == "completed"
+    assert job["errors"] == 1 and job["added"] == 4
+    assert len(FakePool.created) == 2 and FakePool.created[0].shut_down
+    assert len(ingestor.data_manager.catalog.records("plastic")) == 4
+
+
+def test_file_yang_sudah_ditulis_tetap_dicatat_saat_job_gagal(ingestor, monkeypatch):
+    FakePool.created = [None]  # Pool pertama langsung sehat
+    original_submit = FakePool.submit
+
+    def submit(pool, fn, *args):
+        if pool.submitted == 2:
+            raise RuntimeError("disk penuh")
+        return original_submit(pool, fn, *args)
+
+    monkeypatch.setattr(FakePool, "submit", submit)
+    files = [(f"img{i}.png", _png(i * 40)) for i in range(4)]
+    with pytest.raises(RuntimeError):
+        ingestor.ingest("glass", files)
+
+    assert len(ingestor.data_manager.catalog.records("glass")) == 2
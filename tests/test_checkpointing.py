@@ -0,0 +1,136 @@
+"""
+🧪 TEST CHECKPOINTING - checkpoint training yang bisa dilanjutkan (modules/checkpointing.py)
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from modules import checkpointing
+from modules.checkpointing import CheckpointStore, find_resumable, list_runs
+
+
+def _arrays(seed=0):
+    rng = np.random.RandomState(seed)
+    return {
+        "weights": [rng.rand(3, 4).astype(np.float32), rng.rand(4)],
+        "optimizer": [np.array(7, dtype=np.int64)],
+    }
+
+
+def test_save_async_lalu_load_mengembalikan_array_dan_state(tmp_path):
+    store = CheckpointStore(tmp_path / "run-1")
+    assert store.load() is None
+
+    arrays = _arrays()
+    store.save_async(arrays, {"epoch": 2, "history": {"loss": [0.9, 0.5, 0.4]}})
+    assert store.flush(timeout=10)
+
+    loaded, state = store.load()
+    assert state == {"epoch": 2, "history": {"loss": [0.9, 0.5, 0.4]}}
+    assert set(loaded) == {"weights", "optimizer"}
+    for group, items in arrays.items():
+        assert len(loaded[group]) == len(items)
+        for expected, actual in zip(items, loaded[group]):
+            np.testing.assert_array_equal(actual, expected)
+            assert actual.dtype == expected.dtype
+    assert store.read_run()["checkpoint_epoch"] == 3
+    assert not list(tmp_path.glob("run-1/*.tmp"))
+
+    store.discard_checkpoint()
+    assert not store.has_checkpoint() and store.load() is None
+
+
+def test_snapshot_terbaru_yang_tersimpan(tmp_path):
+    store = CheckpointStore(tmp_path / "run-1")
+    for epoch in range(20):
+        store.save_async(_arrays(epoch), {"epoch": epoch})
+    store.flush()
+
+    loaded, state = store.load()
+    assert state["epoch"] == 19
+    np.testing.assert_array_equal(loaded["weights"][0], _arrays(19)["weights"][0])
+
+
+@pytest.mark.skipif(checkpointing.fcntl is None, reason="Lock run butuh fcntl")
+def test_lock_run_menandai_run_aktif(tmp_path):
+    owner = CheckpointStore(tmp_path / "run-1")
+    other = CheckpointStore(tmp_path / "run-1")
+    assert not other.is_active()
+
+    assert owner.acquire()
+    assert owner.is_active() and other.is_active()
+    assert not other.acquire()
+
+    owner.release()
+    assert not other.is_active()
+    assert other.acquire()
+    other.release()
+
+
+def test_find_resumable_hanya_run_terputus_dengan_checkpoint(tmp_path):
+    def run(run_id, started_at, status, checkpoint=True):
+        store = CheckpointStore(tmp_path / run_id)
+        store.write_run(status=status, started_at=started_at)
+        if checkpoint:
+            store.save_async(_arrays(), {"epoch": 0})
+            store.flush()
+        return store
+
+    run("selesai", "2026-01-01T10:00", "completed")
+    run("tanpa-checkpoint", "2026-01-01T11:00", "running", checkpoint=False)
+    run("lama", "2026-01-01T08:00", "running")
+    active = run("aktif", "2026-01-01T12:00", "running")
+    run("terputus", "2026-01-01T09:00", "running")
+    active.acquire()
+
+    runs = list_runs(tmp_path)
+    assert [r["run_id"] for r in runs] == ["aktif", "tanpa-checkpoint", "selesai", "terputus", "lama"]
+    assert [r["run_id"] for r in runs if r["resumable"]] == ["terputus", "lama"]
+
+    assert find_resumable(tmp_path)["run_id"] == "terputus"
+    assert find_resumable(tmp_path, "lama")["run_id"] == "lama"
+    assert find_resumable(tmp_path, "selesai") is None
+    assert find_resumable(tmp_path / "tidak-ada") is None
+    active.release()
+
+
+def test_checkpoint_callback_melanjutkan_state_training(tmp_path):
+    trainer = pytest.importorskip("modules.trainer")
+    keras = trainer.keras
+
+    def model():
+        keras.utils.set_random_seed(0)
+        built = keras.Sequential([keras.Input((4,)), keras.layers.Dense(3, activation="softmax")])
+        built.compile(optimizer=keras.optimizers.Adam(0.01), loss="sparse_categorical_crossentropy")
+        return built
+
+    x = np.random.RandomState(1).rand(32, 4).astype(np.float32)
+    y = np.arange(32) % 3
+
+    store = CheckpointStore(tmp_path / "run-1")
+    early_stopping = keras.callbacks.EarlyStopping(monitor="loss", patience=5)
+    first = model()
+    first.fit(x, y, epochs=2, verbose=0,
+              callbacks=[early_stopping, trainer.CheckpointCallback(store, [early_stopping])])
+    store.flush()
+    rng_after_first = (random.random(), np.random.rand())
+
+    restore = store.load()
+    assert restore[1]["epoch"] == 1 and len(restore[1]["history"]["loss"]) == 2
+
+    random.seed(123)
+    np.random.seed(123)
+    resumed = model()
+    resumed_stopping = keras.callbacks.EarlyStopping(monitor="loss", patience=5)
+    callback = trainer.CheckpointCallback(store, [resumed_stopping], restore=restore)
+    callback.set_model(resumed)
+    callback.on_train_begin()
+
+    for expected, actual in zip(first.get_weights(), resumed.get_weights()):
+        np.testing.assert_allclose(actual, expected)
+    assert int(resumed.optimizer.iterations.numpy()) == int(first.optimizer.iterations.numpy())
+    assert resumed_stopping.best == pytest.approx(restore[1]["callbacks"][0]["best"])
+    assert (random.random(), np.random.rand()) == rng_after_first
+    assert callback.history == restore[1]["history"]
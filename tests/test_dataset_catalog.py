@@ -0,0 +1,118 @@
+"""
+🧪 TEST DATASET CATALOG - katalog dataset incremental (modules/dataset_catalog.py)
+"""
+
+import os
+
+import pytest
+
+from modules import dataset_catalog
+from modules.dataset_catalog import DatasetCatalog, file_sha256
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    raw = tmp_path / "raw"
+    for category in dataset_catalog.CATEGORIES:
+        (raw / category).mkdir(parents=True)
+    return tmp_path
+
+
+def _catalog(dataset):
+    return DatasetCatalog(str(dataset / "catalog.db"), str(dataset / "raw"), str(dataset / "processed"))
+
+
+def _image(dataset, category, name, content=None):
+    path = dataset / "raw" / category / name
+    path.write_bytes(content or name.encode())
+    return path
+
+
+def test_add_remove_memperbarui_statistik_dan_index_hash(dataset):
+    catalog = _catalog(dataset)
+    a = _image(dataset, "plastic", "a.jpg", b"sama")
+    b = _image(dataset, "glass", "b.jpg", b"sama")
+
+    catalog.add("plastic", a)
+    catalog.add_many("glass", [(b, None)])
+
+    stats = catalog.statistics()
+    assert stats["raw"]["plastic"] == 1 and stats["raw"]["glass"] == 1
+    assert stats["total_raw"] == 2
+    assert [r["filename"] for r in catalog.find_sha256(file_sha256(a))] == ["b.jpg", "a.jpg"]
+
+    assert catalog.remove("plastic", "a.jpg")
+    assert not catalog.remove("plastic", "a.jpg")
+    assert catalog.statistics()["total_raw"] == 1
+    assert catalog.get("plastic", "a.jpg") is None
+
+
+def test_perubahan_koneksi_lain_diterapkan_incremental(dataset, monkeypatch):
+    writer, reader = _catalog(dataset), _catalog(dataset)
+    reloads = []
+    original_load = reader._load_from_db
+    monkeypatch.setattr(reader, "_load_from_db", lambda: (reloads.append(1), original_load()))
+
+    writer.add("plastic", _image(dataset, "plastic", "a.jpg"))
+    writer.add("metal", _image(dataset, "metal", "b.jpg"))
+    assert reader.statistics()["raw"]["plastic"] == 1
+    assert reader.get("metal", "b.jpg")["sha256"] == file_sha256(dataset / "raw/metal/b.jpg")
+
+    writer.set_splits("plastic", {"a.jpg": "train"})
+    writer.remove("metal", "b.jpg")
+    stats = reader.statistics()
+    assert stats["processed"]["train"]["plastic"] == 1
+    assert stats["raw"]["metal"] == 0
+    assert reloads == []  # Tanpa reload penuh
+
+
+def test_changelog_terpangkas_memicu_reload_penuh(dataset, monkeypatch):
+    monkeypatch.setattr(dataset_catalog, "CHANGELOG_KEEP", 2)
+    writer, reader = _catalog(dataset), _catalog(dataset)
+    reader.add("paper", _image(dataset, "paper", "lama.jpg"))
+    writer.statistics()
+    reloads = []
+    original_load = reader._load_from_db
+    monkeypatch.setattr(reader, "_load_from_db", lambda: (reloads.append(1), original_load()))
+
+    for i in range(6):
+        writer.add("paper", _image(dataset, "paper", f"{i}.jpg"))
+    writer.remove("paper", "lama.jpg")
+
+    remaining = writer._conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+    assert remaining <= 3
+    assert reader.statistics()["raw"]["paper"] == 6
+    assert reader.get("paper", "lama.jpg") is None
+    assert reloads == [1]
+
+
+def test_reconcile_hanya_hash_file_baru_atau_berubah(dataset, monkeypatch):
+    catalog = _catalog(dataset)
+    keep = _image(dataset, "cardboard", "keep.jpg")
+    changed = _image(dataset, "cardboard", "changed.jpg")
+    gone = _image(dataset, "cardboard", "gone.jpg")
+    assert catalog.reconcile() == {"added": 3, "updated": 0, "removed": 0}
+
+    changed.write_bytes(b"isi baru yang lebih panjang")
+    os.utime(changed, (1, 1))
+    gone.unlink()
+    _image(dataset, "cardboard", "new.png")
+    hashed = []
+    original_hash = dataset_catalog.file_sha256
+    monkeypatch.setattr(dataset_catalog, "file_sha256", lambda path: (hashed.append(path.name), original_hash(path))[1])
+
+    assert catalog.reconcile() == {"added": 1, "updated": 1, "removed": 1}
+    assert sorted(hashed) == ["changed.jpg", "new.png"]
+    assert catalog.get("cardboard", "changed.jpg")["sha256"] == original_hash(changed)
+    assert catalog.get("cardboard", keep.name) is not None
+
+
+def test_katalog_bertahan_setelah_restart(dataset):
+    catalog = _catalog(dataset)
+    catalog.add("glass", _image(dataset, "glass", "a.jpg"))
+    catalog.set_splits("glass", {"a.jpg": "validation"})
+    catalog.close()
+
+    reopened = _catalog(dataset)
+    assert reopened.get("glass", "a.jpg")["split"] == "validation"
+    assert reopened.statistics()["processed"]["validation"]["glass"] == 1
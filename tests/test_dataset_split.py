@@ -0,0 +1,102 @@
+"""
+🧪 TEST DATASET SPLIT - split deterministik dan incremental (modules/data_manager.py)
+"""
+
+import hashlib
+import os
+
+from modules.data_manager import DataManager, assign_split
+
+
+def _sha(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _manager(tmp_path):
+    return DataManager(str(tmp_path / "raw"), str(tmp_path / "processed"))
+
+
+def _image(tmp_path, category, name):
+    path = tmp_path / "raw" / category / name
+    path.write_bytes(name.encode())
+    return path
+
+
+def _manifest_splits(manager):
+    splits = manager.load_split_manifest()["splits"]
+    return {f"{category}/{filename}": split
+            for split, rows in splits.items() for category, filename, _ in rows}
+
+
+def test_assign_split_deterministik_dan_sesuai_ratio():
+    shas = [_sha(str(i)) for i in range(20000)]
+    first = [assign_split(sha) for sha in shas]
+    assert first == [assign_split(sha) for sha in shas]
+
+    counts = {name: first.count(name) / len(first) for name in ("train", "test", "validation")}
+    assert abs(counts["train"] - 0.7) < 0.01
+    assert abs(counts["test"] - 0.15) < 0.01
+    assert abs(counts["validation"] - 0.15) < 0.01
+
+    assert assign_split("0" * 64) == "train"
+    assert assign_split("f" * 64) == "validation"
+    assert assign_split("c" * 64, train_ratio=0.5, test_ratio=0.5) == "test"
+
+
+def test_split_incremental_hanya_assign_file_baru(tmp_path):
+    manager = _manager(tmp_path)
+    for i in range(12):
+        _image(tmp_path, "plastic", f"p{i}.jpg")
+        _image(tmp_path, "glass", f"g{i}.jpg")
+    manager.refresh_catalog()
+
+    result = manager.split_dataset(group_near_duplicates=False)
+    assert result["success"] and result["newly_assigned"] == 24
+    before = _manifest_splits(manager)
+    for key, split in before.items():
+        category, filename = key.split("/")
+        sha = manager.catalog.get(category, filename)["sha256"]
+        assert split == assign_split(sha)
+
+    again = manager.split_dataset(group_near_duplicates=False)
+    assert again["newly_assigned"] == 0
+    assert _manifest_splits(manager) == before
+
+    _image(tmp_path, "plastic", "baru.jpg")
+    manager.refresh_catalog()
+    grown = manager.split_dataset(group_near_duplicates=False)
+    after = _manifest_splits(manager)
+    assert grown["newly_assigned"] == 1
+    assert {k: v for k, v in after.items() if k != "plastic/baru.jpg"} == before
+
+
+def test_split_hardlink_ke_folder_processed(tmp_path):
+    manager = _manager(tmp_path)
+    for i in range(6):
+        _image(tmp_path, "metal", f"m{i}.jpg")
+    manager.refresh_catalog()
+    manager.split_dataset(group_near_duplicates=False)
+
+    for key, split in _manifest_splits(manager).items():
+        category, filename = key.split("/")
+        linked = tmp_path / "processed" / split / category / filename
+        assert os.path.samefile(linked, tmp_path / "raw" / category / filename)
+        others = {"train", "test", "validation"} - {split}
+        assert not any((tmp_path / "processed" / other / category / filename).exists() for other in others)
+
+
+def test_ratio_berubah_assign_ulang_semua_dan_ratio_invalid_ditolak(tmp_path):
+    manager = _manager(tmp_path)
+    for i in range(10):
+        _image(tmp_path, "paper", f"k{i}.jpg")
+    manager.refresh_catalog()
+    manager.split_dataset(group_near_duplicates=False)
+
+    result = manager.split_dataset(0.5, 0.25, 0.25, group_near_duplicates=False)
+    assert result["success"]
+    for key, split in _manifest_splits(manager).items():
+        category, filename = key.split("/")
+        assert split == assign_split(manager.catalog.get(category, filename)["sha256"], 0.5, 0.25)
+
+    invalid = manager.split_dataset(0.5, 0.5, 0.5)
+    assert not invalid["success"]
@@ -0,0 +1,96 @@
+"""
+🧪 TEST EVENT STREAM - fan-out Server-Sent Events (modules/event_stream.py)
+"""
+
+import threading
+import time
+
+import pytest
+
+from modules.event_stream import EventHub, format_sse
+from modules.training_queue import TrainingQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = TrainingQueue(tmp_path / "queue.db")
+    yield queue
+    queue.close()
+
+
+def _hub(queue, **kwargs):
+    kwargs.setdefault("poll_interval", 0.01)
+    return EventHub(queue.events_since, queue.last_event_id, **kwargs)
+
+
+def _ids(events):
+    return [event["id"] for event in events]
+
+
+def _collect(subscription, count, timeout=5.0):
+    events, deadline = [], time.monotonic() + timeout
+    while len(events) < count and time.monotonic() < deadline:
+        events.extend(subscription.get(timeout=0.1))
+    return events
+
+
+def test_format_sse():
+    text = format_sse({"id": 7, "type": "training", "data": {"progress": 50}})
+    assert text == 'id: 7\nevent: training\ndata: {"progress": 50}\n\n'
+
+
+def test_replay_dari_last_event_id_lalu_event_baru(queue):
+    ids = [queue.publish_event("dataset", {"n": i}) for i in range(5)]
+    hub = _hub(queue)
+
+    subscription = hub.subscribe(last_event_id=ids[1])
+    assert _ids(subscription.get(timeout=0)) == ids[2:]
+
+    new_id = queue.publish_event("dataset", {"n": 5})
+    assert _ids(_collect(subscription, 1)) == [new_id]
+    subscription.close()
+
+
+def test_klien_baru_tanpa_last_event_id_hanya_event_baru(queue):
+    queue.publish_event("dataset", {"n": 0})
+    hub = _hub(queue)
+
+    fresh = hub.subscribe()
+    up_to_date = hub.subscribe(last_event_id=queue.last_event_id())
+    assert fresh.get(timeout=0) == [] and up_to_date.get(timeout=0) == []
+
+    job = queue.submit("full", {"epochs": 1})
+    for subscription in (fresh, up_to_date):
+        events = _collect(subscription, 1)
+        assert [event["type"] for event in events] == ["training"]
+        assert events[0]["data"]["training_id"] == job["id"]
+        subscription.close()
+
+
+def test_buffer_terbatas_dan_max_clients(queue):
+    ids = [queue.publish_event("dataset", {"n": i}) for i in range(5)]
+    hub = _hub(queue, buffer_size=2, max_clients=1)
+
+    slow = hub.subscribe(last_event_id=0)
+    assert hub.subscribe() is None
+    assert slow.dropped == 3
+    assert _ids(slow.get(timeout=0)) == ids[-2:]
+
+    slow.close()
+    assert hub.client_count == 0
+    again = hub.subscribe()
+    assert again is not None
+    again.close()
+
+
+def test_close_membangunkan_klien_yang_menunggu(queue):
+    hub = _hub(queue, poll_interval=0.5)
+    subscription = hub.subscribe()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(subscription.get(timeout=30)))
+    waiter.start()
+
+    time.sleep(0.05)
+    subscription.close()
+    waiter.join(timeout=5)
+    assert not waiter.is_alive() and result == [[]]
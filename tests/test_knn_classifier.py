@@ -0,0 +1,93 @@
+"""
+🧪 TEST KNN CLASSIFIER - klasifikasi k-NN di atas embedding (modules/knn_classifier.py)
+"""
+
+import numpy as np
+import pytest
+
+from modules.knn_classifier import KNNClassifier, blend
+from modules.similarity_index import EmbeddingIndex
+
+CLASSES = ["cardboard", "glass", "metal", "paper", "plastic"]
+
+
+def _clusters(per_class, dim=16, noise=0.1, seed=0):
+    """Embedding per kelas di sekitar satu pusat acak"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(len(CLASSES), dim))
+    labels = np.repeat(np.arange(len(CLASSES)), per_class)
+    vectors = centers[labels] + noise * rng.normal(size=(len(labels), dim))
+    keys = [f"{CLASSES[label]}/{i}.jpg" for i, label in enumerate(labels)]
+    return keys, labels, vectors.astype(np.float32), centers
+
+
+def test_voting_tetangga_terdekat():
+    keys, labels, vectors, centers = _clusters(per_class=8)
+    knn = KNNClassifier(CLASSES, k=5)
+    assert knn.classify(centers[0]) is None
+
+    knn.add(keys, labels, vectors)
+    result = knn.classify(centers[2] * 4)  # Skala tidak berpengaruh (cosine)
+
+    assert len(knn) == 40
+    assert int(np.argmax(result["probabilities"])) == 2
+    assert result["probabilities"].sum() == pytest.approx(1.0)
+    assert len(result["neighbors"]) == 5
+    assert {n["class_name"] for n in result["neighbors"]} == {"metal"}
+    similarities = [n["similarity"] for n in result["neighbors"]]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_timpa_dan_hapus_langsung_ikut_voting():
+    keys, labels, vectors, _ = _clusters(per_class=2)
+    knn = KNNClassifier(CLASSES, k=1)
+    knn.add(keys, labels, vectors)
+
+    knn.add([keys[0]], [4], vectors[0])  # Label dikoreksi
+    assert len(knn) == 10
+    assert knn.classify(vectors[0])["neighbors"][0] == {
+        "key": keys[0], "class_name": "plastic", "similarity": pytest.approx(1.0)
+    }
+
+    assert knn.remove(keys[0]) and not knn.remove(keys[0])
+    assert len(knn) == 9
+    assert knn.classify(vectors[0])["neighbors"][0]["key"] != keys[0]
+
+
+def test_ivf_hasil_sama_dengan_exact():
+    keys, labels, vectors, centers = _clusters(per_class=120, noise=0.3)
+    exact = KNNClassifier(CLASSES, k=10)
+    ivf = KNNClassifier(CLASSES, k=10, exact_max=200, nprobe=16)
+    exact.add(keys, labels, vectors)
+    ivf.add(keys[:300], labels[:300], vectors[:300])
+    ivf.add(keys[300:], labels[300:], vectors[300:])  # Masuk list IVF yang sudah ada
+    assert ivf._centroids is not None
+
+    for center in centers:
+        expected = exact.classify(center)
+        actual = ivf.classify(center)
+        assert int(np.argmax(actual["probabilities"])) == int(np.argmax(expected["probabilities"]))
+        overlap = {n["key"] for n in actual["neighbors"]} & {n["key"] for n in expected["neighbors"]}
+        assert len(overlap) >= 8
+
+
+def test_validasi_input_dan_from_index():
+    knn = KNNClassifier(CLASSES)
+    with pytest.raises(ValueError):
+        knn.add(["a/1.jpg", "a/2.jpg"], [0], np.ones((2, 4)))
+    knn.add(["glass/1.jpg"], [1], np.ones(4))
+    with pytest.raises(ValueError):
+        knn.add(["glass/2.jpg"], [1], np.ones(8))
+
+    index = EmbeddingIndex()
+    index.add(["Glass/a.jpg", "lainnya/b.jpg", "metal/c.jpg"], np.eye(3, dtype=np.float32))
+    built = KNNClassifier.from_index(index, CLASSES, k=1)
+    assert len(built) == 2
+    assert built.classify(np.array([0, 0, 1.0]))["neighbors"][0]["class_name"] == "metal"
+
+
+def test_blend_rata_rata_berbobot():
+    knn_probabilities = np.array([1.0, 0.0])
+    cnn_probabilities = np.array([0.0, 1.0])
+    np.testing.assert_allclose(blend(knn_probabilities, cnn_probabilities, 0.25), [0.25, 0.75])
+    np.testing.assert_allclose(blend(knn_probabilities, cnn_probabilities, 0.0), cnn_probabilities)
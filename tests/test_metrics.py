@@ -0,0 +1,142 @@
+"""
+🧪 TEST METRICS - registry counter/gauge/histogram + agregasi multi-proses (utils/metrics.py)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from utils.metrics import MetricsRegistry
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def _write_snapshot(session_dir, pid, registry):
+    with open(session_dir / f"metrics_{pid}.json", "w") as f:
+        json.dump(registry.snapshot(), f)
+
+
+def test_counter_menjumlahkan_shard_semua_thread():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("route",))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(route="/api/predict")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc(5, route="/health")
+
+    assert counter.collect() == {("/api/predict",): 4000.0, ("/health",): 5.0}
+
+
+def test_shard_thread_yang_selesai_digabung_ke_arsip():
+    registry = MetricsRegistry()
+    counter = registry.counter("events_total", "Events")
+    histogram = registry.histogram("wait_seconds", "Wait", buckets=(0.1, 1.0))
+
+    def work():
+        counter.inc()
+        histogram.observe(0.5)
+
+    for _ in range(2000):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+
+    assert len(counter._shards._shards) < 64
+    assert len(histogram._shards._shards) < 64
+    assert counter.collect() == {(): 2000.0}
+    assert histogram.collect() == {(): [0.0, 2000.0, 0.0, 1000.0]}
+    assert counter._shards._shards == [] and counter.collect() == {(): 2000.0}
+
+
+def test_label_harus_sesuai_deklarasi():
+    counter = MetricsRegistry().counter("x_total", "X", ("route",))
+    with pytest.raises(ValueError):
+        counter.inc(path="/")
+
+
+def test_register_ulang_mengembalikan_metrik_yang_sama():
+    registry = MetricsRegistry()
+    assert registry.counter("a_total", "A") is registry.counter("a_total", "A")
+    with pytest.raises(ValueError):
+        registry.gauge("a_total", "A")
+
+
+def test_exposition_format_prometheus():
+    registry = MetricsRegistry()
+    registry.counter("loads_total", "Model loads").inc(2)
+    registry.gauge("queue_depth", 'Depth "now"').set(1.5)
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, route='a"b')
+
+    lines = registry.exposition().splitlines()
+
+    assert "# HELP loads_total Model loads" in lines
+    assert "# TYPE loads_total counter" in lines
+    assert "loads_total 2" in lines
+    assert '# HELP queue_depth Depth \\"now\\"' in lines
+    assert "queue_depth 1.5" in lines
+    assert "# TYPE latency_seconds histogram" in lines
+    # Bucket kumulatif, label di-escape, +Inf = count
+    assert 'latency_seconds_bucket{route="a\\"b",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="a\\"b",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="a\\"b",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{route="a\\"b"} 4.05' in lines
+    assert 'latency_seconds_count{route="a\\"b"} 4' in lines
+
+
+def test_merge_snapshot_worker_lain_dan_arsip_worker_mati(tmp_path):
+    registry = MetricsRegistry()
+    registry.enable_multiprocess(str(tmp_path), flush_interval=3600, session="s")
+    session_dir = tmp_path / "s"
+    registry.counter("predictions_total", "P", ("endpoint",)).inc(1, endpoint="predict")
+    registry.gauge("rss_bytes", "RSS", multiprocess_mode="all").set(100)
+    registry.gauge("training", "T", multiprocess_mode="max").set(1)
+
+    alive = MetricsRegistry()
+    alive.counter("predictions_total", "P", ("endpoint",)).inc(2, endpoint="predict")
+    alive.gauge("rss_bytes", "RSS", multiprocess_mode="all").set(200)
+    alive.gauge("training", "T", multiprocess_mode="max").set(3)
+    _write_snapshot(session_dir, os.getppid(), alive)
+
+    dead = MetricsRegistry()
+    dead.counter("predictions_total", "P", ("endpoint",)).inc(4, endpoint="predict_tensor")
+    dead.gauge("rss_bytes", "RSS", multiprocess_mode="all").set(999)
+    dead_pid = _dead_pid()
+    _write_snapshot(session_dir, dead_pid, dead)
+
+    lines = registry.exposition().splitlines()
+
+    assert 'predictions_total{endpoint="predict"} 3' in lines
+    assert 'predictions_total{endpoint="predict_tensor"} 4' in lines
+    assert "training 3" in lines  # mode max
+    assert f'rss_bytes{{pid="{os.getpid()}"}} 100' in lines
+    assert f'rss_bytes{{pid="{os.getppid()}"}} 200' in lines
+    assert not any("999" in line for line in lines)  # Gauge worker mati dibuang
+    # Counter worker mati dipindah ke arsip dan tetap dihitung
+    assert not (session_dir / f"metrics_{dead_pid}.json").exists()
+    assert (session_dir / "archive.json").exists()
+    assert registry.total("predictions_total") == 7
+
+
+def test_total_hanya_untuk_counter():
+    registry = MetricsRegistry()
+    registry.gauge("g", "G")
+    assert registry.total("belum_ada_total") == 0
+    with pytest.raises(ValueError):
+        registry.total("g")
@@ -0,0 +1,108 @@
+"""
+🧪 TEST NEAR DUPLICATES - perceptual hash dan cluster near-duplicate (modules/near_duplicates.py)
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageEnhance
+
+from modules.data_manager import DataManager
+from modules.dataset_catalog import file_sha256
+from modules.near_duplicates import NearDuplicateIndex, dhash, hamming_distances
+
+
+def _pattern(seed, size=(240, 200)):
+    """Gambar pola halus acak (grid 12x10 di-upscale) sehingga dHash stabil"""
+    grid = np.random.RandomState(seed).randint(0, 256, (10, 12, 3), dtype=np.uint8)
+    return Image.fromarray(grid).resize(size, Image.Resampling.BICUBIC)
+
+
+def _save(image, path, quality=95):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image.save(path, "JPEG", quality=quality)
+    return path
+
+
+def _variant(image):
+    """Near-duplicate: resize, sedikit lebih terang, kompresi ulang"""
+    smaller = image.resize((180, 150), Image.Resampling.BILINEAR)
+    return ImageEnhance.Brightness(smaller).enhance(1.08)
+
+
+def _records(raw, keys):
+    return [{"category": key.split("/")[0], "filename": key.split("/")[1],
+             "sha256": file_sha256(raw / key)} for key in keys]
+
+
+@pytest.fixture
+def raw(tmp_path):
+    raw = tmp_path / "raw"
+    _save(_pattern(1), raw / "plastic/a.jpg")
+    _save(_variant(_pattern(1)), raw / "plastic/a_copy.jpg", quality=70)
+    _save(_pattern(1), raw / "glass/a_salah_label.jpg", quality=80)
+    _save(_pattern(2), raw / "plastic/b.jpg")
+    _save(_pattern(3), raw / "metal/c.jpg")
+    return raw
+
+
+KEYS = ["plastic/a.jpg", "plastic/a_copy.jpg", "glass/a_salah_label.jpg", "plastic/b.jpg", "metal/c.jpg"]
+
+
+def test_dhash_tahan_resize_dan_kompresi(raw):
+    base = dhash(raw / "plastic/a.jpg")
+    others = np.array([dhash(raw / key) for key in KEYS[1:]], dtype=np.uint64)
+    distances = hamming_distances(base, others).tolist()
+
+    assert distances[0] <= 6 and distances[1] <= 6
+    assert min(distances[2:]) > 12
+    assert hamming_distances(base, np.array([base], dtype=np.uint64)).tolist() == [0]
+
+
+def test_cluster_query_dan_cache_hash(tmp_path, raw):
+    index = NearDuplicateIndex(tmp_path / "phash.db")
+    assert index.sync(_records(raw, KEYS), raw) == 5
+
+    assert index.clusters() == [sorted(KEYS[:3])]
+    matches = index.query(dhash(raw / "plastic/a.jpg"))
+    assert {key for key, _ in matches} == set(KEYS[:3])
+    assert matches[0] == ("plastic/a.jpg", 0)
+    index.close()
+
+    reopened = NearDuplicateIndex(tmp_path / "phash.db")
+    assert reopened.sync(_records(raw, KEYS), raw) == 0
+    assert reopened.sync(_records(raw, KEYS[3:]), raw) == 0
+    assert reopened.clusters() == []
+    reopened.close()
+
+
+def test_hash_identik_digabung_walau_di_atas_threshold(tmp_path, raw):
+    index = NearDuplicateIndex(tmp_path / "phash.db", threshold=0)
+    records = _records(raw, KEYS[3:])
+    index.sync(records + [dict(records[0], filename="b_persis.jpg")], raw)
+    assert index.clusters() == [["plastic/b.jpg", "plastic/b_persis.jpg"]]
+    index.close()
+
+
+def test_split_menjaga_satu_cluster_di_split_yang_sama(tmp_path):
+    raw = tmp_path / "raw"
+    for seed in range(10):
+        image = _pattern(100 + seed)
+        _save(image, raw / f"plastic/p{seed}.jpg")
+        _save(_variant(image), raw / f"paper/p{seed}_mirip.jpg", quality=70)
+        _save(_pattern(200 + seed), raw / f"metal/m{seed}.jpg")
+    manager = DataManager(str(raw), str(tmp_path / "processed"))
+
+    result = manager.split_dataset()
+    assert result["success"] and result["near_duplicate_clusters"] == 10
+
+    splits = {
+        f"{category}/{filename}": split
+        for split, rows in manager.load_split_manifest()["splits"].items()
+        for category, filename, _ in rows
+    }
+    for seed in range(10):
+        assert splits[f"plastic/p{seed}.jpg"] == splits[f"paper/p{seed}_mirip.jpg"]
+
+    report = manager.find_near_duplicates()
+    assert report["newly_hashed"] == 0
+    assert len(report["label_conflicts"]) == 10
@@ -0,0 +1,109 @@
+"""
+🧪 TEST SHARED STATE - state bersama antar proses berbasis mmap (modules/shared_state.py)
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from modules import shared_state
+from modules.shared_state import HEADER_SIZE, SharedState, StateOverflowError
+from modules.training_queue import TrainingQueue
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run_python(code, *args):
+    return subprocess.Popen([sys.executable, "-c", code, *map(str, args)], cwd=ROOT)
+
+
+def test_tulis_terlihat_di_instance_lain_dan_snapshot_di_cache(tmp_path):
+    writer = SharedState(tmp_path / "state.bin")
+    reader = SharedState(tmp_path / "state.bin")
+    assert reader.snapshot() == {}
+
+    writer.update(model={"version": 3}, training=None)
+    first = reader.snapshot()
+    assert first == {"model": {"version": 3}, "training": None}
+    assert reader.snapshot() is first
+
+    with writer.transaction() as data:
+        data["model"]["version"] += 1
+    assert reader.get("model") == {"version": 4}
+    assert first == {"model": {"version": 3}, "training": None}
+    assert reader.get("tidak_ada", "default") == "default"
+
+    writer.close()
+    reopened = SharedState(tmp_path / "state.bin")
+    assert reopened.get("model") == {"version": 4}
+
+
+def test_increment_atomik_antar_proses(tmp_path):
+    path = tmp_path / "state.bin"
+    SharedState(path).increment("trainings", 0)
+    code = ("import sys; from modules.shared_state import SharedState; "
+            "s = SharedState(sys.argv[1]); [s.increment('trainings') for _ in range(200)]")
+    processes = [_run_python(code, path) for _ in range(4)]
+    for process in processes:
+        assert process.wait(timeout=60) == 0
+
+    assert SharedState(path).get("counters") == {"trainings": 800}
+
+
+def test_pembaca_tidak_pernah_melihat_tulisan_setengah_jadi(tmp_path):
+    path = tmp_path / "state.bin"
+    reader = SharedState(path)
+    code = ("import sys; from modules.shared_state import SharedState; "
+            "s = SharedState(sys.argv[1]); "
+            "[s.update(a=i, padding='x' * (i % 5000), b=i) for i in range(3000)]; "
+            "s.update(done=True)")
+    writer = _run_python(code, path)
+
+    seen = set()
+    while not reader.get("done"):
+        data = reader.snapshot()
+        assert data.get("a") == data.get("b")
+        assert len(data.get("padding", "")) == (data.get("a") or 0) % 5000
+        seen.add(data.get("a"))
+    assert writer.wait(timeout=60) == 0
+    assert len(seen) > 1
+
+
+def test_sequence_ganjil_dari_penulis_mati_diperbaiki(tmp_path):
+    state = SharedState(tmp_path / "state.bin")
+    state.update(model={"version": 1})
+    sequence = shared_state._SEQ.unpack_from(state._mm, 8)[0]
+    shared_state._SEQ.pack_into(state._mm, 8, sequence + 1)  # Penulis mati di tengah jalan
+
+    reader = SharedState(tmp_path / "state.bin")
+    assert reader.snapshot() == {"model": {"version": 1}}
+    assert not shared_state._SEQ.unpack_from(state._mm, 8)[0] & 1
+
+
+def test_overflow_ditolak_tanpa_mengubah_state(tmp_path):
+    state = SharedState(tmp_path / "state.bin", size=HEADER_SIZE + 64)
+    state.update(kecil=1)
+    with pytest.raises(StateOverflowError):
+        state.update(besar="x" * 100)
+    assert state.snapshot() == {"kecil": 1}
+    assert issubclass(StateOverflowError, ValueError)
+
+
+@pytest.mark.parametrize("size, expected", [(2048, "ringkas"), (HEADER_SIZE + 128, None)])
+def test_status_training_terlalu_besar_diterbitkan_ringkas(tmp_path, size, expected):
+    state = SharedState(tmp_path / "state.bin", size=size)
+    queue = TrainingQueue(tmp_path / "queue.db", state=state)
+    job = queue.submit("full", {"epochs": 2})
+    queue.claim_next(worker_pid=1)
+
+    queue.update_status(job["id"], current_epoch=1, metrics={"history": list(range(1000))})
+    published = state.get("training")
+    if expected is None:
+        assert published is None
+    else:
+        assert published["training_id"] == job["id"] and published["current_epoch"] == 1
+        assert "metrics" not in published
+    assert queue.training_status()["metrics"]["history"][-1] == 999
+    queue.close()
@@ -0,0 +1,95 @@
+"""
+🧪 TEST SIMILARITY INDEX - index embedding gambar mirip (modules/similarity_index.py)
+"""
+
+import numpy as np
+
+from modules.similarity_index import EmbeddingIndex
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_search_mengembalikan_tetangga_terdekat_urut():
+    index = EmbeddingIndex()
+    vectors = _vectors(20)
+    index.add([f"plastic/{i}.jpg" for i in range(20)], vectors)
+
+    results = index.search(vectors[7] * 3, k=3)  # Skala tidak berpengaruh (cosine)
+
+    assert results[0][0] == "plastic/7.jpg"
+    assert abs(results[0][1] - 1.0) < 1e-5
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+
+
+def test_add_menimpa_dan_remove_menghapus_key():
+    index = EmbeddingIndex()
+    vectors = _vectors(3)
+    index.add(["a/1.jpg", "a/2.jpg", "a/3.jpg"], vectors)
+    index.add(["a/2.jpg"], vectors[0])  # Timpa, bukan duplikat
+
+    assert len(index) == 3
+    assert index.remove("a/1.jpg")
+    assert not index.remove("a/1.jpg")
+    assert len(index) == 2
+    assert {key for key, _ in index.search(vectors[0], k=5)} == {"a/2.jpg", "a/3.jpg"}
+
+
+def test_save_load_memeriksa_fingerprint_model(tmp_path):
+    path = tmp_path / "index.npz"
+    index = EmbeddingIndex(str(path), fingerprint="model-a")
+    index.add(["a/1.jpg", "b/2.jpg"], _vectors(2))
+    index.save()
+
+    same_model = EmbeddingIndex(str(path), fingerprint="model-a")
+    assert same_model.load()
+    assert same_model.keys == index.keys
+    np.testing.assert_allclose(same_model.vectors(), index.vectors(), rtol=1e-5)
+
+    assert not EmbeddingIndex(str(path), fingerprint="model-b").load()
+
+
+def test_sync_with_directory_hanya_embed_gambar_baru(tmp_path):
+    for name in ("plastic/1.jpg", "plastic/2.png", "glass/3.jpg", "glass/notes.txt"):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(b"x")
+    embedded = []
+
+    def embed(paths):
+        embedded.extend(paths)
+        return _vectors(len(paths), seed=len(embedded))
+
+    index = EmbeddingIndex()
+    assert index.sync_with_directory(str(tmp_path), embed) == {"added": 3, "removed": 0, "skipped": 0}
+
+    (tmp_path / "plastic/1.jpg").unlink()
+    (tmp_path / "glass/4.jpg").write_bytes(b"x")
+    embedded.clear()
+    assert index.sync_with_directory(str(tmp_path), embed) == {"added": 1, "removed": 1, "skipped": 0}
+    assert [path.name for path in embedded] == ["4.jpg"]
+    assert sorted(index.keys) == ["glass/3.jpg", "glass/4.jpg", "plastic/2.png"]
+
+
+def test_sync_with_directory_melewati_gambar_rusak(tmp_path):
+    (tmp_path / "plastic").mkdir()
+    for name in ("1.jpg", "rusak.jpg", "3.jpg"):
+        (tmp_path / "plastic" / name).write_bytes(b"x")
+
+    def embed(paths):
+        if any(path.name == "rusak.jpg" for path in paths):
+            raise OSError("image file is truncated")
+        return _vectors(len(paths))
+
+    index = EmbeddingIndex()
+    assert index.sync_with_directory(str(tmp_path), embed) == {"added": 2, "removed": 0, "skipped": 1}
+    assert sorted(index.keys) == ["plastic/1.jpg", "plastic/3.jpg"]
+
+
+def test_approximate_search_menemukan_vektor_yang_sama():
+    index = EmbeddingIndex(approximate=True, approximate_min_size=10)
+    vectors = _vectors(200, dim=32)
+    index.add([f"c/{i}.jpg" for i in range(200)], vectors)
+
+    for i in (0, 50, 199):
+        assert index.search(vectors[i], k=1)[0][0] == f"c/{i}.jpg"
@@ -0,0 +1,72 @@
+"""
+🧪 TEST TENSOR CACHE - cache gambar ter-decode berbasis shard (modules/tensor_cache.py)
+"""
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from modules.tensor_cache import TensorCache, decode_for_training
+
+SIZE = (8, 6)
+
+
+def _image(tmp_path, name, value, size=(12, 10)):
+    path = tmp_path / f"{name}.png"
+    Image.new("RGB", size, (value, value // 2, 255 - value)).save(path)
+    return path
+
+
+def _cache(tmp_path, shard_size=2):
+    return TensorCache(tmp_path / "cache", image_size=SIZE, shard_size=shard_size)
+
+
+def test_decode_for_training_rgb_dan_ukuran_target(tmp_path):
+    gray = tmp_path / "gray.png"
+    Image.new("L", (20, 16), 77).save(gray)
+    pixels = decode_for_training(gray, SIZE)
+    assert pixels.shape == SIZE + (3,) and pixels.dtype == np.uint8
+    assert (pixels == 77).all()
+
+
+def test_add_get_dan_gather_lintas_shard(tmp_path):
+    cache = _cache(tmp_path)
+    items = [(f"sha{i}", _image(tmp_path, f"img{i}", i * 40)) for i in range(5)]
+    assert cache.add_many(items) == 5
+    assert cache.add_many(items[:2]) == 0
+    assert not cache.add(*items[0])
+    assert len(cache) == 5
+
+    locations = cache.locations(["sha0", "sha3", "tidak_ada"])
+    assert locations == [(0, 0), (1, 1), None]
+    np.testing.assert_array_equal(cache.get("sha4"), decode_for_training(items[4][1], SIZE))
+    assert cache.get("tidak_ada") is None
+
+    wanted = ["sha4", "sha1", "sha2", "sha0"]
+    shards, slots = map(np.array, zip(*cache.locations(wanted)))
+    batch = cache.gather(shards, slots)
+    for row, sha in zip(batch, wanted):
+        np.testing.assert_array_equal(row, cache.get(sha))
+
+
+def test_prune_membebaskan_slot_untuk_dipakai_ulang(tmp_path):
+    cache = _cache(tmp_path)
+    cache.add_many((f"sha{i}", _image(tmp_path, f"img{i}", i * 40)) for i in range(3))
+
+    assert cache.prune(["sha0", "sha2"]) == 1
+    assert len(cache) == 2 and cache.get("sha1") is None
+    assert cache.add("baru", _image(tmp_path, "baru", 200))
+    assert cache.locations(["baru"]) == [(0, 1)]
+
+
+def test_data_bertahan_dan_layout_berbeda_ditolak(tmp_path):
+    cache = _cache(tmp_path)
+    path = _image(tmp_path, "img", 90)
+    cache.add("sha", path)
+    cache.close()
+
+    reopened = _cache(tmp_path)
+    np.testing.assert_array_equal(reopened.get("sha"), decode_for_training(path, SIZE))
+    reopened.close()
+    with pytest.raises(ValueError):
+        _cache(tmp_path, shard_size=4)
@@ -0,0 +1,54 @@
+"""
+🧪 TEST TENSOR CODEC - payload biner /api/predict-tensor (utils/tensor_codec.py)
+"""
+
+import numpy as np
+import pytest
+
+from utils.tensor_codec import (
+    IMAGE_NBYTES, TENSOR_SHAPE, decode_prediction_binary, decode_tensor_batch,
+    encode_prediction_binary, encode_tensor_batch
+)
+
+
+def test_tensor_batch_round_trip_tanpa_copy():
+    images = np.random.default_rng(0).integers(0, 256, (3,) + TENSOR_SHAPE, dtype=np.uint8)
+    payload = encode_tensor_batch(images)
+
+    decoded = decode_tensor_batch(payload)
+
+    assert decoded.shape == (3,) + TENSOR_SHAPE
+    np.testing.assert_array_equal(decoded, images)
+    assert not decoded.flags.writeable  # View di atas buffer request
+
+
+def test_satu_gambar_tanpa_dimensi_batch():
+    image = np.zeros(TENSOR_SHAPE, dtype=np.uint8)
+    assert decode_tensor_batch(encode_tensor_batch(image)).shape == (1,) + TENSOR_SHAPE
+
+
+@pytest.mark.parametrize("payload", [b"", b"\x00" * (IMAGE_NBYTES - 1), b"\x00" * (IMAGE_NBYTES + 1)])
+def test_decode_menolak_panjang_payload_yang_salah(payload):
+    with pytest.raises(ValueError, match="kelipatan"):
+        decode_tensor_batch(payload)
+
+
+def test_encode_menolak_shape_yang_salah():
+    with pytest.raises(ValueError, match="Shape tensor"):
+        encode_tensor_batch(np.zeros((2, 100, 100, 3), dtype=np.uint8))
+
+
+def test_prediction_binary_round_trip():
+    probs = np.array([[0.1, 0.7, 0.2], [0.5, 0.25, 0.25]], dtype=np.float32)
+
+    indices, decoded = decode_prediction_binary(encode_prediction_binary(probs))
+
+    np.testing.assert_array_equal(indices, [1, 0])
+    np.testing.assert_allclose(decoded, probs)
+
+
+def test_decode_prediction_menolak_magic_lain():
+    data = bytearray(encode_prediction_binary(np.eye(2, dtype=np.float32)))
+    data[:4] = b"XXXX"
+    with pytest.raises(ValueError, match="SWCP"):
+        decode_prediction_binary(bytes(data))
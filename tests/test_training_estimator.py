@@ -0,0 +1,139 @@
+"""
+🧪 TEST TRAINING ESTIMATOR - estimasi durasi training terkalibrasi (modules/training_estimator.py)
+"""
+
+import json
+import time
+
+import pytest
+
+from modules import training_estimator
+from modules.training_estimator import TrainingEstimator, load_history, split_counts
+
+SAMPLES = {"train": 700, "validation": 150, "test": 150}
+
+# train 0.01 detik/gambar, eval 0.005 detik/gambar
+BENCHMARK = {"batch_size": 32, "train_step": 0.32, "eval_step": 0.16, "overhead": 5.0}
+# (22 batch train x 0.01 + 5 batch validasi x 0.005) x 32
+BENCHMARK_EPOCH = 7.84
+
+
+def _write_log(log_dir, name, batch_size=32, epochs=20, completed=20, epoch_time=10.0, images=700,
+               total_time=None, mode="full", worker=True, time_budget=None, training_id="train_1"):
+    log_dir.mkdir(parents=True, exist_ok=True)
+    instrumentation = {"epochs": [{"epoch_time": epoch_time, "images": images}] * completed}
+    parameters = {"epochs": epochs, "batch_size": batch_size, "mode": mode, "time_budget": time_budget}
+    if total_time is None:
+        total_time = 30.0 + epoch_time * completed
+    if worker:
+        log = {"training_id": training_id, "parameters": parameters,
+               "results": {"epochs_completed": completed}}
+    else:
+        log = {"parameters": parameters, "epochs_completed": completed}
+    log.update(instrumentation=instrumentation, samples=SAMPLES, total_time=total_time)
+    (log_dir / f"training_log_{name}.json").write_text(json.dumps(log))
+
+
+def _estimator(tmp_path, benchmark=None):
+    estimator = TrainingEstimator(tmp_path / "benchmark.json", [tmp_path / "logs"])
+    if benchmark is not None:
+        estimator.save_benchmark(dict(benchmark, measured_ts=time.time()))
+    return estimator
+
+
+def test_split_counts():
+    assert split_counts(1000) == {"train": 700, "validation": 150, "test": 150}
+    assert split_counts(0) == {"train": 0, "validation": 0, "test": 0}
+
+
+def test_tanpa_data_memakai_heuristik(tmp_path):
+    estimate = _estimator(tmp_path).estimate(epochs=20, batch_size=32, samples=SAMPLES)
+
+    assert estimate["basis"] == "heuristic" and estimate["benchmark"] is None
+    assert estimate["per_epoch_seconds"] == pytest.approx(22 * 0.1)
+    assert estimate["seconds"] == pytest.approx(20 * 2.2)
+    assert estimate["interval"]["low"] == pytest.approx(6 * 2.2 * 0.5)
+    assert estimate["interval"]["high"] == pytest.approx(20 * 2.2 * 2.0)
+
+
+def test_benchmark_tanpa_riwayat(tmp_path):
+    estimate = _estimator(tmp_path, BENCHMARK).estimate(epochs=10, batch_size=32, samples=SAMPLES)
+
+    assert estimate["basis"] == "benchmark" and estimate["history_runs"] == 0
+    assert estimate["per_epoch_seconds"] == pytest.approx(BENCHMARK_EPOCH)
+    # Overhead benchmark + evaluasi test (5 batch x 0.005 x 32)
+    assert estimate["overhead_seconds"] == pytest.approx(5.8)
+    assert estimate["expected_epochs"] == 10
+    assert estimate["seconds"] == pytest.approx(5.8 + 10 * BENCHMARK_EPOCH)
+    assert estimate["interval"]["high"] == pytest.approx(5.8 + 10 * BENCHMARK_EPOCH * 1.25)
+
+
+def test_benchmark_dikalibrasi_riwayat(tmp_path):
+    for i, completed in enumerate((8, 10, 12)):
+        _write_log(tmp_path / "logs", f"run{i}", completed=completed, epoch_time=2 * BENCHMARK_EPOCH,
+                   total_time=40.0 + 2 * BENCHMARK_EPOCH * completed, training_id=f"train_{i}")
+    estimate = _estimator(tmp_path, BENCHMARK).estimate(epochs=20, batch_size=32, samples=SAMPLES)
+
+    assert estimate["basis"] == "benchmark+history" and estimate["history_runs"] == 3
+    assert estimate["per_epoch_seconds"] == pytest.approx(2 * BENCHMARK_EPOCH)
+    assert estimate["overhead_seconds"] == pytest.approx(40.0)
+    assert estimate["expected_epochs"] == 10
+    assert estimate["seconds"] == pytest.approx(40.0 + 10 * 2 * BENCHMARK_EPOCH)
+    # Rasio semua run sama: interval memakai lebar minimum
+    assert estimate["interval"]["low"] == pytest.approx(40.0 + 8 * 2 * BENCHMARK_EPOCH * 0.9)
+    assert estimate["interval"]["high"] == pytest.approx(40.0 + 20 * 2 * BENCHMARK_EPOCH * 1.1)
+
+
+def test_riwayat_tanpa_benchmark(tmp_path):
+    _write_log(tmp_path / "logs", "a", epoch_time=7.0, training_id="a")
+    _write_log(tmp_path / "logs", "b", batch_size=64, epoch_time=70.0, training_id="b")
+    _write_log(tmp_path / "logs", "transfer", mode="transfer", epoch_time=1.0, training_id="c")
+    estimate = _estimator(tmp_path).estimate(epochs=20, batch_size=32, samples={**SAMPLES, "train": 1400})
+
+    assert estimate["basis"] == "history" and estimate["history_runs"] == 2
+    # Batch size sama diutamakan: 0.01 detik per gambar train
+    assert estimate["per_epoch_seconds"] == pytest.approx(14.0)
+    assert estimate["expected_epochs"] == 20
+
+    transfer = _estimator(tmp_path, BENCHMARK).estimate(20, 32, SAMPLES, mode="transfer")
+    assert transfer["basis"] == "history" and transfer["benchmark"] is None
+
+
+def test_benchmark_batch_size_terdekat_dan_tidak_berlaku(tmp_path, monkeypatch):
+    estimator = _estimator(tmp_path, BENCHMARK)
+    assert estimator.cached_benchmark(64) is None
+    nearest = estimator.estimate(epochs=5, batch_size=64, samples=SAMPLES)
+    assert nearest["basis"] == "benchmark" and nearest["benchmark"]["batch_size"] == 32
+
+    monkeypatch.setattr(training_estimator, "machine_fingerprint", lambda: {"cores": -1})
+    assert estimator.cached_benchmark(32) is None
+    assert estimator.estimate(epochs=5, batch_size=32, samples=SAMPLES)["basis"] == "heuristic"
+    monkeypatch.undo()
+
+    estimator.save_benchmark(dict(BENCHMARK, measured_ts=time.time() - training_estimator.BENCHMARK_MAX_AGE - 1))
+    assert estimator.cached_benchmark(32) is None
+    assert estimator.estimate(epochs=5, batch_size=32, samples=SAMPLES)["basis"] == "heuristic"
+
+
+def test_time_budget_membatasi_estimasi(tmp_path):
+    estimate = _estimator(tmp_path, BENCHMARK).estimate(epochs=50, batch_size=32, samples=SAMPLES,
+                                                        time_budget=60)
+    assert estimate["seconds"] == 60
+    assert estimate["interval"]["high"] == 60
+    assert estimate["interval"]["low"] <= 60
+
+
+def test_load_history_satu_run_dihitung_sekali(tmp_path):
+    logs = tmp_path / "logs"
+    _write_log(logs, "20260101_100000", completed=8, total_time=123.4561, worker=False)
+    _write_log(logs, "20260101_100001", completed=8, total_time=123.4564)
+    _write_log(logs, "20260102_090000", completed=5, total_time=80.0, time_budget=60, training_id="train_2")
+
+    runs = load_history([logs, tmp_path / "tidak_ada"])
+    assert len(runs) == 2
+    duplicated = next(run for run in runs if run["epochs_completed"] == 8)
+    assert duplicated["log"] == "training_log_20260101_100001.json"
+    assert duplicated["early_stopped"]
+    budgeted = next(run for run in runs if run["epochs_completed"] == 5)
+    assert not budgeted["early_stopped"]
+    assert budgeted["overhead"] == pytest.approx(80.0 - 5 * 10.0)
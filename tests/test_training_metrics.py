@@ -0,0 +1,55 @@
+"""
+🧪 TEST TRAINING METRICS - instrumentasi throughput training (modules/training_metrics.py)
+"""
+
+import pytest
+
+from modules import training_metrics
+from modules.training_metrics import InputStamps, bottleneck, summarize_epoch
+
+
+def test_summarize_epoch_throughput_dan_waktu_tunggu_input():
+    summary = summarize_epoch([0.1, 0.2, 0.3, 0.4], [0.05, 0.0, 0.1, 0.05], images=100, val_time=1.5)
+
+    assert summary["batches"] == 4 and summary["images"] == 100
+    assert summary["train_time"] == pytest.approx(1.0)
+    assert summary["images_per_sec"] == pytest.approx(100.0)
+    assert summary["step_ms_p50"] == pytest.approx(250.0)
+    assert summary["step_ms_p95"] == pytest.approx(385.0)
+    assert summary["input_wait"] == pytest.approx(0.2)
+    assert summary["compute"] == pytest.approx(0.8)
+    assert summary["input_wait_pct"] == pytest.approx(20.0)
+    assert summary["val_time"] == 1.5
+
+
+def test_summarize_epoch_tanpa_pengukuran_input_dan_tanpa_step():
+    unmeasured = summarize_epoch([0.5], None, images=10, val_time=None)
+    assert unmeasured["input_wait"] is None and unmeasured["input_wait_pct"] is None
+
+    empty = summarize_epoch([], [], images=0, val_time=None)
+    assert empty["images_per_sec"] == 0.0 and empty["step_ms_p50"] == 0.0
+    assert empty["input_wait"] is None
+
+
+def test_bottleneck_input_atau_compute():
+    def epoch(train_time, input_wait):
+        return {"train_time": train_time, "input_wait": input_wait}
+
+    limit = training_metrics.INPUT_BOUND_PCT / 100
+    assert bottleneck([]) is None
+    assert bottleneck([epoch(1.0, None)]) is None
+    assert bottleneck([epoch(10.0, 10.0 * limit), epoch(10.0, None)]) == "input"
+    assert bottleneck([epoch(10.0, 1.0), epoch(10.0, 1.0)]) == "compute"
+
+
+def test_input_stamps_fifo():
+    stamps = InputStamps(maxlen=2)
+    assert stamps.pop() is None
+    for _ in range(3):
+        stamps._record()
+    first, second = stamps.pop(), stamps.pop()
+    assert first <= second and stamps.pop() is None
+
+    stamps._record()
+    stamps.clear()
+    assert stamps.pop() is None
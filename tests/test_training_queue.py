@@ -0,0 +1,146 @@
+"""
+🧪 TEST TRAINING QUEUE - antrian job training persisten (modules/training_queue.py)
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from modules import training_queue
+from modules.training_queue import CANCELLED, FAILED, MAX_ATTEMPTS, QUEUED, RUNNING, TrainingQueue
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = TrainingQueue(tmp_path / "queue.db")
+    yield queue
+    queue.close()
+
+
+def test_claim_next_urut_prioritas_dan_satu_job_running(queue):
+    low = queue.submit("full", {"epochs": 3})
+    high = queue.submit("transfer", {"epochs": 5}, priority=5)
+    later = queue.submit("full", {"epochs": 1})
+    assert queue.position(high["id"]) == 0
+    assert queue.position(later["id"]) == 2
+
+    claimed = queue.claim_next(worker_pid=123)
+    assert claimed["id"] == high["id"] and claimed["state"] == RUNNING
+    assert claimed["attempts"] == 1 and claimed["worker_pid"] == 123
+    assert queue.claim_next(worker_pid=123) is None
+    assert queue.position(low["id"]) == 1
+
+    queue.finish(high["id"], "completed", completed=True)
+    assert queue.claim_next(worker_pid=123)["id"] == low["id"]
+    queue.finish(low["id"], "completed")
+    assert queue.claim_next(worker_pid=123)["id"] == later["id"]
+    queue.finish(later["id"], "completed")
+    assert queue.claim_next(worker_pid=123) is None
+    assert queue.training_status()["in_progress"] is False
+
+
+def test_submit_id_yang_masih_aktif_ditolak(queue):
+    job = queue.submit("full", {}, job_id="train_1")
+    with pytest.raises(ValueError):
+        queue.submit("full", {}, job_id="train_1")
+
+    queue.cancel(job["id"])
+    assert queue.submit("full", {"resume": True}, job_id="train_1")["state"] == QUEUED
+
+
+def test_cancel_queued_langsung_dan_running_ditandai(queue):
+    queued = queue.submit("full", {})
+    running = queue.submit("full", {}, priority=1)
+    queue.claim_next(worker_pid=1)
+
+    cancelled = queue.cancel(queued["id"])
+    assert cancelled["state"] == CANCELLED and cancelled["finished_at"]
+    assert cancelled["status"]["in_progress"] is False
+
+    requested = queue.cancel(running["id"])
+    assert requested["state"] == RUNNING and requested["cancel_requested"]
+    assert queue.event_data(requested)["message"] == "Membatalkan training..."
+    assert queue.cancel("tidak_ada") is None
+
+
+def test_cancel_rollback_saat_error(queue, monkeypatch):
+    job = queue.submit("full", {})
+
+    def broken(job_id):
+        raise RuntimeError("disk penuh")
+
+    monkeypatch.setattr(queue, "_append_job_event", broken)
+    with pytest.raises(RuntimeError):
+        queue.cancel(job["id"])
+    monkeypatch.undo()
+
+    assert queue.get(job["id"])["state"] == QUEUED
+    assert not queue._conn.in_transaction
+    assert queue.cancel(job["id"])["state"] == CANCELLED
+
+
+def test_requeue_orphans_resume_cancel_dan_batas_percobaan(queue):
+    resumed = queue.submit("full", {"epochs": 2}, priority=2)
+    queue.claim_next(worker_pid=1)
+    assert [job["id"] for job in queue.requeue_orphans()] == [resumed["id"]]
+    job = queue.get(resumed["id"])
+    assert job["state"] == QUEUED and job["params"] == {"epochs": 2, "resume": True}
+    assert job["worker_pid"] is None
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        queue.claim_next(worker_pid=1)
+        queue.requeue_orphans()
+    assert queue.get(resumed["id"])["attempts"] == MAX_ATTEMPTS
+    queue.claim_next(worker_pid=1)
+    assert queue.requeue_orphans() == []
+    failed = queue.get(resumed["id"])
+    assert failed["state"] == FAILED and failed["status"]["in_progress"] is False
+
+    cancelled = queue.submit("full", {})
+    queue.claim_next(worker_pid=1)
+    queue.cancel(cancelled["id"])
+    assert queue.requeue_orphans() == []
+    assert queue.get(cancelled["id"])["state"] == CANCELLED
+
+
+def test_event_job_naik_monoton_dan_bisa_dibaca_proses_lain(tmp_path, queue):
+    start = queue.last_event_id()
+    job = queue.submit("full", {"epochs": 4})
+    queue.publish_event("dataset", {"action": "added"})
+    queue.claim_next(worker_pid=1)
+
+    other = TrainingQueue(tmp_path / "queue.db")
+    events = other.events_since(start)
+    assert [event["type"] for event in events] == ["training", "dataset", "training"]
+    assert [event["data"].get("state") for event in events] == [QUEUED, None, RUNNING]
+    assert events[0]["data"]["training_id"] == job["id"]
+    assert [event["id"] for event in events] == sorted(event["id"] for event in events)
+    assert other.events_since(events[-1]["id"]) == []
+    other.close()
+
+
+@pytest.mark.skipif(training_queue.fcntl is None, reason="Lock worker butuh fcntl")
+def test_lock_worker_satu_per_host(tmp_path, queue):
+    assert not queue.worker_alive()
+
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys; from modules.training_queue import TrainingQueue; "
+         f"q = TrainingQueue({str(tmp_path / 'queue.db')!r}); "
+         "print(q.acquire_worker_lock(), flush=True); sys.stdin.read()"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=ROOT
+    )
+    try:
+        assert holder.stdout.readline().strip() == "True"
+        assert queue.worker_alive()
+        assert not queue.acquire_worker_lock()
+    finally:
+        holder.communicate("", timeout=30)
+
+    assert not queue.worker_alive()
+    assert queue.acquire_worker_lock()
+    assert queue.worker_alive()
@@ -0,0 +1,514 @@
+"""
+📈 UTILITY - METRICS
+Registry metrik ringan (counter, gauge, histogram) dengan output format
+teks Prometheus
+
+Desain:
+- Hot path tanpa lock: counter & histogram ditulis ke shard milik thread
+  masing-masing, dijumlahkan hanya saat /metrics dibaca
+- Multi-proses (gunicorn --workers N): setiap worker menulis snapshot ke
+  folder bersama secara periodik; /metrics menggabungkan semua worker
+  yang berasal dari master yang sama
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+INF = float("inf")
+
+
+def _format_value(value: float) -> str:
+    if value == INF:
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: Dict[str, str] = None) -> str:
+    pairs = [(n, v) for n, v in zip(names, values)]
+    if extra:
+        pairs.extend(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in pairs) + "}"
+
+
+class _ThreadShards:
+    """
+    🧵 Penyimpanan per-thread: setiap thread hanya menulis ke dict miliknya
+    sendiri sehingga increment tidak butuh lock
+
+    Shard milik thread yang sudah selesai digabung ke satu shard arsip,
+    jadi jumlah shard mengikuti thread yang masih hidup (bukan semua
+    thread yang pernah mencatat metrik)
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Tuple[weakref.ref, dict]] = []
+        self._retired: dict = {}
+        self._prune_at = 64
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self._lock:
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+                if len(self._shards) >= self._prune_at:
+                    self._prune()
+                    self._prune_at = max(64, 2 * len(self._shards))
+            self._local.shard = shard
+        return shard
+
+    def _prune(self):
+        """Gabungkan shard thread yang sudah mati ke arsip (dengan self._lock)"""
+        alive = []
+        for thread_ref, shard in self._shards:
+            thread = thread_ref()
+            if thread is not None and thread.is_alive():
+                alive.append((thread_ref, shard))
+                continue
+            # Thread sudah selesai: shard tidak ditulis lagi
+            for key, value in shard.items():
+                if isinstance(value, list):
+                    total = self._retired.setdefault(key, [0.0] * len(value))
+                    for i, v in enumerate(value):
+                        total[i] += v
+                else:
+                    self._retired[key] = self._retired.get(key, 0.0) + value
+        self._shards = alive
+
+    def snapshots(self) -> List[dict]:
+        with self._lock:
+            self._prune()
+            shards = [shard for _, shard in self._shards]
+            retired = {key: list(value) if isinstance(value, list) else value
+                       for key, value in self._retired.items()}
+        # dict(shard) adalah copy atomik di bawah GIL
+        return [retired] + [dict(shard) for shard in shards]
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: label harus {self.labelnames}, bukan {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+
+class Counter(_Metric):
+    """
+    🔢 Nilai yang hanya bertambah (jumlah request, cache hit, dll)
+    """
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._shards = _ThreadShards()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels) if labels or self.labelnames else ()
+        shard = self._shards.get()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def collect(self) -> Dict[tuple, float]:
+        values: Dict[tuple, float] = {}
+        for shard in self._shards.snapshots():
+            for key, value in shard.items():
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+
+class Gauge(_Metric):
+    """
+    🌡️ Nilai yang bisa naik turun (RSS, request in-flight, progress)
+
+    Pakai set() untuk nilai absolut, atau inc()/dec() untuk nilai relatif
+    (jangan dicampur pada gauge yang sama).
+
+    multiprocess_mode menentukan cara menggabungkan nilai antar worker:
+    "sum", "max", "min", atau "all" (satu seri per pid)
+    """
+    type_name = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), multiprocess_mode: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        if multiprocess_mode not in ("sum", "max", "min", "all"):
+            raise ValueError(f"multiprocess_mode tidak valid: {multiprocess_mode}")
+        self.multiprocess_mode = multiprocess_mode
+        self._values: Dict[tuple, float] = {}
+        self._deltas = _ThreadShards()
+
+    def set(self, value: float, **labels):
+        # Assignment dict atomik di bawah GIL
+        self._values[self._key(labels) if labels or self.labelnames else ()] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels) if labels or self.labelnames else ()
+        shard = self._deltas.get()
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def collect(self) -> Dict[tuple, float]:
+        values = dict(self._values)
+        for shard in self._deltas.snapshots():
+            for key, value in shard.items():
+                values[key] = values.get(key, 0.0) + value
+        return values
+
+
+class Histogram(_Metric):
+    """
+    📊 Distribusi nilai dengan bucket tetap (latency, ukuran batch)
+    """
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = sorted(float(b) for b in buckets if float(b) != INF)
+        self._shards = _ThreadShards()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels) if labels or self.labelnames else ()
+        shard = self._shards.get()
+        state = shard.get(key)
+        if state is None:
+            # [count per bucket..., count +Inf, sum]
+            state = [0.0] * (len(self.upper_bounds) + 2)
+            shard[key] = state
+        state[bisect.bisect_left(self.upper_bounds, value)] += 1
+        state[-1] += value
+
+    def collect(self) -> Dict[tuple, List[float]]:
+        values: Dict[tuple, List[float]] = {}
+        for shard in self._shards.snapshots():
+            for key, state in shard.items():
+                total = values.setdefault(key, [0.0] * len(state))
+                for i, v in enumerate(list(state)):
+                    total[i] += v
+        return values
+
+
+class MetricsRegistry:
+    """
+    🗂️ Kumpulan metrik + agregasi multi-proses
+
+    Aktifkan mode multi-proses dengan enable_multiprocess(folder). Snapshot
+    setiap proses disimpan di folder/<pid master>/metrics_<pid>.json.
+    Counter & histogram dari worker yang sudah mati tetap dihitung (digabung
+    ke arsip), gauge-nya dibuang.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._multiprocess_dir = None
+        self._flush_thread = None
+
+    # ---------- Registrasi ----------
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metrik {name} sudah terdaftar dengan tipe lain")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=(), multiprocess_mode="sum") -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames,
+                              multiprocess_mode=multiprocess_mode)
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def add_collector(self, callback: Callable[[], None]):
+        """
+        🔁 Callback yang dipanggil sebelum snapshot/exposition
+        (mis. update gauge RSS)
+        """
+        self._collectors.append(callback)
+
+    # ---------- Snapshot ----------
+
+    def _run_collectors(self):
+        for callback in list(self._collectors):
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Metrics collector error: {e}")
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        📸 Snapshot semua metrik proses ini (format JSON-friendly)
+        """
+        self._run_collectors()
+        data = {}
+        for name, metric in list(self._metrics.items()):
+            entry = {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "values": [[list(k), v] for k, v in metric.collect().items()]
+            }
+            if isinstance(metric, Gauge):
+                entry["mode"] = metric.multiprocess_mode
+            if isinstance(metric, Histogram):
+                entry["buckets"] = metric.upper_bounds
+            data[name] = entry
+        return data
+
+    # ---------- Multi-proses ----------
+
+    def enable_multiprocess(self, directory: str, flush_interval: float = 2.0, session: str = None):
+        """
+        🤝 Aktifkan agregasi antar worker gunicorn
+
+        Args:
+            directory: Folder bersama untuk snapshot per proses
+            flush_interval: Interval (detik) penulisan snapshot
+            session: ID sesi (default: pid parent). Proses di luar pohon
+                gunicorn (mis. training worker) bergabung dengan memberi
+                pid master gunicorn
+        """
+        # Worker gunicorn berbagi parent (master) yang sama
+        session_dir = Path(directory) / str(session or os.getppid())
+        session_dir.mkdir(parents=True, exist_ok=True)
+        self._multiprocess_dir = session_dir
+
+        if self._flush_thread is None:
+            def flush_loop():
+                while True:
+                    time.sleep(flush_interval)
+                    try:
+                        self.flush()
+                    except Exception as e:
+                        print(f"⚠️  Metrics flush error: {e}")
+
+            self._flush_thread = threading.Thread(target=flush_loop, daemon=True)
+            self._flush_thread.start()
+
+    def flush(self):
+        """
+        💾 Tulis snapshot proses ini ke folder multi-proses (atomik)
+        """
+        if self._multiprocess_dir is None:
+            return
+        path = self._multiprocess_dir / f"metrics_{os.getpid()}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _archive_dead(self, path: Path, archive: dict):
+        """
+        🗄️ Gabungkan counter/histogram worker yang sudah mati ke arsip
+        """
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, entry in snapshot.items():
+            if entry["type"] == "gauge":
+                continue
+            target = archive.setdefault(name, dict(entry, values=[]))
+            target["values"] = [[list(k), v] for k, v in _merge_values(
+                entry["type"], [target["values"], entry["values"]]
+            ).items()]
+        path.unlink()
+
+    def _read_session(self) -> List[Tuple[str, dict]]:
+        """
+        📂 Baca snapshot semua worker (pid, snapshot) termasuk arsip
+        """
+        import fcntl
+
+        directory = self._multiprocess_dir
+        archive_path = directory / "archive.json"
+        snapshots = []
+
+        with open(directory / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            archive = {}
+            if archive_path.exists():
+                with open(archive_path) as f:
+                    archive = json.load(f)
+            archive_changed = False
+
+            for path in directory.glob("metrics_*.json"):
+                pid = int(path.stem.split("_", 1)[1])
+                if pid == os.getpid():
+                    continue
+                if not self._pid_alive(pid):
+                    self._archive_dead(path, archive)
+                    archive_changed = True
+                    continue
+                try:
+                    with open(path) as f:
+                        snapshots.append((str(pid), json.load(f)))
+                except (OSError, ValueError):
+                    continue
+
+            if archive_changed:
+                tmp_path = archive_path.with_suffix(".tmp")
+                with open(tmp_path, "w") as f:
+                    json.dump(archive, f)
+                os.replace(tmp_path, archive_path)
+
+        if archive:
+            snapshots.append(("archive", archive))
+        return snapshots
+
+    def total(self, name: str) -> float:
+        """
+        🔢 Jumlah semua seri sebuah counter di seluruh worker sesi ini
+        (termasuk arsip worker yang sudah mati)
+        """
+        metric = self._metrics.get(name)
+        if metric is not None and not isinstance(metric, Counter):
+            raise ValueError(f"Metrik {name} bukan counter")
+        value = sum(metric.collect().values()) if metric is not None else 0.0
+        if self._multiprocess_dir is not None:
+            for _, snapshot in self._read_session():
+                entry = snapshot.get(name)
+                if entry is not None:
+                    value += sum(v for _, v in entry["values"])
+        return value
+
+    # ---------- Exposition ----------
+
+    def exposition(self) -> str:
+        """
+        📝 Render semua metrik dalam format teks Prometheus 0.0.4
+        """
+        snapshots = [(str(os.getpid()), self.snapshot())]
+        if self._multiprocess_dir is not None:
+            snapshots.extend(self._read_session())
+
+        merged: Dict[str, dict] = {}
+        for pid, snapshot in snapshots:
+            for name, entry in snapshot.items():
+                target = merged.setdefault(name, dict(entry, sources=[]))
+                target["sources"].append((pid, entry["values"]))
+
+        lines = []
+        for name in sorted(merged):
+            entry = merged[name]
+            metric_type = entry["type"]
+            labelnames = entry["labelnames"]
+            lines.append(f"# HELP {name} {_escape(entry['help'])}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+            if metric_type == "gauge" and entry.get("mode") == "all":
+                for pid, values in entry["sources"]:
+                    if pid == "archive":
+                        continue
+                    for key, value in values:
+                        lines.append(f"{name}{_format_labels(labelnames, key, {'pid': pid})} "
+                                     f"{_format_value(value)}")
+                continue
+
+            mode = entry.get("mode", "sum")
+            values = _merge_values(metric_type, [v for _, v in entry["sources"]], mode)
+
+            for key, value in sorted(values.items()):
+                if metric_type == "histogram":
+                    cumulative = 0.0
+                    bounds = entry["buckets"] + [INF]
+                    for bound, count in zip(bounds, value[:-1]):
+                        cumulative += count
+                        labels = _format_labels(labelnames, key, {"le": _format_value(bound)})
+                        lines.append(f"{name}_bucket{labels} {_format_value(cumulative)}")
+                    labels = _format_labels(labelnames, key)
+                    lines.append(f"{name}_sum{labels} {_format_value(value[-1])}")
+                    lines.append(f"{name}_count{labels} {_format_value(cumulative)}")
+                else:
+                    lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _merge_values(metric_type: str, sources, mode: str = "sum") -> dict:
+    """
+    ➕ Gabungkan list nilai [[label_values, value], ...] dari beberapa sumber
+    """
+    merged = {}
+    for values in sources:
+        for key, value in values:
+            key = tuple(key)
+            if key not in merged:
+                merged[key] = list(value) if metric_type == "histogram" else value
+            elif metric_type == "histogram":
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            elif mode == "max":
+                merged[key] = max(merged[key], value)
+            elif mode == "min":
+                merged[key] = min(merged[key], value)
+            else:
+                merged[key] += value
+    return merged
+
+
+def read_process_rss() -> int:
+    """
+    🧠 RSS proses saat ini dalam byte (Linux /proc, fallback ke peak RSS)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Registry global untuk seluruh aplikasi
+REGISTRY = MetricsRegistry()
+
+PROCESS_RSS = REGISTRY.gauge(
+    "process_resident_memory_bytes", "Resident memory size in bytes",
+    multiprocess_mode="all"
+)
+REGISTRY.add_collector(lambda: PROCESS_RSS.set(read_process_rss()))
@@ -0,0 +1,126 @@
+"""
+📦 UTILITY - TENSOR CODEC
+Encode/decode payload biner untuk endpoint /api/predict-tensor
+
+Request  : N x 224 x 224 x 3 byte uint8 mentah (RGB, row-major), tanpa header
+Response : format biner ringkas (default) atau msgpack (opsional)
+
+Format biner response (little-endian):
+    magic        4 byte   b"SWCP"
+    version      uint8    1
+    num_classes  uint8    C
+    count        uint16   N
+    indices      N x uint8          (kelas dengan probabilitas tertinggi)
+    probs        N x C x float32    (probabilitas semua kelas)
+"""
+
+import struct
+import numpy as np
+
+TENSOR_SHAPE = (224, 224, 3)
+IMAGE_NBYTES = TENSOR_SHAPE[0] * TENSOR_SHAPE[1] * TENSOR_SHAPE[2]
+
+BINARY_MAGIC = b"SWCP"
+BINARY_VERSION = 1
+BINARY_MIMETYPE = "application/octet-stream"
+MSGPACK_MIMETYPE = "application/x-msgpack"
+
+_HEADER = struct.Struct("<4sBBH")
+
+# Lazy import msgpack (dependency opsional)
+_msgpack = None
+
+def _get_msgpack():
+    global _msgpack
+    if _msgpack is None:
+        try:
+            import msgpack
+            _msgpack = msgpack
+        except ImportError:
+            return None
+    return _msgpack
+
+def msgpack_available() -> bool:
+    """✅ Cek apakah msgpack terinstall"""
+    return _get_msgpack() is not None
+
+def decode_tensor_batch(payload: bytes) -> np.ndarray:
+    """
+    🔓 Ubah payload uint8 mentah menjadi batch tensor tanpa copy
+
+    Args:
+        payload: Bytes dengan panjang kelipatan 224*224*3
+
+    Returns:
+        np.ndarray uint8 read-only dengan shape (N, 224, 224, 3)
+    """
+    if not payload or len(payload) % IMAGE_NBYTES != 0:
+        raise ValueError(
+            f"Panjang payload harus kelipatan {IMAGE_NBYTES} byte (224x224x3 uint8)"
+        )
+    count = len(payload) // IMAGE_NBYTES
+    return np.frombuffer(payload, dtype=np.uint8).reshape((count,) + TENSOR_SHAPE)
+
+def encode_tensor_batch(images: np.ndarray) -> bytes:
+    """
+    🔒 Ubah batch tensor uint8 menjadi payload request (dipakai klien)
+
+    Args:
+        images: Array uint8 (224, 224, 3) atau (N, 224, 224, 3)
+
+    Returns:
+        Bytes siap dikirim ke /api/predict-tensor
+    """
+    images = np.asarray(images, dtype=np.uint8)
+    if images.shape[-3:] != TENSOR_SHAPE:
+        raise ValueError(f"Shape tensor harus (N, 224, 224, 3), bukan {images.shape}")
+    return np.ascontiguousarray(images).tobytes()
+
+def encode_prediction_binary(probabilities: np.ndarray) -> bytes:
+    """
+    📤 Encode probabilitas batch ke format biner ringkas
+
+    Args:
+        probabilities: Array float (N, C)
+
+    Returns:
+        Bytes response (lihat format di docstring modul)
+    """
+    probs = np.asarray(probabilities, dtype="<f4")
+    count, num_classes = probs.shape
+    indices = probs.argmax(axis=1).astype(np.uint8)
+    header = _HEADER.pack(BINARY_MAGIC, BINARY_VERSION, num_classes, count)
+    return header + indices.tobytes() + probs.tobytes()
+
+def decode_prediction_binary(data: bytes):
+    """
+    📥 Decode response biner (dipakai klien)
+
+    Returns:
+        Tuple (indices uint8 (N,), probabilities float32 (N, C))
+    """
+    magic, version, num_classes, count = _HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("Response bukan format SWCP v1")
+    offset = _HEADER.size
+    indices = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset)
+    offset += count
+    probs = np.frombuffer(data, dtype="<f4", count=count * num_classes, offset=offset)
+    return indices, probs.reshape(count, num_classes)
+
+def encode_prediction_msgpack(probabilities: np.ndarray) -> bytes:
+    """
+    📤 Encode probabilitas batch ke msgpack
+
+    Struktur: {"n": N, "c": C, "idx": [..N], "prob": [[..C] x N]}
+    """
+    msgpack = _get_msgpack()
+    if msgpack is None:
+        raise RuntimeError("msgpack tidak terinstall")
+    probs = np.asarray(probabilities, dtype=np.float32)
+    return msgpack.packb({
+        "n": int(probs.shape[0]),
+        "c": int(probs.shape[1]),
+        "idx": probs.argmax(axis=1).tolist(),
+        "prob": probs.tolist()
+    }, use_single_float=True)